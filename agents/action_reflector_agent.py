@@ -17,7 +17,6 @@ import json
 from rich import print
 from rich.json import JSON
 from loguru import logger
-import base64
 import os
 from typing import Dict, Any, List, Optional, Tuple
 import json
@@ -34,6 +33,12 @@ from agenticx.memory.component import MemoryComponent
 from core.base_agent import BaseAgenticSeekerAgent
 from config import AgentConfig
 from utils import get_iso_timestamp
+from tools.image_diff import compare_images
+from tools.screen_cache import get_screen_cache
+
+
+# 不会改变界面的动作，执行前后屏幕无变化属于正常情况
+PASSIVE_ACTIONS = {"wait", "screenshot", "take_screenshot", "finish", "done", "unknown"}
 
 
 class MultimodalActionAnalysisTool(BaseTool):
@@ -270,13 +275,10 @@ class MultimodalActionAnalysisTool(BaseTool):
         # 准备图像内容
         if before_screenshot and after_screenshot:
             try:
-                # 读取操作前截图
-                with open(before_screenshot, "rb") as f:
-                    before_image_base64 = base64.b64encode(f.read()).decode('utf-8')
-                
-                # 读取操作后截图
-                with open(after_screenshot, "rb") as f:
-                    after_image_base64 = base64.b64encode(f.read()).decode('utf-8')
+                # 操作前后截图的base64内容，屏幕未变化或已被其他智能体编码时直接从缓存获取
+                screen_cache = get_screen_cache()
+                before_image_base64 = screen_cache.base64(before_screenshot)
+                after_image_base64 = screen_cache.base64(after_screenshot)
                 
                 # 构建多模态消息
                 messages = [{
@@ -1421,6 +1423,26 @@ class ActionReflectorAgent(BaseAgenticSeekerAgent):
   - expectation: {expectation}""")
         
         try:
+            # 先用像素比较判断屏幕是否变化；预期会改变界面的动作执行后屏幕没有变化时，
+            # 可直接判定为 C（无变化），不必调用多模态大模型
+            visual_diff = await self._compare_screenshots(before_screenshot, after_screenshot)
+            action_type = action_info.get("action", "unknown")
+            if (visual_diff is not None and not visual_diff["changed"]
+                    and action_type not in PASSIVE_ACTIONS):
+                logger.info(f"🖼️ 操作前后屏幕无变化 (SSIM={visual_diff['similarity_score']:.4f})，跳过多模态大模型调用")
+                return {
+                    "success": True,
+                    "operation_success": False,
+                    "outcome": "C",
+                    "comparison_analysis": "操作前后截图的像素比较没有发现任何变化区域",
+                    "success_judgment": "C",
+                    "error_analysis": "操作没有引起界面变化，可能点击位置不在可交互元素上或操作未生效",
+                    "improvement_suggestions": "重新定位目标元素后再执行操作",
+                    "visual_diff": visual_diff,
+                    "analysis_time": get_iso_timestamp(),
+                    "method": "visual_diff"
+                }
+            
             # 使用多模态分析工具
             analysis_tool = self.get_tool("multimodal_action_analysis")
             if analysis_tool:
@@ -1429,10 +1451,12 @@ class ActionReflectorAgent(BaseAgenticSeekerAgent):
                     "after_screenshot": after_screenshot,
                     "action": action_info,
                     "expectation": expectation,
-                    "task_type": action_info.get("action", "unknown")
+                    "task_type": action_type
                 }
                 logger.info(f"调用多模态分析工具，action_data: {action_data}")
                 result = await analysis_tool.aexecute(action_data=action_data)
+                if visual_diff is not None:
+                    result["visual_diff"] = visual_diff
                 
                 logger.info(f"""多模态分析结果:
   - success: {result.get('success')}
@@ -1449,6 +1473,17 @@ class ActionReflectorAgent(BaseAgenticSeekerAgent):
             logger.error(f"❌ 多模态分析失败: {e}")
             return {"success": False, "error": str(e)}
     
+    async def _compare_screenshots(self, before_screenshot: str, after_screenshot: str) -> Optional[Dict[str, Any]]:
+        """像素级比较操作前后截图，比较失败时返回 None"""
+        try:
+            diff = await asyncio.to_thread(compare_images, before_screenshot, after_screenshot)
+        except Exception as e:
+            logger.warning(f"截图像素比较失败: {e}")
+            return None
+        logger.info(f"截图像素比较: SSIM={diff.similarity:.4f}, 变化区域 {len(diff.changed_regions)} 个, "
+                    f"耗时 {diff.elapsed_ms:.1f}ms")
+        return {**diff.to_dict(), "changed": diff.changed}
+    
     async def _generate_improvement_suggestions(self, quality_assessment: Dict[str, Any], 
                                               problem_identification: Dict[str, Any],
                                               multimodal_analysis: Optional[Dict[str, Any]]) -> List[str]:
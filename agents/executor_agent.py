@@ -25,6 +25,9 @@ from core.base_agent import BaseAgenticSeekerAgent
 from config import AgentConfig
 from utils import get_iso_timestamp
 from tools.adb_tools import ADBClickTool, ADBSwipeTool, ADBInputTool, ADBScreenshotTool
+from tools.device_registry import get_device_registry
+from tools.frame_buffer import capture_frame_sync, get_frame_buffer
+from tools.screen_cache import get_screen_cache
 
 
 # 内部task_type与对外原子操作的映射关系
@@ -286,9 +289,8 @@ class ScreenshotTool(BaseTool):
             # 确保目录存在
             os.makedirs("./screenshots", exist_ok=True)
             
-            # 检查ADB设备连接
-            devices_result = subprocess.run(['adb', 'devices'], capture_output=True, text=True)
-            if 'device' not in devices_result.stdout:
+            # 检查ADB设备连接（查询共享设备注册表）
+            if not get_device_registry().is_connected():
                 # 如果没有设备连接，创建模拟截图
                 from PIL import Image, ImageDraw
                 img = Image.new('RGB', (1080, 1920), color='lightcoral')
@@ -304,6 +306,25 @@ class ScreenshotTool(BaseTool):
                     "timestamp": get_iso_timestamp()
                 }
             
+            # 优先通过 exec-out 将截图直接读入内存，PNG 内容直接写盘
+            try:
+                frame = capture_frame_sync(raw=False)
+                get_frame_buffer().assign_path(frame, screenshot_path)
+                frame.save(screenshot_path)
+                # 登记到屏幕缓存，屏幕未变化时下游分析直接复用已有结果
+                screen = get_screen_cache().lookup(frame)
+                return {
+                    "success": True,
+                    "screenshot_path": screenshot_path,
+                    "action": "screenshot",
+                    "device_type": "real_device",
+                    "screen_hash": screen.digest[:16],
+                    "screen_cached": screen.hits > 0,
+                    "timestamp": get_iso_timestamp()
+                }
+            except Exception as e:
+                logger.debug(f"exec-out截图失败，改用设备文件方式: {e}")
+            
             # 使用ADB获取真实设备截图
             device_screenshot_path = "/sdcard/screenshot_temp.png"
             
@@ -1145,9 +1166,7 @@ class ExecutorAgent(BaseAgenticSeekerAgent):
             
             # 如果有截图路径，添加图片到消息中
             if screenshot_path:
-                import base64
-                with open(screenshot_path, "rb") as image_file:
-                    image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+                image_base64 = get_screen_cache().base64(screenshot_path)
                 messages[0]["content"].append(
                     {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
                 )
@@ -25,6 +25,7 @@ from core.base_agent import BaseAgenticSeekerAgent
 from core.info_pool import InfoPool
 from config import AgentConfig
 from utils import get_iso_timestamp
+from tools.screen_cache import get_screen_cache
 
 
 class MultimodalTaskDecompositionTool(BaseTool):
@@ -196,9 +197,8 @@ class MultimodalTaskDecompositionTool(BaseTool):
         # 如果有截图，添加图像内容（转换为base64）
         if screenshot_path:
             try:
-                import base64
-                with open(screenshot_path, "rb") as image_file:
-                    image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+                # 同一屏幕的base64内容由共享屏幕缓存提供
+                image_base64 = get_screen_cache().base64(screenshot_path)
                 
                 # 重新构建消息内容为列表格式
                 messages = [{
@@ -235,9 +235,8 @@ class MultimodalTaskDecompositionTool(BaseTool):
         # 如果有截图，添加图像内容（转换为base64）
         if screenshot_path:
             try:
-                import base64
-                with open(screenshot_path, "rb") as image_file:
-                    image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+                # 同一屏幕的base64内容由共享屏幕缓存提供
+                image_base64 = get_screen_cache().base64(screenshot_path)
                 
                 # 重新构建消息内容为列表格式
                 messages = [{
@@ -271,9 +270,8 @@ class MultimodalTaskDecompositionTool(BaseTool):
         # 如果有截图，添加图像内容（转换为base64）
         if screenshot_path:
             try:
-                import base64
-                with open(screenshot_path, "rb") as image_file:
-                    image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+                # 同一屏幕的base64内容由共享屏幕缓存提供
+                image_base64 = get_screen_cache().base64(screenshot_path)
                 
                 # 重新构建消息内容为列表格式
                 messages = [{
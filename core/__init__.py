@@ -14,7 +14,11 @@ __description__ = "AgenticSeeker核心模块 - 基于AgenticX框架"
 from .system import AgenticSeekerSystem
 from .base_agent import BaseAgenticSeekerAgent, AgentState
 from .info_pool import InfoPool, InfoType, InfoPriority, InfoEntry
+from .info_journal import InfoJournal, JournalOp
+from .info_pool_backend import InfoPoolBackend, LocalBackend, BrokerBackend, InfoPoolBroker
+from .ring_buffer import RingBuffer
 from .coordinator import AgentCoordinator
+from .dag_scheduler import DAGScheduler
 from .task import TaskManager, Task, TaskStatus, TaskPriority
 from .context import AgentContext, ContextType, StateType
 # from .agents import ManagerAgent, ExecutorAgent, ActionReflectorAgent, NotetakerAgent
@@ -27,7 +31,15 @@ __all__ = [
     "InfoType",
     "InfoPriority", 
     "InfoEntry",
+    "InfoJournal",
+    "JournalOp",
+    "InfoPoolBackend",
+    "LocalBackend",
+    "BrokerBackend",
+    "InfoPoolBroker",
+    "RingBuffer",
     "AgentCoordinator",
+    "DAGScheduler",
     "TaskManager",
     "Task",
     "TaskStatus",
@@ -7,6 +7,7 @@
 """
 
 import asyncio
+import time
 from loguru import logger
 from typing import Dict, List, Any, Optional, Set, Callable
 from dataclasses import dataclass
@@ -22,6 +23,7 @@ from agenticx.collaboration.manager import CollaborationManager
 from config import WorkflowConfig, WorkflowNodeConfig, WorkflowEdgeConfig
 from utils import get_iso_timestamp
 from core.info_pool import InfoType, InfoPriority
+from core.dag_scheduler import DAGScheduler
 
 
 class NodeStatus(Enum):
@@ -85,13 +87,15 @@ class AgentCoordinator(Component):
         self,
         event_bus: Optional[EventBus] = None,
         max_concurrent_workflows: int = 10,
-        max_node_retries: int = 3
+        max_node_retries: int = 3,
+        max_concurrent_nodes: Optional[int] = None
     ):
         super().__init__(name="agent_coordinator")
         
         self.event_bus = event_bus or EventBus()
         self.max_concurrent_workflows = max_concurrent_workflows
         self.max_node_retries = max_node_retries
+        self.max_concurrent_nodes = max_concurrent_nodes
         
         # 使用AgenticX的协作管理器
         self.collaboration_manager = CollaborationManager()
@@ -105,6 +109,10 @@ class AgentCoordinator(Component):
         self._running = False
         self._execution_tasks: Dict[str, asyncio.Task] = {}
         
+        # 节点耗时估计（工作流ID:节点ID -> 秒），用于关键路径优先调度
+        self._node_durations: Dict[str, float] = {}
+        self._duration_smoothing = 0.3
+        
         # 回调管理
         self._node_callbacks: Dict[str, List[Callable]] = {}
         self._workflow_callbacks: Dict[str, List[Callable]] = {}
@@ -380,58 +388,49 @@ class AgentCoordinator(Component):
         execution: WorkflowExecution,
         dependencies: Dict[str, Set[str]]
     ) -> None:
-        """执行节点"""
-        completed_nodes = set()
-        
-        while len(completed_nodes) < len(workflow.nodes):
-            # 找到可执行的节点
-            ready_nodes = []
-            for node in workflow.nodes:
-                if (node.id not in completed_nodes and
-                    execution.nodes[node.id].status == NodeStatus.PENDING and
-                    dependencies[node.id].issubset(completed_nodes)):
-                    ready_nodes.append(node)
-            
-            if not ready_nodes:
-                # 检查是否有失败的节点
-                failed_nodes = [
-                    node_id for node_id, node_exec in execution.nodes.items()
-                    if node_exec.status == NodeStatus.FAILED
-                ]
-                if failed_nodes:
-                    raise Exception(f"节点执行失败: {failed_nodes}")
-                
-                # 没有可执行的节点，可能存在循环依赖
-                pending_nodes = [
-                    node_id for node_id, node_exec in execution.nodes.items()
-                    if node_exec.status == NodeStatus.PENDING
-                ]
-                if pending_nodes:
-                    raise Exception(f"检测到循环依赖或无法满足的依赖: {pending_nodes}")
-                
-                break
-            
-            # 并行执行准备好的节点
-            tasks = []
-            for node in ready_nodes:
-                task = asyncio.create_task(
-                    self._execute_node(execution_id, node, execution)
-                )
-                tasks.append((node.id, task))
-            
-            # 等待节点完成
-            for node_id, task in tasks:
-                try:
-                    await task
-                    completed_nodes.add(node_id)
-                except Exception as e:
-                    logger.error(f"节点执行失败: {node_id}, 错误: {e}")
-                    execution.nodes[node_id].status = NodeStatus.FAILED
-                    execution.nodes[node_id].error = str(e)
-                    execution.nodes[node_id].end_time = get_iso_timestamp()
-                    
-                    # 如果是关键节点失败，停止执行
-                    raise
+        """执行节点
+        
+        事件驱动调度：节点完成后立即释放入度归零的后继节点，
+        就绪节点按关键路径（以历史耗时估计）优先，并受 max_concurrent_nodes 限制。
+        """
+        try:
+            scheduler = DAGScheduler(
+                dependencies,
+                max_concurrency=self.max_concurrent_nodes,
+                weights={
+                    node.id: self._node_durations.get(f"{workflow.id}:{node.id}", 1.0)
+                    for node in workflow.nodes
+                }
+            )
+        except ValueError as e:
+            raise Exception(str(e)) from e
+        
+        nodes = {node.id: node for node in workflow.nodes}
+        
+        async def run_node(node_id: str) -> None:
+            started = time.perf_counter()
+            try:
+                await self._execute_node(execution_id, nodes[node_id], execution)
+            except Exception as e:
+                logger.error(f"节点执行失败: {node_id}, 错误: {e}")
+                node_execution = execution.nodes[node_id]
+                node_execution.status = NodeStatus.FAILED
+                node_execution.error = str(e)
+                node_execution.end_time = get_iso_timestamp()
+                raise Exception(f"节点执行失败: {[node_id]}") from e
+            self._record_node_duration(workflow.id, node_id, time.perf_counter() - started)
+        
+        await scheduler.run(run_node)
+    
+    def _record_node_duration(self, workflow_id: str, node_id: str, duration: float) -> None:
+        """以指数滑动平均更新节点耗时估计"""
+        key = f"{workflow_id}:{node_id}"
+        previous = self._node_durations.get(key)
+        if previous is None:
+            self._node_durations[key] = duration
+        else:
+            alpha = self._duration_smoothing
+            self._node_durations[key] = alpha * duration + (1 - alpha) * previous
     
     async def _execute_node(
         self,
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DAG调度器模块
+
+为工作流节点提供事件驱动的调度：按入度计数维护就绪队列，节点完成时在回调中
+立即释放其后继节点，无需按轮次扫描全部节点，也不必等待同一轮中最慢的节点。
+就绪节点按关键路径长度优先调度，并可限制同时运行的节点数。
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+
+class DAGScheduler:
+    """事件驱动的DAG调度器
+
+    Args:
+        dependencies: 节点ID -> 依赖节点ID集合
+        max_concurrency: 同时运行的最大节点数，None表示不限制
+        weights: 节点的预估耗时，用于计算关键路径，缺省为1
+        critical_path_first: 是否优先调度关键路径更长的就绪节点，否则按就绪先后调度
+    """
+
+    def __init__(
+        self,
+        dependencies: Dict[str, Set[str]],
+        max_concurrency: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+        critical_path_first: bool = True
+    ):
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError(f"最大并发数必须大于0: {max_concurrency}")
+        self.dependencies = dependencies
+        self.max_concurrency = max_concurrency
+        self.critical_path_first = critical_path_first
+
+        self.successors: Dict[str, List[str]] = {node_id: [] for node_id in dependencies}
+        self.in_degree: Dict[str, int] = {}
+        for node_id, deps in dependencies.items():
+            unknown = deps - self.successors.keys()
+            if unknown:
+                raise ValueError(f"节点 {node_id} 依赖不存在的节点: {sorted(unknown)}")
+            self.in_degree[node_id] = len(deps)
+            for dep in deps:
+                self.successors[dep].append(node_id)
+
+        self.order = self._topological_order()
+        self.priority = self._critical_path_lengths(weights or {})
+
+        self._stats = {"makespan": 0.0, "max_parallelism": 0, "completed": 0}
+
+    def _topological_order(self) -> List[str]:
+        """Kahn算法求拓扑序，存在环时抛出ValueError"""
+        in_degree = dict(self.in_degree)
+        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        order = []
+        while queue:
+            node_id = queue.pop()
+            order.append(node_id)
+            for successor in self.successors[node_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    queue.append(successor)
+        if len(order) < len(self.dependencies):
+            pending = sorted(node_id for node_id, degree in in_degree.items() if degree > 0)
+            raise ValueError(f"检测到循环依赖或无法满足的依赖: {pending}")
+        return order
+
+    def _critical_path_lengths(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """每个节点到出口节点的最长加权路径（含自身）"""
+        lengths: Dict[str, float] = {}
+        for node_id in reversed(self.order):
+            tail = max((lengths[s] for s in self.successors[node_id]), default=0.0)
+            lengths[node_id] = weights.get(node_id, 1.0) + tail
+        return lengths
+
+    async def run(self, execute: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+        """调度执行全部节点
+
+        任一节点抛出异常时取消其余运行中的节点并重新抛出该异常。
+
+        Args:
+            execute: 执行单个节点的协程函数
+
+        Returns:
+            节点ID -> 执行结果
+        """
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+        remaining = dict(self.in_degree)
+        results: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, str] = {}
+        ready: List[Tuple[float, int, str]] = []
+        counter = itertools.count()
+        start = time.perf_counter()
+
+        def push(node_id: str) -> None:
+            key = -self.priority[node_id] if self.critical_path_first else 0.0
+            heapq.heappush(ready, (key, next(counter), node_id))
+
+        def launch() -> None:
+            while ready and (self.max_concurrency is None or len(running) < self.max_concurrency):
+                _, _, node_id = heapq.heappop(ready)
+                task = asyncio.create_task(execute(node_id))
+                running[task] = node_id
+                task.add_done_callback(on_done)
+            if len(running) > self._stats["max_parallelism"]:
+                self._stats["max_parallelism"] = len(running)
+
+        def on_done(task: asyncio.Task) -> None:
+            node_id = running.pop(task)
+            if finished.done():
+                return
+            if task.cancelled():
+                finished.cancel()
+                return
+            error = task.exception()
+            if error is not None:
+                finished.set_exception(error)
+                return
+
+            results[node_id] = task.result()
+            for successor in self.successors[node_id]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    push(successor)
+            if len(results) == len(self.dependencies):
+                finished.set_result(results)
+            else:
+                launch()
+
+        for node_id in self.dependencies:
+            if remaining[node_id] == 0:
+                push(node_id)
+        if not self.dependencies:
+            return results
+
+        launch()
+        try:
+            return await finished
+        finally:
+            for task in list(running):
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            self._stats["makespan"] = time.perf_counter() - start
+            self._stats["completed"] = len(results)
+            logger.debug(
+                f"DAG调度结束: {len(results)}/{len(self.dependencies)} 个节点，"
+                f"耗时 {self._stats['makespan']:.3f}s，最大并行度 {self._stats['max_parallelism']}"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取最近一次调度的统计数据"""
+        return {
+            **self._stats,
+            "nodes": len(self.dependencies),
+            "critical_path": max(self.priority.values(), default=0.0),
+        }
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+事件投递模块
+
+为InfoPool提供非阻塞的批量事件分发：每个订阅者拥有一个有界投递队列和
+独立的分发任务，慢订阅者只会积压自己的队列，不会拖慢发布者和其他订阅者。
+"""
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+from loguru import logger
+
+from agenticx.core.event import Event
+
+
+class BackpressurePolicy(Enum):
+    """队列满时的背压策略"""
+    BLOCK = "block"                # 阻塞投递方直到队列有空位
+    DROP_OLDEST = "drop_oldest"    # 丢弃最旧的事件
+    COALESCE = "coalesce"          # 按键合并，同键事件只保留最新一条
+
+
+def default_coalesce_key(event: Event) -> Hashable:
+    """默认合并键：事件类型 + 来源智能体"""
+    data = event.data if isinstance(event.data, dict) else {}
+    return event.type, data.get("source_agent", event.agent_id)
+
+
+@dataclass
+class DeliveryMetrics:
+    """投递队列指标"""
+    enqueued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    errors: int = 0
+    max_depth: int = 0
+    blocked_puts: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+    last_lag: float = 0.0
+
+    def to_dict(self, depth: int) -> Dict[str, Any]:
+        return {
+            "queue_depth": depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "errors": self.errors,
+            "blocked_puts": self.blocked_puts,
+            "avg_batch_size": self.delivered / self.batches if self.batches else 0.0,
+            "avg_lag": self.total_lag / self.delivered if self.delivered else 0.0,
+            "max_lag": self.max_lag,
+            "last_lag": self.last_lag,
+        }
+
+
+class DeliveryQueue:
+    """单个订阅者的有界投递队列
+
+    put() 在队列未满时同步完成，不会让出事件循环；分发任务把积压的事件
+    合并为批次交给回调。batch_callback 为 True 时回调一次接收整批事件列表，
+    否则逐条调用。linger 大于0时，分发任务被唤醒后最多等待该时长以聚合突发事件。
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Any],
+        max_size: int = 1000,
+        batch_size: int = 64,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        coalesce_key: Optional[Callable[[Event], Hashable]] = None,
+        batch_callback: bool = False,
+        linger: float = 0.0,
+        name: str = "subscriber"
+    ):
+        self.callback = callback
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.policy = policy
+        self.coalesce_key = coalesce_key or default_coalesce_key
+        self.batch_callback = batch_callback
+        self.linger = linger
+        self.name = name
+        self.metrics = DeliveryMetrics()
+
+        # 队列元素为可变槽位 [event, enqueued_at, key]，合并时原地替换
+        self._queue: Deque[List[Any]] = deque()
+        self._slots: Dict[Hashable, List[Any]] = {}
+        self._not_empty: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # close_nowait 之后不再接受新事件，分发任务投递完积压后退出
+        self._closing = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def ensure_started(self) -> None:
+        """在当前事件循环上启动（或重启）分发任务"""
+        if self._task is not None and not self._task.done():
+            return
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._idle = asyncio.Event()
+        if self._queue:
+            self._not_empty.set()
+        else:
+            self._idle.set()
+        if len(self._queue) < self.max_size:
+            self._not_full.set()
+        self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def put(self, event: Event) -> None:
+        """投递一个事件，队列满时按背压策略处理"""
+        if self._closing:
+            self.metrics.dropped += 1
+            return
+        self.ensure_started()
+        now = time.monotonic()
+
+        if self.policy == BackpressurePolicy.COALESCE:
+            key = self.coalesce_key(event)
+            slot = self._slots.get(key)
+            if slot is not None:
+                # 保留原入队时间，使延迟指标反映最早未投递的事件
+                slot[0] = event
+                self.metrics.coalesced += 1
+                return
+        else:
+            key = None
+
+        while len(self._queue) >= self.max_size:
+            if self.policy == BackpressurePolicy.BLOCK:
+                self.metrics.blocked_puts += 1
+                self._not_full.clear()
+                await self._not_full.wait()
+            else:
+                dropped = self._queue.popleft()
+                if dropped[2] is not None:
+                    self._slots.pop(dropped[2], None)
+                self.metrics.dropped += 1
+
+        slot = [event, now, key]
+        self._queue.append(slot)
+        if key is not None:
+            self._slots[key] = slot
+        self.metrics.enqueued += 1
+        if len(self._queue) > self.metrics.max_depth:
+            self.metrics.max_depth = len(self._queue)
+        self._idle.clear()
+        self._not_empty.set()
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中的事件全部投递完成
+
+        Returns:
+            是否在超时前投递完成
+        """
+        if self._task is None or self._task.done():
+            return not self._queue
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        """停止分发任务"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def close_nowait(self) -> None:
+        """同步关闭（取消订阅时使用）：不再接受新事件，分发任务投递完已入队的事件后退出
+
+        没有运行中的分发任务时，积压的事件无法再投递，计入 dropped。
+        """
+        self._closing = True
+        if self._task is None or self._task.done():
+            self.metrics.dropped += len(self._queue)
+            self._queue.clear()
+            self._slots.clear()
+            return
+        # 唤醒空闲的分发任务，使其发现关闭标记后退出
+        self._not_empty.set()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.metrics.to_dict(len(self._queue))
+
+    def _take_batch(self) -> List[List[Any]]:
+        count = min(self.batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(count)]
+        for slot in batch:
+            if slot[2] is not None:
+                self._slots.pop(slot[2], None)
+        if not self._queue:
+            self._not_empty.clear()
+        self._not_full.set()
+        return batch
+
+    async def _dispatch_loop(self) -> None:
+        """分发循环：取出一批事件交给回调"""
+        while True:
+            try:
+                if self._closing and not self._queue:
+                    break
+                await self._not_empty.wait()
+                if self.linger > 0 and len(self._queue) < self.batch_size:
+                    await asyncio.sleep(self.linger)
+                batch = self._take_batch()
+                if not batch:
+                    continue
+
+                now = time.monotonic()
+                lag = now - batch[0][1]
+                self.metrics.last_lag = lag
+                self.metrics.max_lag = max(self.metrics.max_lag, lag)
+                self.metrics.total_lag += sum(now - slot[1] for slot in batch)
+                self.metrics.batches += 1
+
+                events = [slot[0] for slot in batch]
+                if self.batch_callback:
+                    await self._invoke(events)
+                else:
+                    for event in events:
+                        await self._invoke(event)
+                self.metrics.delivered += len(events)
+
+                if not self._queue:
+                    self._idle.set()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"事件分发循环错误 ({self.name}): {e}")
+
+    async def _invoke(self, arg: Any) -> None:
+        try:
+            result = self.callback(arg)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.error(f"订阅者 {self.name} 处理事件失败: {e}")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+InfoJournal信息池持久化日志模块
+
+为InfoPool提供可选的追加式磁盘日志：
+- 长度前缀 + CRC32 校验的二进制记录
+- 分段滚动写入，组提交（多个发布者共享一次写入和fsync）
+- 周期性压缩快照，快照之前的日志分段可直接删除
+- 启动时按 快照 + 后续分段 的顺序快速重放
+"""
+
+import asyncio
+import json
+import os
+import struct
+import time
+import zlib
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+from loguru import logger
+
+
+# 记录头：负载长度(uint32) + CRC32(uint32)，大端
+RECORD_HEADER = struct.Struct(">II")
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".log"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".snap"
+
+_decoder = json.JSONDecoder()
+
+
+class JournalOp(Enum):
+    """日志操作类型"""
+    PUT = "put"               # 写入或覆盖条目
+    DELETE = "del"            # 删除条目
+    PROCESSED = "proc"        # 标记条目已被某智能体处理
+
+
+def encode_record(op: JournalOp, payload: Dict[str, Any]) -> bytes:
+    """编码一条日志记录"""
+    body = json.dumps(
+        [op.value, payload], ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def decode_records(buffer: bytes) -> Tuple[List[Tuple[JournalOp, Dict[str, Any]]], int]:
+    """解码缓冲区中的全部完整记录
+
+    Returns:
+        (记录列表, 最后一条有效记录的结束偏移)。遇到截断或校验失败的记录即停止。
+    """
+    records = []
+    view = memoryview(buffer)
+    offset = 0
+    end = len(buffer)
+    header_size = RECORD_HEADER.size
+
+    while offset + header_size <= end:
+        length, crc = RECORD_HEADER.unpack_from(view, offset)
+        start = offset + header_size
+        if start + length > end:
+            break
+        body = view[start:start + length]
+        if zlib.crc32(body) != crc:
+            break
+        op, payload = _decoder.decode(str(body, "utf-8"))
+        records.append((JournalOp(op), payload))
+        offset = start + length
+
+    return records, offset
+
+
+class InfoJournal:
+    """信息池追加式日志
+
+    append() 只把编码后的记录放入内存缓冲区，由后台刷写任务批量写入当前分段。
+    durable 为 True 时每批写入后执行 fsync，append() 返回的 Future 在该批提交后完成。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        snapshot_every_segments: int = 4,
+        flush_interval: float = 0.002,
+        durable: bool = True
+    ):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.snapshot_every_segments = snapshot_every_segments
+        self.flush_interval = flush_interval
+        self.durable = durable
+
+        # 由InfoPool提供的快照数据源，返回当前全部条目的PUT负载
+        self.snapshot_source: Optional[Callable[[], List[Dict[str, Any]]]] = None
+
+        self._segment_index = 0
+        self._segment_file = None
+        self._segment_size = 0
+        self._segments_since_snapshot = 0
+        self._tail_valid_offset: Optional[int] = None
+
+        self._pending: List[bytes] = []
+        self._pending_futures: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._commit_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+
+        self._stats = {
+            "records_appended": 0,
+            "bytes_written": 0,
+            "batches_committed": 0,
+            "snapshots_written": 0,
+            "records_replayed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 文件布局
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{index:08d}{SEGMENT_SUFFIX}"
+
+    def _snapshot_path(self, index: int) -> Path:
+        return self.directory / f"{SNAPSHOT_PREFIX}{index:08d}{SNAPSHOT_SUFFIX}"
+
+    def _list_indexed(self, prefix: str, suffix: str) -> List[int]:
+        if not self.directory.exists():
+            return []
+        indexes = []
+        for path in self.directory.iterdir():
+            name = path.name
+            if name.startswith(prefix) and name.endswith(suffix):
+                try:
+                    indexes.append(int(name[len(prefix):-len(suffix)]))
+                except ValueError:
+                    continue
+        return sorted(indexes)
+
+    # ------------------------------------------------------------------
+    # 重放
+    # ------------------------------------------------------------------
+
+    def replay(self) -> Iterator[Tuple[JournalOp, Dict[str, Any]]]:
+        """按顺序重放 最新快照 + 其后的全部分段
+
+        记录均为幂等操作（PUT覆盖、DELETE/PROCESSED可重复），
+        快照包含的内容多于其覆盖的分段时也能得到正确结果。
+        """
+        snapshots = self._list_indexed(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        segments = self._list_indexed(SEGMENT_PREFIX, SEGMENT_SUFFIX)
+        base = 0
+
+        if snapshots:
+            base = snapshots[-1]
+            records, _ = decode_records(self._snapshot_path(base).read_bytes())
+            self._stats["records_replayed"] += len(records)
+            yield from records
+
+        replay_segments = [i for i in segments if i >= base]
+        for position, index in enumerate(replay_segments):
+            data = self._segment_path(index).read_bytes()
+            records, valid_end = decode_records(data)
+            if valid_end < len(data):
+                if position == len(replay_segments) - 1:
+                    # 尾部分段的残缺记录来自崩溃时未完成的写入，打开时截断
+                    self._tail_valid_offset = valid_end
+                    logger.warning(f"日志分段 {index} 尾部有 {len(data) - valid_end} 字节残缺记录")
+                else:
+                    logger.error(f"日志分段 {index} 在偏移 {valid_end} 处损坏，跳过其余记录")
+            self._stats["records_replayed"] += len(records)
+            yield from records
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """打开尾部分段并启动后台刷写任务"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self._list_indexed(SEGMENT_PREFIX, SEGMENT_SUFFIX)
+        snapshots = self._list_indexed(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        self._segment_index = max(segments[-1] if segments else 0, snapshots[-1] if snapshots else 0)
+
+        path = self._segment_path(self._segment_index)
+        if self._tail_valid_offset is not None and path.exists():
+            with open(path, "r+b") as f:
+                f.truncate(self._tail_valid_offset)
+            self._tail_valid_offset = None
+
+        self._segment_file = open(path, "ab")
+        self._segment_size = self._segment_file.tell()
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._commit_lock = asyncio.Lock()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"InfoJournal已打开: {path}")
+
+    def append(self, op: JournalOp, payload: Dict[str, Any],
+               wait: bool = True) -> Optional[asyncio.Future]:
+        """追加一条记录
+
+        Args:
+            op: 操作类型
+            payload: 记录负载
+            wait: 是否需要等待提交的Future
+
+        Returns:
+            durable 模式且 wait 为 True 时返回在记录提交后完成的Future，否则返回None
+        """
+        self._pending.append(encode_record(op, payload))
+        self._stats["records_appended"] += 1
+
+        future = None
+        if self.durable and wait:
+            future = asyncio.get_running_loop().create_future()
+            self._pending_futures.append(future)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return future
+
+    async def flush(self) -> None:
+        """立即提交缓冲区中的全部记录"""
+        await self._commit_pending()
+
+    async def close(self) -> None:
+        """提交剩余记录并关闭日志"""
+        self._closing = True
+        if self._flush_task:
+            self._wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        await self._commit_pending()
+        if self._segment_file:
+            self._segment_file.close()
+            self._segment_file = None
+        logger.info("InfoJournal已关闭")
+
+    async def _flush_loop(self) -> None:
+        """后台刷写循环：等待记录到达，短暂聚合后整批提交"""
+        while not self._closing:
+            try:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if self.flush_interval > 0 and not self._closing:
+                    await asyncio.sleep(self.flush_interval)
+                await self._commit_pending()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"日志刷写错误: {e}")
+
+    async def _commit_pending(self) -> None:
+        """将缓冲区作为一个批次写入当前分段，必要时滚动分段并生成快照"""
+        if not self._pending or self._segment_file is None:
+            return
+
+        # 批次按顺序逐个写入，保证记录在文件中的顺序与追加顺序一致
+        async with self._commit_lock:
+            if not self._pending:
+                return
+            batch = b"".join(self._pending)
+            futures = self._pending_futures
+            self._pending = []
+            self._pending_futures = []
+
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._write_batch, self._segment_file, batch)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+
+            self._segment_size += len(batch)
+            self._stats["bytes_written"] += len(batch)
+            self._stats["batches_committed"] += 1
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+            if self._segment_size >= self.segment_max_bytes:
+                await self._rotate_segment()
+
+    def _write_batch(self, f, batch: bytes) -> None:
+        f.write(batch)
+        f.flush()
+        if self.durable:
+            os.fsync(f.fileno())
+
+    async def _rotate_segment(self) -> None:
+        """滚动到新分段，每隔若干分段写入一次压缩快照"""
+        self._segment_file.close()
+        self._segment_index += 1
+        self._segment_file = open(self._segment_path(self._segment_index), "ab")
+        self._segment_size = 0
+        self._segments_since_snapshot += 1
+
+        if self.snapshot_source and self._segments_since_snapshot >= self.snapshot_every_segments:
+            # 先滚动再采集状态：快照覆盖新分段之前的全部记录
+            payloads = self.snapshot_source()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_snapshot, self._segment_index, payloads)
+            self._segments_since_snapshot = 0
+
+    def _write_snapshot(self, index: int, payloads: List[Dict[str, Any]]) -> None:
+        """写入快照（临时文件 + 原子重命名），然后删除被覆盖的分段和旧快照"""
+        start = time.perf_counter()
+        path = self._snapshot_path(index)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(encode_record(JournalOp.PUT, payload) for payload in payloads))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for old in self._list_indexed(SEGMENT_PREFIX, SEGMENT_SUFFIX):
+            if old < index:
+                self._segment_path(old).unlink(missing_ok=True)
+        for old in self._list_indexed(SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX):
+            if old < index:
+                self._snapshot_path(old).unlink(missing_ok=True)
+
+        self._stats["snapshots_written"] += 1
+        logger.info(
+            f"写入快照 {path.name}: {len(payloads)} 条记录，耗时 {time.perf_counter() - start:.2f}s"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取日志统计数据"""
+        batches = self._stats["batches_committed"]
+        return {
+            **self._stats,
+            "current_segment": self._segment_index,
+            "current_segment_bytes": self._segment_size,
+            "pending_records": len(self._pending),
+            "avg_batch_records": (
+                (self._stats["records_appended"] - len(self._pending)) / batches if batches else 0.0
+            ),
+        }
@@ -8,13 +8,16 @@ InfoPool信息共享池模块
 """
 
 import asyncio
+import gc
+import heapq
+import itertools
 import json
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Set, Callable, Union
+from typing import Dict, Any, List, Optional, Set, Callable, Union, Iterable, Iterator, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 from loguru import logger
 
 # 使用AgenticX的事件系统
@@ -23,6 +26,10 @@ from agenticx.core.event_bus import EventBus
 from agenticx.core.component import Component
 
 from utils import get_iso_timestamp, safe_json_dumps, safe_json_loads
+from .info_journal import InfoJournal, JournalOp
+from .event_delivery import BackpressurePolicy, DeliveryQueue
+from .info_pool_backend import InfoPoolBackend, LocalBackend
+from .ring_buffer import RingBuffer
 
 
 class InfoType(Enum):
@@ -47,6 +54,17 @@ class InfoType(Enum):
     AGENT_EVENT = "agent_event"
 
 
+# 工作记忆历史的容量
+MAX_ACTION_HISTORY = 50
+MAX_PROGRESS_HISTORY = 20
+MAX_LLM_ANALYSIS_HISTORY = 10
+
+
+def _action_type(action: str) -> str:
+    """动作类型：动作字符串中参数之前的名称，如 tap(100, 200) -> tap"""
+    return action.split("(", 1)[0].strip().split(" ", 1)[0] if action else ""
+
+
 class InfoPriority(Enum):
     """信息优先级枚举"""
     LOW = 1
@@ -72,11 +90,11 @@ class AgenticSeekerInfoPool:
     ui_elements_list_after: str = ""   # 操作后的UI元素列表
     action_pool: List[Dict[str, Any]] = field(default_factory=list)
     
-    # 工作记忆
-    summary_history: List[str] = field(default_factory=list)  # 动作描述历史
-    action_history: List[str] = field(default_factory=list)   # 动作历史
-    action_outcomes: List[str] = field(default_factory=list)  # 动作结果
-    error_descriptions: List[str] = field(default_factory=list)
+    # 工作记忆（固定容量的环形缓冲区，四者按下标一一对应）
+    summary_history: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_ACTION_HISTORY))  # 动作描述历史
+    action_history: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_ACTION_HISTORY))   # 动作历史
+    action_outcomes: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_ACTION_HISTORY))  # 动作结果
+    error_descriptions: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_ACTION_HISTORY))
     
     last_summary: str = ""        # 最后一个动作描述
     last_action: str = ""         # 最后一个动作
@@ -90,7 +108,7 @@ class AgenticSeekerInfoPool:
     plan: str = ""
     completed_plan: str = ""
     progress_status: str = ""
-    progress_status_history: List[str] = field(default_factory=list)
+    progress_status_history: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_PROGRESS_HISTORY))
     finish_thought: str = ""
     current_subgoal: str = ""
     err_to_manager_thresh: int = 2
@@ -100,27 +118,65 @@ class AgenticSeekerInfoPool:
     
     # AgenticX扩展字段
     current_screenshot: Optional[str] = None
-    llm_analysis_history: List[Dict[str, Any]] = field(default_factory=list)
+    llm_analysis_history: RingBuffer = field(default_factory=lambda: RingBuffer(MAX_LLM_ANALYSIS_HISTORY))
     multimodal_context: Dict[str, Any] = field(default_factory=dict)
     agent_states: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     
+    # 失败记录的增量索引：累计追加序号、窗口内失败动作的序号、失败总数及按动作类型的失败计数
+    _appended: int = field(default=0, init=False, repr=False)
+    _failure_count: int = field(default=0, init=False, repr=False)
+    _failure_seqs: deque = field(default_factory=lambda: deque(maxlen=MAX_ACTION_HISTORY),
+                                 init=False, repr=False)
+    _failures_by_action: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    
+    def __post_init__(self):
+        """把传入的列表转换为环形缓冲区，并重建失败索引"""
+        histories = (self.action_history, self.summary_history, self.action_outcomes, self.error_descriptions)
+        if any(not isinstance(h, RingBuffer) for h in histories) or self.action_history:
+            actions, summaries, outcomes, errors = (list(h) for h in histories)
+            for name in ("action_history", "summary_history", "action_outcomes", "error_descriptions"):
+                setattr(self, name, RingBuffer(MAX_ACTION_HISTORY))
+            for i, action in enumerate(actions):
+                self.add_action_result(
+                    action,
+                    summaries[i] if i < len(summaries) else "",
+                    outcomes[i] if i < len(outcomes) else "A",
+                    errors[i] if i < len(errors) else ""
+                )
+        if not isinstance(self.progress_status_history, RingBuffer):
+            self.progress_status_history = RingBuffer(MAX_PROGRESS_HISTORY, self.progress_status_history)
+        if not isinstance(self.llm_analysis_history, RingBuffer):
+            self.llm_analysis_history = RingBuffer(MAX_LLM_ANALYSIS_HISTORY, self.llm_analysis_history)
+    
     def add_action_result(self, action: str, summary: str, outcome: str, error_desc: str = ""):
         """添加动作结果"""
+        # 缓冲区已满时最旧的一条将被覆盖，先从失败计数中扣除
+        if self.action_outcomes.is_full() and self.action_outcomes[0] != "A":
+            self._discount_failure(self.action_history[0])
+        
         self.action_history.append(action)
         self.summary_history.append(summary)
         self.action_outcomes.append(outcome)
         self.error_descriptions.append(error_desc)
         
+        if outcome != "A":  # 非成功状态
+            self._failure_seqs.append(self._appended)
+            self._failure_count += 1
+            action_type = _action_type(action)
+            self._failures_by_action[action_type] = self._failures_by_action.get(action_type, 0) + 1
+        self._appended += 1
+        
         self.last_action = action
         self.last_summary = summary
-        
-        # 保持历史记录在合理范围内
-        max_history = 50
-        if len(self.action_history) > max_history:
-            self.action_history = self.action_history[-max_history:]
-            self.summary_history = self.summary_history[-max_history:]
-            self.action_outcomes = self.action_outcomes[-max_history:]
-            self.error_descriptions = self.error_descriptions[-max_history:]
+    
+    def _discount_failure(self, action: str) -> None:
+        self._failure_count -= 1
+        action_type = _action_type(action)
+        remaining = self._failures_by_action.get(action_type, 0) - 1
+        if remaining > 0:
+            self._failures_by_action[action_type] = remaining
+        else:
+            self._failures_by_action.pop(action_type, None)
     
     def update_plan(self, new_plan: str, completed_subgoal: str = ""):
         """更新计划"""
@@ -136,19 +192,11 @@ class AgenticSeekerInfoPool:
         """更新进度状态"""
         self.progress_status = status
         self.progress_status_history.append(status)
-        
-        # 保持进度历史在合理范围内
-        if len(self.progress_status_history) > 20:
-            self.progress_status_history = self.progress_status_history[-20:]
     
     def add_llm_analysis(self, analysis: Dict[str, Any]):
         """添加LLM分析结果"""
         analysis["timestamp"] = get_iso_timestamp()
         self.llm_analysis_history.append(analysis)
-        
-        # 保持分析历史在合理范围内
-        if len(self.llm_analysis_history) > 10:
-            self.llm_analysis_history = self.llm_analysis_history[-10:]
     
     def update_agent_state(self, agent_id: str, state: Dict[str, Any]):
         """更新智能体状态"""
@@ -158,18 +206,29 @@ class AgenticSeekerInfoPool:
         }
     
     def get_recent_failures(self, count: int = 3) -> List[Dict[str, str]]:
-        """获取最近的失败记录"""
+        """获取最近的失败记录（按时间顺序），耗时与返回条数成正比"""
+        oldest = self._appended - len(self.action_outcomes)
         failures = []
-        for i in range(len(self.action_outcomes)):
-            if self.action_outcomes[i] != "A":  # 非成功状态
-                failures.append({
-                    "action": self.action_history[i],
-                    "summary": self.summary_history[i],
-                    "outcome": self.action_outcomes[i],
-                    "error": self.error_descriptions[i]
-                })
-        
-        return failures[-count:] if failures else []
+        for seq in reversed(self._failure_seqs):
+            if len(failures) >= count or seq < oldest:
+                break
+            i = seq - oldest
+            failures.append({
+                "action": self.action_history[i],
+                "summary": self.summary_history[i],
+                "outcome": self.action_outcomes[i],
+                "error": self.error_descriptions[i]
+            })
+        failures.reverse()
+        return failures
+    
+    def get_failure_summary(self) -> Dict[str, Any]:
+        """获取历史窗口内的失败统计"""
+        return {
+            "total_actions": len(self.action_history),
+            "total_failures": self._failure_count,
+            "failures_by_action": dict(self._failures_by_action),
+        }
     
     def should_escalate_to_manager(self) -> bool:
         """判断是否应该上报给管理器"""
@@ -191,6 +250,7 @@ class AgenticSeekerInfoPool:
             "current_screenshot": self.current_screenshot,
             "action_history_count": len(self.action_history),
             "recent_failures": self.get_recent_failures(),
+            "failures_by_action": dict(self._failures_by_action),
             "agent_states": self.agent_states
         }
 
@@ -299,6 +359,8 @@ class InfoPool(Component):
     - 基于优先级的信息处理
     - 信息过期和清理
     - 状态同步和历史信息查询
+    - 可选的磁盘日志持久化与崩溃重放 (InfoJournal)
+    - 可插拔的存储后端，支持智能体分布在多个进程 (InfoPoolBackend)
     """
     
     def __init__(
@@ -308,6 +370,12 @@ class InfoPool(Component):
         cleanup_interval: int = 60,
         sync_interval: int = 5,
         name: Optional[str] = None,
+        journal: Optional[InfoJournal] = None,
+        delivery_queue_size: int = 1000,
+        delivery_batch_size: int = 64,
+        delivery_linger: float = 0.0,
+        backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK,
+        backend: Optional[InfoPoolBackend] = None,
         **kwargs
     ):
         # 初始化Component基类
@@ -327,8 +395,22 @@ class InfoPool(Component):
         self._entries: Dict[str, InfoEntry] = {}
         self._type_index: Dict[InfoType, Set[str]] = defaultdict(set)
         self._agent_index: Dict[str, Set[str]] = defaultdict(set)
-        self._priority_queue: Dict[InfoPriority, List[str]] = defaultdict(list)
+        # 优先级队列：条目ID -> 单调时钟创建时间，按插入(时间)顺序排列，支持O(1)删除
+        self._priority_queue: Dict[InfoPriority, "OrderedDict[str, float]"] = defaultdict(OrderedDict)
         self._conversation_index: Dict[str, List[str]] = defaultdict(list) # 新增：会话索引
+        # 时间序索引：单调递增序号，代替ISO时间戳用于排序
+        self._sequence = itertools.count()
+        self._entry_seq: Dict[str, int] = {}
+        # 过期调度：(单调时钟到期时间, 序号, 条目ID) 最小堆，惰性删除
+        self._entry_expire: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._sweep_event = asyncio.Event()
+        self.sweep_batch_size = 1000
+        
+        # 持久化日志（可选）
+        self._journal = journal
+        if self._journal:
+            self._journal.snapshot_source = self._journal_snapshot
         
         # 状态管理
         self._agent_states: Dict[str, Dict[str, Any]] = {}
@@ -343,6 +425,24 @@ class InfoPool(Component):
         self.important_notes: str = ""
         self._lock = asyncio.Lock()
         
+        # 存储后端：本进程始终维护带索引的副本，后端负责跨进程同步
+        self._backend = backend or LocalBackend()
+        
+        # 事件投递：发布只写入出站队列，由分发任务转发到EventBus；
+        # 每个订阅者拥有独立的有界投递队列
+        self.delivery_queue_size = delivery_queue_size
+        self.delivery_batch_size = delivery_batch_size
+        self.delivery_linger = delivery_linger
+        self.backpressure = backpressure
+        self._subscriptions: Dict[str, Dict[str, Any]] = {}
+        self._outbox = DeliveryQueue(
+            self._forward_to_bus,
+            max_size=delivery_queue_size,
+            batch_size=delivery_batch_size,
+            policy=BackpressurePolicy.BLOCK,
+            name="event_bus"
+        )
+        
         # 日志
         self.logger = logger
     
@@ -351,8 +451,18 @@ class InfoPool(Component):
         if self._running:
             return
         
+        if self._journal:
+            self.recover_from_journal()
+            await self._journal.open()
+        
+        await self._backend.connect(self)
+        
         self._running = True
+        self._sweep_event = asyncio.Event()
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        self._outbox.ensure_started()
+        for sub_info in self._subscriptions.values():
+            sub_info['queue'].ensure_started()
         logger.info("InfoPool已启动")
     
     async def stop(self) -> None:
@@ -368,6 +478,17 @@ class InfoPool(Component):
             except asyncio.CancelledError:
                 pass
         
+        # 尽量投递完积压事件后再停止分发任务
+        await self.flush_deliveries(timeout=1.0)
+        await self._outbox.close()
+        for sub_info in self._subscriptions.values():
+            await sub_info['queue'].close()
+        
+        await self._backend.close()
+        
+        if self._journal:
+            await self._journal.close()
+        
         logger.info("InfoPool已停止")
     
     async def publish(self, info_type: Union[InfoType, str], data: Any, source_agent: str,
@@ -423,21 +544,25 @@ class InfoPool(Component):
             target_agents=destination_agents or set(),
             conversation_id=conversation_id,
             reply_to_id=reply_to_id,
+            ttl=ttl,
         )
 
-        self._entries[entry.id] = entry
-        self._type_index[info_type].add(entry.id)
-        self._agent_index[source_agent].add(entry.id)
-        self._priority_queue[priority].append(entry.id)
-        if conversation_id:
-            self._conversation_index[conversation_id].append(entry.id)
+        self._index_entry(entry)
+        if self._journal or not isinstance(self._backend, LocalBackend):
+            payload = self._entry_payload(entry)
+            await self._backend.publish_entry(payload)
+            if self._journal:
+                commit = self._journal.append(JournalOp.PUT, payload)
+                if commit is not None:
+                    await commit
 
+        # 容量淘汰交给后台清理任务，不在发布路径上执行
         if len(self._entries) > self.max_entries:
-            self._cleanup_expired()
+            self._sweep_event.set()
 
-        event = entry.to_event()
+        # 仅写入出站队列，发布延迟与订阅者处理速度无关
         if self.event_bus:
-            await self.event_bus.publish_async(event)
+            await self._outbox.put(entry.to_event())
 
         logger.debug(
             f"Published info: {info_type.value} from {source_agent} "
@@ -448,26 +573,51 @@ class InfoPool(Component):
     def subscribe(
         self,
         callback: Callable[[Event], Any],
-        info_types: Optional[List[InfoType]] = None
+        info_types: Optional[List[InfoType]] = None,
+        batch_callback: bool = False,
+        policy: Optional[BackpressurePolicy] = None,
+        max_queue_size: Optional[int] = None,
+        coalesce_key: Optional[Callable[[Event], Any]] = None
     ) -> str:
-        """订阅事件并返回订阅ID"""
-        import uuid
+        """订阅事件并返回订阅ID
+        
+        回调由该订阅独立的投递队列异步调用，处理慢不会阻塞发布者。
+        
+        Args:
+            callback: 事件回调，可为同步或异步函数
+            info_types: 订阅的信息类型，None表示全部
+            batch_callback: 为True时回调一次接收一批事件列表
+            policy: 队列满时的背压策略，默认使用信息池配置
+            max_queue_size: 投递队列容量，默认使用信息池配置
+            coalesce_key: COALESCE策略下的合并键函数
+        """
         sub_id = str(uuid.uuid4())
+        queue = DeliveryQueue(
+            callback,
+            max_size=max_queue_size or self.delivery_queue_size,
+            batch_size=self.delivery_batch_size,
+            policy=policy or self.backpressure,
+            coalesce_key=coalesce_key,
+            batch_callback=batch_callback,
+            linger=self.delivery_linger,
+            name=getattr(callback, "__qualname__", sub_id)
+        )
         
         # 存储订阅信息以便后续取消订阅
-        if not hasattr(self, '_subscriptions'):
-            self._subscriptions = {}
-        
         self._subscriptions[sub_id] = {
             'callback': callback,
-            'info_types': info_types
+            'info_types': info_types,
+            'queue': queue
         }
         
-        if info_types:
-            for it in info_types:
-                self.event_bus.subscribe(it.value, callback)
-        else:
-            self.event_bus.subscribe(None, callback)
+        for event_type in self._event_types(info_types):
+            self.event_bus.subscribe(event_type, queue.put)
+        
+        try:
+            queue.ensure_started()
+        except RuntimeError:
+            # 尚无运行中的事件循环，在start()或首次投递时启动
+            pass
             
         return sub_id
 
@@ -478,19 +628,60 @@ class InfoPool(Component):
         sub_id: Optional[str] = None
     ) -> None:
         """取消订阅事件，可以通过callback或sub_id"""
-        if sub_id and hasattr(self, '_subscriptions') and sub_id in self._subscriptions:
-            # 通过订阅ID取消订阅
-            sub_info = self._subscriptions[sub_id]
-            callback = sub_info['callback']
-            info_types = sub_info['info_types']
-            del self._subscriptions[sub_id]
-        
-        if callback:
-            if info_types:
-                for it in info_types:
-                    self.event_bus.unsubscribe(it.value, callback)
-            else:
-                self.event_bus.unsubscribe(None, callback)
+        if sub_id:
+            sub_ids = [sub_id] if sub_id in self._subscriptions else []
+        else:
+            wanted = set(info_types) if info_types else None
+            sub_ids = [
+                sid for sid, sub_info in self._subscriptions.items()
+                if sub_info['callback'] == callback
+                and (wanted is None or set(sub_info['info_types'] or []) == wanted)
+            ]
+        
+        for sid in sub_ids:
+            sub_info = self._subscriptions.pop(sid)
+            queue = sub_info['queue']
+            for event_type in self._event_types(sub_info['info_types']):
+                self.event_bus.unsubscribe(event_type, queue.put)
+            queue.close_nowait()
+
+    @staticmethod
+    def _event_types(info_types: Optional[List[InfoType]]) -> List[str]:
+        """订阅的信息类型对应的EventBus事件类型"""
+        if not info_types:
+            return [EventBus.WILDCARD]
+        return [it.value if isinstance(it, InfoType) else it for it in info_types]
+
+    async def _forward_to_bus(self, event: Event) -> None:
+        """出站队列分发回调：转发到EventBus，订阅者的投递队列在此入队"""
+        await self.event_bus.publish_async(event)
+
+    async def flush_deliveries(self, timeout: Optional[float] = None) -> bool:
+        """等待已发布事件全部投递给订阅者
+        
+        Returns:
+            是否在超时前全部投递完成
+        """
+        if not await self._outbox.join(timeout):
+            return False
+        results = await asyncio.gather(
+            *(sub_info['queue'].join(timeout) for sub_info in self._subscriptions.values())
+        )
+        return all(results)
+
+    def get_delivery_metrics(self) -> Dict[str, Any]:
+        """获取事件投递指标：各队列深度、丢弃/合并数和投递延迟"""
+        return {
+            "event_bus": self._outbox.get_metrics(),
+            "subscribers": {
+                sid: {
+                    "info_types": self._event_types(sub_info['info_types']),
+                    "policy": sub_info['queue'].policy.value,
+                    **sub_info['queue'].get_metrics()
+                }
+                for sid, sub_info in self._subscriptions.items()
+            }
+        }
 
     def get_entries(
         self,
@@ -498,53 +689,119 @@ class InfoPool(Component):
         source_agent: Optional[str] = None,
         target_agent: Optional[str] = None,
         priority: Optional[InfoPriority] = None,
-        unprocessed_only: bool = False
+        unprocessed_only: bool = False,
+        limit: Optional[int] = None
     ) -> List[InfoEntry]:
         """获取信息条目
         
+        由查询计划器选择最具选择性的索引驱动扫描，结果按优先级和时间倒序返回。
+        
         Args:
             info_types: 信息类型过滤
             source_agent: 源智能体过滤
             target_agent: 目标智能体过滤
             priority: 优先级过滤
             unprocessed_only: 仅返回未处理的信息
+            limit: 最多返回的条目数，None表示不限制
         
         Returns:
             匹配的信息条目列表
         """
         entries = []
+        now = time.monotonic()
         
-        for entry in self._entries.values():
-            # 检查过期
-            if entry.is_expired():
-                continue
+        for entry_id in self._plan_query(info_types, source_agent, priority, limit):
+            entry = self._entries[entry_id]
             
-            # 类型过滤
-            if info_types and entry.type not in info_types:
-                continue
-            
-            # 源智能体过滤
-            if source_agent and entry.source_agent != source_agent:
+            # 检查过期
+            if self._is_expired(entry_id, now):
                 continue
             
             # 目标智能体过滤
             if target_agent and not entry.is_target(target_agent):
                 continue
             
-            # 优先级过滤
-            if priority and entry.priority != priority:
-                continue
-            
             # 未处理过滤
             if unprocessed_only and target_agent and target_agent in entry.processed_by:
                 continue
             
             entries.append(entry)
+            if limit is not None and len(entries) >= limit:
+                break
         
-        # 按优先级和时间排序
-        entries.sort(key=lambda x: (x.priority.value, x.timestamp), reverse=True)
         return entries
     
+    def _plan_query(
+        self,
+        info_types: Optional[List[InfoType]],
+        source_agent: Optional[str],
+        priority: Optional[InfoPriority],
+        limit: Optional[int] = None
+    ) -> Iterable[str]:
+        """查询计划器
+        
+        在类型索引、智能体索引和优先级队列中选择候选集最小的一个驱动扫描，
+        其余索引作为集合交集过滤。优先级队列本身按时间有序，可直接倒序遍历；
+        以集合驱动时只需对交集结果按 (优先级, 序号) 排序。
+        
+        Returns:
+            按 (优先级, 时间) 倒序排列的候选条目ID
+        """
+        id_sets: List[Set[str]] = []
+        if info_types:
+            type_sets = [self._type_index.get(t, set()) for t in set(info_types)]
+            id_sets.append(type_sets[0] if len(type_sets) == 1 else set().union(*type_sets))
+        if source_agent:
+            id_sets.append(self._agent_index.get(source_agent, set()))
+        
+        if priority is not None:
+            priorities = [priority]
+        else:
+            priorities = sorted(self._priority_queue, key=lambda p: p.value, reverse=True)
+        queue_size = sum(len(self._priority_queue.get(p, ())) for p in priorities)
+        
+        id_sets.sort(key=len)
+        if id_sets and not id_sets[0]:
+            return []
+        
+        # 估算扫描代价：有limit时按选择性估计需遍历的队列长度
+        scan_cost = queue_size
+        if limit is not None and id_sets:
+            scan_cost = min(queue_size, limit * len(self._entries) // len(id_sets[0]))
+        if not id_sets or scan_cost <= len(id_sets[0]):
+            # 顺序扫描优先级队列，结果天然有序
+            return self._scan_priority_queues(priorities, id_sets)
+        
+        candidates = id_sets[0].intersection(*id_sets[1:]) if len(id_sets) > 1 else id_sets[0]
+        if priority is not None:
+            candidates = [eid for eid in candidates if self._entries[eid].priority == priority]
+        
+        if limit is None:
+            return sorted(
+                candidates,
+                key=lambda eid: (self._entries[eid].priority.value, self._entry_seq[eid]),
+                reverse=True
+            )
+        return self._iter_ordered(candidates)
+    
+    def _iter_ordered(self, candidates: Iterable[str]) -> Iterator[str]:
+        """以堆惰性输出候选条目，取前k个只需 O(n + k log n)"""
+        heap = [
+            (-self._entries[eid].priority.value, -self._entry_seq[eid], eid)
+            for eid in candidates
+        ]
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[2]
+    
+    def _scan_priority_queues(self, priorities: List[InfoPriority],
+                              id_sets: List[Set[str]]) -> Iterator[str]:
+        """按优先级从高到低、时间从新到旧遍历优先级队列"""
+        for p in priorities:
+            for entry_id in reversed(self._priority_queue.get(p, {})):
+                if all(entry_id in ids for ids in id_sets):
+                    yield entry_id
+    
     def mark_processed(self, entry_id: str, agent_id: str) -> bool:
         """标记信息已处理
         
@@ -557,6 +814,9 @@ class InfoPool(Component):
         """
         if entry_id in self._entries:
             self._entries[entry_id].mark_processed(agent_id)
+            if self._journal:
+                self._journal.append(JournalOp.PROCESSED, {"id": entry_id, "agent": agent_id}, wait=False)
+            self._backend.mark_processed(entry_id, agent_id)
             return True
         return False
     
@@ -698,6 +958,10 @@ class InfoPool(Component):
             "active_agents": len(self._agent_states),
             "active_conversations": len(self._conversation_index), # 新增
             "subscribers": self.event_bus.get_subscriber_count() if self.event_bus else 0,
+            "backend": self._backend.get_stats(),
+            "delivery_backlog": self._outbox.depth + sum(
+                sub_info['queue'].depth for sub_info in self._subscriptions.values()
+            ),
             # 从communication.py融合的统计信息
             "current_task": self.current_task,
             "action_history_count": len(self.action_history),
@@ -888,89 +1152,231 @@ class InfoPool(Component):
     async def clear_old_entries(self, hours: int = 24):
         """清理旧的信息条目（从communication.py融合）
         
+        优先级队列按创建时间有序，只需从各低优先级队列头部弹出早于截止时间的条目。
+        
         Args:
             hours: 保留最近多少小时的数据
         """
-        from datetime import datetime, timedelta
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff = time.monotonic() - hours * 3600
         
         async with self._lock:
-            old_count = len(self._entries)
-            expired_ids = []
-            
-            for entry_id, entry in self._entries.items():
-                entry_time = datetime.fromisoformat(entry.timestamp)
-                if entry_time < cutoff_time and entry.priority.value < InfoPriority.HIGH.value:
-                    expired_ids.append(entry_id)
-            
-            # 清理过期条目
-            for entry_id in expired_ids:
-                if entry_id in self._entries:
-                    entry = self._entries[entry_id]
-                    # 从索引中移除
-                    self._type_index[entry.type].discard(entry_id)
-                    self._agent_index[entry.source_agent].discard(entry_id)
-                    if entry_id in self._priority_queue[entry.priority]:
-                        self._priority_queue[entry.priority].remove(entry_id)
-                    # 从主存储中移除
-                    del self._entries[entry_id]
-            
-            cleaned_count = old_count - len(self._entries)
-            
-            if cleaned_count > 0:
-                # 发布清理事件
-                await self.publish(
-                    InfoType.STATUS,
-                    {
-                        'event_type': 'entries_cleaned',
-                        'cleaned_count': cleaned_count,
-                        'remaining_count': len(self._entries),
-                        'cutoff_hours': hours
-                    },
-                    InfoPriority.LOW,
-                    "system"
-                )
+            cleaned_count = 0
+            for p, queue in self._priority_queue.items():
+                if p.value >= InfoPriority.HIGH.value:
+                    continue
+                while queue:
+                    entry_id, created_at = next(iter(queue.items()))
+                    if created_at >= cutoff:
+                        break
+                    self._remove_entry(entry_id)
+                    cleaned_count += 1
+        
+        if cleaned_count > 0:
+            # 发布清理事件
+            await self.publish(
+                info_type=InfoType.STATUS,
+                data={
+                    'event_type': 'entries_cleaned',
+                    'cleaned_count': cleaned_count,
+                    'remaining_count': len(self._entries),
+                    'cutoff_hours': hours
+                },
+                priority=InfoPriority.LOW,
+                source_agent="system"
+            )
     
-    def _cleanup_expired(self) -> int:
-        """清理过期信息"""
-        expired_ids = []
+    def _cleanup_expired(self, max_batch: Optional[int] = None) -> int:
+        """清理过期信息并执行容量淘汰
         
-        for entry_id, entry in self._entries.items():
-            if entry.is_expired():
-                expired_ids.append(entry_id)
+        过期条目从到期时间最小堆中弹出，超出容量时从各优先级队列头部淘汰最旧条目，
+        每条均摊 O(log n)。
         
-        # 如果没有过期信息但超过最大条目数，清理最旧的信息
-        if not expired_ids and len(self._entries) > self.max_entries:
-            # 按时间排序，删除最旧的
-            sorted_entries = sorted(
-                self._entries.items(),
-                key=lambda x: x[1].timestamp
-            )
-            expired_ids = [entry_id for entry_id, _ in sorted_entries[:len(self._entries) - self.max_entries + 100]]
+        Args:
+            max_batch: 本次最多清理的条目数，None表示不限制
+        
+        Returns:
+            清理的条目数
+        """
+        now = time.monotonic()
+        removed = 0
+        
+        while self._expiry_heap and (max_batch is None or removed < max_batch):
+            expire_at, seq, entry_id = self._expiry_heap[0]
+            if expire_at > now:
+                break
+            heapq.heappop(self._expiry_heap)
+            # 惰性删除：跳过已被移除的条目
+            if self._entry_seq.get(entry_id) == seq:
+                self._remove_entry(entry_id)
+                removed += 1
+        
+        while len(self._entries) > self.max_entries and (max_batch is None or removed < max_batch):
+            heads = [
+                (self._entry_seq[next(iter(queue))], next(iter(queue)))
+                for queue in self._priority_queue.values() if queue
+            ]
+            self._remove_entry(min(heads)[1])
+            removed += 1
+        
+        # 堆中失效项过多时重建
+        if len(self._expiry_heap) > 2 * len(self._entry_expire) + 64:
+            self._expiry_heap = [
+                (expire_at, self._entry_seq[entry_id], entry_id)
+                for entry_id, expire_at in self._entry_expire.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        
+        if removed:
+            logger.debug(f"清理了 {removed} 条过期信息")
+        
+        return removed
+    
+    def _is_expired(self, entry_id: str, now: float) -> bool:
+        """基于单调时钟检查条目是否过期"""
+        expire_at = self._entry_expire.get(entry_id)
+        return expire_at is not None and expire_at <= now
+    
+    def _index_entry(self, entry: InfoEntry, created_at: Optional[float] = None) -> None:
+        """将信息条目写入主存储和全部索引
         
-        # 删除过期信息
-        for entry_id in expired_ids:
-            entry = self._entries.pop(entry_id, None)
-            if entry:
-                self._type_index[entry.type].discard(entry_id)
-                self._agent_index[entry.source_agent].discard(entry_id)
-                for priority_list in self._priority_queue.values():
-                    if entry_id in priority_list:
-                        priority_list.remove(entry_id)
+        Args:
+            entry: 信息条目
+            created_at: 单调时钟创建时间，None表示当前时间（重放时由日志恢复）
+        """
+        if created_at is None:
+            created_at = time.monotonic()
+        seq = next(self._sequence)
         
-        if expired_ids:
-            logger.debug(f"清理了 {len(expired_ids)} 条过期信息")
+        self._entries[entry.id] = entry
+        self._type_index[entry.type].add(entry.id)
+        self._agent_index[entry.source_agent].add(entry.id)
+        self._priority_queue[entry.priority][entry.id] = created_at
+        self._entry_seq[entry.id] = seq
+        if entry.conversation_id:
+            self._conversation_index[entry.conversation_id].append(entry.id)
+        if entry.ttl is not None:
+            expire_at = created_at + entry.ttl
+            self._entry_expire[entry.id] = expire_at
+            heapq.heappush(self._expiry_heap, (expire_at, seq, entry.id))
+    
+    def _remove_entry(self, entry_id: str, journal: bool = True) -> Optional[InfoEntry]:
+        """从主存储和全部索引中移除信息条目
         
-        return len(expired_ids)
+        Args:
+            entry_id: 信息ID
+            journal: 是否写入删除日志（重放时为False）
+        """
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return None
+        
+        if journal and self._journal:
+            self._journal.append(JournalOp.DELETE, {"id": entry_id}, wait=False)
+        
+        self._type_index[entry.type].discard(entry_id)
+        self._agent_index[entry.source_agent].discard(entry_id)
+        self._priority_queue[entry.priority].pop(entry_id, None)
+        self._entry_seq.pop(entry_id, None)
+        self._entry_expire.pop(entry_id, None)
+        if entry.conversation_id:
+            conversation = self._conversation_index.get(entry.conversation_id)
+            if conversation is not None:
+                conversation.remove(entry_id)
+                if not conversation:
+                    del self._conversation_index[entry.conversation_id]
+        return entry
+    
+    def _entry_payload(self, entry: InfoEntry) -> Dict[str, Any]:
+        """生成条目的日志/同步负载，附带墙上时钟创建时间以便恢复条目年龄"""
+        payload = entry.to_dict()
+        created_at = self._priority_queue[entry.priority][entry.id]
+        payload["created"] = time.time() - (time.monotonic() - created_at)
+        return payload
+    
+    def _journal_snapshot(self) -> List[Dict[str, Any]]:
+        """压缩快照数据源：按发布顺序导出全部存活条目"""
+        return [self._entry_payload(entry) for entry in self._entries.values()]
+    
+    async def _apply_remote_entry(self, payload: Dict[str, Any], notify: bool = True) -> None:
+        """应用其他进程发布的条目，并通知本进程的订阅者
+        
+        Args:
+            payload: 条目负载（见 _entry_payload）
+            notify: 是否通知订阅者（初始同步时为False）
+        """
+        entry = InfoEntry.from_dict(payload)
+        if entry.id in self._entries:
+            return
+        
+        created = payload.get("created", time.time())
+        self._index_entry(entry, created_at=time.monotonic() - (time.time() - created))
+        if self._journal:
+            self._journal.append(JournalOp.PUT, payload, wait=False)
+        if len(self._entries) > self.max_entries:
+            self._sweep_event.set()
+        if notify and self.event_bus:
+            await self._outbox.put(entry.to_event())
+    
+    def recover_from_journal(self) -> int:
+        """从持久化日志重放，重建主存储和全部二级索引
+        
+        Returns:
+            重放后的条目数
+        """
+        if not self._journal:
+            return 0
+        
+        start = time.perf_counter()
+        mono_offset = time.monotonic() - time.time()
+        # 批量创建大量长期存活对象时暂停分代GC，避免反复全量扫描
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for op, payload in self._journal.replay():
+                if op == JournalOp.PUT:
+                    entry = InfoEntry.from_dict(payload)
+                    self._remove_entry(entry.id, journal=False)
+                    self._index_entry(entry, created_at=payload.get("created", time.time()) + mono_offset)
+                elif op == JournalOp.DELETE:
+                    self._remove_entry(payload["id"], journal=False)
+                elif op == JournalOp.PROCESSED:
+                    entry = self._entries.get(payload["id"])
+                    if entry:
+                        entry.mark_processed(payload["agent"])
+        finally:
+            if gc_enabled:
+                gc.enable()
+        
+        if self._entries:
+            logger.info(
+                f"从日志恢复 {len(self._entries)} 条信息，耗时 {time.perf_counter() - start:.2f}s"
+            )
+        if len(self._entries) > self.max_entries:
+            self._sweep_event.set()
+        return len(self._entries)
     
     async def _cleanup_loop(self) -> None:
-        """清理循环"""
+        """后台清理循环
+        
+        在最近的到期时间、清理间隔或容量超限通知三者中最早的时刻唤醒，
+        分批清理以避免长时间占用事件循环。
+        """
         while self._running:
             try:
-                self._cleanup_expired()
-                await asyncio.sleep(self.cleanup_interval)
+                while self._cleanup_expired(self.sweep_batch_size) >= self.sweep_batch_size:
+                    await asyncio.sleep(0)
+                
+                timeout = self.cleanup_interval
+                if self._expiry_heap:
+                    timeout = min(timeout, max(self._expiry_heap[0][0] - time.monotonic(), 0))
+                try:
+                    await asyncio.wait_for(self._sweep_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._sweep_event.clear()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"清理循环错误: {e}")
-                await asyncio.sleep(self.cleanup_interval)
\ No newline at end of file
+                # 清理持续失败时不能空转占住事件循环
+                await asyncio.sleep(self.cleanup_interval)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+InfoPool存储后端模块
+
+InfoPool始终在本进程内维护带索引的条目副本，后端负责在进程间同步这些条目：
+- LocalBackend: 单进程默认后端，不做任何同步
+- BrokerBackend + InfoPoolBroker: 基于本地Unix套接字的代理进程，
+  各智能体进程连接同一个代理，发布的条目由代理按订阅类型转发给其他进程，
+  新连接的进程先获得代理中已有条目的初始同步
+
+帧格式复用InfoJournal的记录编码（长度前缀 + CRC32 + JSON负载）。
+
+启动独立代理进程:
+    python -m core.info_pool_backend --socket /tmp/agenticseeker.sock
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from loguru import logger
+
+from .info_journal import RECORD_HEADER, encode_record
+
+if TYPE_CHECKING:
+    from .info_pool import InfoPool
+
+
+class BrokerOp(Enum):
+    """代理协议操作类型"""
+    HELLO = "hello"           # 客户端握手：客户端ID与订阅的信息类型
+    PUT = "put"               # 新条目
+    PROCESSED = "proc"        # 条目已被某智能体处理
+    SYNCED = "synced"         # 初始同步结束
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[BrokerOp, Dict[str, Any]]:
+    """从流中读取一帧"""
+    header = await reader.readexactly(RECORD_HEADER.size)
+    length, crc = RECORD_HEADER.unpack(header)
+    body = await reader.readexactly(length)
+    if zlib.crc32(body) != crc:
+        raise ValueError("代理帧校验失败")
+    op, payload = json.loads(body)
+    return BrokerOp(op), payload
+
+
+class InfoPoolBackend(ABC):
+    """InfoPool后端接口"""
+
+    @abstractmethod
+    async def connect(self, pool: "InfoPool") -> None:
+        """连接后端，并将已有的共享条目同步到信息池"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """断开后端"""
+
+    @abstractmethod
+    async def publish_entry(self, payload: Dict[str, Any]) -> None:
+        """同步本进程新发布的条目"""
+
+    @abstractmethod
+    def mark_processed(self, entry_id: str, agent_id: str) -> None:
+        """同步条目的处理状态"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+
+class LocalBackend(InfoPoolBackend):
+    """单进程后端：所有智能体共享同一个InfoPool对象，无需同步"""
+
+    async def connect(self, pool: "InfoPool") -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def publish_entry(self, payload: Dict[str, Any]) -> None:
+        return None
+
+    def mark_processed(self, entry_id: str, agent_id: str) -> None:
+        return None
+
+
+class BrokerBackend(InfoPoolBackend):
+    """连接InfoPoolBroker代理进程的多进程后端"""
+
+    def __init__(
+        self,
+        socket_path: str,
+        info_types: Optional[List[str]] = None,
+        client_id: Optional[str] = None,
+        connect_timeout: float = 5.0,
+        write_buffer_limit: int = 1024 * 1024
+    ):
+        self.socket_path = socket_path
+        self.info_types = [getattr(t, "value", t) for t in info_types] if info_types else None
+        self.client_id = client_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.connect_timeout = connect_timeout
+        self.write_buffer_limit = write_buffer_limit
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._receive_task: Optional[asyncio.Task] = None
+        self._pool: Optional["InfoPool"] = None
+        self._closing = False
+        self._stats = {"sent": 0, "received": 0, "synced": 0}
+
+    async def connect(self, pool: "InfoPool") -> None:
+        self._pool = pool
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+        self._send(BrokerOp.HELLO, {"client_id": self.client_id, "info_types": self.info_types})
+        await self._writer.drain()
+
+        # 初始同步：代理中已有的条目直接写入本地副本，不触发订阅通知
+        while True:
+            op, payload = await read_frame(self._reader)
+            if op == BrokerOp.SYNCED:
+                break
+            await self._apply(op, payload, notify=False)
+            self._stats["synced"] += 1
+
+        self._receive_task = asyncio.create_task(self._receive_loop())
+        logger.info(f"已连接InfoPool代理 {self.socket_path}，同步 {self._stats['synced']} 条信息")
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        # 先半关闭写方向，等代理读完剩余帧并关闭连接后再断开。
+        # 直接关闭时代理转发给本端的写入会触发连接重置，其尚未读取的帧会被丢弃。
+        self._closing = True
+        if self._writer.can_write_eof():
+            self._writer.write_eof()
+        if self._receive_task:
+            try:
+                await asyncio.wait_for(self._receive_task, self.connect_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"等待InfoPool代理关闭连接超时: {self.socket_path}")
+            self._receive_task = None
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._writer = None
+
+    async def publish_entry(self, payload: Dict[str, Any]) -> None:
+        self._send(BrokerOp.PUT, payload)
+        # 写缓冲区积压过多时才等待，正常情况下发布不会让出事件循环
+        if self._writer and self._writer.transport.get_write_buffer_size() > self.write_buffer_limit:
+            await self._writer.drain()
+
+    def mark_processed(self, entry_id: str, agent_id: str) -> None:
+        self._send(BrokerOp.PROCESSED, {"id": entry_id, "agent": agent_id})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "client_id": self.client_id, **self._stats}
+
+    def _send(self, op: BrokerOp, payload: Dict[str, Any]) -> None:
+        if self._writer is None:
+            return
+        self._writer.write(encode_record(op, payload))
+        self._stats["sent"] += 1
+
+    async def _apply(self, op: BrokerOp, payload: Dict[str, Any], notify: bool = True) -> None:
+        if op == BrokerOp.PUT:
+            await self._pool._apply_remote_entry(payload, notify=notify)
+        elif op == BrokerOp.PROCESSED:
+            entry = self._pool._entries.get(payload["id"])
+            if entry:
+                entry.mark_processed(payload["agent"])
+
+    async def _receive_loop(self) -> None:
+        while True:
+            try:
+                op, payload = await read_frame(self._reader)
+                if self._closing:
+                    # 关闭过程中只排空连接，不再写入本地副本
+                    continue
+                await self._apply(op, payload)
+                self._stats["received"] += 1
+            except asyncio.CancelledError:
+                break
+            except (asyncio.IncompleteReadError, ConnectionError):
+                if not self._closing:
+                    logger.warning(f"与InfoPool代理的连接已断开: {self.socket_path}")
+                break
+            except Exception as e:
+                logger.error(f"处理代理消息失败: {e}")
+
+
+@dataclass
+class _BrokerClient:
+    """代理侧的客户端连接"""
+    client_id: str
+    writer: asyncio.StreamWriter
+    info_types: Optional[Set[str]] = None
+    forwarded: int = field(default=0)
+
+    def wants(self, info_type: str) -> bool:
+        return self.info_types is None or info_type in self.info_types
+
+
+class InfoPoolBroker:
+    """InfoPool代理
+
+    保存最近 max_entries 条共享条目，为新连接的客户端提供初始同步，
+    并把每个客户端发布的条目转发给订阅了该类型的其他客户端。
+    """
+
+    def __init__(self, socket_path: str, max_entries: int = 10000,
+                 write_buffer_limit: int = 4 * 1024 * 1024):
+        self.socket_path = socket_path
+        self.max_entries = max_entries
+        self.write_buffer_limit = write_buffer_limit
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._clients: Dict[str, _BrokerClient] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stats = {"published": 0, "forwarded": 0, "connections": 0}
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        logger.info(f"InfoPool代理已启动: {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self._clients.values()):
+            client.writer.close()
+        self._clients.clear()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("InfoPool代理已停止")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "clients": {cid: client.forwarded for cid, client in self._clients.items()},
+        }
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client: Optional[_BrokerClient] = None
+        try:
+            op, payload = await read_frame(reader)
+            if op != BrokerOp.HELLO:
+                raise ValueError(f"期望握手帧，收到 {op.value}")
+            info_types = payload.get("info_types")
+            client = _BrokerClient(
+                client_id=payload["client_id"],
+                writer=writer,
+                info_types=set(info_types) if info_types else None
+            )
+            self._clients[client.client_id] = client
+            self._stats["connections"] += 1
+
+            for entry in list(self._entries.values()):
+                if client.wants(entry["type"]):
+                    writer.write(encode_record(BrokerOp.PUT, entry))
+            writer.write(encode_record(BrokerOp.SYNCED, {"entries": len(self._entries)}))
+            await writer.drain()
+
+            while True:
+                op, payload = await read_frame(reader)
+                if op == BrokerOp.PUT:
+                    self._store(payload)
+                    await self._forward(client, op, payload, payload["type"])
+                elif op == BrokerOp.PROCESSED:
+                    entry = self._entries.get(payload["id"])
+                    if entry is not None and payload["agent"] not in entry["processed_by"]:
+                        entry["processed_by"].append(payload["agent"])
+                    await self._forward(client, op, payload, entry["type"] if entry else None)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"代理客户端处理错误: {e}")
+        finally:
+            if client is not None:
+                self._clients.pop(client.client_id, None)
+            writer.close()
+
+    def _store(self, payload: Dict[str, Any]) -> None:
+        self._entries[payload["id"]] = payload
+        self._stats["published"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _forward(self, source: _BrokerClient, op: BrokerOp,
+                       payload: Dict[str, Any], info_type: Optional[str]) -> None:
+        """转发给除来源外、订阅了该类型的全部客户端"""
+        frame = encode_record(op, payload)
+        slow_writers = []
+        for client in list(self._clients.values()):
+            if client is source or (info_type is not None and not client.wants(info_type)):
+                continue
+            client.writer.write(frame)
+            client.forwarded += 1
+            self._stats["forwarded"] += 1
+            if client.writer.transport.get_write_buffer_size() > self.write_buffer_limit:
+                slow_writers.append(client.writer)
+        for writer in slow_writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+def run_broker(socket_path: str, max_entries: int = 10000) -> None:
+    """在当前进程运行代理直到被终止"""
+    broker = InfoPoolBroker(socket_path, max_entries=max_entries)
+    try:
+        asyncio.run(broker.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def start_broker_process(socket_path: str, max_entries: int = 10000,
+                         timeout: float = 10.0) -> multiprocessing.Process:
+    """在独立进程中启动代理，并等待套接字就绪"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    process = multiprocessing.Process(
+        target=run_broker, args=(socket_path, max_entries), daemon=True, name="InfoPoolBroker"
+    )
+    process.start()
+
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if not process.is_alive() or time.monotonic() >= deadline:
+            process.terminate()
+            raise RuntimeError(f"InfoPool代理启动失败: {socket_path}")
+        time.sleep(0.01)
+    return process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AgenticSeeker InfoPool代理进程")
+    parser.add_argument("--socket", required=True, help="Unix套接字路径")
+    parser.add_argument("--max-entries", type=int, default=10000, help="代理保存的最大条目数")
+    args = parser.parse_args()
+    run_broker(args.socket, args.max_entries)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+环形缓冲区模块
+
+为信息池中的各类历史记录提供固定容量的环形缓冲区：
+追加为O(1)，写满后覆盖最旧的元素，不会像列表切片那样在每次追加时重新分配整个列表。
+"""
+
+from collections.abc import Sequence
+from typing import Any, Generic, Iterable, Iterator, List, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class RingBuffer(Sequence, Generic[T]):
+    """固定容量的环形缓冲区
+
+    行为与只读列表一致：支持 len()、正负下标、切片（返回列表）、迭代和与列表比较。
+    """
+
+    __slots__ = ("_capacity", "_items", "_start", "_size")
+
+    def __init__(self, capacity: int, items: Optional[Iterable[T]] = None):
+        if capacity <= 0:
+            raise ValueError(f"容量必须大于0: {capacity}")
+        self._capacity = capacity
+        self._items: List[Optional[T]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+        if items is not None:
+            self.extend(items)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def is_full(self) -> bool:
+        return self._size == self._capacity
+
+    def append(self, item: T) -> None:
+        """追加元素，缓冲区已满时覆盖最旧的元素"""
+        if self._size < self._capacity:
+            index = self._start + self._size
+            if index >= self._capacity:
+                index -= self._capacity
+            self._items[index] = item
+            self._size += 1
+        else:
+            self._items[self._start] = item
+            self._start += 1
+            if self._start == self._capacity:
+                self._start = 0
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.append(item)
+
+    def clear(self) -> None:
+        self._items = [None] * self._capacity
+        self._start = 0
+        self._size = 0
+
+    def last(self, count: int) -> List[T]:
+        """按时间顺序返回最近的 count 个元素"""
+        count = min(max(count, 0), self._size)
+        return [self[i] for i in range(self._size - count, self._size)]
+
+    def to_list(self) -> List[T]:
+        return self.last(self._size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RingBuffer index out of range")
+        index += self._start
+        if index >= self._capacity:
+            index -= self._capacity
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __reversed__(self) -> Iterator[T]:
+        for i in range(self._size - 1, -1, -1):
+            yield self[i]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (RingBuffer, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self._capacity}, items={self.to_list()!r})"
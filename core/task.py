@@ -3,10 +3,13 @@
 基于AgenticX Task组件提供任务定义、状态管理和执行跟踪功能。
 """
 
+import asyncio
+import heapq
+import itertools
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from uuid import uuid4
 
 # 使用AgenticX的任务组件
@@ -53,6 +56,10 @@ class TaskResult:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
+# 变更时需要通知TaskManager更新索引的字段
+_INDEXED_FIELDS = frozenset({"status", "assigned_agent", "priority"})
+
+
 @dataclass
 class Task:
     """任务定义"""
@@ -81,6 +88,21 @@ class Task:
     # 元数据
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # 所属TaskManager的变更通知，用于维护状态、智能体和就绪队列索引
+    _observer: Optional[Callable[["Task", str, Any], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _INDEXED_FIELDS:
+            old = self.__dict__.get(name, value)
+            object.__setattr__(self, name, value)
+            observer = self.__dict__.get("_observer")
+            if observer is not None and old != value:
+                observer(self, name, old)
+        else:
+            object.__setattr__(self, name, value)
+    
     def start(self, agent_id: str) -> None:
         """开始执行任务"""
         self.status = TaskStatus.RUNNING
@@ -126,12 +148,33 @@ class Task:
 
 
 class TaskManager(Component):
-    """任务管理器 - 基于AgenticX Component"""
+    """任务管理器 - 基于AgenticX Component
+    
+    任务按状态和分配的智能体建立索引；依赖已满足的待执行任务放入按优先级排序的堆中，
+    状态或优先级变化时旧堆项惰性失效。任务字段的修改（包括直接调用 Task.start() 等）
+    通过 Task 的变更通知自动同步到索引。
+    """
     
     def __init__(self):
         super().__init__(name="task_manager")
         self._tasks: Dict[str, Task] = {}
-        self._task_queue: List[str] = []
+        self._task_queue: Dict[str, None] = {}  # 未结束的任务ID，按创建顺序
+        
+        # 索引
+        self._by_status: Dict[TaskStatus, Dict[str, Task]] = {status: {} for status in TaskStatus}
+        self._by_agent: Dict[str, Dict[str, Task]] = {}
+        
+        # 依赖跟踪：未满足的依赖数、依赖ID -> 依赖它的任务ID
+        self._unmet: Dict[str, int] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        
+        # 就绪堆：(-优先级, 创建序号, 任务ID)，_heap_keys 记录每个任务当前有效的堆项
+        self._ready_heap: List[Tuple[int, int, str]] = []
+        self._heap_keys: Dict[str, Tuple[int, int, str]] = {}
+        self._created_seq: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        
+        self._ready_event: Optional[asyncio.Event] = None
     
     def create_task(
         self,
@@ -152,10 +195,32 @@ class TaskManager(Component):
             dependencies=dependencies or []
         )
         
+        self.add_task(task)
+        return task
+    
+    def add_task(self, task: Task) -> None:
+        """加入一个已构造的任务并建立索引"""
         self._tasks[task.id] = task
-        self._add_to_queue(task.id)
+        self._created_seq[task.id] = next(self._sequence)
+        self._by_status[task.status][task.id] = task
+        if task.assigned_agent is not None:
+            self._by_agent.setdefault(task.assigned_agent, {})[task.id] = task
         
-        return task
+        unmet = 0
+        for dep_id in task.dependencies:
+            self._dependents.setdefault(dep_id, set()).add(task.id)
+            dep_task = self._tasks.get(dep_id)
+            if not dep_task or dep_task.status != TaskStatus.COMPLETED:
+                unmet += 1
+        self._unmet[task.id] = unmet
+        
+        task._observer = self._on_task_change
+        if not task.is_completed:
+            self._add_to_queue(task.id)
+        if task.status == TaskStatus.COMPLETED:
+            # 先声明依赖、后加入的已完成任务
+            self._release_dependents(task.id, -1)
+        self._push_if_ready(task)
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """获取任务"""
@@ -163,31 +228,58 @@ class TaskManager(Component):
     
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """根据状态获取任务列表"""
-        return [task for task in self._tasks.values() if task.status == status]
+        return list(self._by_status[status].values())
     
     def get_tasks_by_agent(self, agent_id: str) -> List[Task]:
         """获取分配给特定智能体的任务"""
-        return [task for task in self._tasks.values() if task.assigned_agent == agent_id]
+        return list(self._by_agent.get(agent_id, {}).values())
     
     def get_next_task(self, agent_id: Optional[str] = None) -> Optional[Task]:
-        """获取下一个待执行任务"""
-        # 按优先级排序
-        pending_tasks = self.get_tasks_by_status(TaskStatus.PENDING)
-        if not pending_tasks:
-            return None
+        """获取下一个待执行任务（优先级最高、同优先级中最早创建且依赖已满足）"""
+        heap = self._ready_heap
+        while heap:
+            key = heap[0]
+            if self._heap_keys.get(key[2]) == key:
+                return self._tasks[key[2]]
+            heapq.heappop(heap)
+        return None
+    
+    async def wait_for_next_task(
+        self,
+        agent_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        start: bool = False
+    ) -> Optional[Task]:
+        """等待下一个待执行任务
         
-        # 检查依赖关系
-        available_tasks = []
-        for task in pending_tasks:
-            if self._are_dependencies_satisfied(task):
-                available_tasks.append(task)
+        没有就绪任务时挂起，直到有任务进入就绪状态时被唤醒，不做轮询。
         
-        if not available_tasks:
-            return None
+        Args:
+            agent_id: 智能体ID
+            timeout: 超时时间（秒），None表示一直等待
+            start: 是否立即以 agent_id 开始该任务，避免多个等待者拿到同一任务
         
-        # 按优先级排序
-        available_tasks.sort(key=lambda t: t.priority.value, reverse=True)
-        return available_tasks[0]
+        Returns:
+            任务，超时返回None
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            task = self.get_next_task(agent_id)
+            if task is not None:
+                if start:
+                    self.start_task(task.id, agent_id)
+                return task
+            
+            event = self._get_ready_event()
+            event.clear()
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
     
     def start_task(self, task_id: str, agent_id: str) -> bool:
         """开始执行任务"""
@@ -195,7 +287,7 @@ class TaskManager(Component):
         if not task or task.status != TaskStatus.PENDING:
             return False
         
-        if not self._are_dependencies_satisfied(task):
+        if self._unmet.get(task_id, 0) > 0:
             return False
         
         task.start(agent_id)
@@ -208,7 +300,6 @@ class TaskManager(Component):
             return False
         
         task.complete(result)
-        self._remove_from_queue(task_id)
         return True
     
     def cancel_task(self, task_id: str) -> bool:
@@ -218,30 +309,89 @@ class TaskManager(Component):
             return False
         
         task.cancel()
-        self._remove_from_queue(task_id)
         return True
     
     def get_task_statistics(self) -> Dict[str, int]:
         """获取任务统计信息"""
-        stats = {status.value: 0 for status in TaskStatus}
-        for task in self._tasks.values():
-            stats[task.status.value] += 1
-        return stats
+        return {status.value: len(tasks) for status, tasks in self._by_status.items()}
+    
+    def _on_task_change(self, task: Task, name: str, old: Any) -> None:
+        """任务字段变更回调：同步索引"""
+        task_id = task.id
+        if name == "status":
+            self._by_status[old].pop(task_id, None)
+            self._by_status[task.status][task_id] = task
+            if task.is_completed:
+                self._remove_from_queue(task_id)
+            else:
+                self._add_to_queue(task_id)
+            
+            # 依赖满足状态只在进入或离开COMPLETED时变化
+            if task.status == TaskStatus.COMPLETED:
+                self._release_dependents(task_id, -1)
+            elif old == TaskStatus.COMPLETED:
+                self._release_dependents(task_id, 1)
+        elif name == "assigned_agent":
+            if old is not None:
+                agent_tasks = self._by_agent.get(old)
+                if agent_tasks is not None:
+                    agent_tasks.pop(task_id, None)
+                    if not agent_tasks:
+                        del self._by_agent[old]
+            if task.assigned_agent is not None:
+                self._by_agent.setdefault(task.assigned_agent, {})[task_id] = task
+        
+        self._update_ready(task)
+    
+    def _release_dependents(self, task_id: str, delta: int) -> None:
+        """调整依赖此任务的各任务的未满足依赖数"""
+        for dependent_id in self._dependents.get(task_id, ()):
+            dependent = self._tasks.get(dependent_id)
+            if dependent is not None:
+                self._unmet[dependent_id] += delta
+                self._update_ready(dependent)
+    
+    def _update_ready(self, task: Task) -> None:
+        """根据任务当前状态入堆或使其堆项失效"""
+        if self._is_ready(task):
+            self._push_if_ready(task)
+        else:
+            self._heap_keys.pop(task.id, None)
+    
+    def _is_ready(self, task: Task) -> bool:
+        return task.status == TaskStatus.PENDING and self._unmet.get(task.id, 0) == 0
+    
+    def _push_if_ready(self, task: Task) -> None:
+        """任务就绪且堆中没有对应当前优先级的有效堆项时入堆，并唤醒等待者"""
+        if not self._is_ready(task):
+            return
+        key = (-task.priority.value, self._created_seq[task.id], task.id)
+        if self._heap_keys.get(task.id) == key:
+            return
+        self._heap_keys[task.id] = key
+        heapq.heappush(self._ready_heap, key)
+        
+        # _heap_keys 只包含就绪任务，失效堆项过多时重建
+        if len(self._ready_heap) > 2 * len(self._heap_keys) + 64:
+            self._ready_heap = list(self._heap_keys.values())
+            heapq.heapify(self._ready_heap)
+        
+        if self._ready_event is not None:
+            self._ready_event.set()
+    
+    def _get_ready_event(self) -> asyncio.Event:
+        if self._ready_event is None:
+            self._ready_event = asyncio.Event()
+        return self._ready_event
     
     def _add_to_queue(self, task_id: str) -> None:
         """添加任务到队列"""
-        if task_id not in self._task_queue:
-            self._task_queue.append(task_id)
+        self._task_queue[task_id] = None
     
     def _remove_from_queue(self, task_id: str) -> None:
         """从队列中移除任务"""
-        if task_id in self._task_queue:
-            self._task_queue.remove(task_id)
+        self._task_queue.pop(task_id, None)
     
     def _are_dependencies_satisfied(self, task: Task) -> bool:
         """检查任务依赖是否满足"""
-        for dep_id in task.dependencies:
-            dep_task = self.get_task(dep_id)
-            if not dep_task or dep_task.status != TaskStatus.COMPLETED:
-                return False
-        return True
\ No newline at end of file
+        return self._unmet.get(task.id, 0) == 0
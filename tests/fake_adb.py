@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake ADB
+模拟的 adb 可执行文件：用于在没有真实设备的环境下测试和基准测试ADB相关工具
+
+支持的命令：
+    adb [-s SERIAL] devices
+    adb track-devices                    设备列表变化时推送 4位十六进制长度+设备列表
+    adb [-s SERIAL] shell [COMMAND...]   无命令时进入交互模式，逐行从stdin读取命令
+    adb [-s SERIAL] pull REMOTE LOCAL
+    adb [-s SERIAL] exec-out screencap [-p]   截图输出到stdout（raw 格式或 PNG）
+    adb [-s SERIAL] exec-out COMMAND...       其他命令的输出不经过 shell 协议直接写到stdout
+
+设备命令（input/getprop/wm/screencap/uiautomator/rm）由 sh 函数模拟，/sdcard 映射到本地目录。
+
+环境变量：
+    FAKE_ADB_SPAWN_DELAY  每次启动 adb 进程的额外延迟（秒），模拟 adb 客户端与 server 的握手开销
+    FAKE_ADB_LOG          记录设备上执行的 input 命令的文件
+    FAKE_ADB_INPUT_DELAY  每条 input 命令在设备上的耗时（秒），真机上 input 需要启动 app_process
+    FAKE_ADB_DEVICES      逗号分隔的设备序列号，默认 emulator-5554
+    FAKE_ADB_DEVICES_FILE 设备列表文件（每行 序列号[<TAB>状态]），设置时优先使用，可在运行中修改以模拟设备插拔
+    FAKE_ADB_SDCARD       /sdcard 对应的本地目录
+    FAKE_ADB_SCREEN_SIZE  屏幕尺寸，默认 1080x2400
+    FAKE_ADB_SCREEN_FILE  作为屏幕内容的图片文件，设置时优先使用，可在运行中替换以模拟界面变化
+    FAKE_ADB_UI_DUMP      uiautomator dump 返回的XML文件
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import os
+import shutil
+import stat
+import struct
+import sys
+import tempfile
+import time
+from typing import Dict
+
+DEVICE_PRELUDE = r'''
+_sd() { case "$1" in /sdcard/*) echo "$FAKE_ADB_SDCARD/${1#/sdcard/}";; *) echo "$1";; esac; }
+input() {
+    if [ -n "$FAKE_ADB_INPUT_DELAY" ]; then sleep "$FAKE_ADB_INPUT_DELAY"; fi
+    if [ -n "$FAKE_ADB_LOG" ]; then echo "$FAKE_ADB_SERIAL input $*" >> "$FAKE_ADB_LOG"; fi
+}
+getprop() {
+    case "$1" in
+        ro.product.model) echo "Fake Pixel";;
+        ro.build.version.release) echo "14";;
+        sys.boot_completed) echo "1";;
+    esac
+}
+wm() { echo "Physical size: 1080x2400"; }
+screencap() { "$FAKE_ADB_PYTHON" "$FAKE_ADB_SCRIPT" _screencap "$@"; }
+_ui_dump() {
+    if [ -n "$FAKE_ADB_UI_DUMP" ]; then cat "$FAKE_ADB_UI_DUMP"
+    else echo '<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0"></hierarchy>'; fi
+}
+uiautomator() {
+    if [ "$2" = "/dev/tty" ]; then _ui_dump; else _ui_dump > "$(_sd "$2")"; fi
+    echo "UI hierchary dumped to: $2"
+}
+rm() { for last; do :; done; command rm -f "$(_sd "$last")"; }
+'''
+
+INTERACTIVE_LOOP = 'while IFS= read -r line; do eval "$line"; done'
+
+
+def install(directory: str, spawn_delay: float = 0.0) -> str:
+    """在 directory 下生成名为 adb 的可执行脚本（调用本文件），返回其路径"""
+    os.environ['FAKE_ADB_SPAWN_DELAY'] = str(spawn_delay)
+    os.environ['FAKE_ADB_SDCARD'] = os.path.join(directory, 'sdcard')
+    path = os.path.join(directory, 'adb')
+    with open(path, 'w') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def list_devices() -> Dict[str, str]:
+    devices_file = os.environ.get('FAKE_ADB_DEVICES_FILE')
+    if devices_file:
+        devices = {}
+        try:
+            with open(devices_file) as f:
+                for line in f:
+                    parts = line.split()
+                    if parts:
+                        devices[parts[0]] = parts[1] if len(parts) > 1 else 'device'
+        except FileNotFoundError:
+            pass
+        return devices
+    return {serial: 'device' for serial in os.environ.get('FAKE_ADB_DEVICES', 'emulator-5554').split(',') if serial}
+
+
+def screen_pixels():
+    """当前屏幕内容 (height, width, 4) RGBA 数组"""
+    import numpy as np
+    screen_file = os.environ.get('FAKE_ADB_SCREEN_FILE')
+    if screen_file and os.path.exists(screen_file):
+        from PIL import Image
+        with Image.open(screen_file) as image:
+            return np.asarray(image.convert('RGBA'))
+    width, height = (int(v) for v in (os.environ.get('FAKE_ADB_SCREEN_SIZE') or '1080x2400').split('x'))
+    x = np.arange(width, dtype=np.uint32)[None, :]
+    y = np.arange(height, dtype=np.uint32)[:, None]
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    pixels[..., 0] = x * 255 // max(width - 1, 1)
+    pixels[..., 1] = y * 255 // max(height - 1, 1)
+    # 带纹理的通道使 PNG 大小和编码耗时接近真实界面截图
+    pixels[..., 2] = ((x * 7 + y * 13) ^ (x * y)) % 256
+    pixels[..., 3] = 255
+    return pixels
+
+
+def screencap(args, sdcard: str) -> int:
+    """模拟 screencap [-p] [FILE]：raw 格式为 16 字节头（宽、高、格式、色彩空间）加 RGBA 像素"""
+    png = '-p' in args
+    paths = [a for a in args if a != '-p']
+    pixels = screen_pixels()
+    if png or (paths and paths[0].endswith('.png')):
+        import io
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.fromarray(pixels, 'RGBA').save(buffer, format='PNG')
+        data = buffer.getvalue()
+    else:
+        height, width = pixels.shape[:2]
+        data = struct.pack('<IIII', width, height, 1, 0) + pixels.tobytes()
+    if paths:
+        target = paths[0]
+        if target.startswith('/sdcard/'):
+            target = os.path.join(sdcard, target[len('/sdcard/'):])
+        with open(target, 'wb') as f:
+            f.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    return 0
+
+
+def format_devices(devices: Dict[str, str]) -> str:
+    return ''.join(f"{serial}\t{state}\n" for serial, state in devices.items())
+
+
+def track_devices() -> int:
+    """模拟 adb track-devices：先推送当前列表，之后每次变化推送一次"""
+    last = None
+    try:
+        while True:
+            payload = format_devices(list_devices()).encode()
+            if payload != last:
+                sys.stdout.buffer.write(f"{len(payload):04x}".encode() + payload)
+                sys.stdout.buffer.flush()
+                last = payload
+            time.sleep(0.02)
+    except (BrokenPipeError, KeyboardInterrupt):
+        return 0
+
+
+def main(argv):
+    delay = float(os.environ.get('FAKE_ADB_SPAWN_DELAY') or 0)
+    if delay:
+        time.sleep(delay)
+
+    devices = list_devices()
+    if argv and argv[0] == 'track-devices':
+        return track_devices()
+    serial = next(iter(devices), '')
+    if len(argv) >= 2 and argv[0] == '-s':
+        serial, argv = argv[1], argv[2:]
+        if devices.get(serial) != 'device':
+            sys.stderr.write(f"error: device '{serial}' not found\n")
+            return 1
+    if not argv:
+        sys.stderr.write("usage: adb [-s SERIAL] devices|shell|pull\n")
+        return 1
+
+    sdcard = os.environ.get('FAKE_ADB_SDCARD') or os.path.join(tempfile.gettempdir(), 'fake_adb_sdcard')
+    os.makedirs(sdcard, exist_ok=True)
+    os.environ['FAKE_ADB_SDCARD'] = sdcard
+    os.environ['FAKE_ADB_SERIAL'] = serial
+    os.environ['FAKE_ADB_PYTHON'] = sys.executable
+    os.environ['FAKE_ADB_SCRIPT'] = os.path.abspath(__file__)
+
+    command, args = argv[0], argv[1:]
+    if command == 'devices':
+        sys.stdout.write("List of devices attached\n" + format_devices(devices) + "\n")
+        return 0
+    if command == '_screencap':
+        return screencap(args, sdcard)
+    if command == 'exec-out':
+        if args[:1] == ['screencap']:
+            return screencap(args[1:], sdcard)
+        os.execvp('sh', ['sh', '-c', DEVICE_PRELUDE + ' '.join(args)])
+    if command == 'shell':
+        script = ' '.join(args) if args else INTERACTIVE_LOOP
+        os.execvp('sh', ['sh', '-c', DEVICE_PRELUDE + script])
+    if command == 'pull' and len(args) == 2:
+        remote = args[0]
+        source = os.path.join(sdcard, remote[len('/sdcard/'):]) if remote.startswith('/sdcard/') else remote
+        if not os.path.exists(source):
+            sys.stderr.write(f"adb: error: failed to stat remote object '{remote}': No such file or directory\n")
+            return 1
+        shutil.copyfile(source, args[1])
+        sys.stdout.write(f"{remote}: 1 file pulled\n")
+        return 0
+
+    sys.stderr.write(f"adb: unknown command {command}\n")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
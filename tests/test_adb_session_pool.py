@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ADB Session Pool Test
+ADB常驻会话池测试：使用模拟的 adb 可执行文件(tests/fake_adb.py)，
+校验会话池与逐条启动 adb 进程的结果一致、会话异常后自动重建，并对比单次操作延迟
+
+直接运行可输出 每次操作延迟和每秒操作数：
+    python tests/test_adb_session_pool.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb as fake_adb_module
+from tools.adb_session import AdbSessionPool
+from tools.tool_adapters import AndroidAdapter
+
+
+def make_adapter(adb_path: str, use_shell_pool: bool, device_id: str = "emulator-5554", **kwargs) -> AndroidAdapter:
+    adapter = AndroidAdapter(device_id, use_shell_pool=use_shell_pool, **kwargs)
+    adapter.adb_path = adb_path
+    return adapter
+
+
+async def run_actions(adapter: AndroidAdapter, actions: int) -> None:
+    for i in range(actions):
+        if i % 3 == 0:
+            result = await adapter.click(100 + i, 200)
+        elif i % 3 == 1:
+            result = await adapter.swipe(100, 800, 100, 200, 300)
+        else:
+            result = await adapter.press_key("back")
+        assert result["success"], result
+
+
+async def measure_actions(adb_path: str, use_shell_pool: bool, actions: int) -> Dict[str, float]:
+    """执行 actions 次操作，返回单次操作延迟（毫秒）和每秒操作数"""
+    adapter = make_adapter(adb_path, use_shell_pool)
+    try:
+        # 预热：会话池模式下建立会话
+        await adapter.click(0, 0)
+        start = time.perf_counter()
+        await run_actions(adapter, actions)
+        elapsed = time.perf_counter() - start
+    finally:
+        await adapter.cleanup()
+    return {"latency_ms": elapsed / actions * 1000, "actions_per_sec": actions / elapsed}
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_LOG", str(tmp_path / "device.log"))
+    monkeypatch.setenv("FAKE_ADB_DEVICES", "emulator-5554,emulator-5556")
+    for name in ("FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD"):
+        monkeypatch.setenv(name, "")
+    return fake_adb_module.install(str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_session_pool_matches_spawned_commands(fake_adb, tmp_path):
+    pooled, spawned = make_adapter(fake_adb, True), make_adapter(fake_adb, False)
+    try:
+        assert await pooled.initialize() and await spawned.initialize()
+        assert pooled.device_info == spawned.device_info
+        assert pooled.device_info["model"] == "Fake Pixel"
+
+        for adapter in (pooled, spawned):
+            assert (await adapter.click(10, 20))["success"]
+            assert (await adapter.input_text("hello world"))["success"]
+            shot = await adapter.take_screenshot(str(tmp_path / "shot.png"))
+            assert shot["success"], shot
+            elements = await adapter.get_elements()
+            assert elements["success"], elements
+
+            # 输出不以换行结尾、命令失败时同样保持一致
+            assert (await adapter._run_adb_command(["shell", "printf", "abc"]))["output"] == "abc"
+            failed = await adapter._run_adb_command(["shell", "ls", "/no/such/path"])
+            assert not failed["success"] and failed["return_code"] != 0 and failed["error"]
+
+        # 会话按行分隔命令：多行命令返回失败而不是抛出异常
+        multiline = await pooled.session_pool.run(None, "input text a\nb")
+        assert not multiline["success"] and "single line" in multiline["error"]
+
+        log = (tmp_path / "device.log").read_text().splitlines()
+        assert log == ["emulator-5554 input tap 10 20", "emulator-5554 input text hello%sworld"] * 2
+        assert pooled.session_pool.get_stats()["sessions_started"] == 1
+    finally:
+        await pooled.cleanup()
+        await spawned.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_session_respawn_and_health_check(fake_adb):
+    pool = AdbSessionPool(fake_adb, health_check_interval=3600)
+    try:
+        assert (await pool.run("emulator-5554", "echo one"))["output"] == "one\n"
+        session = pool._idle["emulator-5554"][0]
+
+        # 设备连接断开：会话进程退出后，下次执行自动重建会话
+        session.process.kill()
+        await session.process.wait()
+        assert (await pool.run("emulator-5554", "echo two"))["output"] == "two\n"
+
+        # 命令超时的会话被丢弃，不会把迟到的输出串到下一条命令
+        timed_out = await pool.run("emulator-5554", "sleep 5; echo late", timeout=0.2)
+        assert not timed_out["success"] and "timed out" in timed_out["error"]
+        assert (await pool.run("emulator-5554", "echo three"))["output"] == "three\n"
+
+        # 空闲超过检查间隔的会话先做健康检查
+        pool.health_check_interval = 0
+        assert (await pool.run("emulator-5554", "echo four"))["success"]
+
+        # 会话中途退出时命令执行失败
+        exited = await pool.run("emulator-5554", "exit 3")
+        assert not exited["success"]
+        assert (await pool.run("emulator-5554", "echo five"))["output"] == "five\n"
+
+        stats = pool.get_stats()
+        assert stats["sessions_started"] == 4
+        assert stats["sessions_discarded"] == 3
+        assert stats["health_checks"] >= 1 and stats["health_check_failures"] == 0
+        assert stats["devices"]["emulator-5554"] == {"sessions": 1, "idle": 1}
+    finally:
+        await pool.close()
+    assert pool.get_stats()["devices"]["emulator-5554"] == {"sessions": 0, "idle": 0}
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_pooled_per_device(fake_adb):
+    pool = AdbSessionPool(fake_adb, max_sessions_per_device=2)
+    try:
+        commands = [pool.run(device, f"sleep 0.05; echo {device}")
+                    for device in ("emulator-5554", "emulator-5556") for _ in range(5)]
+        results = await asyncio.gather(*commands)
+        assert [r["output"].strip() for r in results] == ["emulator-5554"] * 5 + ["emulator-5556"] * 5
+        stats = pool.get_stats()
+        assert stats["sessions_started"] == 4
+        assert stats["devices"]["emulator-5556"] == {"sessions": 2, "idle": 2}
+
+        missing = await pool.run("emulator-9999", "echo hi")
+        assert not missing["success"]
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_session_pool_reduces_action_latency(fake_adb):
+    spawned = await measure_actions(fake_adb, use_shell_pool=False, actions=15)
+    pooled = await measure_actions(fake_adb, use_shell_pool=True, actions=15)
+    assert pooled["latency_ms"] * 3 < spawned["latency_ms"], (spawned, pooled)
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    actions = 200
+    with tempfile.TemporaryDirectory() as directory:
+        for spawn_delay in (0.0, 0.02):
+            adb_path = fake_adb_module.install(directory, spawn_delay)
+            print(f"{actions} actions, fake adb spawn delay {spawn_delay * 1000:.0f}ms")
+            for name, use_pool in (("spawn per command", False), ("shell session pool", True)):
+                stats = await measure_actions(adb_path, use_pool, actions)
+                print(f"  {name:<19} {stats['latency_ms']:>7.2f}ms/action {stats['actions_per_sec']:>8.1f} actions/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
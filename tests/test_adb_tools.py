@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ADB Tools Test
+ADB工具执行核心测试：使用模拟的 adb 可执行文件(tests/fake_adb.py)，校验同步入口复用共享的后台事件循环、
+并发的异步操作（包括设备连接检查）不阻塞调用方的事件循环并在会话池上排队，截图在执行核心的进程槽上执行，
+以及一次性 adb 进程的成功、失败与超时
+
+直接运行可输出 原有实现（每次调用新建线程和事件循环、阻塞的 subprocess.run）与共享执行核心的
+单次调用开销，以及同时发起 100 个操作时的总耗时和调用方事件循环的最大停顿：
+    python tests/test_adb_tools.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import concurrent.futures
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb
+from tools import adb_runtime, device_registry
+from tools.adb_runtime import AdbRuntime, get_adb_runtime
+from tools.adb_tools import ADBClickTool, ADBInputTool, ADBScreenshotTool
+from tools.device_registry import DeviceRegistry
+
+SERIAL = "emulator-5554"
+
+
+class LegacyClickTool(ADBClickTool):
+    """原有实现：同步入口每次新建线程和事件循环，异步入口内部是阻塞的 subprocess.run"""
+
+    async def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+            success = result.returncode == 0
+            return success, result.stdout if success else result.stderr
+        except subprocess.TimeoutExpired:
+            return False, "ADB命令执行超时"
+
+    def execute(self, coordinates: Dict[str, int], **kwargs) -> Dict[str, Any]:
+        try:
+            loop = asyncio.get_event_loop()
+            if loop.is_running():
+                with concurrent.futures.ThreadPoolExecutor() as executor:
+                    return executor.submit(asyncio.run, self.aexecute(coordinates, **kwargs)).result()
+            return asyncio.run(self.aexecute(coordinates, **kwargs))
+        except RuntimeError:
+            return asyncio.run(self.aexecute(coordinates, **kwargs))
+
+
+def setup_environment(directory: str, input_delay: float = 0.0) -> None:
+    os.environ["FAKE_ADB_DEVICES"] = SERIAL
+    os.environ.pop("FAKE_ADB_DEVICES_FILE", None)
+    os.environ["FAKE_ADB_INPUT_DELAY"] = str(input_delay) if input_delay else ""
+    fake_adb.install(directory)
+    if directory not in os.environ["PATH"].split(os.pathsep):
+        os.environ["PATH"] = f"{directory}{os.pathsep}{os.environ['PATH']}"
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """安装模拟 adb 到 PATH，并使用全新的共享注册表和执行核心"""
+    monkeypatch.setenv("PATH", os.environ["PATH"])
+    for name in ("FAKE_ADB_DEVICES", "FAKE_ADB_DEVICES_FILE", "FAKE_ADB_INPUT_DELAY",
+                 "FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD"):
+        monkeypatch.setenv(name, os.environ.get(name, ""))
+    setup_environment(str(tmp_path))
+    monkeypatch.setenv("FAKE_ADB_LOG", str(tmp_path / "device.log"))
+    registries: Dict[str, DeviceRegistry] = {}
+    monkeypatch.setattr(device_registry, "_registries", registries)
+    runtimes: Dict[str, AdbRuntime] = {}
+    monkeypatch.setattr(adb_runtime, "_runtimes", runtimes)
+    yield get_adb_runtime()
+    for item in runtimes.values():
+        item.stop()
+    for registry in registries.values():
+        registry.stop()
+
+
+def device_log() -> List[str]:
+    path = Path(os.environ["FAKE_ADB_LOG"])
+    return path.read_text().splitlines() if path.exists() else []
+
+
+async def concurrent_clicks(tool: ADBClickTool, actions: int, tick: float = 0.005) -> Dict[str, float]:
+    """同时发起 actions 次点击，同时以 tick 间隔运行心跳协程，记录调用方事件循环的最大停顿"""
+    lag = 0.0
+    done = False
+
+    async def heartbeat() -> None:
+        nonlocal lag
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(tick)
+            lag = max(lag, time.perf_counter() - before - tick)
+
+    # 先做一次完整回收，避免测量期间恰好触发的全量 GC（与线程模型无关）计入停顿
+    gc.collect()
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(tick)
+    start = time.perf_counter()
+    results = await asyncio.gather(*[tool.aexecute({"x": i, "y": i}) for i in range(actions)])
+    elapsed = time.perf_counter() - start
+    done = True
+    await beat
+    assert all(r["success"] and r["method"] == "adb" for r in results), results
+    return {'seconds': elapsed, 'max_lag': lag}
+
+
+def test_sync_calls_share_one_background_loop(runtime):
+    tool = ADBClickTool()
+    assert tool.execute({"x": 0, "y": 0})["method"] == "adb"
+    threads = threading.active_count()
+    for i in range(1, 6):
+        result = tool.execute({"x": i, "y": i})
+        assert result["success"] and result["method"] == "adb", result
+    # 事件循环正在运行时调用同步入口也不再新建线程
+    async def inside_loop() -> Dict[str, Any]:
+        return tool.execute({"x": 6, "y": 6})
+    assert asyncio.run(inside_loop())["success"]
+    assert threading.active_count() == threads
+
+    stats = runtime.get_stats()
+    assert stats['loop_starts'] == 1 and stats['sync_calls'] == 7
+    assert stats['session_commands'] == 7 and stats['sessions']['sessions_started'] == 1
+    assert device_log() == [f"{SERIAL} input tap {i} {i}" for i in range(7)]
+
+    # 后台循环上的协程不能再同步等待自身
+    async def nested() -> Any:
+        return runtime.run_sync(asyncio.sleep(0))
+    with pytest.raises(RuntimeError):
+        runtime.run_sync(nested())
+
+    # 停止后再次使用时重新启动
+    runtime.stop()
+    assert not runtime.running
+    assert tool.execute({"x": 7, "y": 7})["success"]
+    assert runtime.get_stats()['loop_starts'] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_actions_do_not_block_caller_loop(runtime):
+    os.environ["FAKE_ADB_INPUT_DELAY"] = "0.01"
+    tool = ADBClickTool()
+    await tool.aexecute({"x": -1, "y": -1})
+    stats = await concurrent_clicks(tool, 100)
+    # 100 个操作在两个常驻会话上排队，调用方的循环照常调度其他协程
+    assert stats['max_lag'] < 0.05, stats
+    assert runtime.get_stats()['sessions']['sessions_started'] <= runtime.max_sessions_per_device
+    assert sorted(device_log()[1:]) == sorted(f"{SERIAL} input tap {i} {i}" for i in range(100))
+
+    # 原有实现在每条命令执行期间阻塞调用方的循环
+    legacy = await concurrent_clicks(LegacyClickTool(), 5)
+    assert legacy['max_lag'] > 0.01 and legacy['max_lag'] > stats['max_lag'], (legacy, stats)
+
+
+@pytest.mark.asyncio
+async def test_spawned_commands_report_failures_and_timeouts(runtime, tmp_path):
+    sdcard = Path(os.environ["FAKE_ADB_SDCARD"])
+    sdcard.mkdir(exist_ok=True)
+    (sdcard / "shot.png").write_bytes(b"png")
+    success, output = await runtime.execute(["adb", "pull", "/sdcard/shot.png", str(tmp_path / "shot.png")])
+    assert success and "1 file pulled" in output
+    assert (tmp_path / "shot.png").read_bytes() == b"png"
+
+    success, output = await runtime.execute(["adb", "pull", "/sdcard/missing.png", str(tmp_path / "x.png")])
+    assert not success and "missing.png" in output
+    success, output = await runtime.execute(["adb", "-s", "emulator-9999", "pull", "/sdcard/shot.png", "x"])
+    assert not success and "not found" in output
+
+    # 一次性进程超时后被结束；shell 命令失败返回合并后的输出
+    success, output = await runtime.execute(["adb", "exec-out", "sleep", "5"], timeout=0.3)
+    assert not success and output == "ADB命令执行超时"
+    success, output = await runtime.execute(["adb", "shell", "echo", "oops;", "false"])
+    assert not success and output.strip() == "oops"
+
+    stats = runtime.get_stats()
+    assert stats['process_commands'] == 4 and stats['timeouts'] == 1 and stats['failures'] == 4
+
+
+@pytest.mark.asyncio
+async def test_connection_check_does_not_block_caller_loop(runtime, monkeypatch):
+    # 不跟踪的注册表每次过期后同步探测 adb devices，探测期间调用方的循环照常运行
+    monkeypatch.setenv("FAKE_ADB_SPAWN_DELAY", "0.3")
+    registry = device_registry._registries["adb"] = DeviceRegistry(track=False)
+    lag = 0.0
+    done = False
+
+    async def heartbeat() -> None:
+        nonlocal lag
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - before - 0.005)
+
+    gc.collect()
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.005)
+    assert await ADBClickTool()._acheck_adb_connection()
+    done = True
+    await beat
+    assert registry.get_stats()['probes'] == 1 and lag < 0.1, lag
+
+
+@pytest.mark.asyncio
+async def test_screenshots_are_captured_on_runtime_process_slots(runtime, monkeypatch, tmp_path):
+    runtime.max_processes = 2
+    running = peak = 0
+    threads = set()
+    capture = adb_runtime.capture_frame
+
+    async def tracked_capture(*args, **kwargs):
+        nonlocal running, peak
+        threads.add(threading.current_thread().name)
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await capture(*args, **kwargs)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(adb_runtime, "capture_frame", tracked_capture)
+    monkeypatch.setenv("FAKE_ADB_SCREEN_SIZE", "64x128")
+    tool = ADBScreenshotTool()
+    results = await asyncio.gather(*[tool.aexecute(str(tmp_path / f"shot_{i}.png")) for i in range(6)])
+    assert all(r["success"] and r["frame_sequence"] for r in results), results
+    # 截图在执行核心的循环上执行，同时运行的 adb 进程数受进程槽限制
+    assert threads == {f"adb-runtime[{runtime.adb_path}]"} and peak == 2
+    assert runtime.get_stats()['frame_captures'] == 6
+
+
+@pytest.mark.asyncio
+async def test_hung_screenshot_times_out_and_frees_process_slot(runtime, monkeypatch):
+    runtime.max_processes = 1
+    monkeypatch.setenv("FAKE_ADB_SCREEN_SIZE", "64x128")
+    monkeypatch.setenv("FAKE_ADB_SPAWN_DELAY", "5")
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="timed out"):
+        await runtime.capture_frame(raw=True, timeout=0.3)
+    assert time.perf_counter() - start < 2
+    # 超时的进程被结束，唯一的进程槽已释放
+    monkeypatch.setenv("FAKE_ADB_SPAWN_DELAY", "")
+    frame = await asyncio.wait_for(runtime.capture_frame(raw=True), 5)
+    assert frame.width == 64 and runtime.get_stats()['failures'] == 1
+
+
+@pytest.mark.asyncio
+async def test_multiline_input_uses_one_off_process(runtime):
+    # 常驻会话按行分隔命令，含换行的文本交给一次性 adb 进程，失败时返回结果而不是抛出异常
+    tool = ADBInputTool()
+    result = await tool.aexecute("hello\nworld")
+    assert result["method"] == "adb" and "success" in result, result
+    assert tool.execute("line\n")["method"] == "adb"
+    stats = runtime.get_stats()
+    assert stats['session_commands'] == 0 and stats['process_commands'] == 2
+    assert device_log()[:2] == [f"{SERIAL} input text hello", f"{SERIAL} input text line"]
+
+
+def measure_overhead(calls: int) -> Dict[str, float]:
+    """单次调用开销（微秒）：只计同步/异步桥接，不执行 adb 命令"""
+    async def noop() -> None:
+        return None
+
+    def legacy_bridge() -> None:
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            executor.submit(asyncio.run, noop()).result()
+
+    runtime = get_adb_runtime()
+    runtime.run_sync(noop())
+    timings = {}
+    for name, call in (('legacy', legacy_bridge), ('asyncio_run', lambda: asyncio.run(noop())),
+                       ('run_sync', lambda: runtime.run_sync(noop()))):
+        start = time.perf_counter()
+        for _ in range(calls):
+            call()
+        timings[name] = (time.perf_counter() - start) / calls * 1e6
+
+    async def from_loop() -> float:
+        await runtime.run(noop())
+        start = time.perf_counter()
+        for _ in range(calls):
+            await runtime.run(noop())
+        return (time.perf_counter() - start) / calls * 1e6
+    timings['run'] = asyncio.run(from_loop())
+    return timings
+
+
+def measure_clicks(tool: ADBClickTool, calls: int) -> float:
+    """同步入口单次点击的延迟（毫秒）"""
+    tool.execute({"x": 0, "y": 0})
+    start = time.perf_counter()
+    for i in range(calls):
+        assert tool.execute({"x": i, "y": i})["success"]
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    with tempfile.TemporaryDirectory() as directory:
+        setup_environment(directory)
+        os.environ.pop("FAKE_ADB_LOG", None)
+        overhead = measure_overhead(200)
+        print("Sync/async bridge overhead per call (no adb command)")
+        print(f"  ThreadPoolExecutor + asyncio.run: {overhead['legacy']:8.1f}us")
+        print(f"  asyncio.run:                      {overhead['asyncio_run']:8.1f}us")
+        print(f"  shared loop, sync caller:         {overhead['run_sync']:8.1f}us")
+        print(f"  shared loop, async caller:        {overhead['run']:8.1f}us")
+
+        legacy = measure_clicks(LegacyClickTool(), 20)
+        shared = measure_clicks(ADBClickTool(), 20)
+        print("Sync ADBClickTool.execute latency per click (fake adb)")
+        print(f"  legacy:      {legacy:7.2f}ms")
+        print(f"  shared loop: {shared:7.2f}ms")
+
+        # 常驻会话在启动时读取模拟设备的 input 耗时，重新启动执行核心
+        os.environ["FAKE_ADB_INPUT_DELAY"] = "0.02"
+        get_adb_runtime().stop()
+        print("100 concurrent clicks from one event loop (20ms per input command on device)")
+        for name, tool in (('legacy', LegacyClickTool()), ('shared loop', ADBClickTool())):
+            asyncio.run(tool.aexecute({"x": 0, "y": 0}))
+            stats = asyncio.run(concurrent_clicks(tool, 100))
+            print(f"  {name:12s} total {stats['seconds']:6.2f}s, "
+                  f"max caller loop stall {stats['max_lag'] * 1000:7.1f}ms")
+        get_adb_runtime().stop()
+
+
+if __name__ == "__main__":
+    main()
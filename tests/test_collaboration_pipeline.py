@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Collaboration Pipeline Test
+协作流水线测试：使用模拟设备和模拟LLM对比逐个任务顺序执行与流水线模式的端到端吞吐
+
+直接运行可输出 不同并发度下的每分钟任务数：
+    python tests/test_collaboration_pipeline.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agenticx.core.event_bus import EventBus
+from core.info_pool import InfoPool
+from workflows.collaboration import AgentCoordinator
+
+
+class SimulatedDevice:
+    """模拟设备：截图和操作各有固定耗时，并检查设备操作不会并发"""
+
+    def __init__(self, capture_delay: float = 0.03, action_delay: float = 0.02):
+        self.capture_delay = capture_delay
+        self.action_delay = action_delay
+        self.version = 0
+        self.captures = 0
+        self._busy = False
+
+    async def _use(self, delay: float) -> None:
+        assert not self._busy, "设备被并发操作"
+        self._busy = True
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._busy = False
+
+    async def capture(self) -> str:
+        await self._use(self.capture_delay)
+        self.captures += 1
+        return f"/tmp/screen_{self.version}.png"
+
+    async def act(self) -> None:
+        await self._use(self.action_delay)
+        self.version += 1
+
+
+class MockManager:
+    def __init__(self, device: SimulatedDevice, llm_delay: float):
+        self.device = device
+        self.llm_delay = llm_delay
+        self.seen_screens: List[str] = []
+
+    async def take_screenshot(self) -> str:
+        return await self.device.capture()
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        self.seen_screens.append(context["screenshot_path"])
+        await asyncio.sleep(self.llm_delay)
+        return {"steps": ["tap"], "task": context["description"]}
+
+
+class MockExecutor:
+    def __init__(self, device: SimulatedDevice, llm_delay: float):
+        self.device = device
+        self.llm_delay = llm_delay
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.llm_delay)
+        await self.device.act()
+        after = await self.device.capture()
+        return {"success": True, "screenshot_path": context["screenshot_path"], "after_screenshot": after}
+
+
+class MockLLMAgent:
+    def __init__(self, llm_delay: float):
+        self.llm_delay = llm_delay
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(self.llm_delay)
+        return {"task_id": context["task_id"]}
+
+
+async def build_coordinator(max_concurrent_tasks: int = 2, llm_delay: float = 0.1):
+    device = SimulatedDevice()
+    info_pool = InfoPool(event_bus=EventBus())
+    await info_pool.start()
+    agents = {
+        "manager": MockManager(device, llm_delay),
+        "executor": MockExecutor(device, llm_delay),
+        "reflector": MockLLMAgent(llm_delay),
+        "notetaker": MockLLMAgent(llm_delay * 0.8),
+    }
+    coordinator = AgentCoordinator(agents, info_pool, max_concurrent_tasks=max_concurrent_tasks, verbose=False)
+    return coordinator, device, info_pool
+
+
+async def measure_throughput(tasks: int, pipelined: bool, max_concurrent_tasks: int = 2,
+                             llm_delay: float = 0.1) -> Dict[str, Any]:
+    """执行 tasks 个任务，返回每分钟任务数和截图统计"""
+    coordinator, device, info_pool = await build_coordinator(max_concurrent_tasks, llm_delay)
+    descriptions = [f"打开设置并检查第{i}项" for i in range(tasks)]
+    try:
+        start = time.perf_counter()
+        if pipelined:
+            results = await coordinator.execute_tasks(descriptions)
+        else:
+            results = [await coordinator.execute_task(d) for d in descriptions]
+        elapsed = time.perf_counter() - start
+    finally:
+        await info_pool.stop()
+
+    assert all(r["status"] == "success" for r in results), results
+    return {
+        "tasks_per_minute": tasks / elapsed * 60,
+        "captures": device.captures,
+        "manager_screens": coordinator.agents["manager"].seen_screens,
+        "final_version": device.version,
+        **coordinator.get_pipeline_stats(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_pipelined_mode_overlaps_phases_and_shares_screenshots():
+    sequential = await measure_throughput(6, pipelined=False)
+    pipelined = await measure_throughput(6, pipelined=True, max_concurrent_tasks=3)
+
+    assert pipelined["tasks_per_minute"] > sequential["tasks_per_minute"] * 1.3, (sequential, pipelined)
+    # 每个任务的规划都基于上一个任务执行后的屏幕
+    for stats in (sequential, pipelined):
+        assert stats["manager_screens"] == [f"/tmp/screen_{i}.png" for i in range(6)]
+    # 流水线内只有首次规划需要单独截图；逐个调用之间屏幕可能自行变化，每次调用重新截图
+    assert (pipelined["screenshots_taken"], pipelined["screenshots_reused"]) == (1, 5)
+    assert (sequential["screenshots_taken"], sequential["screenshots_reused"]) == (6, 0)
+
+
+class FailingExecutor(MockExecutor):
+    """操作设备后抛出异常"""
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        await self.device.act()
+        raise RuntimeError("executor crashed after acting")
+
+
+@pytest.mark.asyncio
+async def test_failed_execution_invalidates_shared_screenshot():
+    coordinator, device, info_pool = await build_coordinator(max_concurrent_tasks=2, llm_delay=0.01)
+    coordinator.agents["executor"] = FailingExecutor(device, 0.01)
+    try:
+        await coordinator.execute_tasks(["第一项", "第二项"])
+    finally:
+        await info_pool.stop()
+    # 执行失败时设备已被操作，第二个任务的规划重新截图而不是复用操作前的截图
+    assert coordinator.agents["manager"].seen_screens == ["/tmp/screen_0.png", "/tmp/screen_1.png"]
+    assert coordinator.get_pipeline_stats()["screenshots_reused"] == 0
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    tasks = 20
+    sequential = await measure_throughput(tasks, pipelined=False)
+    print(f"{tasks} tasks, mock LLM latency 100ms, simulated device")
+    print(f"  sequential:                {sequential['tasks_per_minute']:>7.1f} tasks/min "
+          f"({sequential['captures']} captures)")
+    for concurrency in (1, 2, 4):
+        stats = await measure_throughput(tasks, pipelined=True, max_concurrent_tasks=concurrency)
+        print(f"  pipelined (in flight={concurrency}): {stats['tasks_per_minute']:>7.1f} tasks/min "
+              f"({stats['captures']} captures, {stats['screenshots_reused']} reused)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
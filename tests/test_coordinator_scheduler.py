@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Coordinator Scheduler Test
+协调器DAG调度测试：对比按轮次扫描执行与事件驱动调度在合成DAG上的完成时间(makespan)，
+以及限制并发时关键路径优先与先到先服务的差异
+
+直接运行可输出 1000 节点合成DAG上的完整基准：
+    python tests/test_coordinator_scheduler.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.coordinator import AgentCoordinator, WorkflowExecution, WorkflowStatus, NodeExecution, NodeStatus
+from core.dag_scheduler import DAGScheduler
+from config import WorkflowConfig, WorkflowNodeConfig, WorkflowEdgeConfig
+
+
+def synthetic_dag(nodes: int, seed: int = 7, max_deps: int = 3,
+                  window: int = 50) -> Dict[str, Set[str]]:
+    """生成合成DAG：每个节点依赖前 window 个节点中随机的至多 max_deps 个"""
+    rng = random.Random(seed)
+    dependencies: Dict[str, Set[str]] = {}
+    for i in range(nodes):
+        candidates = range(max(0, i - window), i)
+        count = min(len(candidates), rng.randint(0, max_deps))
+        dependencies[f"n{i}"] = {f"n{j}" for j in rng.sample(candidates, count)}
+    return dependencies
+
+
+def synthetic_durations(dependencies: Dict[str, Set[str]], seed: int = 7,
+                        unit: float = 0.001) -> Dict[str, float]:
+    """节点耗时：大多数节点很快，少量节点耗时是其10倍"""
+    rng = random.Random(seed)
+    return {node_id: unit * (10 if rng.random() < 0.1 else rng.randint(1, 3)) for node_id in dependencies}
+
+
+async def run_waves(dependencies: Dict[str, Set[str]], durations: Dict[str, float]) -> float:
+    """旧的按轮次执行：每轮扫描全部节点，启动就绪节点并依次等待整轮完成"""
+    start = time.perf_counter()
+    completed: Set[str] = set()
+    while len(completed) < len(dependencies):
+        ready = [n for n, deps in dependencies.items() if n not in completed and deps <= completed]
+        tasks = [(n, asyncio.create_task(asyncio.sleep(durations[n]))) for n in ready]
+        for node_id, task in tasks:
+            await task
+            completed.add(node_id)
+    return time.perf_counter() - start
+
+
+async def run_scheduler(dependencies: Dict[str, Set[str]], durations: Dict[str, float],
+                        max_concurrency: Optional[int] = None, critical_path_first: bool = True) -> float:
+    """事件驱动调度，返回完成时间（秒）"""
+    scheduler = DAGScheduler(dependencies, max_concurrency=max_concurrency, weights=durations,
+                             critical_path_first=critical_path_first)
+
+    async def execute(node_id: str) -> None:
+        await asyncio.sleep(durations[node_id])
+
+    await scheduler.run(execute)
+    return scheduler.get_stats()["makespan"]
+
+
+def critical_path(dependencies: Dict[str, Set[str]], durations: Dict[str, float]) -> float:
+    return DAGScheduler(dependencies, weights=durations).get_stats()["critical_path"]
+
+
+def build_workflow(dependencies: Dict[str, Set[str]]) -> WorkflowConfig:
+    return WorkflowConfig(
+        id="synthetic",
+        name="synthetic",
+        nodes=[WorkflowNodeConfig(id=n, type="task", agent_id="worker") for n in dependencies],
+        edges=[WorkflowEdgeConfig(from_node=d, to_node=n) for n, deps in dependencies.items() for d in deps]
+    )
+
+
+class SleepAgent:
+    """按节点预设耗时休眠的测试智能体"""
+
+    def __init__(self, durations: Dict[str, float], fail: Optional[str] = None):
+        self.durations = durations
+        self.fail = fail
+        self.finished = []
+
+    async def execute_task(self, task_context):
+        node_id = task_context["node_id"]
+        if node_id == self.fail:
+            raise RuntimeError("boom")
+        await asyncio.sleep(self.durations.get(node_id, 0))
+        self.finished.append(node_id)
+        return {"node": node_id}
+
+
+def new_execution(workflow: WorkflowConfig) -> WorkflowExecution:
+    execution = WorkflowExecution(workflow_id=workflow.id, status=WorkflowStatus.RUNNING, start_time="")
+    for node in workflow.nodes:
+        execution.nodes[node.id] = NodeExecution(node_id=node.id, status=NodeStatus.PENDING)
+    return execution
+
+
+@pytest.mark.asyncio
+async def test_coordinator_executes_in_dependency_order():
+    dependencies = synthetic_dag(200, max_deps=2, window=10)
+    durations = synthetic_durations(dependencies, unit=0.0005)
+    workflow = build_workflow(dependencies)
+    coordinator = AgentCoordinator(max_node_retries=0, max_concurrent_nodes=16)
+    agent = SleepAgent(durations)
+    coordinator.register_agent("worker", agent)
+
+    execution = new_execution(workflow)
+    await coordinator._execute_nodes("e1", workflow, execution, coordinator._build_dependency_graph(workflow))
+
+    position = {node_id: i for i, node_id in enumerate(agent.finished)}
+    assert len(position) == 200
+    assert all(position[d] < position[n] for n, deps in dependencies.items() for d in deps)
+    assert all(node.status == NodeStatus.COMPLETED for node in execution.nodes.values())
+    # 完成后记录了节点耗时估计，供下次关键路径排序使用
+    assert len(coordinator._node_durations) == 200
+
+
+@pytest.mark.asyncio
+async def test_coordinator_failure_and_cycle():
+    dependencies = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    workflow = build_workflow(dependencies)
+    coordinator = AgentCoordinator(max_node_retries=0)
+    agent = SleepAgent({"c": 0.2}, fail="b")
+    coordinator.register_agent("worker", agent)
+
+    execution = new_execution(workflow)
+    with pytest.raises(Exception, match="节点执行失败"):
+        await coordinator._execute_nodes("e1", workflow, execution, coordinator._build_dependency_graph(workflow))
+    assert execution.nodes["b"].status == NodeStatus.FAILED
+    assert execution.nodes["d"].status == NodeStatus.PENDING
+    # 失败时取消仍在运行的兄弟节点
+    assert "c" not in agent.finished
+
+    cyclic = build_workflow({"a": {"b"}, "b": {"a"}})
+    with pytest.raises(Exception, match="循环依赖"):
+        await coordinator._execute_nodes("e2", cyclic, new_execution(cyclic),
+                                         coordinator._build_dependency_graph(cyclic))
+
+
+@pytest.mark.asyncio
+async def test_event_driven_makespan_beats_waves():
+    dependencies = synthetic_dag(300)
+    durations = synthetic_durations(dependencies)
+    waves = await run_waves(dependencies, durations)
+    event_driven = await run_scheduler(dependencies, durations)
+    assert event_driven < waves, (event_driven, waves)
+    assert event_driven < critical_path(dependencies, durations) * 2 + 0.2
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    dependencies = synthetic_dag(1000)
+    durations = synthetic_durations(dependencies)
+    total = sum(durations.values())
+    print(f"1000-node DAG: critical path={critical_path(dependencies, durations) * 1000:.0f}ms "
+          f"total work={total * 1000:.0f}ms")
+
+    print(f"  waves (legacy):              {await run_waves(dependencies, durations) * 1000:>8.0f}ms")
+    print(f"  event-driven (unlimited):    {await run_scheduler(dependencies, durations) * 1000:>8.0f}ms")
+    for limit in (4, 16):
+        fifo = await run_scheduler(dependencies, durations, limit, critical_path_first=False)
+        cp = await run_scheduler(dependencies, durations, limit)
+        print(f"  limit={limit:<3} FIFO:               {fifo * 1000:>8.0f}ms")
+        print(f"  limit={limit:<3} critical-path-first:{cp * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
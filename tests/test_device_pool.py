@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Device Pool Test
+设备池测试：校验工作窃取把慢设备积压的任务分给空闲设备、多步任务绑定同一设备按顺序执行、
+设备移除时任务的转移，以及在 N 台模拟 adb 设备(tests/fake_adb.py)上吞吐量随设备数增长
+
+直接运行可输出 1/2/4/8 台设备时每秒完成的任务数：
+    python tests/test_device_pool.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb as fake_adb_module
+from tools.device_pool import DevicePool, DevicePoolError
+from tools.gui_tools import Platform
+from tools.tool_adapters import AdapterFactory, AndroidAdapter, ToolAdapter
+
+
+class EmulatedAdapter(ToolAdapter):
+    """模拟设备适配器：每次点击耗时 latency 秒，记录执行过的操作"""
+
+    def __init__(self, device_id: str, latency: float, log: List[tuple]):
+        super().__init__(platform=Platform.ANDROID, adapter_name="EmulatedAdapter")
+        self.device_id = device_id
+        self.latency = latency
+        self.log = log
+        self.cleaned_up = False
+
+    async def initialize(self) -> bool:
+        self.is_initialized = True
+        return True
+
+    async def cleanup(self) -> bool:
+        self.cleaned_up = True
+        return True
+
+    async def get_device_info(self) -> Dict[str, Any]:
+        return {'device_id': self.device_id}
+
+    async def take_screenshot(self, save_path: Optional[str] = None) -> Dict[str, Any]:
+        return {'success': True}
+
+    async def click(self, x: int, y: int, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        self.log.append((self.device_id, x))
+        return {'success': True, 'device_id': self.device_id}
+
+    async def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 300,
+                    **kwargs) -> Dict[str, Any]:
+        return {'success': True}
+
+    async def input_text(self, text: str, **kwargs) -> Dict[str, Any]:
+        return {'success': True}
+
+    async def press_key(self, key: str, **kwargs) -> Dict[str, Any]:
+        return {'success': True}
+
+    async def get_elements(self, **kwargs) -> Dict[str, Any]:
+        return {'success': True, 'elements': []}
+
+
+def click(x: int):
+    async def task(adapter: ToolAdapter) -> Dict[str, Any]:
+        return await adapter.click(x, 0)
+    return task
+
+
+def emulated_pool(latencies: Dict[str, float], log: List[tuple]) -> DevicePool:
+    return DevicePool(list(latencies), adapter_builder=lambda device_id: EmulatedAdapter(
+        device_id, latencies[device_id], log))
+
+
+@pytest.mark.asyncio
+async def test_work_stealing_balances_slow_devices():
+    log: List[tuple] = []
+    pool = await emulated_pool({'slow': 0.05, 'fast': 0.005}, log).start()
+    try:
+        results = await pool.map([click(i) for i in range(40)])
+        assert [r['success'] for r in results] == [True] * 40
+        assert sorted(x for _, x in log) == list(range(40))
+        stats = pool.get_stats()
+        # 提交时两台设备各分到一半，快设备做完后从慢设备队尾窃取
+        assert stats['stolen'] > 0 and stats['devices']['fast']['completed'] > 30
+        assert stats['completed'] == stats['submitted'] == 40
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_affinity_keeps_multi_step_tasks_on_one_device():
+    log: List[tuple] = []
+    pool = await emulated_pool({'a': 0.01, 'b': 0.01, 'c': 0.01}, log).start()
+    try:
+        steps, others = [], []
+        for step in range(6):
+            steps.append(pool.submit(click(100 + step), affinity="login-flow"))
+            others.extend(pool.submit(click(i)) for i in range(step * 3, step * 3 + 3))
+        results = await asyncio.gather(*steps, *others)
+        device = pool.device_for("login-flow")
+        assert {r['device_id'] for r in results[:6]} == {device}
+        assert [x for d, x in log if d == device and x >= 100] == list(range(100, 106))
+
+        # 绑定解除后新的同名任务重新按负载分派；指定设备的任务只在该设备执行
+        pool.release_affinity("login-flow")
+        assert pool.device_for("login-flow") is None
+        assert (await pool.run(click(200), device_id='c'))['device_id'] == 'c'
+        with pytest.raises(DevicePoolError):
+            pool.submit(click(0), device_id='missing')
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_removing_device_moves_or_fails_queued_tasks():
+    log: List[tuple] = []
+    pool = await emulated_pool({'a': 0.02, 'b': 0.02}, log).start()
+    try:
+        pinned = [pool.submit(click(i), device_id='a') for i in range(5)]
+        free = [pool.submit(click(10 + i)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        adapter = pool.get_adapter('a')
+        await pool.remove_device('a')
+        assert adapter.cleaned_up and pool.device_ids == ['b']
+
+        pinned_results = await asyncio.gather(*pinned, return_exceptions=True)
+        assert all(isinstance(r, DevicePoolError) for r in pinned_results)
+        assert all(r['success'] for r in await asyncio.gather(*free))
+
+        # 按注册表的设备列表接入新设备
+        pool.adapter_builder = lambda device_id: EmulatedAdapter(device_id, 0.01, log)
+        await pool.sync_devices({'b': 'device', 'c': 'device', 'd': 'offline'})
+        assert sorted(pool.device_ids) == ['b', 'c']
+        assert len(await pool.map([click(i) for i in range(8)])) == 8
+    finally:
+        await pool.stop()
+    # 没有设备时提交失败
+    with pytest.raises(DevicePoolError):
+        await DevicePool().run(click(0))
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_LOG", str(tmp_path / "device.log"))
+    monkeypatch.setenv("FAKE_ADB_INPUT_DELAY", "0.05")
+    for name in ("FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD"):
+        monkeypatch.setenv(name, "")
+    return fake_adb_module.install(str(tmp_path))
+
+
+def serials(count: int) -> List[str]:
+    return [f"emulator-{5554 + 2 * i}" for i in range(count)]
+
+
+async def measure_throughput(adb_path: str, devices: int, tasks: int) -> Dict[str, Any]:
+    """每个任务包含两步点击，返回每秒完成的任务数"""
+    async def two_taps(adapter: AndroidAdapter) -> str:
+        for _ in range(2):
+            result = await adapter.click(10, 20)
+            assert result['success'], result
+        return adapter.device_id
+
+    pool = AdapterFactory.create_device_pool(serials(devices), adb_path=adb_path)
+    await pool.start()
+    try:
+        # 预热：为每台设备建立 shell 会话
+        await asyncio.gather(*[pool.run(two_taps, device_id=serial) for serial in pool.device_ids])
+        start = time.perf_counter()
+        executed_on = await pool.map([two_taps] * tasks)
+        elapsed = time.perf_counter() - start
+        sessions = {serial: pool._devices[serial].session_pool.get_stats()['sessions_started']
+                    for serial in pool.device_ids}
+    finally:
+        await pool.stop()
+    return {'tasks_per_sec': tasks / elapsed, 'executed_on': executed_on, 'sessions': sessions}
+
+
+@pytest.mark.asyncio
+async def test_throughput_scales_with_fake_adb_devices(fake_adb, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_DEVICES", ",".join(serials(4)))
+    one = await measure_throughput(fake_adb, 1, 12)
+    four = await measure_throughput(fake_adb, 4, 48)
+    assert four['tasks_per_sec'] > 2.5 * one['tasks_per_sec']
+    assert sorted(set(four['executed_on'])) == serials(4)
+    # 每台设备使用各自的会话池
+    assert set(four['sessions']) == set(serials(4)) and all(n >= 1 for n in four['sessions'].values())
+
+    log = Path(os.environ["FAKE_ADB_LOG"]).read_text().splitlines()
+    assert {line.split()[0] for line in log} == set(serials(4))
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["FAKE_ADB_INPUT_DELAY"] = "0.05"
+        os.environ["FAKE_ADB_DEVICES"] = ",".join(serials(8))
+        os.environ.pop("FAKE_ADB_LOG", None)
+        adb_path = fake_adb_module.install(directory)
+        print("Two-tap tasks on fake adb devices (50ms per input command)")
+        baseline = None
+        for devices in (1, 2, 4, 8):
+            stats = asyncio.run(measure_throughput(adb_path, devices, 24 * devices))
+            baseline = baseline or stats['tasks_per_sec']
+            print(f"  {devices} device(s): {stats['tasks_per_sec']:6.1f} tasks/s "
+                  f"({stats['tasks_per_sec'] / baseline:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Device Registry Test
+设备注册表测试：使用模拟的 adb 可执行文件(tests/fake_adb.py)，校验注册表跟随设备插拔更新、
+跟踪不可用时退化为TTL探测，并对比ADB工具每次操作前启动 adb devices 与查询注册表的延迟
+
+直接运行可输出 每次操作的延迟对比：
+    python tests/test_device_registry.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb
+from tools import adb_runtime, device_registry
+from tools.adb_runtime import AdbRuntime
+from tools.adb_tools import ADBClickTool
+from tools.device_registry import DeviceRegistry
+
+SERIAL = "emulator-5554"
+
+
+def set_devices(devices_file: str, devices: Dict[str, str]) -> None:
+    with open(devices_file, "w") as f:
+        f.write("".join(f"{serial}\t{state}\n" for serial, state in devices.items()))
+
+
+def legacy_check_adb_connection() -> bool:
+    """原有实现：每次操作前启动 adb devices"""
+    result = subprocess.run(["adb", "devices"], capture_output=True, text=True, timeout=5)
+    if result.returncode == 0:
+        devices = result.stdout.strip().split('\n')[1:]
+        return len([line for line in devices if line.strip() and 'device' in line]) > 0
+    return False
+
+
+async def measure_clicks(actions: int, legacy: bool) -> float:
+    """执行 actions 次点击，返回单次操作平均延迟（毫秒）"""
+    tool = ADBClickTool()
+    if legacy:
+        async def legacy_acheck_adb_connection() -> bool:
+            return legacy_check_adb_connection()
+        object.__setattr__(tool, "_acheck_adb_connection", legacy_acheck_adb_connection)
+    # 预热：启动设备跟踪
+    await tool.aexecute({"x": 0, "y": 0})
+    start = time.perf_counter()
+    for i in range(actions):
+        result = await tool.aexecute({"x": i, "y": i})
+        assert result["method"] == "adb" and result["success"], result
+    return (time.perf_counter() - start) / actions * 1000
+
+
+@pytest.fixture
+def devices_file(tmp_path, monkeypatch):
+    """安装模拟 adb 到 PATH，并使用全新的共享注册表"""
+    path = str(tmp_path / "devices")
+    set_devices(path, {SERIAL: "device"})
+    monkeypatch.setenv("FAKE_ADB_DEVICES_FILE", path)
+    monkeypatch.setenv("FAKE_ADB_LOG", str(tmp_path / "device.log"))
+    for name in ("FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD"):
+        monkeypatch.setenv(name, "")
+    fake_adb.install(str(tmp_path))
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    registries: Dict[str, DeviceRegistry] = {}
+    monkeypatch.setattr(device_registry, "_registries", registries)
+    runtimes: Dict[str, AdbRuntime] = {}
+    monkeypatch.setattr(adb_runtime, "_runtimes", runtimes)
+    yield path
+    for runtime in runtimes.values():
+        runtime.stop()
+    for registry in registries.values():
+        registry.stop()
+
+
+def test_tracking_registry_follows_device_changes(devices_file):
+    registry = DeviceRegistry("adb")
+    changes: List[Dict[str, str]] = []
+    registry.add_listener(lambda previous, current: changes.append(current))
+    try:
+        assert registry.is_connected() and registry.is_connected(SERIAL)
+        for _ in range(1000):
+            assert registry.is_connected(SERIAL)
+        stats = registry.get_stats()
+        assert stats["tracking"] and stats["probes"] == 0 and stats["tracker_starts"] == 1
+
+        set_devices(devices_file, {SERIAL: "offline", "emulator-5556": "device"})
+        assert registry.wait_for(lambda d: d.get(SERIAL) == "offline", timeout=2.0)
+        assert not registry.is_connected(SERIAL)
+        assert registry.is_connected()
+
+        set_devices(devices_file, {})
+        assert registry.wait_for(lambda d: not d, timeout=2.0)
+        assert not registry.is_connected()
+        assert changes[-1] == {}
+        assert registry.get_stats()["probes"] == 0
+    finally:
+        registry.stop()
+
+
+def test_probe_fallback_uses_ttl_cache(devices_file):
+    registry = DeviceRegistry("adb", track=False, probe_ttl=60)
+    for _ in range(50):
+        assert registry.is_connected(SERIAL)
+    assert registry.get_stats()["probes"] == 1
+
+    # 缓存期内设备断开，命令失败后使缓存失效，下次查询重新探测
+    set_devices(devices_file, {})
+    assert registry.is_connected(SERIAL)
+    registry.invalidate()
+    assert not registry.is_connected(SERIAL)
+    assert registry.get_stats()["probes"] == 2
+
+    # adb 不可用时跟踪线程退出，查询退化为探测且不抛出异常
+    missing = DeviceRegistry("/nonexistent/adb", startup_timeout=1.0)
+    assert not missing.is_connected()
+    assert missing.get_stats()["probes"] == 1
+    missing.stop()
+
+
+@pytest.mark.asyncio
+async def test_adb_tools_fail_fast_when_device_drops(devices_file, tmp_path):
+    tool = ADBClickTool()
+    result = await tool.aexecute({"x": 10, "y": 20})
+    assert result["method"] == "adb" and result["success"]
+    assert (tmp_path / "device.log").read_text().splitlines() == [f"{SERIAL} input tap 10 20"]
+
+    set_devices(devices_file, {})
+    registry = device_registry.get_device_registry()
+    assert registry.wait_for(lambda d: not d, timeout=2.0)
+    result = await tool.aexecute({"x": 30, "y": 40})
+    assert result["method"] == "simulated"
+    assert registry.get_stats()["probes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_reduces_action_latency(devices_file):
+    legacy = await measure_clicks(10, legacy=True)
+    cached = await measure_clicks(10, legacy=False)
+    assert cached < legacy * 0.75, (legacy, cached)
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    actions = 50
+    with tempfile.TemporaryDirectory() as directory:
+        devices_path = os.path.join(directory, "devices")
+        set_devices(devices_path, {SERIAL: "device"})
+        os.environ["FAKE_ADB_DEVICES_FILE"] = devices_path
+        os.environ["PATH"] = f"{directory}{os.pathsep}{os.environ['PATH']}"
+        for spawn_delay in (0.0, 0.02):
+            fake_adb.install(directory, spawn_delay)
+            legacy = await measure_clicks(actions, legacy=True)
+            cached = await measure_clicks(actions, legacy=False)
+            print(f"{actions} ADB clicks, fake adb spawn delay {spawn_delay * 1000:.0f}ms")
+            print(f"  adb devices per action: {legacy:>7.2f}ms/action")
+            print(f"  device registry:        {cached:>7.2f}ms/action (saved {legacy - cached:.2f}ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frame Buffer Test
+截图帧缓冲测试：使用模拟的 adb 可执行文件(tests/fake_adb.py)，校验 exec-out 截图解析、
+帧数据的零拷贝视图和异步落盘，并对比原有 screencap+pull+rm 流程的每秒帧数和每帧复制字节数
+
+直接运行可输出 1080x2400 屏幕下的完整基准：
+    python tests/test_frame_buffer.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pytest
+from loguru import logger
+from PIL import Image
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb
+from tools.adb_tools import ADBScreenshotTool
+from tools.frame_buffer import Frame, FrameBuffer, get_frame_buffer
+from tools.tool_adapters import AndroidAdapter
+
+SERIAL = "emulator-5554"
+
+
+def make_adapter(adb_path: str, frame_buffer: FrameBuffer) -> AndroidAdapter:
+    adapter = AndroidAdapter(SERIAL, frame_buffer=frame_buffer)
+    adapter.adb_path = adb_path
+    return adapter
+
+
+async def measure_capture(adapter: AndroidAdapter, mode: str, frames: int, directory: str) -> Dict[str, float]:
+    """截取 frames 帧并取得像素数组，返回每秒帧数、每帧复制的字节数和 adb 调用次数
+
+    复制字节数统计 adb 输出之后的数据搬运：legacy 为 pull 写盘、PIL 读盘和解码，
+    流式截图为读入内存的帧数据（raw 格式的数组是帧数据的视图），png 格式另加解码。
+    """
+    copied = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        if mode == "legacy":
+            path = os.path.join(directory, f"legacy_{i}.png")
+            result = await adapter._take_screenshot_via_file(path)
+            assert result["success"], result
+            size = os.path.getsize(path)
+            with Image.open(path) as image:
+                pixels = np.asarray(image.convert("RGBA"))
+            copied += size * 2 + pixels.nbytes
+        else:
+            frame = await adapter.capture_frame(raw=(mode == "raw"))
+            pixels = frame.array()
+            copied += frame.nbytes
+            if not np.shares_memory(pixels, np.frombuffer(frame.data, dtype=np.uint8)):
+                copied += pixels.nbytes
+    elapsed = time.perf_counter() - start
+    return {"fps": frames / elapsed, "bytes_copied": copied / frames, "adb_calls": 3 if mode == "legacy" else 1}
+
+
+@pytest.fixture
+def adb_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_DEVICES", SERIAL)
+    monkeypatch.setenv("FAKE_ADB_SCREEN_SIZE", "270x600")
+    for name in ("FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD", "FAKE_ADB_SCREEN_FILE", "FAKE_ADB_DEVICES_FILE"):
+        monkeypatch.setenv(name, "")
+    path = fake_adb.install(str(tmp_path))
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return path
+
+
+def test_frame_parses_raw_headers():
+    pixels = np.arange(3 * 2 * 4, dtype=np.uint8).reshape(2, 3, 4)
+    for header in (struct.pack("<III", 3, 2, 1), struct.pack("<IIII", 3, 2, 1, 0)):
+        frame = Frame.from_screencap(header + pixels.tobytes())
+        assert (frame.width, frame.height, frame.pixel_offset) == (3, 2, len(header))
+        assert np.array_equal(frame.array(), pixels)
+        assert np.array_equal(np.asarray(frame.image()), pixels)
+
+    bgra = Frame.from_screencap(struct.pack("<III", 3, 2, 5) + pixels.tobytes())
+    assert np.array_equal(bgra.array(), pixels[..., [2, 1, 0, 3]])
+    with pytest.raises(ValueError):
+        Frame.from_screencap(struct.pack("<III", 3, 2, 1) + b"\0" * 5)
+
+
+@pytest.mark.asyncio
+async def test_streamed_frames_are_shared_without_copies(adb_path, tmp_path):
+    frame_buffer = FrameBuffer(history=2)
+    adapter = make_adapter(adb_path, frame_buffer)
+
+    raw = await adapter.capture_frame(raw=True)
+    png = await adapter.capture_frame(raw=False)
+    assert (raw.format, png.format) == ("raw", "png")
+    assert raw.array().shape == (600, 270, 4)
+    assert np.array_equal(raw.array(), png.array())
+    # raw 帧的数组和图像都直接引用帧数据
+    assert np.shares_memory(raw.array(), np.frombuffer(raw.data, dtype=np.uint8))
+    assert not raw.array().flags.writeable
+    assert np.array_equal(np.asarray(raw.image()), raw.array())
+
+    third = await adapter.capture_frame()
+    assert frame_buffer.latest(SERIAL) is third
+    assert frame_buffer.recent(SERIAL) == [png, third]
+    assert frame_buffer.get_stats()["frames"] == 3
+
+
+@pytest.mark.asyncio
+async def test_take_screenshot_persists_asynchronously(adb_path, tmp_path):
+    frame_buffer = FrameBuffer()
+    adapter = make_adapter(adb_path, frame_buffer)
+    path = str(tmp_path / "shots" / "a.png")
+
+    result = await adapter.take_screenshot(path, wait_for_save=False)
+    assert result["success"] and result["screenshot_path"] == path
+    # 写盘完成前，同一路径由缓冲直接提供
+    assert frame_buffer.get_by_path(path) is result["frame"]
+    assert np.array_equal(np.asarray(frame_buffer.open_image(path)), result["frame"].array())
+    assert await result["save_task"] == path
+    with Image.open(path) as image:
+        assert np.array_equal(np.asarray(image.convert("RGBA")), result["frame"].array())
+
+    memory_only = await adapter.take_screenshot(persist=False)
+    assert memory_only["success"] and memory_only["screenshot_path"] is None
+    await frame_buffer.flush()
+    stats = frame_buffer.get_stats()
+    assert stats["frames_persisted"] == 1 and stats["pending_writes"] == 0
+    # 截图没有经过设备上的临时文件
+    assert not os.listdir(os.environ["FAKE_ADB_SDCARD"])
+
+    # ADB 工具同样一次调用完成截图
+    tool_result = await ADBScreenshotTool().aexecute(str(tmp_path / "tool.png"))
+    frame = get_frame_buffer().get_by_path(str(tmp_path / "tool.png"))
+    assert tool_result["success"] and frame.format == "png"
+    assert tool_result["frame_sequence"] == frame.sequence
+    assert os.path.getsize(tmp_path / "tool.png") == frame.nbytes
+    # 结果字典中不含帧数据，打印或序列化时不会展开整帧
+    assert len(json.dumps(tool_result, default=str)) < 1000 and len(repr(frame)) < 1000
+
+
+@pytest.mark.asyncio
+async def test_streaming_capture_outperforms_pull(adb_path, tmp_path):
+    adapter = make_adapter(adb_path, FrameBuffer())
+    legacy = await measure_capture(adapter, "legacy", 4, str(tmp_path))
+    raw = await measure_capture(adapter, "raw", 4, str(tmp_path))
+    assert raw["fps"] > legacy["fps"], (legacy, raw)
+    assert raw["bytes_copied"] < legacy["bytes_copied"], (legacy, raw)
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    frames = 10
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["FAKE_ADB_SCREEN_SIZE"] = "1080x2400"
+        adapter = make_adapter(fake_adb.install(directory), FrameBuffer())
+        print(f"{frames} frames, 1080x2400 fake screen")
+        for mode, name in (("legacy", "screencap + pull + rm"), ("png", "exec-out screencap -p"),
+                           ("raw", "exec-out screencap (raw)")):
+            stats = await measure_capture(adapter, mode, frames, directory)
+            print(f"  {name:<25} {stats['fps']:>6.2f} frames/s {stats['bytes_copied'] / 1e6:>7.2f}MB copied/frame "
+                  f"({stats['adb_calls']} adb calls/frame)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
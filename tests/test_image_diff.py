@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Image Diff Test
+图像差异测试：在合成的操作前后截图对（无变化、按钮高亮、弹窗、整页跳转、全屏噪声）上
+校验 SSIM、变化区域的位置和连通域合并，并测量 1080x2400 帧的比较耗时
+
+直接运行可输出 各类截图对的比较结果和耗时：
+    python tests/test_image_diff.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+from loguru import logger
+from PIL import Image
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.advanced_tools import ImageComparisonTool
+from tools.gui_tools import ToolParameters
+from tools.image_diff import compare_images, label_runs
+
+WIDTH, HEIGHT = 1080, 2400
+
+
+def app_screen(seed: int = 0) -> np.ndarray:
+    """带状态栏、列表条目和文字纹理的界面截图 (HEIGHT, WIDTH, 4)"""
+    rng = np.random.default_rng(seed)
+    pixels = np.full((HEIGHT, WIDTH, 4), 250, dtype=np.uint8)
+    pixels[..., 3] = 255
+    pixels[:96, :, :3] = 40
+    for row in range(12):
+        top = 160 + row * 180
+        pixels[top:top + 150, 40:1040, :3] = 235
+        pixels[top + 30:top + 120, 60:150, :3] = rng.integers(60, 200, 3, dtype=np.uint8)
+        # 文字行：细小的深色笔画
+        text = rng.random((30, 700)) < 0.3
+        pixels[top + 40:top + 70, 180:880, :3][text] = 30
+    return pixels
+
+
+def pairs() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    base = app_screen()
+    highlighted = base.copy()
+    highlighted[520:670, 40:1040, :3] = 200
+    dialog = base.copy()
+    dialog[..., :3] //= 2
+    dialog[900:1500, 140:940, :3] = 255
+    noise = np.random.default_rng(3).integers(0, 255, base.shape, dtype=np.uint8)
+    return {
+        "unchanged": (base, base.copy()),
+        "button_highlight": (base, highlighted),
+        "dialog": (base, dialog),
+        "navigation": (base, app_screen(seed=1)),
+        "full_noise": (base, noise),
+    }
+
+
+def bfs_regions(mask: np.ndarray) -> List[set]:
+    """参考实现：逐单元格的 8 邻域广度优先搜索"""
+    seen, regions = set(), []
+    for start in zip(*np.nonzero(mask)):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue, cells = deque([start]), set()
+        while queue:
+            r, c = queue.popleft()
+            cells.add((r, c))
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    n = (r + dr, c + dc)
+                    if 0 <= n[0] < mask.shape[0] and 0 <= n[1] < mask.shape[1] and mask[n] and n not in seen:
+                        seen.add(n)
+                        queue.append(n)
+        regions.append(cells)
+    return regions
+
+
+def test_label_runs_matches_bfs():
+    rng = np.random.default_rng(7)
+    for density in (0.05, 0.3, 0.6, 0.95):
+        mask = rng.random((40, 30)) < density
+        rows, starts, ends, labels = label_runs(mask)
+        found: Dict[int, set] = {}
+        for row, start, end, label in zip(rows, starts, ends, labels):
+            found.setdefault(int(label), set()).update((int(row), c) for c in range(start, end))
+        expected = {frozenset(region) for region in bfs_regions(mask)}
+        assert {frozenset(region) for region in found.values()} == expected
+
+
+def test_compare_detects_changed_regions():
+    results = {name: compare_images(a, b) for name, (a, b) in pairs().items()}
+
+    unchanged = results["unchanged"]
+    assert unchanged.similarity == pytest.approx(1.0) and not unchanged.changed
+    assert unchanged.difference_percentage == 0
+
+    highlight = results["button_highlight"]
+    assert highlight.similarity > 0.9 and len(highlight.changed_regions) == 1
+    bounds = highlight.changed_regions[0]
+    # 变化区域按 32 像素分块对齐，与高亮条目的误差不超过一个分块
+    assert bounds.top <= 520 and bounds.bottom >= 670 and bounds.bottom - bounds.top <= 150 + 64
+    assert abs(bounds.left - 40) <= 32 and abs(bounds.right - 1040) <= 32
+
+    dialog = results["dialog"]
+    assert dialog.changed_regions[0].area >= 600 * 800
+    assert results["navigation"].similarity < highlight.similarity
+    assert results["full_noise"].similarity < 0.2 and results["full_noise"].difference_percentage > 90
+
+
+def test_compare_is_fast_on_full_resolution_frames():
+    for a, b in pairs().values():
+        compare_images(a, b)
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            compare_images(a, b)
+            timings.append(time.perf_counter() - start)
+        assert min(timings) * 1000 < 20
+
+
+class ComparisonTool(ImageComparisonTool):
+    """ImageComparisonTool 未实现 execute_gui_tool，测试中补上以便实例化"""
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+@pytest.mark.asyncio
+async def test_comparison_tool_reports_real_differences(tmp_path):
+    before, after = pairs()["button_highlight"]
+    reference, current = tmp_path / "before.png", tmp_path / "after.png"
+    Image.fromarray(before).save(reference)
+    Image.fromarray(after).save(current)
+
+    tool = ComparisonTool()
+    result = await tool.execute(ToolParameters(custom_params={
+        "reference_image": str(reference), "current_image": str(current), "threshold": 0.01}))
+    assert result.success
+    comparison = result.result_data["comparison_results"]
+    assert comparison["change_detected"] and comparison["has_significant_change"]
+    assert comparison["similarity_score"] < 1.0
+    assert comparison["changed_regions"][0]["bounds"]["top"] <= 520
+
+    same = await tool.execute(ToolParameters(custom_params={
+        "reference_image": str(reference), "current_image": str(reference)}))
+    assert same.result_data["comparison_results"]["similarity_score"] == 1.0
+    assert not same.result_data["comparison_results"]["change_detected"]
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    print(f"{WIDTH}x{HEIGHT} RGBA frame pairs")
+    for name, (a, b) in pairs().items():
+        compare_images(a, b)
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            diff = compare_images(a, b)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  {name:<17} ssim={diff.similarity:.4f} changed={diff.difference_percentage:5.1f}% "
+              f"regions={len(diff.changed_regions):<3} median {np.median(timings):.2f}ms, max {max(timings):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import pytest
 from typing import List, Dict, Any
 from agenticx.core.event import Event
 from agenticx.core.event_bus import EventBus
-from core.info_pool import InfoPool, InfoType, InfoPriority, InfoEntry
+from core.info_pool import InfoPool, InfoType, InfoPriority, InfoEntry, AgenticSeekerInfoPool
 
 @pytest.fixture
 def event_bus():
@@ -82,4 +82,237 @@ async def test_get_stats(info_pool: InfoPool):
     stats = info_pool.get_stats()
     assert stats["total_entries"] == 2
     assert stats["entries_by_type"]["agent_state"] == 2
-    assert stats["active_conversations"] == 1
\ No newline at end of file
+    assert stats["active_conversations"] == 1
+
+def _reference_entries(pool: InfoPool, info_types=None, source_agent=None,
+                       target_agent=None, priority=None) -> List[str]:
+    """全量扫描的参考实现，用于校验查询计划器"""
+    entries = [
+        e for e in pool._entries.values()
+        if (not info_types or e.type in info_types)
+        and (not source_agent or e.source_agent == source_agent)
+        and (not target_agent or e.is_target(target_agent))
+        and (not priority or e.priority == priority)
+    ]
+    entries.sort(key=lambda e: (e.priority.value, pool._entry_seq[e.id]), reverse=True)
+    return [e.id for e in entries]
+
+@pytest.mark.asyncio
+async def test_get_entries_query_planner(info_pool: InfoPool):
+    types = [InfoType.TASK_STATUS, InfoType.ACTION_RESULT, InfoType.ERROR]
+    priorities = [InfoPriority.LOW, InfoPriority.NORMAL, InfoPriority.HIGH]
+    for i in range(300):
+        await info_pool.publish(
+            info_type=types[i % 3],
+            data={"i": i},
+            source_agent=f"agent{i % 7}",
+            priority=priorities[i % 5 % 3],
+            destination_agents={"executor"} if i % 4 == 0 else None
+        )
+
+    queries = [
+        {},
+        {"info_types": [InfoType.ERROR]},
+        {"info_types": [InfoType.ERROR, InfoType.TASK_STATUS], "source_agent": "agent3"},
+        {"source_agent": "agent1", "priority": InfoPriority.HIGH},
+        {"priority": InfoPriority.LOW, "target_agent": "manager"},
+        {"source_agent": "missing"},
+    ]
+    for query in queries:
+        expected = _reference_entries(info_pool, **query)
+        assert [e.id for e in info_pool.get_entries(**query)] == expected
+        assert [e.id for e in info_pool.get_entries(limit=5, **query)] == expected[:5]
+
+@pytest.mark.asyncio
+async def test_ttl_expiry_and_capacity_eviction(event_bus):
+    pool = InfoPool(event_bus=event_bus, max_entries=50)
+    await pool.start()
+    try:
+        short_id = await pool.publish(InfoType.SCREEN_STATE, {"screen": "home"}, "executor", ttl=0)
+        ids = [await pool.publish(InfoType.ACTION_RESULT, {"i": i}, "executor") for i in range(60)]
+
+        # 发布路径不做淘汰，查询时过期条目已不可见
+        assert short_id not in {e.id for e in pool.get_entries()}
+
+        removed = pool._cleanup_expired()
+        assert removed == 11
+        assert len(pool._entries) == 50
+        assert short_id not in pool._entries
+        assert set(pool._entries) == set(ids[10:])
+        assert sum(len(q) for q in pool._priority_queue.values()) == 50
+    finally:
+        await pool.stop()
+
+@pytest.mark.asyncio
+async def test_cleanup_loop_backs_off_after_errors(event_bus):
+    pool = InfoPool(event_bus=event_bus, cleanup_interval=0.05)
+    calls = 0
+
+    def failing_cleanup(limit=None):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("broken index")
+
+    pool._cleanup_expired = failing_cleanup
+    await pool.start()
+    try:
+        # 清理持续失败时循环按清理间隔重试，事件循环照常调度
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(0.2)
+        assert loop.time() - start < 0.3
+        assert 1 <= calls <= 6
+    finally:
+        await pool.stop()
+
+@pytest.mark.asyncio
+async def test_clear_old_entries_keeps_high_priority(info_pool: InfoPool):
+    high_id = await info_pool.publish(InfoType.ERROR, {"error": "x"}, "executor", priority=InfoPriority.HIGH)
+    await info_pool.publish(InfoType.ACTION_RESULT, {"ok": True}, "executor", conversation_id="c1")
+
+    await info_pool.clear_old_entries(hours=0)
+
+    remaining = info_pool.get_entries()
+    assert high_id in {e.id for e in remaining}
+    assert all(e.priority == InfoPriority.HIGH or e.type == InfoType.STATUS for e in remaining)
+    assert "c1" not in info_pool._conversation_index
+
+@pytest.mark.asyncio
+async def test_journal_replay_rebuilds_indexes(event_bus, tmp_path):
+    from core.info_journal import InfoJournal
+
+    pool = InfoPool(event_bus=event_bus, journal=InfoJournal(str(tmp_path), segment_max_bytes=4096,
+                                                             snapshot_every_segments=2))
+    await pool.start()
+    ids = []
+    for i in range(200):
+        ids.append(await pool.publish(
+            InfoType.ACTION_RESULT if i % 2 else InfoType.TASK_STATUS,
+            {"i": i}, f"agent{i % 3}", conversation_id="conv" if i < 5 else None
+        ))
+    pool.mark_processed(ids[10], "reflector")
+    pool._remove_entry(ids[20])
+    expected = [e.id for e in pool.get_entries()]
+    await pool.stop()
+    assert any(p.suffix == ".snap" for p in tmp_path.iterdir())
+
+    # 模拟崩溃时写了一半的记录
+    segment = sorted(tmp_path.glob("journal-*.log"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b"\x00\x00\x01\x00garbage")
+
+    recovered = InfoPool(event_bus=EventBus(), journal=InfoJournal(str(tmp_path)))
+    await recovered.start()
+    try:
+        assert [e.id for e in recovered.get_entries()] == expected
+        assert ids[20] not in recovered._entries
+        assert "reflector" in recovered._entries[ids[10]].processed_by
+        assert len(recovered.get_entries(source_agent="agent1")) == len(pool.get_entries(source_agent="agent1"))
+        assert len(recovered.get_conversation("conv")) == 5
+
+        # 恢复后新发布的条目排在时间序索引最前
+        new_id = await recovered.publish(InfoType.ERROR, {"error": "x"}, "executor")
+        assert recovered.get_entries(limit=1)[0].id == new_id
+    finally:
+        await recovered.stop()
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_block_publish(event_bus):
+    from core.event_delivery import BackpressurePolicy
+
+    pool = InfoPool(event_bus=event_bus, delivery_queue_size=10, delivery_linger=0.01)
+    await pool.start()
+    release = asyncio.Event()
+    slow_received: List[Event] = []
+    batches: List[List[Event]] = []
+
+    async def slow_callback(event: Event):
+        await release.wait()
+        slow_received.append(event)
+
+    async def batch_callback(events: List[Event]):
+        batches.append(events)
+
+    slow_id = pool.subscribe(slow_callback, [InfoType.SCREEN_STATE], policy=BackpressurePolicy.DROP_OLDEST)
+    pool.subscribe(batch_callback, [InfoType.SCREEN_STATE], batch_callback=True)
+    latest_id = pool.subscribe(
+        lambda event: None, [InfoType.SCREEN_STATE], policy=BackpressurePolicy.COALESCE
+    )
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(50):
+        await pool.publish(InfoType.SCREEN_STATE, {"frame": i}, "executor")
+    assert loop.time() - start < 1.0
+
+    await pool._outbox.join(timeout=1.0)
+    metrics = pool.get_delivery_metrics()["subscribers"]
+    assert metrics[slow_id]["dropped"] > 0
+    assert metrics[slow_id]["queue_depth"] <= 10
+    assert metrics[latest_id]["coalesced"] + metrics[latest_id]["delivered"] <= 50
+
+    release.set()
+    assert await pool.flush_deliveries(timeout=1.0)
+    assert slow_received[-1].data["content"]["frame"] == 49
+    assert sum(len(batch) for batch in batches) == 50
+    assert len(batches) < 50
+
+    pool.unsubscribe(sub_id=slow_id)
+    assert slow_id not in pool.get_delivery_metrics()["subscribers"]
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_unsubscribe_delivers_queued_events(event_bus):
+    pool = InfoPool(event_bus=event_bus)
+    await pool.start()
+    release = asyncio.Event()
+    received: List[Event] = []
+
+    async def slow_callback(event: Event):
+        await release.wait()
+        received.append(event)
+
+    sub_id = pool.subscribe(slow_callback, [InfoType.SCREEN_STATE])
+    queue = pool._subscriptions[sub_id]['queue']
+    for i in range(5):
+        await pool.publish(InfoType.SCREEN_STATE, {"frame": i}, "executor")
+    await pool._outbox.join(timeout=1.0)
+
+    # 取消订阅后不再接收新事件，已入队的事件投递完后分发任务退出
+    pool.unsubscribe(sub_id=sub_id)
+    await pool.publish(InfoType.SCREEN_STATE, {"frame": 5}, "executor")
+    await pool._outbox.join(timeout=1.0)
+    release.set()
+    await asyncio.wait_for(queue._task, 1.0)
+    assert [e.data["content"]["frame"] for e in received] == list(range(5))
+    assert queue.get_metrics()["dropped"] == 0
+    await pool.stop()
+
+def test_working_memory_history_ring_buffer():
+    pool = AgenticSeekerInfoPool()
+    actions, outcomes = [], []
+    for i in range(130):
+        action = ["tap(1, 2)", "swipe up", "back"][i % 3]
+        outcome = "A" if i % 4 else "C"
+        pool.add_action_result(action, f"s{i}", outcome, f"e{i}")
+        actions.append(action)
+        outcomes.append(outcome)
+
+    # 与切片截断的旧实现保持一致：只保留最近50条
+    assert pool.action_history == actions[-50:]
+    assert pool.action_history[-1] == actions[-1]
+    assert pool.summary_history[:2] == ["s80", "s81"]
+
+    expected = [i for i in range(80, 130) if outcomes[i] != "A"]
+    assert [f["summary"] for f in pool.get_recent_failures(5)] == [f"s{i}" for i in expected[-5:]]
+    summary = pool.get_failure_summary()
+    assert summary["total_failures"] == len(expected)
+    assert summary["failures_by_action"] == {
+        name: sum(1 for i in expected if actions[i].startswith(name)) for name in ("tap", "swipe", "back")
+    }
+
+    restored = AgenticSeekerInfoPool(action_history=actions, action_outcomes=outcomes,
+                                     summary_history=[f"s{i}" for i in range(130)],
+                                     error_descriptions=[f"e{i}" for i in range(130)])
+    assert restored.get_recent_failures(5) == pool.get_recent_failures(5)
+    assert restored.get_failure_summary() == summary
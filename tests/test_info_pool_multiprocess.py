@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+InfoPool Multi-Process Test
+多进程InfoPool测试：智能体运行在独立进程中，通过InfoPool代理共享信息
+
+直接运行可输出 1/2/4 个发布进程下的聚合吞吐：
+    python tests/test_info_pool_multiprocess.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agenticx.core.event import Event
+from agenticx.core.event_bus import EventBus
+from core.info_pool import InfoPool, InfoType
+from core.info_pool_backend import BrokerBackend, start_broker_process
+
+
+def publisher_process(socket_path: str, agent_id: str, count: int) -> None:
+    """在独立进程中运行一个发布信息的智能体"""
+    async def run():
+        pool = InfoPool(event_bus=EventBus(), backend=BrokerBackend(socket_path))
+        await pool.start()
+        for i in range(count):
+            await pool.publish(InfoType.ACTION_RESULT, {"step": i}, agent_id)
+        await pool.publish(InfoType.TASK_STATUS, {"status": "done"}, agent_id)
+        await pool.stop()
+
+    asyncio.run(run())
+
+
+def spawn_publishers(socket_path: str, processes: int, count: int) -> List[multiprocessing.Process]:
+    workers = [
+        multiprocessing.Process(target=publisher_process, args=(socket_path, f"executor{i}", count))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+async def collect(socket_path: str, processes: int, count: int) -> float:
+    """启动发布进程并在本进程接收全部事件，返回聚合吞吐（条/秒）"""
+    pool = InfoPool(
+        event_bus=EventBus(), max_entries=processes * count * 2,
+        backend=BrokerBackend(socket_path, info_types=[InfoType.ACTION_RESULT, InfoType.TASK_STATUS])
+    )
+    await pool.start()
+    done = asyncio.Event()
+    finished: List[str] = []
+
+    def on_status(event: Event):
+        finished.append(event.agent_id)
+        if len(finished) == processes:
+            done.set()
+
+    pool.subscribe(on_status, [InfoType.TASK_STATUS])
+
+    start = time.perf_counter()
+    workers = await asyncio.to_thread(spawn_publishers, socket_path, processes, count)
+    await asyncio.wait_for(done.wait(), timeout=120)
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        await asyncio.to_thread(worker.join)
+
+    # 代理中可能已有先前运行留下的条目
+    assert len(pool.get_entries(info_types=[InfoType.ACTION_RESULT])) >= processes * count
+    await pool.stop()
+    return processes * count / elapsed
+
+
+@pytest.fixture
+def broker_socket():
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = str(Path(directory) / "info_pool.sock")
+        broker = start_broker_process(socket_path)
+        yield socket_path
+        broker.terminate()
+        broker.join()
+
+
+@pytest.mark.asyncio
+async def test_entries_and_notifications_cross_processes(broker_socket):
+    received: List[Event] = []
+    local = InfoPool(event_bus=EventBus(), backend=BrokerBackend(broker_socket))
+    await local.start()
+    local.subscribe(received.append, [InfoType.ACTION_RESULT])
+
+    await collect(broker_socket, processes=2, count=50)
+    await local.flush_deliveries(timeout=1.0)
+    assert len(received) == 100
+
+    # 后加入的进程先获得已有条目的初始同步
+    late = InfoPool(event_bus=EventBus(), backend=BrokerBackend(broker_socket))
+    await late.start()
+    assert len(late.get_entries(info_types=[InfoType.ACTION_RESULT])) == 100
+
+    # 处理状态在进程间同步
+    entry_id = received[0].data["info_id"]
+    local.mark_processed(entry_id, "reflector")
+    for _ in range(100):
+        if "reflector" in late._entries[entry_id].processed_by:
+            break
+        await asyncio.sleep(0.01)
+    assert "reflector" in late._entries[entry_id].processed_by
+
+    await late.stop()
+    await local.stop()
+
+
+async def main():
+    # 基准测试只关心吞吐，关闭逐条发布的调试日志
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = str(Path(directory) / "info_pool.sock")
+        broker = start_broker_process(socket_path, max_entries=1000000)
+        try:
+            for processes in [1, 2, 4]:
+                throughput = await collect(socket_path, processes, 5000)
+                print(f"{processes} publisher process(es): {throughput:>10.0f} entries/s")
+        finally:
+            broker.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+InfoPool Performance Test
+信息池性能基准：验证查询延迟与满容量下的发布延迟不随信息池规模线性增长，
+测量持久化日志的吞吐开销与恢复时间、慢订阅者存在时的发布延迟，
+以及工作记忆历史的追加与失败查询开销
+
+直接运行可输出 1k ~ 100k 条目下的完整基准：
+    python tests/test_info_pool_performance.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agenticx.core.event_bus import EventBus
+from core.info_pool import InfoPool, InfoType, InfoPriority, InfoEntry, AgenticSeekerInfoPool
+from core.info_journal import InfoJournal, JournalOp, encode_record
+
+
+AGENTS = ["manager", "executor", "reflector", "notetaker"]
+COMMON_TYPES = [InfoType.ACTION_RESULT, InfoType.AGENT_STATE, InfoType.SCREEN_STATE]
+
+
+async def build_pool(size: int) -> InfoPool:
+    """构建包含 size 条信息的信息池，其中错误信息数量固定为100条"""
+    pool = InfoPool(event_bus=EventBus(), max_entries=size * 2)
+    await pool.start()
+    for i in range(size):
+        rare = i % max(size // 100, 1) == 0
+        await pool.publish(
+            info_type=InfoType.ERROR if rare else COMMON_TYPES[i % len(COMMON_TYPES)],
+            data={"step": i},
+            source_agent=AGENTS[i % len(AGENTS)],
+            priority=InfoPriority.HIGH if rare else InfoPriority.NORMAL
+        )
+    return pool
+
+
+def measure_queries(pool: InfoPool, rounds: int = 200) -> Dict[str, float]:
+    """测量典型轮询查询的平均延迟（微秒）"""
+    queries = {
+        "recent_20": dict(limit=20),
+        "agent_recent_20": dict(source_agent="executor", target_agent="reflector", limit=20),
+        "type_agent_recent_10": dict(
+            info_types=[InfoType.ACTION_RESULT], source_agent="manager", limit=10
+        ),
+        "rare_type_all": dict(info_types=[InfoType.ERROR]),
+    }
+    results = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            pool.get_entries(**query)
+        results[name] = (time.perf_counter() - start) / rounds * 1e6
+    return results
+
+
+async def run_benchmark(sizes: List[int]) -> Dict[int, Dict[str, float]]:
+    report = {}
+    for size in sizes:
+        pool = await build_pool(size)
+        report[size] = measure_queries(pool)
+        await pool.stop()
+    return report
+
+
+async def measure_publish_at_capacity(capacity: int, rounds: int = 2000) -> Dict[str, float]:
+    """在信息池已满时测量发布延迟（微秒），淘汰由后台清理任务完成"""
+    pool = InfoPool(event_bus=EventBus(), max_entries=capacity)
+    await pool.start()
+    for i in range(capacity):
+        await pool.publish(InfoType.ACTION_RESULT, {"step": i}, AGENTS[i % len(AGENTS)], ttl=3600)
+
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        await pool.publish(InfoType.ACTION_RESULT, {"step": i}, "executor", ttl=3600)
+        latencies.append(time.perf_counter() - start)
+        if i % 100 == 0:
+            await asyncio.sleep(0)  # 让出事件循环给后台清理
+    await asyncio.sleep(0.05)
+    final_size = len(pool._entries)
+    await pool.stop()
+
+    latencies.sort()
+    return {
+        "mean": sum(latencies) / len(latencies) * 1e6,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "max": latencies[-1] * 1e6,
+        "final_size": final_size,
+    }
+
+
+async def measure_publish_throughput(journal: InfoJournal = None, total: int = 20000,
+                                     publishers: int = 32) -> float:
+    """多个发布者并发发布时的吞吐（条/秒）"""
+    pool = InfoPool(event_bus=EventBus(), max_entries=total * 2, journal=journal)
+    await pool.start()
+
+    async def publisher(agent: str, count: int):
+        for i in range(count):
+            await pool.publish(InfoType.ACTION_RESULT, {"step": i, "agent": agent}, agent)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(publisher(f"agent{p}", total // publishers) for p in range(publishers)))
+    elapsed = time.perf_counter() - start
+    await pool.stop()
+    return total / elapsed
+
+
+def write_journal(directory: str, total: int) -> None:
+    """直接生成包含 total 条PUT记录的日志分段，用于测量恢复时间"""
+    now = time.time()
+    with open(Path(directory) / "journal-00000000.log", "wb") as f:
+        for i in range(total):
+            entry = InfoEntry(
+                id=f"entry-{i}", type=COMMON_TYPES[i % len(COMMON_TYPES)],
+                priority=InfoPriority.NORMAL, source_agent=AGENTS[i % len(AGENTS)],
+                data={"step": i}
+            )
+            payload = entry.to_dict()
+            payload["created"] = now - total + i
+            f.write(encode_record(JournalOp.PUT, payload))
+
+
+async def measure_recovery(total: int) -> float:
+    """从日志恢复 total 条信息所需的秒数"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_journal(directory, total)
+        pool = InfoPool(event_bus=EventBus(), max_entries=total * 2, journal=InfoJournal(directory))
+        start = time.perf_counter()
+        await pool.start()
+        elapsed = time.perf_counter() - start
+        assert len(pool._entries) == total
+        await pool.stop()
+    return elapsed
+
+
+async def measure_publish_with_slow_subscriber(handler_delay: float = 0.01,
+                                               rounds: int = 500) -> Dict[str, float]:
+    """存在一个慢订阅者（每条事件耗时 handler_delay 秒）时的发布延迟（微秒）"""
+    from core.event_delivery import BackpressurePolicy
+
+    pool = InfoPool(event_bus=EventBus(), delivery_queue_size=100)
+    await pool.start()
+
+    async def slow_reflector(event):
+        await asyncio.sleep(handler_delay)
+
+    sub_id = pool.subscribe(slow_reflector, [InfoType.ACTION_RESULT], policy=BackpressurePolicy.DROP_OLDEST)
+    pool.subscribe(lambda event: None, [InfoType.ACTION_RESULT])
+
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        await pool.publish(InfoType.ACTION_RESULT, {"step": i}, "executor")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+    metrics = pool.get_delivery_metrics()["subscribers"][sub_id]
+    await pool.stop()
+
+    latencies.sort()
+    return {
+        "mean": sum(latencies) / len(latencies) * 1e6,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "slow_queue_max_depth": metrics["max_depth"],
+        "slow_dropped": metrics["dropped"],
+    }
+
+
+def measure_history(total: int, query_every: int = 10) -> Dict[str, float]:
+    """向工作记忆追加 total 条动作结果，每 query_every 次追加查询一次最近失败和失败统计
+
+    Returns:
+        每次追加、最近失败查询、失败统计查询的平均耗时（微秒）
+    """
+    pool = AgenticSeekerInfoPool()
+    actions = [f"{name}({i}, {i})" for i, name in enumerate(["tap", "swipe", "input", "back"] * 4)]
+    outcomes = ["A", "A", "B", "A", "C"]
+
+    append_time = failures_time = summary_time = 0.0
+    queries = 0
+    perf = time.perf_counter
+    for i in range(total):
+        start = perf()
+        pool.add_action_result(actions[i % len(actions)], "summary", outcomes[i % len(outcomes)], "err")
+        append_time += perf() - start
+        if i % query_every == 0:
+            start = perf()
+            pool.get_recent_failures(3)
+            failures_time += perf() - start
+            start = perf()
+            pool.get_failure_summary()
+            summary_time += perf() - start
+            queries += 1
+
+    return {
+        "append": append_time / total * 1e6,
+        "recent_failures": failures_time / queries * 1e6,
+        "failure_summary": summary_time / queries * 1e6,
+    }
+
+
+@pytest.mark.asyncio
+async def test_publish_latency_independent_of_subscriber_speed():
+    stats = await measure_publish_with_slow_subscriber(handler_delay=0.01, rounds=300)
+    # 内联投递时每次发布至少等待10ms
+    assert stats["p99"] < 5000, stats
+
+
+@pytest.mark.asyncio
+async def test_journal_overhead_and_recovery():
+    with tempfile.TemporaryDirectory() as directory:
+        journaled = await measure_publish_throughput(InfoJournal(directory), total=4000)
+    baseline = await measure_publish_throughput(total=4000)
+    # 组提交下持久化发布吞吐应保持在内存基线的同一数量级
+    assert journaled > baseline / 10, (baseline, journaled)
+    assert await measure_recovery(20000) < 10
+
+
+@pytest.mark.asyncio
+async def test_publish_latency_at_capacity_stays_flat():
+    small = await measure_publish_at_capacity(1000)
+    large = await measure_publish_at_capacity(20000)
+    assert large["p99"] < small["p99"] * 5 + 200, (small, large)
+    assert large["final_size"] == 20000
+
+
+@pytest.mark.asyncio
+async def test_query_latency_stays_flat():
+    report = await run_benchmark([1000, 20000])
+    small, large = report[1000], report[20000]
+    for name in small:
+        # 规模扩大20倍，延迟增长应远小于线性
+        assert large[name] < small[name] * 5 + 50, (name, small[name], large[name])
+
+
+def test_history_append_and_failure_queries_are_constant_time():
+    small = measure_history(1000)
+    large = measure_history(100000)
+    for name in small:
+        assert large[name] < small[name] * 3 + 5, (name, small[name], large[name])
+
+async def main():
+    # 基准测试只关心延迟，关闭逐条发布的调试日志
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sizes = [1000, 10000, 50000, 100000]
+    report = await run_benchmark(sizes)
+    names = list(report[sizes[0]].keys())
+    print(f"{'entries':>8} " + " ".join(f"{n:>22}" for n in names))
+    for size in sizes:
+        print(f"{size:>8} " + " ".join(f"{report[size][n]:>20.1f}us" for n in names))
+
+    print("\npublish latency at capacity")
+    for size in sizes:
+        stats = await measure_publish_at_capacity(size)
+        print(f"{size:>8} mean={stats['mean']:.1f}us p99={stats['p99']:.1f}us max={stats['max']:.1f}us")
+
+    print("\npublish latency with a 10ms subscriber")
+    stats = await measure_publish_with_slow_subscriber()
+    print(f"  mean={stats['mean']:.1f}us p99={stats['p99']:.1f}us "
+          f"slow queue max depth={stats['slow_queue_max_depth']} dropped={stats['slow_dropped']}")
+
+    print("\njournal publish throughput (32 concurrent publishers)")
+    baseline = await measure_publish_throughput()
+    print(f"  in-memory:          {baseline:>10.0f} entries/s")
+    with tempfile.TemporaryDirectory() as directory:
+        durable = await measure_publish_throughput(InfoJournal(directory))
+    print(f"  journal (fsync):    {durable:>10.0f} entries/s ({durable / baseline:.0%})")
+    with tempfile.TemporaryDirectory() as directory:
+        buffered = await measure_publish_throughput(InfoJournal(directory, durable=False))
+    print(f"  journal (buffered): {buffered:>10.0f} entries/s ({buffered / baseline:.0%})")
+
+    print("\njournal recovery")
+    for total in [100000, 1000000]:
+        print(f"{total:>8} entries: {await measure_recovery(total):.2f}s")
+
+    print("\nworking memory history (1M appends, query every 10)")
+    stats = measure_history(1000000)
+    print(f"  append={stats['append']:.2f}us recent_failures={stats['recent_failures']:.2f}us "
+          f"failure_summary={stats['failure_summary']:.2f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Result Cache Test
+结果缓存测试：校验参数摘要的稳定性和区分度、LRU/TTL/字节上限的淘汰行为，
+以及工具管理器按缓存策略只缓存只读的屏幕查询
+
+直接运行可输出 10 万条目下新旧缓存的写入、命中和淘汰耗时对比：
+    python tests/test_result_cache.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pytest
+from loguru import logger
+from PIL import Image
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.gui_tools import (
+    Coordinate, ExecutionMode, GUITool, GUIToolManager, Rectangle,
+    ToolParameters, ToolResult, ToolStatus
+)
+from tools.result_cache import CachePolicy, ResultCache, stable_digest
+from utils import get_iso_timestamp
+
+
+class LegacyResultCache:
+    """原有实现：hash(json.dumps(...)) 为键，缓存满后用 min() 找最旧的条目"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 300):
+        self.result_cache: Dict[str, Tuple[Any, datetime]] = {}
+        self.max_entries = max_entries
+        self.cache_ttl = ttl
+
+    @staticmethod
+    def key(tool_id: str, parameters: ToolParameters) -> str:
+        try:
+            return str(hash(json.dumps({'tool_id': tool_id, 'parameters': parameters.to_dict()}, sort_keys=True)))
+        except Exception:
+            return f"{tool_id}_{hash(str(parameters))}"
+
+    def get(self, cache_key: str) -> Optional[Any]:
+        if cache_key in self.result_cache:
+            result, cached_time = self.result_cache[cache_key]
+            if datetime.now() - cached_time < timedelta(seconds=self.cache_ttl):
+                return result
+            del self.result_cache[cache_key]
+        return None
+
+    def put(self, cache_key: str, result: Any) -> None:
+        self.result_cache[cache_key] = (result, datetime.now())
+        if len(self.result_cache) > self.max_entries:
+            oldest_key = min(self.result_cache.keys(), key=lambda k: self.result_cache[k][1])
+            del self.result_cache[oldest_key]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingTool(GUITool):
+    """记录执行次数的工具，cache_policy 由子类决定"""
+
+    def __init__(self, **kwargs):
+        super().__init__(name=type(self).__name__, description="counting tool", **kwargs)
+        self.calls = 0
+
+    async def execute(self, parameters: ToolParameters, context: Optional[Dict] = None) -> ToolResult:
+        self.calls += 1
+        return ToolResult(
+            tool_id=self.tool_id, tool_type=self.tool_type.value, status=ToolStatus.COMPLETED,
+            success=True, start_time=get_iso_timestamp(), end_time=get_iso_timestamp(),
+            result_data={'call': self.calls}
+        )
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+class TapTool(CountingTool):
+    pass
+
+
+class QueryTool(CountingTool):
+    cache_policy = CachePolicy.screen_query(ttl=60, screen_params=('image_path',))
+
+
+def make_result(i: int = 0) -> ToolResult:
+    return ToolResult(tool_id=f"tool-{i}", tool_type="advanced", status=ToolStatus.COMPLETED,
+                      success=True, start_time=get_iso_timestamp(), result_data={'elements': [i] * 8})
+
+
+def screen(path: Path, seed: int) -> str:
+    pixels = np.random.default_rng(seed).integers(0, 255, (64, 32, 3), dtype=np.uint8)
+    Image.fromarray(np.kron(pixels, np.ones((8, 8, 1), dtype=np.uint8))).save(path)
+    return str(path)
+
+
+def test_digest_is_stable_and_type_aware():
+    params = ToolParameters(target=Coordinate(10, 20), custom_params={'ids': {3, 1, 2}, 'blob': b'\x00\x01'})
+    same = ToolParameters(target=Coordinate(10.0, 20.0), custom_params={'blob': b'\x00\x01', 'ids': {2, 3, 1}})
+    assert stable_digest("t", params.to_dict()) == stable_digest("t", same.to_dict())
+
+    distinct = [
+        stable_digest("t", {'value': 1}), stable_digest("t", {'value': "1"}),
+        stable_digest("t", {'value': 1.0}), stable_digest("t", {'value': True}),
+        stable_digest("t", {'value': [1, 2]}), stable_digest("t", {'value': {1, 2}}),
+        stable_digest("t", {'value': Rectangle(0, 0, 1, 1)}), stable_digest("t", {'value': np.zeros(2)}),
+        stable_digest("t", {'value': np.zeros(2, dtype=np.int8)}), stable_digest("t", {1: 'value'}),
+    ]
+    assert len(set(distinct)) == len(distinct)
+
+    # 摘要不依赖进程的哈希随机化
+    # 直接加载模块文件，避免子进程导入整个 tools 包
+    code = ("import importlib.util as u; spec = u.spec_from_file_location('rc', 'tools/result_cache.py'); "
+            "m = u.module_from_spec(spec); spec.loader.exec_module(m); "
+            "print(m.stable_digest('t', {'ids': {'a', 'b', 'c'}, 'x': 0.1}))")
+    outputs = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent.parent, env={**os.environ, 'PYTHONHASHSEED': seed}).stdout
+               for seed in ("1", "2")}
+    assert outputs == {stable_digest('t', {'ids': {'a', 'b', 'c'}, 'x': 0.1}) + "\n"}
+
+
+def test_lru_ttl_and_byte_limits():
+    clock = FakeClock()
+    cache = ResultCache(max_entries=3, default_ttl=10, clock=clock)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"
+    cache.put("d", "D")
+    # b 最久未访问，被淘汰
+    assert "b" not in cache and cache.get("a") == "A" and len(cache) == 3
+
+    cache.put("short", "S", ttl=1)
+    clock.now = 2
+    assert cache.get("short") is None
+    clock.now = 11
+    assert cache.purge_expired() == 2 and len(cache) == 0
+    stats = cache.get_stats()
+    assert stats["evictions"] == 2 and stats["expirations"] == 3 and stats["bytes"] == 0
+
+    sized = ResultCache(max_entries=100, max_bytes=10_000)
+    for i in range(50):
+        sized.put(str(i), make_result(i))
+    assert 0 < sized.size_bytes <= 10_000 and len(sized) < 50
+    assert sized.get("49") is not None and sized.get("0") is None
+    sized.put("huge", b"x" * 20_000)
+    assert "huge" not in sized
+    assert sized.invalidate(key="49") == 1 and sized.get("49") is None
+
+
+@pytest.mark.asyncio
+async def test_manager_caches_only_screen_queries(tmp_path):
+    manager = GUIToolManager()
+    tap, query = TapTool(), QueryTool()
+    manager.register_tool(tap)
+    manager.register_tool(query)
+
+    async def run(tool, context=None, **custom):
+        return await manager.execute_tool(tool.tool_id, ToolParameters(text="ok", custom_params=custom),
+                                          context, ExecutionMode.SYNC)
+
+    home = screen(tmp_path / "home.png", 1)
+    home_again = screen(tmp_path / "home_again.png", 1)
+    settings = screen(tmp_path / "settings.png", 2)
+    # 同一屏幕上只有一小块不同（例如输入了文字），感知哈希相同但查询结果不能共享
+    typed_path = tmp_path / "typed.png"
+    pixels = np.asarray(Image.open(home)).copy()
+    pixels[:8, :16] = 0
+    Image.fromarray(pixels).save(typed_path)
+    typed = str(typed_path)
+
+    # 有副作用的操作从不缓存
+    for _ in range(3):
+        await run(tap, {'current_screenshot': home})
+    assert tap.calls == 3
+
+    first = await run(query, {'current_screenshot': home})
+    assert (await run(query, {'current_screenshot': home_again})) is first
+    assert (await run(query, {'current_screenshot': settings})).result_data['call'] == 2
+    assert (await run(query, {'current_screenshot': typed})).result_data['call'] == 3
+    # 无法确定屏幕时工具会自行截图，不使用缓存
+    await run(query)
+    await run(query)
+    # 截图路径参数按屏幕内容参与缓存键
+    await run(query, image_path=home)
+    await run(query, image_path=home_again)
+    await run(query, image_path=str(tmp_path / "missing.png"))
+    assert query.calls == 7
+
+    manager.set_cache_policy("TapTool", CachePolicy.screen_query())
+    await run(tap, {'screen_hash': 'abc'})
+    await run(tap, {'screen_hash': 'abc'})
+    assert tap.calls == 4
+
+    stats = manager.get_manager_stats()["cache"]
+    assert stats["hits"] == 3 and stats["entries"] == 5
+    manager.unregister_tool(query.tool_id)
+    assert manager.get_manager_stats()["cache"]["entries"] == 1
+
+
+def benchmark(entries: int = 100_000) -> Dict[str, float]:
+    keys = [stable_digest("tool", {'text': str(i)}) for i in range(entries)]
+    result = make_result()
+    stats = {}
+
+    cache = ResultCache(max_entries=entries)
+    start = time.perf_counter()
+    for key in keys:
+        cache.put(key, result, size=512)
+    stats['fill_us'] = (time.perf_counter() - start) / entries * 1e6
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    stats['hit_us'] = (time.perf_counter() - start) / entries * 1e6
+    overflow = [stable_digest("tool", {'text': f"new-{i}"}) for i in range(entries)]
+    start = time.perf_counter()
+    for key in overflow:
+        cache.put(key, result, size=512)
+    stats['evicting_put_us'] = (time.perf_counter() - start) / entries * 1e6
+    start = time.perf_counter()
+    for i in range(10_000):
+        stable_digest("tool", ToolParameters(text=str(i), custom_params={'region': [0, 0, 100, i]}).to_dict())
+    stats['digest_us'] = (time.perf_counter() - start) / 10_000 * 1e6
+
+    legacy = LegacyResultCache(max_entries=entries)
+    for key in keys:
+        legacy.result_cache[key] = (result, datetime.now())
+    samples = 200
+    start = time.perf_counter()
+    for i in range(samples):
+        legacy.put(f"new-{i}", result)
+    stats['legacy_evicting_put_us'] = (time.perf_counter() - start) / samples * 1e6
+    return stats
+
+
+def test_eviction_cost_does_not_grow_with_size():
+    small, large = benchmark(1_000), benchmark(20_000)
+    assert large['evicting_put_us'] < 5 * small['evicting_put_us'] + 5
+    assert large['legacy_evicting_put_us'] > 5 * large['evicting_put_us']
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    stats = benchmark()
+    print("100k entries")
+    print(f"  ResultCache: fill {stats['fill_us']:.2f}us/put, hit {stats['hit_us']:.2f}us/get, "
+          f"evicting put {stats['evicting_put_us']:.2f}us, digest {stats['digest_us']:.2f}us/key")
+    print(f"  legacy dict + min(): evicting put {stats['legacy_evicting_put_us']:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Screen Cache Test
+屏幕缓存测试：校验感知哈希对状态栏等细微变化的容忍和对界面切换、滚动的区分，
+以及派生结果只在内容完全相同的截图文件、帧缓冲和并发请求之间共享
+
+直接运行可输出 模拟的多智能体分析循环在有无缓存时的耗时对比：
+    python tests/test_screen_cache.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pytest
+from loguru import logger
+from PIL import Image
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.frame_buffer import Frame, FrameBuffer
+from tools.screen_cache import ScreenCache, dhash, hamming_distance, phash
+
+
+def list_screen(scroll: int = 0, clock: int = 0, width: int = 540, height: int = 1200) -> np.ndarray:
+    """列表界面：状态栏中的时钟区域、若干行明暗不同的条目，scroll 为内容的滚动距离"""
+    pixels = np.full((height, width, 3), 245, dtype=np.uint8)
+    pixels[:60] = 30
+    # 时钟数字用几个小色块模拟
+    for i, digit in enumerate(f"{clock:04d}"):
+        left = 20 + i * 18
+        pixels[20:40, left:left + 12] = 100 + int(digit) * 15
+    for row in range(-1, height // 120 + 1):
+        top = 80 + row * 120 - scroll % 120
+        index = row + scroll // 120
+        shade = 60 + (index * 37) % 160
+        y0, y1 = max(top + 10, 60), min(top + 110, height)
+        if y0 < y1:
+            pixels[y0:y1, 20:120] = shade
+            pixels[y0:y1, 140:140 + 40 + (index * 53) % 340] = 255 - shade // 2
+    return pixels
+
+
+def save_png(pixels: np.ndarray, path: str) -> str:
+    Image.fromarray(pixels).save(path, compress_level=1)
+    return path
+
+
+def test_hash_ignores_status_bar_but_detects_navigation():
+    base = list_screen()
+    for hash_function in (dhash, phash):
+        original = hash_function(base)
+        assert hamming_distance(hash_function(list_screen(clock=1234)), original) <= 3
+        assert hamming_distance(hash_function(list_screen(scroll=240)), original) > 3
+        assert hamming_distance(hash_function(255 - base), original) > 3
+
+    cache = ScreenCache()
+    assert cache.is_same_screen(base, list_screen(clock=959))
+    assert not cache.is_same_screen(base, list_screen(scroll=360))
+
+
+def test_artifacts_are_shared_between_identical_screenshots(tmp_path):
+    cache = ScreenCache()
+    first = save_png(list_screen(), str(tmp_path / "manager.png"))
+    copy = save_png(list_screen(), str(tmp_path / "executor.png"))
+    clock = save_png(list_screen(clock=1), str(tmp_path / "clock.png"))
+    # 输入框中多了几个字符：感知哈希几乎不变，但内容不同
+    typed_pixels = list_screen()
+    typed_pixels[100:110, 400:420] = 0
+    typed = save_png(typed_pixels, str(tmp_path / "typed.png"))
+    assert cache.is_same_screen(first, typed)
+
+    calls: List[str] = []
+
+    def detect(path):
+        def compute():
+            calls.append(path)
+            time.sleep(0.01)
+            return [{"text": "item", "path": path}]
+        return compute
+
+    assert cache.get_artifact(first, "elements", detect(first))[0]["path"] == first
+    # 内容完全相同的截图直接使用第一张的结果
+    assert cache.get_artifact(copy, "elements", detect(copy))[0]["path"] == first
+    # 视觉上相近但内容不同的截图各自计算
+    assert cache.get_artifact(clock, "elements", detect(clock))[0]["path"] == clock
+    assert cache.get_artifact(typed, "elements", detect(typed))[0]["path"] == typed
+    assert calls == [first, clock, typed]
+
+    payload = cache.base64(first)
+    assert cache.base64(copy) is payload
+    with open(typed, "rb") as f:
+        assert cache.base64(typed) == base64.b64encode(f.read()).decode("utf-8")
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["hits"] == 4 and stats["misses"] == 3
+    assert stats["artifact_hits"] == 2 and stats["saved_seconds"] >= 0.01
+    assert cache.lookup(copy).paths == {first, copy}
+
+    # 同一路径的文件被覆盖后重新计算摘要
+    save_png(typed_pixels, first)
+    os.utime(first, ns=(time.time_ns(), time.time_ns() + 1))
+    assert cache.lookup(first) is cache.lookup(typed)
+
+
+def test_frames_are_hashed_from_memory(tmp_path, monkeypatch):
+    frame_buffer = FrameBuffer()
+    monkeypatch.setattr("tools.screen_cache.get_frame_buffer", lambda: frame_buffer)
+    pixels = np.dstack([list_screen(), np.full((1200, 540), 255, dtype=np.uint8)])
+    header = np.array([540, 1200, 1], dtype="<u4").tobytes()
+    frame = frame_buffer.publish(Frame.from_screencap(header + pixels.tobytes(), "emulator-5554"))
+    path = str(tmp_path / "not_written_yet.png")
+    frame_buffer.assign_path(frame, path)
+
+    cache = ScreenCache()
+    entry = cache.lookup(frame)
+    # 文件尚未写入，按路径查找时由帧缓冲提供数据
+    assert not os.path.exists(path)
+    assert cache.lookup(path) is entry and path in entry.paths
+    assert cache.base64(path) == cache.base64(frame)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_compute_once(tmp_path):
+    cache = ScreenCache()
+    path = save_png(list_screen(), str(tmp_path / "screen.png"))
+    calls = 0
+
+    async def analyze():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"analysis": "settings screen"}
+
+    results = await asyncio.gather(*(cache.aget_artifact(path, "analysis", analyze) for _ in range(5)))
+    assert calls == 1 and all(r is results[0] for r in results)
+    assert cache.get_stats()["artifact_hits"] == 4
+
+    # 无法解码的截图不经过缓存
+    missing = await cache.aget_artifact(str(tmp_path / "missing.png"), "analysis", analyze)
+    assert missing == {"analysis": "settings screen"} and calls == 2
+
+
+def simulate_agents(directory: str, cache: Optional[ScreenCache], steps: int = 30, analysis_delay: float = 0.02) -> Dict[str, float]:
+    """三个智能体每步各自读取截图、编码base64并做一次分析；屏幕每三步变化一次"""
+    def analysis(path):
+        def compute():
+            time.sleep(analysis_delay)
+            return {"path": path}
+        return compute
+
+    start = time.perf_counter()
+    for step in range(steps):
+        pixels = list_screen(scroll=(step // 3) * 120, clock=step)
+        for agent in ("manager", "executor", "reflector"):
+            path = save_png(pixels, os.path.join(directory, f"{agent}_{step}.png"))
+            if cache is None:
+                with open(path, "rb") as f:
+                    base64.b64encode(f.read()).decode("utf-8")
+                analysis(path)()
+            else:
+                cache.base64(path)
+                cache.get_artifact(path, "analysis", analysis(path))
+    return {"seconds": time.perf_counter() - start}
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = simulate_agents(directory, None)
+        cache = ScreenCache()
+        cached = simulate_agents(directory, cache)
+    stats = cache.get_stats()
+    print("30 steps x 3 agents, screen changes every 3 steps, 20ms analysis")
+    print(f"  without cache: {baseline['seconds']:.2f}s")
+    print(f"  with cache:    {cached['seconds']:.2f}s  hit rate {stats['hit_rate']:.0%}, "
+          f"artifact hit rate {stats['artifact_hit_rate']:.0%}, saved {stats['saved_seconds']:.2f}s, "
+          f"digest {stats['average_digest_ms']:.2f}ms/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Smart Scroll Test
+智能滚动测试：校验逐行投影互相关的滚动偏移估计（含固定的标题栏/导航栏、四个方向、列表到底）、
+新条带的区域换算和文本拼接去重，以及 SmartScrollTool 在模拟长列表上只识别新露出的内容
+
+直接运行可输出整屏识别与增量识别在搜索长列表时交给 OCR 的像素数和耗时：
+    python tests/test_smart_scroll.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from loguru import logger
+from PIL import Image
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core  # noqa: F401  先导入 core，避免 tools 与 config 之间的循环导入
+from tools.advanced_tools import OCRTool
+from tools.gui_tools import GUITool, ToolParameters, ToolResult, ToolStatus
+from tools.scroll_stitch import ScrollSession, estimate_scroll_offset, orient, row_profile
+from tools.smart_tools import SmartScrollTool
+from utils import get_iso_timestamp
+
+
+HEADER, FOOTER = 100, 80
+ITEM_HEIGHT = 160
+
+
+class SimulatedList:
+    """模拟长列表应用：固定标题栏和导航栏之间是可滚动的列表，每项有一个宽度和灰度各不相同的文字块
+
+    滑动 distance 像素时内容移动 distance * fling 像素（到底后不再移动）。
+    """
+
+    def __init__(self, directory: Path, items: int = 80, size=(1200, 540), fling: float = 1.0, seed: int = 3):
+        self.directory = directory
+        self.items = items
+        self.height, self.width = size
+        self.fling = fling
+        self.viewport = self.height - HEADER - FOOTER
+        rng = np.random.default_rng(seed)
+        self.widths = rng.integers(120, self.width - 80, items)
+        self.content = np.full((items * ITEM_HEIGHT, self.width, 3), 246, dtype=np.uint8)
+        for i in range(items):
+            top = i * ITEM_HEIGHT
+            self.content[top + 40:top + 90, 40:40 + self.widths[i]] = rng.integers(0, 140, 3)
+            self.content[top + ITEM_HEIGHT - 2:top + ITEM_HEIGHT] = 220
+        self.position = 0
+        self.captures = 0
+        self.positions: Dict[str, int] = {}
+        self.ocr_pixels = 0
+        self.ocr_calls = 0
+
+    @property
+    def max_position(self) -> int:
+        return len(self.content) - self.viewport
+
+    def screen(self, position: int) -> np.ndarray:
+        pixels = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        pixels[:HEADER] = (30, 60, 120)
+        pixels[self.height - FOOTER:] = 40
+        pixels[HEADER:self.height - FOOTER] = self.content[position:position + self.viewport]
+        return pixels
+
+    def capture(self) -> str:
+        self.captures += 1
+        path = str(self.directory / f"screen_{self.captures}.png")
+        Image.fromarray(self.screen(self.position)).save(path, compress_level=1)
+        self.positions[path] = self.position
+        return path
+
+    def swipe(self, direction: str, distance: float) -> None:
+        delta = int(distance * self.fling) * (1 if direction == 'up' else -1)
+        self.position = min(max(self.position + delta, 0), self.max_position)
+
+    def recognize(self, image_path: str, region: Optional[Dict[str, int]]) -> List[Dict[str, Any]]:
+        """OCR 的开销按识别区域的像素数计算，只返回完整落在区域内的文字"""
+        region = region or {'left': 0, 'top': 0, 'right': self.width, 'bottom': self.height}
+        self.ocr_calls += 1
+        self.ocr_pixels += (region['bottom'] - region['top']) * (region['right'] - region['left'])
+        position = self.positions[image_path]
+        texts = []
+        for i in range(self.items):
+            top = HEADER + i * ITEM_HEIGHT + 40 - position
+            bounds = {'left': 40, 'top': top, 'right': 40 + int(self.widths[i]), 'bottom': top + 50}
+            if (HEADER <= top and bounds['bottom'] <= self.height - FOOTER
+                    and region['top'] <= top and bounds['bottom'] <= region['bottom']):
+                texts.append({'text': f"Item {i}", 'confidence': 0.9, 'bounds': bounds,
+                              'center': {'x': (bounds['left'] + bounds['right']) // 2, 'y': top + 25}})
+        return texts
+
+
+def tool_result(tool: GUITool, success: bool = True, **fields) -> ToolResult:
+    now = get_iso_timestamp()
+    return ToolResult(tool_id=tool.tool_id, tool_type=tool.tool_type.value, success=success,
+                      status=ToolStatus.COMPLETED if success else ToolStatus.FAILED,
+                      start_time=now, end_time=now, **fields)
+
+
+class DeviceScreenshotTool(GUITool):
+    def __init__(self, device: SimulatedList):
+        super().__init__(name="DeviceScreenshotTool", description="simulated screenshot")
+        self.device = device
+
+    async def execute(self, parameters, context=None):
+        path = self.device.capture()
+        return tool_result(self, screenshot_path=path, result_data={'screenshot_path': path})
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+class DeviceSwipeTool(GUITool):
+    def __init__(self, device: SimulatedList):
+        super().__init__(name="DeviceSwipeTool", description="simulated swipe")
+        self.device = device
+
+    async def execute_gui_tool(self, parameters, context=None):
+        self.device.swipe(parameters.direction, parameters.distance)
+        return tool_result(self, result_data={'end_point': {'x': parameters.target.x, 'y': parameters.target.y}})
+
+
+class DeviceOCRTool(OCRTool):
+    def __init__(self, device: SimulatedList):
+        super().__init__()
+        self.device = device
+
+    async def _perform_ocr(self, image_path, language, region, context):
+        return {'texts': self.device.recognize(image_path, region), 'language': language}
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+def make_tool(device: SimulatedList) -> SmartScrollTool:
+    return SmartScrollTool(screenshot_tool=DeviceScreenshotTool(device), ocr_tool=DeviceOCRTool(device),
+                           swipe_tool=DeviceSwipeTool(device))
+
+
+def test_offset_estimation_with_fixed_bars(tmp_path):
+    device = SimulatedList(tmp_path)
+    previous = row_profile(device.screen(0))
+    for position in (1, 37, 300, 611, 700):
+        estimate = estimate_scroll_offset(previous, row_profile(device.screen(position)), expected=600)
+        assert estimate.offset == position
+        # 固定的标题栏和导航栏不参与比较
+        assert HEADER <= estimate.top and estimate.bottom <= device.height - FOOTER
+    assert estimate_scroll_offset(previous, previous).offset == 0
+
+    # 其他方向先转到统一朝向。横向列表：把纵向屏幕转置；向右滚动时内容左移，向左滚动时内容右移
+    def horizontal(p):
+        return device.screen(p).swapaxes(0, 1)
+
+    for direction, frame, before, after in (('up', device.screen, 500, 260), ('right', horizontal, 260, 500),
+                                            ('left', horizontal, 500, 260)):
+        estimate = estimate_scroll_offset(row_profile(orient(frame(before), direction)),
+                                          row_profile(orient(frame(after), direction)))
+        assert estimate.offset == 240
+
+
+def test_session_regions_and_stitching(tmp_path):
+    device = SimulatedList(tmp_path)
+    session = ScrollSession(overlap=48)
+    first = session.advance(device.screen(0))
+    assert first.region == {'left': 0, 'top': 0, 'right': device.width, 'bottom': device.height}
+    step = session.advance(device.screen(600), expected=600)
+    assert step.offset == 600 and step.position == 600
+    assert step.region['bottom'] <= device.height - FOOTER
+    assert step.region['top'] <= device.height - FOOTER - 600 - 48 + 2
+
+    # 重叠区域内的重复文本只保留一份
+    item = {'text': "Item 7", 'bounds': {'left': 40, 'top': 100 + 7 * ITEM_HEIGHT + 40 - 600, 'right': 90, 'bottom': 0}}
+    assert session.add_texts([item]) and not session.add_texts([dict(item)])
+    assert session.stitched_texts()[0]['content_offset'] == 100 + 7 * ITEM_HEIGHT + 40
+
+    # 一次没有移动可能只是滑动没有生效；滑动失败时不计入，连续两次成功滑动都没有移动才算到底
+    stalled = session.advance(device.screen(600))
+    assert stalled.region is None and not stalled.at_end
+    assert not session.advance(device.screen(600), swiped=False).at_end
+    assert session.advance(device.screen(600)).at_end
+
+    up = ScrollSession(direction='up')
+    up.advance(device.screen(900))
+    region = up.advance(device.screen(600)).region
+    # 新内容从标题栏下方露出；两帧中相同的空白行不计入滚动区
+    assert region['top'] >= HEADER and region['bottom'] - region['top'] == 300 + 48
+
+
+@pytest.mark.asyncio
+async def test_incremental_scroll_finds_target_and_detects_end(tmp_path):
+    device = SimulatedList(tmp_path)
+    tool = make_tool(device)
+    result = await tool.execute(ToolParameters(text="Item 40", custom_params={'max_scrolls': 30, 'settle_time': 0}))
+    data = result.result_data
+    assert result.success and data['target_found'] and not data['end_reached']
+    assert 40 * ITEM_HEIGHT - device.viewport < device.position <= 40 * ITEM_HEIGHT
+    assert all(offset == 300 for offset in data['scroll_stats']['offsets'])
+    names = [item['text'] for item in data['stitched_texts']]
+    assert names == [f"Item {i}" for i in range(len(names))]
+
+    device = SimulatedList(tmp_path)
+    result = await make_tool(device).execute(
+        ToolParameters(text="Missing", custom_params={'max_scrolls': 50, 'settle_time': 0})
+    )
+    data = result.result_data
+    assert data['end_reached'] and not data['target_found'] and data['scroll_count'] < 50
+    assert [item['text'] for item in data['stitched_texts']] == [f"Item {i}" for i in range(device.items)]
+    assert data['scroll_stats']['analyzed_rows'] < 0.4 * data['scroll_stats']['screen_rows']
+
+
+@pytest.mark.asyncio
+async def test_scroll_uses_actual_swipe_distance_and_ignores_failed_swipes(tmp_path, monkeypatch):
+    calls = []
+    advance = ScrollSession.advance
+
+    def spy(self, pixels, expected=None, swiped=True):
+        calls.append((expected, swiped))
+        return advance(self, pixels, expected, swiped)
+
+    monkeypatch.setattr(ScrollSession, "advance", spy)
+    device = SimulatedList(tmp_path)
+    result = await make_tool(device).execute(ToolParameters(
+        text="Item 20", custom_params={'max_scrolls': 30, 'settle_time': 0, 'scroll_distance': 240}
+    ))
+    assert result.result_data['target_found']
+    assert calls[0] == (None, True) and all(call == (240, True) for call in calls[1:])
+    assert all(offset == 240 for offset in result.result_data['scroll_stats']['offsets'])
+
+    # 滑动失败后屏幕没有移动，不能据此判断列表到底
+    class FailingSwipeTool(DeviceSwipeTool):
+        async def execute_gui_tool(self, parameters, context=None):
+            return tool_result(self, success=False, error_message="device offline")
+
+    tool = SmartScrollTool(screenshot_tool=DeviceScreenshotTool(device), ocr_tool=DeviceOCRTool(device),
+                           swipe_tool=FailingSwipeTool(device))
+    result = await tool.execute(ToolParameters(text="Missing", custom_params={'settle_time': 0}))
+    assert not result.result_data['end_reached'] and result.result_data['scroll_count'] == 0
+    assert calls[-1] == (300, False)
+
+
+def benchmark(directory: Path, target: str = "Item 70", items: int = 80,
+              ocr_seconds: float = 0.3) -> Dict[str, Dict[str, float]]:
+    """ocr_seconds 为整屏 OCR 的耗时，按识别像素数折算 OCR 总耗时"""
+    stats = {}
+    for name, incremental in (('full', False), ('incremental', True)):
+        device = SimulatedList(directory, items=items)
+        tool = make_tool(device)
+        start = time.perf_counter()
+        result = asyncio.run(tool.execute(ToolParameters(
+            text=target, custom_params={'max_scrolls': 50, 'settle_time': 0, 'incremental': incremental}
+        )))
+        elapsed = time.perf_counter() - start
+        assert result.result_data['target_found']
+        stats[name] = {
+            'scrolls': result.result_data['scroll_count'],
+            'ocr_calls': device.ocr_calls,
+            'ocr_pixels': device.ocr_pixels,
+            'ocr_seconds': device.ocr_pixels / (device.width * device.height) * ocr_seconds,
+            'seconds': elapsed
+        }
+    return stats
+
+
+def test_incremental_scroll_analyzes_less(tmp_path):
+    stats = benchmark(tmp_path, target="Item 40")
+    assert stats['incremental']['scrolls'] == stats['full']['scrolls']
+    assert stats['incremental']['ocr_pixels'] < 0.5 * stats['full']['ocr_pixels']
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    with tempfile.TemporaryDirectory() as directory:
+        stats = benchmark(Path(directory))
+    print("Search for 'Item 70' in an 80-item list (540x1200 screen, 300px per scroll, 300ms full-screen OCR)")
+    for name, label in (('full', "full-screen OCR"), ('incremental', "incremental strips")):
+        s = stats[name]
+        print(f"  {label:18s} scrolls {s['scrolls']:3d}, OCR calls {s['ocr_calls']:3d}, "
+              f"OCR pixels {s['ocr_pixels'] / 1e6:6.2f}M (~{s['ocr_seconds']:4.1f}s), "
+              f"tool overhead {s['seconds'] * 1000:5.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tool Executor Test
+工具执行器调度测试：校验事件驱动调度按空闲槽位批量派发、按优先级出队、依赖完成后释放等待任务，
+并对比原有 0.1 秒轮询循环在空操作工具上的吞吐量(tasks/s)和 p99 排队等待时间；
+批次执行器测试校验按完成顺序流式返回、首个失败后取消、批次截止时间，
+并测量 1 到 10000 个任务的批次从最后一个任务结束到批次返回的完成延迟
+
+直接运行可输出 完整基准：
+    python tests/test_tool_executor.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.gui_tools import GUITool, ToolParameters, ToolResult, ToolStatus
+from tools.tool_executor import BatchExecutor, ExecutionPriority, ToolExecutor
+from utils import get_iso_timestamp
+
+
+class NoopTool(GUITool):
+    """空操作工具：可选地等待一个事件后返回，记录执行顺序"""
+
+    def __init__(self, gate: Optional[asyncio.Event] = None, fail: bool = False, **kwargs):
+        super().__init__(name="NoopTool", description="no-op", **kwargs)
+        self.gate = gate
+        self.fail = fail
+        self.order: List[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.finished_at = 0.0
+
+    async def execute(self, parameters: ToolParameters, context: Optional[Dict] = None) -> ToolResult:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            # custom_params 中的 delay 为模拟的执行耗时
+            delay = parameters.custom_params.get("delay")
+            if delay:
+                await asyncio.sleep(delay)
+            self.order.append(parameters.text)
+        finally:
+            self.running -= 1
+            self.finished_at = time.perf_counter()
+        return ToolResult(
+            tool_id=self.tool_id, tool_type=self.tool_type.value,
+            status=ToolStatus.FAILED if self.fail else ToolStatus.COMPLETED,
+            success=not self.fail, start_time=get_iso_timestamp(), end_time=get_iso_timestamp()
+        )
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+class PollingToolExecutor(ToolExecutor):
+    """原有的轮询调度：每 0.1 秒最多启动一个任务"""
+
+    async def _execution_loop(self) -> None:
+        while self.is_running:
+            await self._cleanup_completed_tasks()
+            if len(self.active_tasks) < self.max_concurrent_tasks:
+                task = await self.queue.dequeue()
+                if task:
+                    self._start_task(task)
+            await asyncio.sleep(0.1)
+
+
+class PollingBatchExecutor(BatchExecutor):
+    """原有的批次等待：依次对每个任务每 0.1 秒查询一次结果"""
+
+    async def execute_parallel(self, tasks, max_concurrent=5, timeout=None, **kwargs):
+        task_ids = [await self.tool_executor.submit_task(tool, parameters, context, timeout=timeout)
+                    for tool, parameters, context in tasks]
+        results = []
+        for task_id in task_ids:
+            while True:
+                result = await self.tool_executor.get_task_result(task_id)
+                if result:
+                    results.append(result)
+                    break
+                await asyncio.sleep(0.1)
+        return results
+
+
+async def wait_results(executor: ToolExecutor, task_ids: List[str], timeout: float = 10) -> List[ToolResult]:
+    return [await executor.wait_for_task(task_id, timeout) for task_id in task_ids]
+
+
+async def measure(executor_class, tasks: int, max_concurrent: int = 10, paced: bool = False) -> Dict[str, float]:
+    """提交 tasks 个空操作任务，返回吞吐量和排队等待分位数
+
+    paced 为真时逐个提交并等待完成，排队等待时间即空闲执行器的派发延迟；
+    否则一次性提交全部任务，衡量吞吐量。
+    """
+    executor = executor_class(max_concurrent_tasks=max_concurrent, max_queue_size=tasks + 1)
+    completed = asyncio.Queue()
+    executor.register_event_callback('task_completed', completed.put_nowait)
+    await executor.start()
+    tool = NoopTool()
+    start = time.perf_counter()
+    try:
+        if paced:
+            for i in range(tasks):
+                await executor.submit_task(tool, ToolParameters(text=str(i)))
+                await completed.get()
+        else:
+            for i in range(tasks):
+                await executor.submit_task(tool, ToolParameters(text=str(i)))
+            for _ in range(tasks):
+                await completed.get()
+        elapsed = time.perf_counter() - start
+        wait = (await executor.get_status())['queue_wait']
+    finally:
+        await executor.stop()
+    return {"tasks_per_sec": tasks / elapsed, "p50_ms": wait['p50_ms'], "p99_ms": wait['p99_ms']}
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logger.disable("tools.tool_executor")
+    yield
+    logger.enable("tools.tool_executor")
+
+
+@pytest.mark.asyncio
+async def test_dispatches_up_to_free_slots_per_wakeup():
+    gate = asyncio.Event()
+    tool = NoopTool(gate)
+    executor = ToolExecutor(max_concurrent_tasks=4)
+    await executor.start()
+    try:
+        task_ids = [await executor.submit_task(tool, ToolParameters(text=str(i))) for i in range(10)]
+        await asyncio.sleep(0.01)
+        assert tool.running == 4 and len(executor.active_tasks) == 4
+        gate.set()
+        results = await wait_results(executor, task_ids)
+        assert all(r.success for r in results)
+        assert sorted(tool.order, key=int) == [str(i) for i in range(10)]
+    finally:
+        await executor.stop()
+    assert not executor.active_tasks
+
+
+@pytest.mark.asyncio
+async def test_priority_and_dependencies():
+    gate = asyncio.Event()
+    blocker = NoopTool(gate)
+    tool = NoopTool()
+    failing = NoopTool(fail=True)
+    executor = ToolExecutor(max_concurrent_tasks=1)
+    await executor.start()
+    try:
+        blocking_id = await executor.submit_task(blocker, ToolParameters(text="blocker"))
+        await asyncio.sleep(0.01)
+        low = await executor.submit_task(tool, ToolParameters(text="low"), priority=ExecutionPriority.LOW)
+        first = await executor.submit_task(tool, ToolParameters(text="first"))
+        second = await executor.submit_task(tool, ToolParameters(text="second"), dependencies=[first])
+        urgent = await executor.submit_task(tool, ToolParameters(text="urgent"), priority=ExecutionPriority.URGENT)
+        failed = await executor.submit_task(failing, ToolParameters(text="fails"))
+        orphan = await executor.submit_task(tool, ToolParameters(text="orphan"), dependencies=[failed])
+        grandchild = await executor.submit_task(tool, ToolParameters(text="grandchild"), dependencies=[orphan])
+        assert len(executor.queue.waiting_tasks) == 3
+
+        gate.set()
+        results = await wait_results(executor, [blocking_id, low, first, second, urgent, failed, orphan, grandchild])
+        # 依赖完成后释放的任务排在同优先级已就绪任务之后，低优先级任务最后执行
+        assert tool.order == ["urgent", "first", "second", "low"]
+        assert results[6].error_code == results[7].error_code == "DEPENDENCY_FAILED"
+        assert not executor.queue.waiting_tasks and not executor.queue.dependency_graph
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_task_is_skipped():
+    gate = asyncio.Event()
+    tool = NoopTool(gate)
+    executor = ToolExecutor(max_concurrent_tasks=1)
+    await executor.start()
+    try:
+        running = await executor.submit_task(tool, ToolParameters(text="running"))
+        queued = await executor.submit_task(tool, ToolParameters(text="queued"))
+        dependent = await executor.submit_task(tool, ToolParameters(text="dependent"), dependencies=[queued])
+        await asyncio.sleep(0.01)
+        assert await executor.cancel_task(queued)
+        gate.set()
+        await wait_results(executor, [running, dependent])
+        assert tool.order == ["running"]
+        assert (await executor.get_task_result(dependent)).error_code == "DEPENDENCY_FAILED"
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_event_driven_dispatch_outperforms_polling():
+    polling = await measure(PollingToolExecutor, 10)
+    event_driven = await measure(ToolExecutor, 500)
+    assert event_driven["tasks_per_sec"] > 20 * polling["tasks_per_sec"], (polling, event_driven)
+    # 空闲执行器上的派发延迟不再受轮询间隔限制
+    paced = await measure(ToolExecutor, 50, paced=True)
+    assert paced["p99_ms"] < 10, paced
+
+
+def batch(tool: NoopTool, count: int, delay: float = 0.0) -> List[tuple]:
+    return [(tool, ToolParameters(text=str(i), custom_params={"delay": delay}), None) for i in range(count)]
+
+
+async def completion_latency(batch_class, tasks: int, max_concurrent: int = 10) -> Dict[str, float]:
+    """执行 tasks 个空操作任务的批次，返回总耗时和最后一个任务结束到批次返回的延迟"""
+    executor = ToolExecutor(max_concurrent_tasks=max_concurrent, max_queue_size=tasks + 1)
+    await executor.start()
+    tool = NoopTool()
+    try:
+        start = time.perf_counter()
+        results = await batch_class(executor).execute_parallel(batch(tool, tasks), max_concurrent=max_concurrent)
+        returned = time.perf_counter()
+    finally:
+        await executor.stop()
+    assert len(results) == tasks and all(r.success for r in results)
+    return {"total_ms": (returned - start) * 1000, "latency_ms": (returned - tool.finished_at) * 1000}
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_results_in_completion_order():
+    tool = NoopTool()
+    executor = ToolExecutor(max_concurrent_tasks=10)
+    await executor.start()
+    try:
+        tasks = [(tool, ToolParameters(text=str(i), custom_params={"delay": delay}), None)
+                 for i, delay in enumerate([0.06, 0.0, 0.03, 0.0, 0.01])]
+        batch_executor = BatchExecutor(executor)
+        streamed = [index async for index, _ in batch_executor.stream_parallel(tasks, max_concurrent=None)]
+        assert streamed == [1, 3, 4, 2, 0]
+
+        results = await batch_executor.execute_parallel(batch(tool, 12, delay=0.005), max_concurrent=3)
+        assert all(r.success for r in results) and tool.max_running == 3
+        sequential = await batch_executor.execute_sequential(batch(NoopTool(), 3))
+        assert [r.success for r in sequential] == [True] * 3
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_fail_fast_and_deadline():
+    gate = asyncio.Event()
+    blocked, failing = NoopTool(gate), NoopTool(fail=True)
+    executor = ToolExecutor(max_concurrent_tasks=10)
+    await executor.start()
+    try:
+        batch_executor = BatchExecutor(executor)
+        tasks = batch(blocked, 3) + [(failing, ToolParameters(text="fails"), None)] + batch(blocked, 4)
+        results = await batch_executor.execute_parallel(tasks, max_concurrent=5, fail_fast=True)
+        assert results[3].error_code is None and not results[3].success
+        assert {r.error_code for i, r in enumerate(results) if i != 3} == {"BATCH_CANCELLED"}
+        await asyncio.sleep(0.01)
+        assert blocked.running == 0 and not executor.active_tasks
+
+        start = time.perf_counter()
+        tasks = [(NoopTool(), ToolParameters(text="quick"), None)] + batch(blocked, 3)
+        results = await batch_executor.execute_parallel(tasks, deadline=0.05)
+        assert 0.05 <= time.perf_counter() - start < 0.5
+        assert results[0].success
+        assert [r.error_code for r in results[1:]] == ["BATCH_DEADLINE_EXCEEDED"] * 3
+        assert all(r.status == ToolStatus.TIMEOUT for r in results[1:])
+        await asyncio.sleep(0.01)
+        assert blocked.running == 0
+    finally:
+        await executor.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_completion_latency_is_not_bounded_by_polling():
+    for tasks in (1, 100, 1000):
+        stats = await completion_latency(BatchExecutor, tasks)
+        assert stats["latency_ms"] < 20, (tasks, stats)
+    polling = await completion_latency(PollingBatchExecutor, 100)
+    assert polling["total_ms"] > 50
+
+
+async def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    for name, executor_class, tasks, paced in (
+        ("polling, burst", PollingToolExecutor, 50, False),
+        ("event-driven, burst", ToolExecutor, 5000, False),
+        ("polling, paced", PollingToolExecutor, 30, True),
+        ("event-driven, paced", ToolExecutor, 1000, True),
+    ):
+        stats = await measure(executor_class, tasks, paced=paced)
+        print(f"{name:<20} {tasks:>5} no-op tasks: {stats['tasks_per_sec']:>8.1f} tasks/s, "
+              f"queue wait p50 {stats['p50_ms']:.2f}ms p99 {stats['p99_ms']:.2f}ms")
+
+    print("batch completion latency (last task finished -> batch returned)")
+    for tasks in (1, 10, 100, 1000, 10000):
+        line = f"  {tasks:>5} tasks:"
+        for name, batch_class in (("polling", PollingBatchExecutor), ("futures", BatchExecutor)):
+            stats = await completion_latency(batch_class, tasks)
+            line += f"  {name} {stats['latency_ms']:7.2f}ms (total {stats['total_ms']:8.1f}ms)"
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tool Monitor Test
+工具监控测试：校验 DDSketch 分位数的相对误差、草图合并和固定内存，
+指标收集器的线程分片写入、读取合并和按时间窗口查询，
+以及监控器的滑动窗口预聚合、边沿触发的告警和事件循环中的告警分发
+
+直接运行可输出 10 万样本下按线程分片写入的吞吐量、原有排序方式与草图的 p99 读取耗时和误差，
+以及每次工具调用的监控开销和仪表板读取耗时：
+    python tests/test_tool_monitor.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core  # noqa: F401  先导入 core，避免 tools 与 config 之间的循环导入
+from tools.quantile_sketch import DDSketch, merge_sketches
+from tools.gui_tools import ToolResult, ToolStatus
+from tools.tool_monitor import AlertSeverity, MetricCollector, MetricType, SlidingWindow, ToolMonitor
+
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def latencies(count: int, seed: int = 0) -> np.ndarray:
+    """对数正态分布的执行耗时（秒），带少量慢请求"""
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(mean=-3, sigma=0.8, size=count)
+    slow = rng.random(count) < 0.02
+    values[slow] *= 40
+    return values
+
+
+def relative_errors(sketch: DDSketch, values: np.ndarray) -> List[float]:
+    expected = np.quantile(values, QUANTILES, method="lower")
+    return [abs(estimate - actual) / actual for estimate, actual in zip(sketch.quantiles(QUANTILES), expected)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = latencies(100_000)
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values.tolist():
+        sketch.add(value)
+    assert max(relative_errors(sketch, values)) <= 0.0101
+    assert sketch.count == len(values) and sketch.sum == pytest.approx(values.sum())
+    assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+
+    mixed = DDSketch()
+    for value in (-5.0, -1.0, 0.0, 0.0, 2.0, 10.0):
+        mixed.add(value)
+    assert mixed.quantiles([0, 0.4, 1]) == [-5.0, 0.0, 10.0]
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_sketches_merge_and_stay_bounded():
+    values = latencies(50_000, seed=1)
+    whole, halves = DDSketch(), [DDSketch(), DDSketch()]
+    for i, value in enumerate(values.tolist()):
+        whole.add(value)
+        halves[i % 2].add(value)
+    merged = merge_sketches(halves)
+    assert merged.positive == whole.positive and merged.count == whole.count
+    assert merged.quantiles(QUANTILES) == whole.quantiles(QUANTILES)
+
+    # 动态范围极大时合并最小的桶，高分位数仍然准确
+    bounded = DDSketch(max_buckets=512)
+    wide = np.random.default_rng(2).lognormal(mean=0, sigma=2, size=50_000)
+    for value in wide.tolist():
+        bounded.add(value)
+    assert len(bounded.positive) == 512
+    for q in (0.5, 0.99):
+        assert abs(bounded.quantile(q) / np.quantile(wide, q, method="lower") - 1) <= 0.0101
+
+
+def test_collector_merges_thread_shards():
+    collector = MetricCollector(max_history_size=100)
+    values = latencies(40_000, seed=3)
+    chunks = np.array_split(values, 4)
+
+    def record(chunk):
+        for value in chunk.tolist():
+            collector.record_metric("tool.click.execution_time", value, MetricType.TIMER, "seconds")
+        collector.record_metric("tool.click.executions", len(chunk), MetricType.COUNTER)
+
+    threads = [threading.Thread(target=record, args=(chunk,)) for chunk in chunks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(collector._shards) == 4
+    agg = collector.get_aggregated_metrics("tool.click.execution_time")
+    assert agg["count"] == 40_000 and agg["max"] == values.max()
+    assert abs(agg["p99"] / np.quantile(values, 0.99, method="lower") - 1) <= 0.0101
+    assert collector.get_aggregated_metrics("tool.click.executions")["latest"] == 40_000
+    assert len(collector.get_metric_history("tool.click.execution_time")) == 100
+    assert set(collector.get_all_metrics()) == {"tool.click.execution_time", "tool.click.executions"}
+
+
+def test_windowed_quantiles():
+    clock = FakeClock()
+    collector = MetricCollector(window_seconds=10, max_windows=3, clock=clock, max_history_size=0)
+    for _ in range(1000):
+        collector.record_metric("latency", 0.01)
+    clock.now += 25
+    for _ in range(100):
+        collector.record_metric("latency", 2.0)
+    clock.now += 5
+
+    recent = collector.get_aggregated_metrics("latency", window=10)
+    assert recent["count"] == 100 and recent["p50"] == pytest.approx(2.0, rel=0.01)
+    overall = collector.get_aggregated_metrics("latency")
+    assert overall["count"] == 1100 and overall["p50"] == pytest.approx(0.01, rel=0.01)
+    assert collector.get_quantiles("latency", (0.99,))["p99"] == pytest.approx(2.0, rel=0.01)
+
+    # 只保留最近 max_windows 个窗口
+    for _ in range(3):
+        clock.now += 10
+        collector.record_metric("latency", 0.5)
+    assert collector.get_aggregated_metrics("latency", window=1000)["count"] == 3
+    assert collector.get_metric_history("latency") == []
+
+
+def benchmark(samples: int = 100_000, threads: int = 4) -> Dict[str, float]:
+    values = latencies(samples, seed=4)
+    stats = {}
+    for name, history in (("sketch", 0), ("sketch+history", 10_000)):
+        collector = MetricCollector(max_history_size=history)
+        chunks = [chunk.tolist() for chunk in np.array_split(values, threads)]
+
+        def record(chunk):
+            for value in chunk:
+                collector.record_metric("latency", value, MetricType.TIMER)
+
+        workers = [threading.Thread(target=record, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stats[f"{name}_samples_per_sec"] = samples / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    p99 = collector.get_quantiles("latency")["p99"]
+    stats["sketch_p99_read_ms"] = (time.perf_counter() - start) * 1000
+    actual = np.quantile(values, 0.99, method="lower")
+    stats["sketch_p99_error"] = abs(p99 / actual - 1)
+    stats["sketch_buckets"] = collector.get_sketch("latency").bucket_count
+
+    # 原有方式：在最近 max_history_size 个原始样本上排序求分位数
+    start = time.perf_counter()
+    history = sorted(metric.value for metric in collector.get_metric_history("latency"))
+    legacy_p99 = history[int(len(history) * 0.99)]
+    stats["legacy_p99_read_ms"] = (time.perf_counter() - start) * 1000
+    stats["legacy_p99_error"] = abs(legacy_p99 / actual - 1)
+    return stats
+
+
+def make_tool(name: str = "click") -> SimpleNamespace:
+    return SimpleNamespace(tool_id=f"{name}-id", name=name)
+
+
+def run_call(monitor: ToolMonitor, tool, success: bool = True, duration: Optional[float] = 0.01) -> None:
+    trace_id = monitor.start_tool_execution(tool)
+    result = ToolResult(tool_id=tool.tool_id, tool_type="basic",
+                        status=ToolStatus.COMPLETED if success else ToolStatus.FAILED,
+                        success=success, start_time="", duration=duration)
+    monitor.end_tool_execution(trace_id, tool, result)
+
+
+def test_sliding_window_drops_expired_buckets():
+    clock = FakeClock()
+    window = SlidingWindow(window_seconds=10, buckets=5, clock=clock)
+    for value in (1.0, 5.0, 3.0):
+        window.add(value)
+    clock.now += 4
+    window.add(2.0)
+    snapshot = window.snapshot()
+    assert snapshot["count"] == 4 and snapshot["sum"] == 11.0 and snapshot["max"] == 5.0
+    assert snapshot["latest"] == 2.0 and snapshot["current_count"] == 1
+
+    # 前三个样本所在的桶滑出窗口
+    clock.now += 7
+    snapshot = window.snapshot()
+    assert snapshot["count"] == 1 and snapshot["avg"] == 2.0 and snapshot["max"] == 2.0
+    clock.now += 100
+    assert window.snapshot()["count"] == 0 and window.sum == 0.0 and window.total_count == 4
+
+
+def test_window_alerts_fire_once_and_auto_resolve():
+    clock = FakeClock()
+    monitor = ToolMonitor(window_seconds=10, window_buckets=5, clock=clock)
+    received = []
+    monitor.add_alert_handler(received.append)
+    tool = make_tool()
+
+    # 样本数不足 min_count 时不评估失败率
+    for _ in range(9):
+        run_call(monitor, tool, success=False)
+    assert received == []
+    for _ in range(20):
+        run_call(monitor, tool, success=False)
+    assert sorted(alert.severity.value for alert in received) == ["error", "warning"]
+    assert all(alert.tags == {"scope": "click"} for alert in received)
+    assert monitor.get_monitoring_dashboard()["monitoring_status"]["health"] == "unhealthy"
+
+    # 失败样本滑出窗口后告警自动解除，不会重复触发
+    clock.now += 20
+    for _ in range(10):
+        run_call(monitor, tool)
+    assert len(received) == 2 and all(alert.resolved for alert in received)
+
+    run_call(monitor, tool, duration=45.0)
+    run_call(monitor, tool, duration=50.0)
+    assert [alert.metric_name for alert in received[2:]] == ["execution_time"]
+    run_call(monitor, tool, duration=0.5)
+    assert received[2].resolved
+
+    dashboard = monitor.get_monitoring_dashboard()
+    assert dashboard["monitoring_status"]["health"] == "healthy"
+    assert dashboard["key_metrics"]["tool.click.failure_rate"]["count"] == 13
+    assert dashboard["key_metrics"]["tool.click.execution_time"]["max"] == 50.0
+    assert dashboard["statistics"]["total_executions"] == 42
+    assert [alert["id"] for alert in dashboard["recent_alerts"]] == [a.alert_id for a in reversed(received)]
+    assert len({trace.trace_id for trace in monitor.execution_tracker.get_completed_traces()}) == 42
+
+
+@pytest.mark.asyncio
+async def test_alerts_dispatched_on_event_loop():
+    monitor = ToolMonitor()
+    assert monitor.get_monitoring_dashboard()["monitoring_status"]["loop_running"]
+    received = []
+
+    async def handler(alert):
+        await asyncio.sleep(0)
+        received.append((alert.tags["scope"], threading.current_thread()))
+
+    monitor.add_alert_handler(handler)
+    run_call(monitor, make_tool("tap"), duration=31.0)
+
+    # 其他线程中结束的执行，告警同样回到事件循环中处理
+    await asyncio.get_running_loop().run_in_executor(
+        None, run_call, monitor, make_tool("swipe"), True, 31.0
+    )
+    await monitor.stop()
+    assert received == [("tap", threading.current_thread()), ("swipe", threading.current_thread())]
+    assert not monitor.get_monitoring_dashboard()["monitoring_status"]["loop_running"]
+
+
+def monitor_benchmark(calls: int = 20_000, tools: int = 100) -> Dict[str, float]:
+    stats = {}
+    tool_list = [make_tool(f"tool{i}") for i in range(tools)]
+    results = [ToolResult(tool_id=tool.tool_id, tool_type="basic", status=ToolStatus.COMPLETED,
+                          success=True, start_time="", duration=0.01) for tool in tool_list]
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        ToolResult(tool_id="x", tool_type="basic", status=ToolStatus.COMPLETED,
+                   success=True, start_time="", duration=0.01)
+    baseline = time.perf_counter() - start
+
+    monitor = ToolMonitor()
+    start = time.perf_counter()
+    for i in range(calls):
+        tool = tool_list[i % tools]
+        trace_id = monitor.start_tool_execution(tool)
+        ToolResult(tool_id="x", tool_type="basic", status=ToolStatus.COMPLETED,
+                   success=True, start_time="", duration=0.01)
+        monitor.end_tool_execution(trace_id, tool, results[i % tools])
+    stats["overhead_us_per_call"] = (time.perf_counter() - start - baseline) / calls * 1e6
+    stats["calls_per_sec"] = calls / (time.perf_counter() - start)
+
+    # 其中滑动窗口更新和告警评估的部分
+    windows = ToolMonitor()
+    start = time.perf_counter()
+    for i in range(calls):
+        windows._observe("execution_time", 0.01, tool_list[i % tools].name)
+        windows._observe("failure_rate", 0.0, tool_list[i % tools].name)
+    stats["window_us_per_call"] = (time.perf_counter() - start) / calls * 1e6
+
+    rounds = 50
+    start = time.perf_counter()
+    for _ in range(rounds):
+        monitor.get_monitoring_dashboard()
+    stats["dashboard_ms"] = (time.perf_counter() - start) / rounds * 1000
+
+    # 原有方式：读取时合并所有指标并对每条规则重新评估
+    start = time.perf_counter()
+    for _ in range(rounds):
+        monitor.alert_manager.get_alerts(limit=10)
+        monitor.metric_collector.get_all_metrics()
+    stats["recompute_ms"] = (time.perf_counter() - start) / rounds * 1000
+    return stats
+
+
+def test_dashboard_reads_window_snapshots():
+    stats = monitor_benchmark(calls=2_000, tools=50)
+    assert stats["dashboard_ms"] < stats["recompute_ms"]
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    stats = benchmark()
+    print("100k lognormal latency samples from 4 threads")
+    print(f"  record: {stats['sketch_samples_per_sec']:,.0f} samples/s (sketch only), "
+          f"{stats['sketch+history_samples_per_sec']:,.0f} samples/s (sketch + raw history)")
+    print(f"  p99 via sketch:        {stats['sketch_p99_read_ms']:.2f}ms, error {stats['sketch_p99_error']:.3%}, "
+          f"{stats['sketch_buckets']} buckets")
+    print(f"  p99 via sorted history: {stats['legacy_p99_read_ms']:.2f}ms, error {stats['legacy_p99_error']:.3%} "
+          f"(last 10k samples only)")
+    stats = monitor_benchmark()
+    print("20k tool calls across 100 tools")
+    print(f"  monitoring overhead: {stats['overhead_us_per_call']:.1f}us/call ({stats['calls_per_sec']:,.0f} calls/s), "
+          f"of which window update + alert evaluation {stats['window_us_per_call']:.1f}us")
+    print(f"  dashboard from window snapshots: {stats['dashboard_ms']:.2f}ms, "
+          f"recomputed from all metrics: {stats['recompute_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI Hierarchy Test
+UI层次结构测试：使用录制的 uiautomator dump 样例(tests/fixtures/ui_dump_settings.xml)校验解析结果和查询，
+在数千节点的合成界面上与线性扫描结果对比，并测量点选、最近元素和文本查询的延迟
+
+直接运行可输出 不同节点规模下的解析与查询耗时：
+    python tests/test_ui_hierarchy.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import fake_adb
+from tools.advanced_tools import ElementDetectionTool
+from tools.gui_tools import ToolParameters
+from tools.tool_adapters import AndroidAdapter
+from tools.ui_hierarchy import UIElement, UIHierarchy, UIHierarchyParser
+
+SETTINGS_DUMP = Path(__file__).parent / "fixtures" / "ui_dump_settings.xml"
+
+
+def synthetic_dump(rows: int, cols: int = 4, width: int = 1080, row_height: int = 60) -> str:
+    """生成 rows x cols 的列表界面：每行可点击，每个单元格包含图标和文本"""
+    cell_width = width // cols
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">',
+             f'<node class="android.widget.FrameLayout" bounds="[0,0][{width},{rows * row_height}]" '
+             f'resource-id="com.example:id/root">']
+    for r in range(rows):
+        top, bottom = r * row_height, (r + 1) * row_height
+        parts.append(f'<node class="android.widget.LinearLayout" clickable="true" enabled="true" '
+                     f'resource-id="com.example:id/row" bounds="[0,{top}][{width},{bottom}]">')
+        for c in range(cols):
+            left = c * cell_width
+            parts.append(f'<node class="android.widget.ImageView" content-desc="icon {r}-{c}" '
+                         f'bounds="[{left + 4},{top + 10}][{left + 44},{bottom - 10}]"/>')
+            parts.append(f'<node class="android.widget.TextView" text="item {r}-{c}" '
+                         f'resource-id="com.example:id/label" '
+                         f'bounds="[{left + 50},{top + 5}][{left + cell_width - 60},{bottom - 5}]"/>')
+        parts.append('</node>')
+    parts.append('</node></hierarchy>')
+    return ''.join(parts)
+
+
+def brute_element_at(hierarchy: UIHierarchy, x: float, y: float,
+                     predicate: Optional[Callable[[UIElement], bool]] = None) -> Optional[UIElement]:
+    hits = [e for e in hierarchy if e.contains(x, y) and (predicate is None or predicate(e))]
+    return min(hits, key=lambda e: (-e.depth, e.area, -e.index), default=None)
+
+
+def brute_nearest(hierarchy: UIHierarchy, x: float, y: float,
+                  predicate: Optional[Callable[[UIElement], bool]] = None) -> Optional[UIElement]:
+    candidates = [e for e in hierarchy if e.area > 0 and (predicate is None or predicate(e))]
+    return min(candidates, key=lambda e: (e.distance_to(x, y), -e.depth, e.area), default=None)
+
+
+def clickable(element: UIElement) -> bool:
+    return element.clickable
+
+
+class HierarchyDetectionTool(ElementDetectionTool):
+    """ElementDetectionTool 未实现 execute_gui_tool，测试中补上以便实例化"""
+
+    async def execute_gui_tool(self, parameters, context=None):
+        return await self.execute(parameters, context)
+
+
+def measure_queries(hierarchy: UIHierarchy, queries: int = 2000, seed: int = 5) -> Dict[str, float]:
+    """随机点和文本上的平均查询耗时（微秒）"""
+    rng = random.Random(seed)
+    root = hierarchy.root()
+    points = [(rng.uniform(0, root.right), rng.uniform(0, root.bottom)) for _ in range(queries)]
+    texts = [hierarchy.get(rng.randrange(len(hierarchy))).text or "missing" for _ in range(queries)]
+    timings = {}
+    for name, query in (
+        ("element_at", lambda i: hierarchy.element_at(*points[i])),
+        ("nearest_clickable", lambda i: hierarchy.nearest(points[i][0], points[i][1], clickable)),
+        ("find_by_text", lambda i: hierarchy.find_by_text(texts[i])),
+        ("linear_scan", lambda i: brute_element_at(hierarchy, *points[i])),
+    ):
+        count = queries if name != "linear_scan" else max(queries // 20, 1)
+        start = time.perf_counter()
+        for i in range(count):
+            query(i)
+        timings[name] = (time.perf_counter() - start) / count * 1e6
+    return timings
+
+
+def test_parse_recorded_settings_dump():
+    hierarchy = UIHierarchy.parse(str(SETTINGS_DUMP))
+    root = hierarchy.root()
+    assert root.bounds == (0, 0, 1080, 2640) and root.parent is None
+    assert len(hierarchy) == 7 + 9 * 6
+
+    battery = hierarchy.find_by_text("电池")[0]
+    assert battery.resource_id == "android:id/title"
+    row = hierarchy.parent_of(hierarchy.parent_of(battery))
+    assert row.clickable and [c.class_name for c in hierarchy.children_of(row)] == [
+        "android.widget.LinearLayout", "android.widget.RelativeLayout"]
+
+    # 点选：最上层的是标题文本，只要可点击元素时得到整行
+    x, y = battery.center
+    assert hierarchy.element_at(x, y) is battery
+    assert hierarchy.element_at(x, y, clickable) is row
+    assert hierarchy.elements_at(x, y)[-1] is root
+
+    # 状态栏区域没有可点击元素，最近的是搜索栏
+    search = hierarchy.find_by_resource_id("search_bar")[0]
+    assert hierarchy.nearest(540, 50, clickable) is search
+    assert hierarchy.nearest(540, 50, clickable, max_distance=50) is None
+
+    assert len(hierarchy.find_by_resource_id("android:id/title")) == 9
+    assert len(hierarchy.find_by_resource_id("title")) == 9
+    assert [e.text for e in hierarchy.find_by_text("蓝牙", exact=False)] == ["蓝牙、配对"]
+    assert hierarchy.find_by_resource_id("recycler_view")[0].scrollable
+    assert battery.to_dict()["center"] == {"x": x, "y": y}
+
+
+def test_incremental_feed_matches_iterparse():
+    data = SETTINGS_DUMP.read_bytes() + b"UI hierchary dumped to: /dev/tty\n"
+    parser = UIHierarchyParser()
+    for i in range(0, len(data), 97):
+        parser.feed(data[i:i + 97])
+    assert parser.finished
+    streamed = parser.close()
+    parsed = UIHierarchy.parse(io.BytesIO(SETTINGS_DUMP.read_bytes()))
+    assert streamed.to_dicts() == parsed.to_dicts()
+
+    # 根节点结束标签被切在两块之间时，其后的提示信息同样被忽略
+    tag = data.rindex(b"</hierarchy>")
+    for split in range(tag, tag + len(b"</hierarchy>") + 1):
+        parser = UIHierarchyParser()
+        parser.feed(data[:split])
+        parser.feed(data[split:])
+        assert parser.finished and parser.close().to_dicts() == parsed.to_dicts()
+
+
+def test_index_queries_match_linear_scan():
+    hierarchy = UIHierarchy.from_string(synthetic_dump(200))
+    assert len(hierarchy) == 1 + 200 * 9
+    rng = random.Random(11)
+    for _ in range(500):
+        x, y = rng.uniform(-50, 1130), rng.uniform(-50, 12050)
+        assert hierarchy.element_at(x, y) is brute_element_at(hierarchy, x, y)
+        assert hierarchy.element_at(x, y, clickable) is brute_element_at(hierarchy, x, y, clickable)
+        assert hierarchy.nearest(x, y) is brute_nearest(hierarchy, x, y)
+        text_only = lambda e: bool(e.text)
+        assert hierarchy.nearest(x, y, text_only) is brute_nearest(hierarchy, x, y, text_only)
+    assert [e.text for e in hierarchy.find_by_text("item 7-3")] == ["item 7-3"]
+    assert len(hierarchy.find_by_text("icon 7-", exact=False)) == 4
+
+
+def test_queries_are_sub_millisecond_on_large_dumps():
+    hierarchy = UIHierarchy.from_string(synthetic_dump(600))
+    assert len(hierarchy) > 5000
+    timings = measure_queries(hierarchy, queries=500)
+    assert timings["element_at"] < 1000, timings
+    assert timings["nearest_clickable"] < 1000, timings
+    assert timings["find_by_text"] < 1000, timings
+
+
+@pytest.mark.asyncio
+async def test_adapter_streams_ui_dump(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_DEVICES", "emulator-5554")
+    monkeypatch.setenv("FAKE_ADB_UI_DUMP", str(SETTINGS_DUMP))
+    for name in ("FAKE_ADB_SPAWN_DELAY", "FAKE_ADB_SDCARD", "FAKE_ADB_DEVICES_FILE"):
+        monkeypatch.setenv(name, "")
+    adapter = AndroidAdapter("emulator-5554")
+    adapter.adb_path = fake_adb.install(str(tmp_path))
+    try:
+        streamed = await adapter.get_elements()
+        assert streamed["success"] and "dump_path" not in streamed
+        assert len(streamed["elements"]) == len(streamed["hierarchy"]) == 61
+        pulled = await adapter._get_elements_via_file()
+        assert pulled["success"] and pulled["elements"] == streamed["elements"]
+        assert adapter.ui_hierarchy is pulled["hierarchy"]
+    finally:
+        await adapter.cleanup()
+
+    # 元素检测直接查询层次结构，不需要截图
+    tool = HierarchyDetectionTool()
+    result = await tool.execute(ToolParameters(text="电池"), {"ui_hierarchy": adapter.ui_hierarchy})
+    assert result.success and result.screenshot_path is None
+    assert [e["text"] for e in result.result_data["detected_elements"]] == ["电池"]
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    for rows in (100, 500, 2000):
+        xml = synthetic_dump(rows)
+        start = time.perf_counter()
+        hierarchy = UIHierarchy.from_string(xml)
+        parse_ms = (time.perf_counter() - start) * 1000
+        timings = measure_queries(hierarchy)
+        print(f"{len(hierarchy)} nodes ({len(xml) / 1024:.0f}KB XML): parse {parse_ms:.1f}ms")
+        print("  " + "  ".join(f"{name}={value:.1f}us" for name, value in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
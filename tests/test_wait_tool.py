@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wait Tool Test
+等待工具测试：在虚拟时钟驱动的模拟设备上校验帧差异产生的变化/稳定事件（包括小块文字）、屏幕稳定后立即检查条件、
+静止时的抽帧退避，以及没有帧源时的轮询回退
+
+直接运行可输出固定 0.5 秒轮询与帧驱动等待的平均超时量（条件满足到等待返回的时间）和每次等待的检查次数：
+    python tests/test_wait_tool.py
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from loguru import logger
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core  # noqa: F401  先导入 core，避免 tools 与 config 之间的循环导入
+from tools.basic_tools import WaitTool
+from tools.frame_wait import (
+    EVENT_CHANGED, EVENT_STABLE, FrameChangeDetector, FrameWaitConfig, FrameWaiter
+)
+from tools.gui_tools import ToolParameters
+
+
+class VirtualClock:
+    """虚拟时钟：sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += max(0.0, delay)
+        await asyncio.sleep(0)
+
+
+class SimulatedDevice:
+    """模拟设备：change_at 时刻开始播放 animation 秒的过渡动画，动画结束后目标元素出现
+
+    抽帧耗时 frame_cost 秒，一次元素检查（UI 树导出）耗时 check_cost 秒。
+    """
+
+    def __init__(self, clock: VirtualClock, change_at: float, animation: float = 0.3,
+                 frame_cost: float = 0.03, check_cost: float = 0.2, size=(480, 240)):
+        self.clock = clock
+        self.change_at = change_at
+        self.animation = animation
+        self.frame_cost = frame_cost
+        self.check_cost = check_cost
+        self.size = size
+        self.frames = 0
+        self.checks = 0
+
+    @property
+    def ready_at(self) -> float:
+        return self.change_at + self.animation
+
+    def screen(self, t: float) -> np.ndarray:
+        height, width = self.size
+        pixels = np.full((height, width, 3), 240, dtype=np.uint8)
+        pixels[:40] = 30  # 状态栏
+        if t >= self.ready_at:
+            pixels[200:280, 40:200] = (20, 120, 220)  # 目标按钮
+        elif t >= self.change_at:
+            # 进度条随时间推进
+            progress = int((t - self.change_at) / self.animation * width)
+            pixels[120:140, :progress] = 90
+        return pixels
+
+    async def capture(self) -> np.ndarray:
+        self.frames += 1
+        await self.clock.sleep(self.frame_cost)
+        return self.screen(self.clock())
+
+    async def elements(self) -> List[Dict[str, Any]]:
+        self.checks += 1
+        await self.clock.sleep(self.check_cost)
+        return [{'id': 'login_button'}] if self.clock() >= self.ready_at else []
+
+
+class SimulatedWaitTool(WaitTool):
+    """条件检查读取模拟设备当前的元素列表"""
+
+    def __init__(self, device: SimulatedDevice, **kwargs):
+        super().__init__(**kwargs)
+        self.device = device
+
+    async def _check_condition(self, condition: str, context: Optional[Dict[str, Any]]) -> bool:
+        elements = await self.device.elements()
+        return await super()._check_condition(condition, {**(context or {}), 'elements': elements})
+
+
+def make_tool(device: SimulatedDevice, config: Optional[FrameWaitConfig] = None) -> SimulatedWaitTool:
+    return SimulatedWaitTool(device, waiter=FrameWaiter(config, clock=device.clock, sleep=device.clock.sleep))
+
+
+def test_detector_events():
+    detector = FrameChangeDetector(FrameWaitConfig(settle_frames=2))
+    device = SimulatedDevice(VirtualClock(), change_at=1.0)
+    events = [detector.feed(detector.reduce(device.screen(t))) for t in (0.0, 0.1, 0.2, 1.1, 1.2, 1.3, 1.4, 1.5)]
+    assert events == [None, None, EVENT_STABLE, EVENT_CHANGED, EVENT_CHANGED, EVENT_CHANGED, None, EVENT_STABLE]
+
+    # 小于阈值的噪声不算变化；分辨率变化算变化
+    noisy = device.screen(1.5).astype(np.int16) + np.random.default_rng(0).integers(-4, 5, (480, 240, 3))
+    assert detector.feed(detector.reduce(noisy.clip(0, 255).astype(np.uint8))) is None
+    assert detector.feed(detector.reduce(np.zeros((240, 480, 3), dtype=np.uint8))) == EVENT_CHANGED
+
+
+def test_detector_sees_small_text():
+    """全尺寸屏幕上出现 20 像素的“OK”也算变化，无论落在分块的什么位置"""
+    from PIL import Image, ImageDraw, ImageFont
+    font = ImageFont.load_default(size=20)
+    blank = Image.new('RGB', (1080, 2400), (240, 240, 240))
+    for offset in range(0, 16, 3):
+        detector = FrameChangeDetector(FrameWaitConfig())
+        detector.feed(detector.reduce(np.asarray(blank)))
+        screen = blank.copy()
+        ImageDraw.Draw(screen).text((500 + offset, 1000 + offset), "OK", fill=(60, 60, 60), font=font)
+        assert detector.feed(detector.reduce(np.asarray(screen))) == EVENT_CHANGED, offset
+
+
+@pytest.mark.asyncio
+async def test_checks_run_only_after_screen_changes():
+    clock = VirtualClock()
+    device = SimulatedDevice(clock, change_at=3.0)
+    tool = make_tool(device)
+    result = await tool.execute_gui_tool(
+        ToolParameters(target="element_login_button", timeout=10),
+        {'frame_source': device.capture}
+    )
+    stats = result.result_data['wait_stats']
+    assert result.success and stats['mode'] == 'frames'
+    # 初始检查、静止期间约每 0.5 秒的兜底复查，以及动画结束稳定后立即检查一次（固定轮询需要 6 次）
+    assert stats['checks'] == device.checks == 5
+    assert clock.now - device.ready_at < 0.5
+    # 静止阶段抽帧间隔退避到上限，3 秒内只抽取少量帧
+    assert device.frames < 30
+
+    # 超时：屏幕一直不变时只做初始检查和兜底复查（固定轮询需要 18 次）
+    clock.now = 0.0
+    idle = SimulatedDevice(clock, change_at=100.0)
+    result = await make_tool(idle).execute_gui_tool(
+        ToolParameters(target="element_login_button", timeout=12), {'frame_source': idle.capture}
+    )
+    assert not result.success and idle.checks == 13
+    assert result.result_data['wait_value'] == pytest.approx(12.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_frame_conditions_and_polling_fallback():
+    clock = VirtualClock()
+    device = SimulatedDevice(clock, change_at=1.0)
+    tool = make_tool(device)
+
+    changed = await tool.execute_gui_tool(ToolParameters(target="screen_changed", timeout=5),
+                                          {'frame_source': device.capture})
+    assert changed.success and 1.0 <= clock.now < 1.2 and device.checks == 0
+    stable = await tool.execute_gui_tool(ToolParameters(target="screen_stable", timeout=5),
+                                         {'frame_source': device.capture})
+    assert stable.success and device.ready_at <= clock.now < device.ready_at + 0.3
+    assert not (await tool.execute_gui_tool(ToolParameters(target="screen_stable", timeout=1))).success
+
+    # 没有帧源时按 0.5 秒轮询；帧源出错时同样回退
+    clock.now = 0.0
+    polled = SimulatedDevice(clock, change_at=1.0)
+    result = await make_tool(polled).execute_gui_tool(ToolParameters(target="element_login_button", timeout=5))
+    assert result.success and result.result_data['wait_stats']['mode'] == 'polling' and polled.checks == 3
+
+    async def broken():
+        raise RuntimeError("device offline")
+
+    clock.now = 0.0
+    result = await make_tool(polled).execute_gui_tool(
+        ToolParameters(target="element_login_button", timeout=5), {'frame_source': broken}
+    )
+    assert result.success and clock.now >= polled.ready_at and result.result_data['wait_stats']['mode'] == 'polling'
+
+
+@pytest.mark.asyncio
+async def test_real_clock_wait():
+    """真实时钟下 WaitTool 默认配置可用（包括同步帧源）"""
+    device = SimulatedDevice(VirtualClock(), change_at=0.0, animation=0.0)
+    tool = WaitTool()
+    result = await tool.execute_gui_tool(ToolParameters(target="screen_stable", timeout=2),
+                                         {'frame_source': lambda: device.screen(1.0)})
+    assert result.success and result.result_data['wait_stats']['frames'] == 3
+    result = await tool.execute_gui_tool(ToolParameters(target="text_hello", timeout=0.2), {'page_text': "Hello"})
+    assert result.success and result.result_data['wait_stats']['checks'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stuck_frame_source_does_not_overrun_timeout():
+    """帧源卡住（adb 无响应）时等待在超时时返回"""
+    captured = 0
+
+    async def stuck():
+        nonlocal captured
+        captured += 1
+        if captured > 1:
+            await asyncio.sleep(30)
+        return np.zeros((64, 32, 3), dtype=np.uint8)
+
+    loop = asyncio.get_running_loop()
+    for target in ("screen_changed", "element_login_button"):
+        captured = 0
+        start = loop.time()
+        result = await WaitTool().execute_gui_tool(ToolParameters(target=target, timeout=0.3),
+                                                   {'frame_source': stuck, 'elements': []})
+        assert not result.success and loop.time() - start < 1.0
+        assert result.result_data['wait_stats']['frames'] == 1
+
+
+def benchmark(waits: int = 200, seed: int = 7) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    scenarios = [(rng.uniform(0.5, 8.0), rng.uniform(0.1, 0.8)) for _ in range(waits)]
+    stats = {}
+    for name, frame_stream in (('polling', False), ('frames', True)):
+        overshoot, checks, frames = [], [], []
+        for change_at, animation in scenarios:
+            clock = VirtualClock()
+            device = SimulatedDevice(clock, change_at, animation)
+            tool = make_tool(device)
+            context = {'frame_source': device.capture} if frame_stream else None
+            result = asyncio.run(tool.execute_gui_tool(
+                ToolParameters(target="element_login_button", timeout=30), context
+            ))
+            assert result.success
+            overshoot.append(clock.now - device.ready_at)
+            checks.append(device.checks)
+            frames.append(device.frames)
+        stats[name] = {
+            'overshoot': float(np.mean(overshoot)),
+            'overshoot_p95': float(np.percentile(overshoot, 95)),
+            'checks': float(np.mean(checks)),
+            'frames': float(np.mean(frames))
+        }
+    return stats
+
+
+def test_frame_wait_reduces_overshoot_and_checks():
+    stats = benchmark(waits=40)
+    assert stats['frames']['overshoot'] < stats['polling']['overshoot']
+    assert stats['frames']['checks'] < stats['polling']['checks']
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    stats = benchmark()
+    print("200 simulated waits (condition after 0.5-8s + 0.1-0.8s animation; frame 30ms, check 200ms)")
+    for name, label in (('polling', "fixed 0.5s polling"), ('frames', "frame-diff driven")):
+        s = stats[name]
+        print(f"  {label:20s} overshoot avg {s['overshoot'] * 1000:6.0f}ms p95 {s['overshoot_p95'] * 1000:6.0f}ms, "
+              f"checks/wait {s['checks']:5.1f}, frames/wait {s['frames']:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,87 @@ from .tool_adapters import (
     AdaptedGUITool
 )
 
+# 导入ADB会话池
+from .adb_session import (
+    AdbShellSession,
+    AdbSessionPool,
+    AdbSessionError
+)
+
+# 导入ADB共享执行核心
+from .adb_runtime import (
+    AdbRuntime,
+    get_adb_runtime
+)
+
+# 导入设备注册表
+from .device_registry import (
+    DeviceRegistry,
+    get_device_registry
+)
+
+# 导入多设备适配器池
+from .device_pool import (
+    DevicePool,
+    DevicePoolError
+)
+
+# 导入截图帧缓冲
+from .frame_buffer import (
+    Frame,
+    FrameBuffer,
+    capture_frame,
+    get_frame_buffer
+)
+
+# 导入图像差异比较
+from .image_diff import (
+    ChangedRegion,
+    ImageDiff,
+    compare_images
+)
+
+# 导入帧驱动等待
+from .frame_wait import (
+    FrameWaitConfig,
+    FrameWaiter,
+    WaitOutcome
+)
+
+# 导入滚动拼接
+from .scroll_stitch import (
+    ScrollSession,
+    estimate_scroll_offset
+)
+
+# 导入分位数草图
+from .quantile_sketch import (
+    DDSketch,
+    merge_sketches
+)
+
+# 导入结果缓存
+from .result_cache import (
+    CachePolicy,
+    ResultCache,
+    stable_digest
+)
+
+# 导入屏幕缓存
+from .screen_cache import (
+    ScreenCache,
+    ScreenCacheEntry,
+    get_screen_cache
+)
+
+# 导入UI层次结构解析
+from .ui_hierarchy import (
+    UIElement,
+    UIHierarchy,
+    UIHierarchyParser,
+    parse_ui_dump
+)
+
 # 导入工具执行器
 from .tool_executor import (
     ToolExecutor,
@@ -85,7 +166,8 @@ from .tool_validator import (
     ToolValidator,
     ValidationReport,
     ValidationResult,
-    ValidationIssue
+    ValidationIssue,
+    CompiledValidationPlan
 )
 
 # 导入工具监控器
@@ -93,7 +175,8 @@ from .tool_monitor import (
     ToolMonitor,
     PerformanceMetric,
     MonitorEvent,
-    Alert
+    Alert,
+    SlidingWindow
 )
 
 __all__ = [
@@ -141,6 +224,39 @@ __all__ = [
     'DesktopAdapter',
     'AdapterFactory',
     'AdaptedGUITool',
+    'AdbShellSession',
+    'AdbSessionPool',
+    'AdbSessionError',
+    'AdbRuntime',
+    'get_adb_runtime',
+    'DeviceRegistry',
+    'get_device_registry',
+    'DevicePool',
+    'DevicePoolError',
+    'Frame',
+    'FrameBuffer',
+    'capture_frame',
+    'get_frame_buffer',
+    'ChangedRegion',
+    'ImageDiff',
+    'compare_images',
+    'FrameWaitConfig',
+    'FrameWaiter',
+    'WaitOutcome',
+    'ScrollSession',
+    'estimate_scroll_offset',
+    'DDSketch',
+    'merge_sketches',
+    'CachePolicy',
+    'ResultCache',
+    'stable_digest',
+    'ScreenCache',
+    'ScreenCacheEntry',
+    'get_screen_cache',
+    'UIElement',
+    'UIHierarchy',
+    'UIHierarchyParser',
+    'parse_ui_dump',
     
     # 执行器
     'ToolExecutor',
@@ -154,9 +270,11 @@ __all__ = [
     'ValidationReport',
     'ValidationResult',
     'ValidationIssue',
+    'CompiledValidationPlan',
     
     # 监控器
     'ToolMonitor',
+    'SlidingWindow',
     'PerformanceMetric',
     'MonitorEvent',
     'Alert'
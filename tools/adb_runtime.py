@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker ADB Runtime
+ADB工具的共享执行核心：一个常驻后台事件循环，承载 adb shell 会话池和一次性 adb 进程
+
+原有 ADB 工具的同步入口每次调用都新建线程和事件循环（ThreadPoolExecutor + asyncio.run），
+异步入口内部又是阻塞的 subprocess.run，调用方的事件循环在命令执行期间完全停住。
+这里每个 adb 路径只维护一个后台线程及其事件循环：
+
+- 异步调用方：命令以协程提交到后台循环，调用方通过 asyncio.wrap_future 等待，自身的循环不被阻塞；
+  调用方本身就在后台循环上时直接执行
+- 同步调用方：asyncio.run_coroutine_threadsafe 提交后阻塞等待结果，不再创建线程和事件循环
+- shell 命令走常驻会话池（asyncio 同步原语与事件循环绑定，会话池只能属于一个循环，
+  这也是所有调用统一落到后台循环的原因）；pull 等其他命令用 asyncio.create_subprocess_exec，
+  并限制同时运行的进程数，大量并发操作在会话池和进程槽上排队，而不是各占一个线程；
+  exec-out 截图同样占用进程槽
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import atexit
+import threading
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .adb_session import AdbSessionPool
+from .device_registry import get_device_registry
+from .frame_buffer import Frame, capture_frame
+
+
+class AdbRuntime:
+    """ADB命令的共享执行核心"""
+
+    def __init__(
+        self,
+        adb_path: str = "adb",
+        max_sessions_per_device: int = 2,
+        max_processes: int = 4,
+        startup_timeout: float = 5.0
+    ):
+        self.adb_path = adb_path
+        self.max_sessions_per_device = max_sessions_per_device
+        self.max_processes = max_processes
+        self.startup_timeout = startup_timeout
+
+        self.session_pool: Optional[AdbSessionPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._process_slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'commands': 0,
+            'session_commands': 0,
+            'process_commands': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'frame_captures': 0,
+            'sync_calls': 0,
+            'loop_starts': 0
+        }
+
+    # ------------------------------------------------------------------
+    # 后台事件循环
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环，首次使用时启动"""
+        loop = self._loop
+        if loop is not None:
+            return loop
+        with self._lock:
+            if self._loop is None:
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        # 会话池和进程槽只在后台循环上使用
+        self.session_pool = AdbSessionPool(self.adb_path, max_sessions_per_device=self.max_sessions_per_device)
+        self._process_slots = asyncio.Semaphore(self.max_processes)
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name=f"adb-runtime[{self.adb_path}]", daemon=True)
+        thread.start()
+        if not ready.wait(self.startup_timeout):
+            raise RuntimeError("ADB runtime event loop failed to start")
+        self._loop, self._thread = loop, thread
+        self.stats['loop_starts'] += 1
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def in_runtime_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """同步调用方：在后台循环上执行协程并阻塞等待结果"""
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("run_sync cannot be called from the ADB runtime loop, await the coroutine instead")
+        self.stats['sync_calls'] += 1
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def run(self, coro: Coroutine) -> Any:
+        """异步调用方：在后台循环上执行协程，调用方的循环在等待期间照常运行"""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    # ------------------------------------------------------------------
+    # 命令执行
+
+    async def execute(self, command: List[str], timeout: float = 10.0) -> Tuple[bool, str]:
+        """执行ADB命令（可带 adb 可执行文件前缀和 -s 序列号），返回 (是否成功, 输出)
+
+        成功时输出为 stdout；失败时为错误信息。命令失败可能是设备断开，失败后使设备注册表缓存失效。
+        """
+        success, output = await self.run(self._execute(command, timeout))
+        if not success:
+            self.stats['failures'] += 1
+            get_device_registry(self.adb_path).invalidate()
+        return success, output
+
+    async def _execute(self, command: List[str], timeout: float) -> Tuple[bool, str]:
+        args = list(command)
+        if args and args[0] in ("adb", self.adb_path):
+            args = args[1:]
+        device_id = None
+        if len(args) >= 2 and args[0] == '-s':
+            device_id, args = args[1], args[2:]
+        self.stats['commands'] += 1
+
+        # 常驻会话按行分隔命令，多行命令（如含换行的 input text）交给一次性进程
+        if len(args) > 1 and args[0] == 'shell' and not any('\n' in arg for arg in args[1:]):
+            self.stats['session_commands'] += 1
+            result = await self.session_pool.run(device_id, ' '.join(args[1:]), timeout)
+            return result['success'], result['output'] if result['success'] else result['error']
+        return await self._spawn(device_id, args, timeout)
+
+    async def _spawn(self, device_id: Optional[str], args: List[str], timeout: float) -> Tuple[bool, str]:
+        """一次性 adb 进程（pull/push/install 等）"""
+        cmd = [self.adb_path, *(['-s', device_id] if device_id else []), *args]
+        self.stats['process_commands'] += 1
+        async with self._process_slots:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                )
+            except Exception as e:
+                return False, f"ADB命令执行失败: {e}"
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                return False, "ADB命令执行超时"
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+        success = process.returncode == 0
+        output = stdout if success else stderr
+        return success, output.decode('utf-8', errors='replace')
+
+    async def capture_frame(self, device_id: Optional[str] = None, raw: bool = True,
+                            timeout: float = 15.0) -> Frame:
+        """exec-out 截图到内存并发布到共享帧缓冲；与其他一次性 adb 进程一起在进程槽上排队
+
+        截图失败可能是设备断开，失败后使设备注册表缓存失效。
+        """
+        try:
+            return await self.run(self._capture_frame(device_id, raw, timeout))
+        except Exception:
+            self.stats['failures'] += 1
+            get_device_registry(self.adb_path).invalidate()
+            raise
+
+    async def _capture_frame(self, device_id: Optional[str], raw: bool, timeout: float) -> Frame:
+        self.stats['frame_captures'] += 1
+        async with self._process_slots:
+            return await capture_frame(self.adb_path, device_id, raw, timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # 生命周期
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """关闭会话并停止后台循环；之后再次使用时重新启动"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            if self.in_runtime_thread():
+                raise RuntimeError("ADB runtime cannot be stopped from its own loop")
+            try:
+                asyncio.run_coroutine_threadsafe(self.session_pool.close(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Failed to close ADB shell sessions: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._loop = self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'running': self.running,
+            'sessions': self.session_pool.get_stats() if self.session_pool is not None else {}
+        }
+
+
+_runtimes: Dict[str, AdbRuntime] = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_adb_runtime(adb_path: str = "adb") -> AdbRuntime:
+    """获取共享的ADB执行核心，同一 adb 路径只维护一个后台循环"""
+    with _runtimes_lock:
+        runtime = _runtimes.get(adb_path)
+        if runtime is None:
+            runtime = _runtimes[adb_path] = AdbRuntime(adb_path)
+        return runtime
+
+
+@atexit.register
+def _stop_runtimes() -> None:
+    for runtime in list(_runtimes.values()):
+        runtime.stop()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker ADB Shell Session Pool
+ADB常驻Shell会话池：复用长期运行的 adb shell 进程执行设备命令，避免每次操作都启动新的 adb 进程
+
+每条命令通过 stdin 写入会话，命令结束后输出带唯一哨兵的结束行（包含退出码），
+按哨兵切分 stdout 即可得到该命令的输出。会话按设备分池管理，空闲过久时先做健康检查，
+进程退出或命令失败时丢弃会话，下次获取时自动重建。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import os
+import signal
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class AdbSessionError(Exception):
+    """ADB会话错误
+
+    sent 表示命令是否已写入会话；未写入时可以安全地换一个会话重试。
+    """
+
+    def __init__(self, message: str, sent: bool = True):
+        super().__init__(message)
+        self.sent = sent
+
+
+class AdbShellSession:
+    """单个常驻 adb shell 会话"""
+
+    # 单条命令输出的最大缓冲，uiautomator dump 等命令的输出可能较大
+    STREAM_LIMIT = 16 * 1024 * 1024
+
+    def __init__(self, adb_path: str = "adb", device_id: Optional[str] = None):
+        self.adb_path = adb_path
+        self.device_id = device_id
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.commands_run = 0
+        self.last_used = time.monotonic()
+        self._token = uuid.uuid4().hex[:12]
+        self._seq = 0
+
+    async def start(self) -> None:
+        """启动 adb shell 进程"""
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd.extend(['-s', self.device_id])
+        cmd.append('shell')
+        self.process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=self.STREAM_LIMIT,
+            # 独立进程组，强制关闭时连同会话内仍在运行的命令一起结束
+            start_new_session=True
+        )
+        self.last_used = time.monotonic()
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and not self.process.stdout.at_eof()
+        )
+
+    @property
+    def idle_time(self) -> float:
+        return time.monotonic() - self.last_used
+
+    async def execute(self, command: str, timeout: float = 30.0) -> Tuple[int, str]:
+        """执行一条shell命令，返回 (退出码, 合并后的stdout/stderr输出)"""
+        if '\n' in command:
+            raise ValueError("Shell session commands must be a single line")
+        if not self.is_alive:
+            raise AdbSessionError("ADB shell session is not running", sent=False)
+
+        self._seq += 1
+        marker = f"__ADB_SESSION_{self._token}_{self._seq}__:"
+        # 重定向 stdin 防止命令读走后续命令；printf 前的换行保证哨兵独占一行
+        line = f"{command} </dev/null 2>&1; printf '\\n{marker}%d\\n' $?\n"
+
+        try:
+            self.process.stdin.write(line.encode('utf-8'))
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            await self.close()
+            raise AdbSessionError(f"ADB shell session closed: {e}", sent=False)
+
+        try:
+            return_code, output = await asyncio.wait_for(self._read_response(marker), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise AdbSessionError(f"ADB shell command timed out after {timeout}s: {command}")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionResetError, ValueError) as e:
+            await self.close()
+            raise AdbSessionError(f"ADB shell session broken: {e!r}")
+
+        self.commands_run += 1
+        self.last_used = time.monotonic()
+        return return_code, output
+
+    async def _read_response(self, marker: str) -> Tuple[int, str]:
+        separator = f"\n{marker}".encode('utf-8')
+        data = await self.process.stdout.readuntil(separator)
+        return_code = int((await self.process.stdout.readline()).strip())
+        return return_code, data[:-len(separator)].decode('utf-8', errors='replace')
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """健康检查"""
+        try:
+            return_code, output = await self.execute('echo ping', timeout=timeout)
+            return return_code == 0 and output.strip() == 'ping'
+        except AdbSessionError:
+            return False
+
+    async def close(self) -> None:
+        """关闭会话，进程未及时退出时强制结束"""
+        process = self.process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.stdin.close()
+            await asyncio.wait_for(process.wait(), timeout=1.0)
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+            pass
+        if process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                process.kill()
+            await process.wait()
+
+
+class AdbSessionPool:
+    """按设备分池的 adb shell 会话池"""
+
+    def __init__(
+        self,
+        adb_path: str = "adb",
+        max_sessions_per_device: int = 2,
+        command_timeout: float = 30.0,
+        health_check_interval: float = 30.0
+    ):
+        self.adb_path = adb_path
+        self.max_sessions_per_device = max_sessions_per_device
+        self.command_timeout = command_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle: Dict[str, List[AdbShellSession]] = {}
+        self._size: Dict[str, int] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self.stats = {
+            'commands': 0,
+            'command_failures': 0,
+            'retries': 0,
+            'sessions_started': 0,
+            'sessions_discarded': 0,
+            'health_checks': 0,
+            'health_check_failures': 0
+        }
+
+    async def run(self, device_id: Optional[str], command: str,
+                  timeout: Optional[float] = None) -> Dict[str, Any]:
+        """在设备的会话上执行shell命令，返回与 adb 进程调用相同格式的结果（不抛出异常）
+
+        会话按行分隔命令，多行命令直接返回失败，应改用一次性 adb 进程执行。
+        """
+        if '\n' in command:
+            self.stats['command_failures'] += 1
+            return {'success': False, 'output': '', 'error': "Shell session commands must be a single line",
+                    'return_code': -1}
+        key = device_id or ""
+        for attempt in range(2):
+            try:
+                session = await self._acquire(key, device_id)
+            except Exception as e:
+                return {'success': False, 'output': '', 'error': f"Failed to start adb shell: {e}", 'return_code': -1}
+            try:
+                return_code, output = await session.execute(command, timeout or self.command_timeout)
+                self.stats['commands'] += 1
+                return {
+                    'success': return_code == 0,
+                    'output': output,
+                    'error': output if return_code != 0 else '',
+                    'return_code': return_code
+                }
+            except AdbSessionError as e:
+                self.stats['command_failures'] += 1
+                # 命令未发出时换一个新会话重试一次；已发出的命令可能已生效，不自动重试
+                if e.sent or attempt:
+                    logger.warning(f"ADB shell command failed on {key or 'default device'}: {e}")
+                    return {'success': False, 'output': '', 'error': str(e), 'return_code': -1}
+                self.stats['retries'] += 1
+            finally:
+                await self._release(key, session)
+
+    async def _acquire(self, key: str, device_id: Optional[str]) -> AdbShellSession:
+        condition = self._conditions.setdefault(key, asyncio.Condition())
+        while True:
+            session = None
+            async with condition:
+                while True:
+                    idle = self._idle.setdefault(key, [])
+                    while idle and session is None:
+                        candidate = idle.pop()
+                        if candidate.is_alive:
+                            session = candidate
+                        else:
+                            self._discard(key)
+                    if session is not None:
+                        break
+                    if self._size.get(key, 0) < self.max_sessions_per_device:
+                        self._size[key] = self._size.get(key, 0) + 1
+                        break
+                    await condition.wait()
+
+            if session is None:
+                return await self._spawn(key, device_id)
+
+            if session.idle_time < self.health_check_interval:
+                return session
+            self.stats['health_checks'] += 1
+            if await session.ping():
+                return session
+            self.stats['health_check_failures'] += 1
+            logger.warning(f"ADB shell session for {key or 'default device'} failed health check, respawning")
+            await session.close()
+            await self._release(key, session)
+
+    async def _spawn(self, key: str, device_id: Optional[str]) -> AdbShellSession:
+        session = AdbShellSession(self.adb_path, device_id)
+        try:
+            await session.start()
+        except Exception:
+            async with self._conditions[key]:
+                self._size[key] -= 1
+                self._conditions[key].notify()
+            raise
+        self.stats['sessions_started'] += 1
+        return session
+
+    async def _release(self, key: str, session: AdbShellSession) -> None:
+        condition = self._conditions[key]
+        async with condition:
+            if session.is_alive:
+                self._idle.setdefault(key, []).append(session)
+            else:
+                self._discard(key)
+            condition.notify()
+
+    def _discard(self, key: str) -> None:
+        self._size[key] -= 1
+        self.stats['sessions_discarded'] += 1
+
+    async def close_device(self, device_id: Optional[str]) -> None:
+        """关闭指定设备的空闲会话"""
+        key = device_id or ""
+        condition = self._conditions.get(key)
+        if condition is None:
+            return
+        async with condition:
+            sessions = self._idle.pop(key, [])
+            self._size[key] -= len(sessions)
+            condition.notify_all()
+        for session in sessions:
+            await session.close()
+
+    async def close(self) -> None:
+        """关闭所有设备的空闲会话"""
+        for key in list(self._conditions):
+            await self.close_device(key or None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取会话池统计"""
+        return {
+            **self.stats,
+            'devices': {
+                key or 'default': {'sessions': size, 'idle': len(self._idle.get(key, []))}
+                for key, size in self._size.items()
+            }
+        }
@@ -4,21 +4,26 @@
 ADB工具模块 - 真实的Android设备操作
 
 提供真实的ADB命令执行，包括点击、滑动、输入等操作
+
+命令统一交给共享的 ADB 执行核心（tools/adb_runtime.py）：异步调用不阻塞调用方的事件循环，
+同步调用不再为每次操作创建线程和事件循环。
 """
 
 import asyncio
-import subprocess
 from loguru import logger
-from typing import Dict, Any, Optional, Tuple
+from typing import ClassVar, Coroutine, Dict, Any, Optional, Tuple
 from agenticx.core.tool import BaseTool
 from utils import get_iso_timestamp
+from .adb_runtime import get_adb_runtime
+from .device_registry import get_device_registry
+from .frame_buffer import get_frame_buffer
 
 
-class ADBClickTool(BaseTool):
-    """ADB点击工具 - 真实设备操作"""
+class ADBToolBase(BaseTool):
+    """ADB工具基类 - 设备连接检查与命令执行"""
     
-    name: str = "adb_click"
-    description: str = "使用ADB执行真实的设备点击操作"
+    # 单条ADB命令的超时（秒）
+    command_timeout: ClassVar[float] = 10.0
     
     def __init__(self):
         super().__init__()
@@ -26,62 +31,38 @@ class ADBClickTool(BaseTool):
         object.__setattr__(self, 'logger', logger)
     
     def _check_adb_connection(self) -> bool:
-        """检查ADB连接状态"""
-        try:
-            result = subprocess.run(
-                ["adb", "devices"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            if result.returncode == 0:
-                devices = result.stdout.strip().split('\n')[1:]  # 跳过标题行
-                connected_devices = [line for line in devices if line.strip() and 'device' in line]
-                return len(connected_devices) > 0
-            return False
-        except Exception as e:
-            logger.error(f"检查ADB连接失败: {e}")
-            return False
+        """检查ADB连接状态（查询共享设备注册表，不再每次启动 adb devices）"""
+        return get_device_registry().is_connected()
     
-    def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
-        """执行ADB命令"""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            success = result.returncode == 0
-            output = result.stdout if success else result.stderr
-            return success, output
-        except subprocess.TimeoutExpired:
-            return False, "ADB命令执行超时"
-        except Exception as e:
-            return False, f"ADB命令执行失败: {e}"
+    async def _acheck_adb_connection(self) -> bool:
+        """异步检查ADB连接状态：注册表需要等待首次快照或探测时不阻塞调用方的事件循环"""
+        return await get_device_registry().ais_connected()
+    
+    async def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
+        """执行ADB命令（shell 命令复用常驻会话），失败时设备注册表缓存失效"""
+        return await get_adb_runtime().execute(command, self.command_timeout)
+    
+    def _run_sync(self, coro: Coroutine) -> Dict[str, Any]:
+        """同步入口：在共享的后台事件循环上执行，不再每次调用创建线程和事件循环"""
+        return get_adb_runtime().run_sync(coro)
+
+
+class ADBClickTool(ADBToolBase):
+    """ADB点击工具 - 真实设备操作"""
+    
+    name: str = "adb_click"
+    description: str = "使用ADB执行真实的设备点击操作"
     
     def execute(self, coordinates: Dict[str, int], **kwargs) -> Dict[str, Any]:
         """同步执行点击"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建一个任务
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.aexecute(coordinates, **kwargs))
-                    return future.result()
-            else:
-                return asyncio.run(self.aexecute(coordinates, **kwargs))
-        except RuntimeError:
-            # 如果没有事件循环，直接运行
-            return asyncio.run(self.aexecute(coordinates, **kwargs))
+        return self._run_sync(self.aexecute(coordinates, **kwargs))
     
     async def aexecute(self, coordinates: Dict[str, int], **kwargs) -> Dict[str, Any]:
         """异步执行点击操作"""
         x, y = coordinates["x"], coordinates["y"]
         
         # 检查ADB连接
-        if not self._check_adb_connection():
+        if not await self._acheck_adb_connection():
             logger.warning("ADB设备未连接，使用模拟操作")
             await asyncio.sleep(0.5)
             return {
@@ -94,7 +75,7 @@ class ADBClickTool(BaseTool):
         
         # 执行真实的ADB点击
         command = ["adb", "shell", "input", "tap", str(x), str(y)]
-        success, output = self._execute_adb_command(command)
+        success, output = await self._execute_adb_command(command)
         
         if success:
             logger.info(f"ADB点击成功: ({x}, {y})")
@@ -118,52 +99,12 @@ class ADBClickTool(BaseTool):
             }
 
 
-class ADBSwipeTool(BaseTool):
+class ADBSwipeTool(ADBToolBase):
     """ADB滑动工具 - 真实设备操作"""
     
     name: str = "adb_swipe"
     description: str = "使用ADB执行真实的设备滑动操作"
     
-    def __init__(self):
-        super().__init__()
-        # 使用对象属性而不是字段
-        object.__setattr__(self, 'logger', logger)
-    
-    def _check_adb_connection(self) -> bool:
-        """检查ADB连接状态"""
-        try:
-            result = subprocess.run(
-                ["adb", "devices"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            if result.returncode == 0:
-                devices = result.stdout.strip().split('\n')[1:]
-                connected_devices = [line for line in devices if line.strip() and 'device' in line]
-                return len(connected_devices) > 0
-            return False
-        except Exception as e:
-            logger.error(f"检查ADB连接失败: {e}")
-            return False
-    
-    def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
-        """执行ADB命令"""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            success = result.returncode == 0
-            output = result.stdout if success else result.stderr
-            return success, output
-        except subprocess.TimeoutExpired:
-            return False, "ADB命令执行超时"
-        except Exception as e:
-            return False, f"ADB命令执行失败: {e}"
-    
     def execute(
         self,
         start_coordinates: Dict[str, int],
@@ -172,19 +113,7 @@ class ADBSwipeTool(BaseTool):
         **kwargs
     ) -> Dict[str, Any]:
         """同步执行滑动"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建一个任务
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.aexecute(start_coordinates, end_coordinates, duration, **kwargs))
-                    return future.result()
-            else:
-                return asyncio.run(self.aexecute(start_coordinates, end_coordinates, duration, **kwargs))
-        except RuntimeError:
-            # 如果没有事件循环，直接运行
-            return asyncio.run(self.aexecute(start_coordinates, end_coordinates, duration, **kwargs))
+        return self._run_sync(self.aexecute(start_coordinates, end_coordinates, duration, **kwargs))
     
     async def aexecute(
         self,
@@ -199,7 +128,7 @@ class ADBSwipeTool(BaseTool):
         duration_ms = int(duration * 1000)  # 转换为毫秒
         
         # 检查ADB连接
-        if not self._check_adb_connection():
+        if not await self._acheck_adb_connection():
             logger.warning("ADB设备未连接，使用模拟操作")
             await asyncio.sleep(duration)
             return {
@@ -214,7 +143,7 @@ class ADBSwipeTool(BaseTool):
         
         # 执行真实的ADB滑动
         command = ["adb", "shell", "input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration_ms)]
-        success, output = self._execute_adb_command(command)
+        success, output = await self._execute_adb_command(command)
         
         if success:
             logger.info(f"ADB滑动成功: ({x1}, {y1}) -> ({x2}, {y2})")
@@ -242,72 +171,20 @@ class ADBSwipeTool(BaseTool):
             }
 
 
-class ADBInputTool(BaseTool):
+class ADBInputTool(ADBToolBase):
     """ADB输入工具 - 真实设备操作"""
     
     name: str = "adb_input"
     description: str = "使用ADB执行真实的设备文本输入操作"
     
-    def __init__(self):
-        super().__init__()
-        # 使用对象属性而不是字段
-        object.__setattr__(self, 'logger', logger)
-    
-    def _check_adb_connection(self) -> bool:
-        """检查ADB连接状态"""
-        try:
-            result = subprocess.run(
-                ["adb", "devices"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            if result.returncode == 0:
-                devices = result.stdout.strip().split('\n')[1:]
-                connected_devices = [line for line in devices if line.strip() and 'device' in line]
-                return len(connected_devices) > 0
-            return False
-        except Exception as e:
-            logger.error(f"检查ADB连接失败: {e}")
-            return False
-    
-    def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
-        """执行ADB命令"""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            success = result.returncode == 0
-            output = result.stdout if success else result.stderr
-            return success, output
-        except subprocess.TimeoutExpired:
-            return False, "ADB命令执行超时"
-        except Exception as e:
-            return False, f"ADB命令执行失败: {e}"
-    
     def execute(self, text: str, coordinates: Optional[Dict[str, int]] = None, **kwargs) -> Dict[str, Any]:
         """同步执行输入"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建一个任务
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.aexecute(text, coordinates, **kwargs))
-                    return future.result()
-            else:
-                return asyncio.run(self.aexecute(text, coordinates, **kwargs))
-        except RuntimeError:
-            # 如果没有事件循环，直接运行
-            return asyncio.run(self.aexecute(text, coordinates, **kwargs))
+        return self._run_sync(self.aexecute(text, coordinates, **kwargs))
     
     async def aexecute(self, text: str, coordinates: Optional[Dict[str, int]] = None, **kwargs) -> Dict[str, Any]:
         """异步执行输入操作"""
         # 检查ADB连接
-        if not self._check_adb_connection():
+        if not await self._acheck_adb_connection():
             logger.warning("ADB设备未连接，使用模拟操作")
             input_time = len(text) * 0.1
             await asyncio.sleep(input_time)
@@ -323,7 +200,7 @@ class ADBInputTool(BaseTool):
         # 如果提供了坐标，先点击该位置
         if coordinates:
             click_command = ["adb", "shell", "input", "tap", str(coordinates["x"]), str(coordinates["y"])]
-            click_success, click_output = self._execute_adb_command(click_command)
+            click_success, click_output = await self._execute_adb_command(click_command)
             if not click_success:
                 logger.error(f"ADB点击输入位置失败: {click_output}")
         
@@ -331,7 +208,7 @@ class ADBInputTool(BaseTool):
         # 注意：ADB input text 需要转义特殊字符
         escaped_text = text.replace(' ', '%s').replace('&', '\\&')
         command = ["adb", "shell", "input", "text", escaped_text]
-        success, output = self._execute_adb_command(command)
+        success, output = await self._execute_adb_command(command)
         
         if success:
             logger.info(f"ADB输入成功: {text}")
@@ -357,67 +234,16 @@ class ADBInputTool(BaseTool):
             }
 
 
-class ADBScreenshotTool(BaseTool):
+class ADBScreenshotTool(ADBToolBase):
     """ADB截图工具 - 真实设备操作"""
     
     name: str = "adb_screenshot"
     description: str = "使用ADB获取真实设备截图"
-    
-    def __init__(self):
-        super().__init__()
-        # 使用对象属性而不是字段
-        object.__setattr__(self, 'logger', logger)
-    
-    def _check_adb_connection(self) -> bool:
-        """检查ADB连接状态"""
-        try:
-            result = subprocess.run(
-                ["adb", "devices"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            if result.returncode == 0:
-                devices = result.stdout.strip().split('\n')[1:]
-                connected_devices = [line for line in devices if line.strip() and 'device' in line]
-                return len(connected_devices) > 0
-            return False
-        except Exception as e:
-            logger.error(f"检查ADB连接失败: {e}")
-            return False
-    
-    def _execute_adb_command(self, command: list) -> Tuple[bool, str]:
-        """执行ADB命令"""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-            success = result.returncode == 0
-            output = result.stdout if success else result.stderr
-            return success, output
-        except subprocess.TimeoutExpired:
-            return False, "ADB命令执行超时"
-        except Exception as e:
-            return False, f"ADB命令执行失败: {e}"
+    command_timeout: ClassVar[float] = 15.0
     
     def execute(self, save_path: str = None, **kwargs) -> Dict[str, Any]:
         """同步执行截图"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 如果事件循环正在运行，创建一个任务
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.aexecute(save_path, **kwargs))
-                    return future.result()
-            else:
-                return asyncio.run(self.aexecute(save_path, **kwargs))
-        except RuntimeError:
-            # 如果没有事件循环，直接运行
-            return asyncio.run(self.aexecute(save_path, **kwargs))
+        return self._run_sync(self.aexecute(save_path, **kwargs))
     
     async def aexecute(self, save_path: str = None, **kwargs) -> Dict[str, Any]:
         """异步执行截图操作"""
@@ -435,7 +261,7 @@ class ADBScreenshotTool(BaseTool):
             save_path = screenshots_dir / screenshot_filename
         
         # 检查ADB连接
-        if not self._check_adb_connection():
+        if not await self._acheck_adb_connection():
             logger.warning("ADB设备未连接，无法获取真实截图")
             return {
                 "success": False,
@@ -446,12 +272,29 @@ class ADBScreenshotTool(BaseTool):
                 "timestamp": get_iso_timestamp()
             }
         
+        # 优先通过 exec-out 将截图直接读入内存，一次 adb 调用完成截图和传输
+        try:
+            frame = await get_adb_runtime().capture_frame(raw=False, timeout=self.command_timeout)
+            await get_frame_buffer().persist(frame, str(save_path))
+            logger.info(f"ADB截图成功: {save_path}")
+            return {
+                "success": True,
+                "screenshot_path": str(save_path),
+                # 结果字典会被打印和发布到 InfoPool，只带帧序号；帧本身通过 get_frame_buffer().get_by_path 获取
+                "frame_sequence": frame.sequence,
+                "method": "adb",
+                "message": f"ADB截图成功: {save_path}",
+                "timestamp": get_iso_timestamp()
+            }
+        except Exception as e:
+            logger.debug(f"exec-out截图失败，改用设备文件方式: {e}")
+        
         # 执行ADB截图命令
         device_path = "/sdcard/screenshot.png"
         
         # 1. 在设备上截图
         screenshot_command = ["adb", "shell", "screencap", "-p", device_path]
-        success, output = self._execute_adb_command(screenshot_command)
+        success, output = await self._execute_adb_command(screenshot_command)
         
         if not success:
             logger.error(f"ADB设备截图失败: {output}")
@@ -466,12 +309,12 @@ class ADBScreenshotTool(BaseTool):
         
         # 2. 将截图拉取到本地
         pull_command = ["adb", "pull", device_path, str(save_path)]
-        success, output = self._execute_adb_command(pull_command)
+        success, output = await self._execute_adb_command(pull_command)
         
         if success:
             # 3. 清理设备上的临时文件
             cleanup_command = ["adb", "shell", "rm", device_path]
-            self._execute_adb_command(cleanup_command)
+            await self._execute_adb_command(cleanup_command)
             
             logger.info(f"ADB截图成功: {save_path}")
             return {
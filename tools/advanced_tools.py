@@ -30,10 +30,16 @@ except ImportError:
     cv2 = None
     np = None
 
+from loguru import logger
+
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
     Coordinate, Rectangle, Platform, ToolType, ToolStatus
 )
+from .image_diff import compare_images
+from .result_cache import CachePolicy
+from .screen_cache import get_screen_cache
+from .ui_hierarchy import UIHierarchy
 from utils import get_iso_timestamp, setup_logger
 
 
@@ -324,6 +330,9 @@ class ScreenshotTool(GUITool):
 class ElementDetectionTool(GUITool):
     """元素检测工具"""
     
+    # 只读查询：同一屏幕上的相同请求复用结果
+    cache_policy = CachePolicy.screen_query()
+    
     def __init__(self, **kwargs):
         super().__init__(
             name="ElementDetectionTool",
@@ -358,23 +367,32 @@ class ElementDetectionTool(GUITool):
         start_time = get_iso_timestamp()
         
         try:
-            # 获取当前屏幕截图
-            screenshot_path = await self._get_current_screenshot(context)
+            # 上下文提供了UI层次结构时直接查询索引，无需截图
+            hierarchy = context.get('ui_hierarchy') if context else None
+            screenshot_path = None
+            if hierarchy is None:
+                screenshot_path = await self._get_current_screenshot(context)
             
-            if not screenshot_path:
+            if hierarchy is None and not screenshot_path:
                 raise ToolError(
                     "Failed to get screenshot for element detection",
                     "SCREENSHOT_FAILED",
                     self.tool_id
                 )
             
-            # 执行元素检测
-            detected_elements = await self._detect_elements(
+            # 执行元素检测；基于截图的检测结果按屏幕缓存，视觉相同的屏幕不重复检测
+            detect = lambda: self._detect_elements(
                 screenshot_path,
                 target=parameters.target,
                 text=parameters.text,
                 context=context
             )
+            if hierarchy is None:
+                detected_elements = await get_screen_cache().aget_artifact(
+                    screenshot_path, f"elements:{parameters.target}:{parameters.text}", detect
+                )
+            else:
+                detected_elements = await detect()
             
             # 过滤和排序结果
             filtered_elements = self._filter_and_sort_elements(
@@ -449,6 +467,10 @@ class ElementDetectionTool(GUITool):
     ) -> List[Dict[str, Any]]:
         """检测屏幕上的UI元素"""
         try:
+            hierarchy = context.get('ui_hierarchy') if context else None
+            if hierarchy is not None:
+                return self._query_hierarchy(hierarchy, target, text)
+            
             elements = []
             
             # 这里应该集成实际的元素检测实现
@@ -519,6 +541,33 @@ class ElementDetectionTool(GUITool):
             logger.error(f"Error detecting elements: {e}")
             return []
     
+    def _query_hierarchy(
+        self,
+        hierarchy: UIHierarchy,
+        target: Optional[str],
+        text: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """通过UI层次结构的索引查找元素（resource-id、文本和内容描述）"""
+        if not target and not text:
+            matched = [e for e in hierarchy if e.area > 0 and (e.text or e.content_desc or e.clickable)]
+        else:
+            matched = []
+            if target:
+                matched.extend(hierarchy.find_by_resource_id(target))
+                matched.extend(hierarchy.find_by_text(target, exact=False))
+            if text:
+                matched.extend(hierarchy.find_by_text(text, exact=False))
+        
+        elements = []
+        seen = set()
+        for element in matched:
+            if element.index in seen:
+                continue
+            seen.add(element.index)
+            # 层次结构给出的是确定的元素位置
+            elements.append({**element.to_dict(), 'confidence': 1.0})
+        return elements
+    
     def _filter_and_sort_elements(
         self,
         elements: List[Dict[str, Any]],
@@ -552,6 +601,9 @@ class ElementDetectionTool(GUITool):
 class OCRTool(GUITool):
     """OCR文字识别工具"""
     
+    # 只读查询：同一屏幕上的相同请求复用结果
+    cache_policy = CachePolicy.screen_query(screen_params=('image_path',))
+    
     def __init__(self, **kwargs):
         super().__init__(
             name="OCRTool",
@@ -607,12 +659,11 @@ class OCRTool(GUITool):
             language = parameters.custom_params.get('language', 'en') if parameters.custom_params else 'en'
             region = parameters.custom_params.get('region') if parameters.custom_params else None
             
-            # 执行OCR识别
-            ocr_results = await self._perform_ocr(
+            # 执行OCR识别；视觉相同的屏幕直接使用缓存的识别结果
+            ocr_results = await get_screen_cache().aget_artifact(
                 image_path,
-                language=language,
-                region=region,
-                context=context
+                f"ocr:{language}:{json.dumps(region, sort_keys=True)}",
+                lambda: self._perform_ocr(image_path, language=language, region=region, context=context)
             )
             
             # 后处理OCR结果
@@ -782,6 +833,9 @@ class OCRTool(GUITool):
 class ImageComparisonTool(GUITool):
     """图像比较工具"""
     
+    # 只读查询：同一屏幕上的相同请求复用结果
+    cache_policy = CachePolicy.screen_query(screen_params=('reference_image', 'current_image'))
+    
     def __init__(self, **kwargs):
         super().__init__(
             name="ImageComparisonTool",
@@ -913,30 +967,27 @@ class ImageComparisonTool(GUITool):
                     self.tool_id
                 )
             
-            # 这里应该集成实际的图像比较实现
-            # 例如使用OpenCV、PIL、SSIM等
-            
-            comparison_results = {
-                'similarity_score': 0.85,  # 模拟相似度分数
-                'difference_percentage': 15.0,
-                'changed_regions': [
-                    {
-                        'bounds': {'left': 100, 'top': 200, 'right': 300, 'bottom': 250},
-                        'change_type': 'color_change',
-                        'confidence': 0.9
-                    }
-                ],
-                'comparison_method': params.get('method', 'pixel_diff'),
-                'threshold': params.get('threshold', 0.1),
-                'processing_time': 0.3
-            }
+            # 缩小后的SSIM、分块绝对差和变化区域提取，在线程池中执行避免阻塞事件循环
+            diff = await asyncio.to_thread(
+                compare_images,
+                reference_path,
+                current_path,
+                scale=params.get('scale', 4),
+                diff_threshold=params.get('diff_threshold', 12.0),
+                min_blocks=params.get('min_blocks', 1)
+            )
+            comparison_results = diff.to_dict()
+            comparison_results.update({
+                'comparison_method': params.get('method', 'ssim'),
+                'threshold': params.get('threshold', 0.1)
+            })
             
             # 根据阈值判断是否有显著变化
             threshold = params.get('threshold', 0.1)
             has_significant_change = comparison_results['difference_percentage'] / 100 > threshold
             
             comparison_results['has_significant_change'] = has_significant_change
-            comparison_results['change_detected'] = has_significant_change
+            comparison_results['change_detected'] = diff.changed
             
             return comparison_results
             
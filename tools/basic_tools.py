@@ -28,6 +28,12 @@ except ImportError:
     Image = None
     ImageDraw = None
 
+from loguru import logger
+
+from .frame_buffer import capture_frame
+from .frame_wait import (
+    WAIT_CHANGED, WAIT_CONDITION, WAIT_STABLE, FrameWaitConfig, FrameWaiter, WaitOutcome
+)
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, GUIToolError,
     Coordinate, Rectangle, Platform, ToolType, ToolStatus
@@ -1003,15 +1009,29 @@ class KeyPressTool(GUITool):
 
 
 class WaitTool(GUITool):
-    """等待工具"""
+    """等待工具
+
+    条件等待优先由帧流驱动：上下文提供 frame_source（返回一帧的同步或异步可调用对象），
+    或提供 device_id 时通过 exec-out screencap 抽帧；屏幕变化并稳定后才执行元素/文本检查。
+    两者都没有时退回固定间隔轮询。条件 screen_stable / screen_changed 直接由帧事件判定。
+    """
     
-    def __init__(self, **kwargs):
+    # 只由帧事件判定、不需要执行检查的条件
+    FRAME_CONDITIONS = {'screen_stable': WAIT_STABLE, 'screen_changed': WAIT_CHANGED}
+    
+    def __init__(
+        self,
+        wait_config: Optional[FrameWaitConfig] = None,
+        waiter: Optional[FrameWaiter] = None,
+        **kwargs
+    ):
         super().__init__(
             name="WaitTool",
             description="Wait for specified duration or condition",
             tool_type=ToolType.BASIC,
             **kwargs
         )
+        self.waiter = waiter or FrameWaiter(wait_config)
     
     async def validate_gui_parameters(
         self,
@@ -1053,13 +1073,14 @@ class WaitTool(GUITool):
                 wait_value = parameters.duration
             elif parameters.target:
                 # 条件等待
-                success, actual_wait_time = await self._wait_for_condition(
+                outcome = await self._wait_for_condition(
                     parameters.target,
                     timeout=parameters.timeout or 30.0,
                     context=context
                 )
+                success = outcome.success
                 wait_type = "condition"
-                wait_value = actual_wait_time
+                wait_value = outcome.elapsed
             else:
                 raise GUIToolError(
                     "No wait duration or condition specified",
@@ -1079,7 +1100,8 @@ class WaitTool(GUITool):
                 result_data={
                     'wait_type': wait_type,
                     'wait_value': wait_value,
-                    'condition': str(parameters.target) if parameters.target else None
+                    'condition': str(parameters.target) if parameters.target else None,
+                    'wait_stats': outcome.to_dict() if wait_type == "condition" else None
                 }
             )
             
@@ -1115,32 +1137,48 @@ class WaitTool(GUITool):
         condition: str,
         timeout: float,
         context: Optional[Dict[str, Any]]
-    ) -> Tuple[bool, float]:
-        """等待条件满足"""
-        start_time = time.time()
+    ) -> WaitOutcome:
+        """等待条件满足，返回包含实际等待时间和检查次数的结果"""
+        start_time = time.monotonic()
+        frame_source = self._resolve_frame_source(context)
+        until = self.FRAME_CONDITIONS.get(condition, WAIT_CONDITION)
+        if until != WAIT_CONDITION and frame_source is None:
+            raise GUIToolError(
+                f"Condition {condition} requires a frame source",
+                self.name,
+                "FRAME_SOURCE_REQUIRED"
+            )
+        
+        async def check() -> bool:
+            return await self._check_condition(condition, context)
         
         try:
             logger.info(f"Waiting for condition: {condition} (timeout: {timeout}s)")
-            
-            while time.time() - start_time < timeout:
-                # 检查条件是否满足
-                if await self._check_condition(condition, context):
-                    actual_wait_time = time.time() - start_time
-                    logger.info(f"Condition met after {actual_wait_time:.2f}s")
-                    return True, actual_wait_time
-                
-                # 短暂等待后重新检查
-                await asyncio.sleep(0.5)
-            
-            # 超时
-            actual_wait_time = time.time() - start_time
-            logger.warning(f"Condition not met after {actual_wait_time:.2f}s (timeout)")
-            return False, actual_wait_time
+            outcome = await self.waiter.wait(check, timeout, frame_source, until)
+            if outcome.success:
+                logger.info(f"Condition met after {outcome.elapsed:.2f}s "
+                            f"({outcome.checks} checks, {outcome.frames} frames)")
+            else:
+                logger.warning(f"Condition not met after {outcome.elapsed:.2f}s (timeout)")
+            return outcome
             
         except Exception as e:
-            actual_wait_time = time.time() - start_time
+            actual_wait_time = time.monotonic() - start_time
             logger.error(f"Error waiting for condition: {e}")
-            return False, actual_wait_time
+            return WaitOutcome(success=False, elapsed=actual_wait_time,
+                               mode='frames' if frame_source else 'polling', until=until)
+    
+    def _resolve_frame_source(self, context: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """上下文中的帧源；只给出设备时通过 exec-out screencap 抽帧"""
+        if not context:
+            return None
+        if context.get('frame_source') is not None:
+            return context['frame_source']
+        device_id = context.get('device_id')
+        if device_id and context.get('frame_stream', True):
+            adb_path = context.get('adb_path', 'adb')
+            return lambda: capture_frame(adb_path, device_id)
+        return None
     
     async def _check_condition(
         self,
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Device Pool
+设备池：管理 N 台设备（真机或模拟器）的适配器，以工作窃取方式把相互独立的任务分派给空闲设备
+
+每台设备有自己的 adb shell 会话池和帧缓冲，设备之间不共享任何需要加锁的状态；每台设备一个工作协程，
+同一设备上的操作天然串行，不同设备并行，吞吐量随设备数近似线性增长。
+
+任务提交时放入当前负载最低设备的本地队列；设备空闲时先取自己队列的队首，队列为空则从积压最多的
+设备队尾窃取一个可窃取的任务，慢设备上积压的任务会被快设备分走。多步任务以 affinity 标识：
+同一标识的第一步分派到负载最低的设备后即与该设备绑定，后续各步按提交顺序在该设备上执行、不会被窃取，
+直到调用 release_affinity 解除绑定。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .adb_session import AdbSessionPool
+from .frame_buffer import FrameBuffer
+from .tool_adapters import AndroidAdapter, ToolAdapter
+
+
+DeviceTaskFunc = Callable[[ToolAdapter], Awaitable[Any]]
+AdapterBuilder = Callable[[str], ToolAdapter]
+
+
+class DevicePoolError(Exception):
+    """设备池错误：没有可用设备、绑定的设备已移除等"""
+
+
+@dataclass
+class DeviceTask:
+    """一个设备任务：func 接收设备的适配器并返回结果"""
+    func: DeviceTaskFunc
+    future: asyncio.Future
+    affinity: Optional[str] = None
+    # 绑定到指定设备（显式指定或属于多步任务）的任务不可窃取
+    pinned: bool = False
+    name: Optional[str] = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class PooledDevice:
+    """设备池中的一台设备"""
+    device_id: str
+    adapter: ToolAdapter
+    session_pool: Optional[AdbSessionPool] = None
+    frame_buffer: Optional[FrameBuffer] = None
+    queue: Deque[DeviceTask] = field(default_factory=deque)
+    busy: bool = False
+    worker: Optional[asyncio.Task] = None
+    completed: int = 0
+    failed: int = 0
+    stolen: int = 0
+    busy_time: float = 0.0
+
+    @property
+    def load(self) -> int:
+        """本地积压的任务数（包括正在执行的任务）"""
+        return len(self.queue) + (1 if self.busy else 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'queued': len(self.queue),
+            'busy': self.busy,
+            'completed': self.completed,
+            'failed': self.failed,
+            'stolen': self.stolen,
+            'busy_time': self.busy_time
+        }
+
+
+class DevicePool:
+    """多设备适配器池与工作窃取分派器"""
+
+    def __init__(
+        self,
+        device_ids: Optional[Iterable[str]] = None,
+        adb_path: str = "adb",
+        adapter_builder: Optional[AdapterBuilder] = None,
+        max_sessions_per_device: int = 2,
+        frame_history: int = 4,
+        initialize_adapters: bool = False
+    ):
+        self.initial_devices = list(device_ids or [])
+        self.adb_path = adb_path
+        self.adapter_builder = adapter_builder
+        self.max_sessions_per_device = max_sessions_per_device
+        self.frame_history = frame_history
+        self.initialize_adapters = initialize_adapters
+
+        self._devices: Dict[str, PooledDevice] = {}
+        self._affinity: Dict[str, str] = {}
+        self._work = asyncio.Condition()
+        self._running = False
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'stolen': 0,
+            'devices_added': 0,
+            'devices_removed': 0
+        }
+
+    # ------------------------------------------------------------------
+    # 设备管理
+
+    def _build_device(self, device_id: str) -> PooledDevice:
+        """为设备创建独立的会话池、帧缓冲和适配器"""
+        if self.adapter_builder is not None:
+            return PooledDevice(device_id, self.adapter_builder(device_id))
+        session_pool = AdbSessionPool(self.adb_path, max_sessions_per_device=self.max_sessions_per_device)
+        frame_buffer = FrameBuffer(history=self.frame_history)
+        adapter = AndroidAdapter(device_id, session_pool=session_pool, frame_buffer=frame_buffer,
+                                 adb_path=self.adb_path)
+        return PooledDevice(device_id, adapter, session_pool, frame_buffer)
+
+    async def add_device(self, device_id: str) -> PooledDevice:
+        """接入一台设备；设备池已启动时立即开始为其分派任务"""
+        if device_id in self._devices:
+            return self._devices[device_id]
+        device = self._build_device(device_id)
+        if self.initialize_adapters and not await device.adapter.initialize():
+            raise DevicePoolError(f"Failed to initialize adapter for {device_id}")
+        self._devices[device_id] = device
+        self.stats['devices_added'] += 1
+        if self._running:
+            device.worker = asyncio.create_task(self._worker(device))
+            async with self._work:
+                self._work.notify_all()
+        logger.info(f"Device {device_id} added to pool ({len(self._devices)} devices)")
+        return device
+
+    async def remove_device(self, device_id: str) -> None:
+        """移除设备：可窃取的积压任务转给其他设备，绑定到该设备的任务以 DevicePoolError 结束"""
+        device = self._devices.pop(device_id, None)
+        if device is None:
+            return
+        self.stats['devices_removed'] += 1
+        if device.worker is not None:
+            device.worker.cancel()
+            await asyncio.gather(device.worker, return_exceptions=True)
+        for key in [key for key, bound in self._affinity.items() if bound == device_id]:
+            del self._affinity[key]
+        pending = list(device.queue)
+        device.queue.clear()
+        for task in pending:
+            if task.pinned or not self._devices:
+                if not task.future.done():
+                    task.future.set_exception(DevicePoolError(f"Device {device_id} was removed"))
+            else:
+                self._least_loaded().queue.append(task)
+        async with self._work:
+            self._work.notify_all()
+        await self._close_device(device)
+        logger.info(f"Device {device_id} removed from pool ({len(self._devices)} devices)")
+
+    async def sync_devices(self, devices: Dict[str, str]) -> None:
+        """按设备列表（{序列号: 状态}，如 DeviceRegistry.get_devices()）接入或移除设备"""
+        online = {serial for serial, state in devices.items() if state == 'device'}
+        for device_id in sorted(online - set(self._devices)):
+            await self.add_device(device_id)
+        for device_id in sorted(set(self._devices) - online):
+            await self.remove_device(device_id)
+
+    async def _close_device(self, device: PooledDevice) -> None:
+        try:
+            await device.adapter.cleanup()
+        finally:
+            if device.session_pool is not None:
+                await device.session_pool.close()
+
+    @property
+    def device_ids(self) -> List[str]:
+        return list(self._devices)
+
+    def get_adapter(self, device_id: str) -> ToolAdapter:
+        return self._devices[device_id].adapter
+
+    # ------------------------------------------------------------------
+    # 生命周期
+
+    async def start(self, device_ids: Iterable[str] = ()) -> 'DevicePool':
+        """接入设备（构造时给出的和 device_ids）并为每台设备启动工作协程"""
+        for device_id in [*self.initial_devices, *device_ids]:
+            await self.add_device(device_id)
+        self._running = True
+        for device in self._devices.values():
+            if device.worker is None:
+                device.worker = asyncio.create_task(self._worker(device))
+        return self
+
+    async def stop(self) -> None:
+        """停止工作协程并关闭各设备的会话；尚未执行的任务以 DevicePoolError 结束"""
+        self._running = False
+        workers = [device.worker for device in self._devices.values() if device.worker is not None]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for device in self._devices.values():
+            device.worker = None
+            while device.queue:
+                task = device.queue.popleft()
+                if not task.future.done():
+                    task.future.set_exception(DevicePoolError("Device pool stopped"))
+            await self._close_device(device)
+        self._affinity.clear()
+
+    async def __aenter__(self) -> 'DevicePool':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # 分派
+
+    def _least_loaded(self) -> PooledDevice:
+        if not self._devices:
+            raise DevicePoolError("No devices in pool")
+        return min(self._devices.values(), key=lambda device: device.load)
+
+    def submit(
+        self,
+        func: DeviceTaskFunc,
+        affinity: Optional[str] = None,
+        device_id: Optional[str] = None,
+        name: Optional[str] = None
+    ) -> asyncio.Future:
+        """提交任务，返回结果 Future
+
+        Args:
+            func: 接收设备适配器的协程函数
+            affinity: 多步任务标识，同一标识的任务在同一设备上按提交顺序执行
+            device_id: 指定执行的设备
+            name: 任务名称（用于日志）
+        """
+        future = asyncio.get_running_loop().create_future()
+        if device_id is not None:
+            if device_id not in self._devices:
+                raise DevicePoolError(f"Device {device_id} is not in pool")
+            device = self._devices[device_id]
+        elif affinity is not None and affinity in self._affinity:
+            device = self._devices[self._affinity[affinity]]
+        else:
+            device = self._least_loaded()
+        if affinity is not None:
+            self._affinity.setdefault(affinity, device.device_id)
+        pinned = device_id is not None or affinity is not None
+        device.queue.append(DeviceTask(func, future, affinity=affinity, pinned=pinned, name=name))
+        self.stats['submitted'] += 1
+        # 唤醒所有空闲设备：目标设备取自己的任务，其他设备有机会窃取
+        asyncio.get_running_loop().create_task(self._notify())
+        return future
+
+    async def run(self, func: DeviceTaskFunc, **kwargs) -> Any:
+        """提交任务并等待结果"""
+        return await self.submit(func, **kwargs)
+
+    async def map(self, funcs: Iterable[DeviceTaskFunc]) -> List[Any]:
+        """并行执行一组相互独立的任务，按提交顺序返回结果"""
+        return list(await asyncio.gather(*[self.submit(func) for func in funcs]))
+
+    def release_affinity(self, affinity: str) -> None:
+        """多步任务结束，解除与设备的绑定"""
+        self._affinity.pop(affinity, None)
+
+    def device_for(self, affinity: str) -> Optional[str]:
+        """多步任务当前绑定的设备"""
+        return self._affinity.get(affinity)
+
+    async def _notify(self) -> None:
+        async with self._work:
+            self._work.notify_all()
+
+    def _take(self, device: PooledDevice) -> Optional[DeviceTask]:
+        """取下一个任务：先取本地队首，否则从积压最多的设备队尾窃取"""
+        if device.queue:
+            return device.queue.popleft()
+        victims = sorted((other for other in self._devices.values() if other is not device and other.queue),
+                         key=lambda other: len(other.queue), reverse=True)
+        for victim in victims:
+            for index in range(len(victim.queue) - 1, -1, -1):
+                task = victim.queue[index]
+                if not task.pinned:
+                    del victim.queue[index]
+                    device.stolen += 1
+                    self.stats['stolen'] += 1
+                    return task
+        return None
+
+    async def _worker(self, device: PooledDevice) -> None:
+        while True:
+            async with self._work:
+                task = self._take(device)
+                while task is None:
+                    await self._work.wait()
+                    task = self._take(device)
+                device.busy = True
+            if task.future.done():
+                # 调用方已取消
+                device.busy = False
+                continue
+            started = time.perf_counter()
+            try:
+                result = await task.func(device.adapter)
+            except asyncio.CancelledError:
+                if not task.future.done():
+                    task.future.set_exception(DevicePoolError(f"Device {device.device_id} was removed"))
+                raise
+            except Exception as e:
+                device.failed += 1
+                self.stats['failed'] += 1
+                if not task.future.done():
+                    task.future.set_exception(e)
+            else:
+                device.completed += 1
+                self.stats['completed'] += 1
+                if not task.future.done():
+                    task.future.set_result(result)
+            finally:
+                device.busy = False
+                device.busy_time += time.perf_counter() - started
+
+    def get_stats(self) -> Dict[str, Any]:
+        """设备池统计"""
+        return {
+            **self.stats,
+            'affinities': len(self._affinity),
+            'devices': {device_id: device.get_stats() for device_id, device in self._devices.items()}
+        }
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Device Registry
+设备注册表：在后台跟踪ADB设备连接状态，工具执行操作前直接查询内存中的设备列表
+
+默认通过常驻的 `adb track-devices` 进程接收设备变化（每次变化推送一份完整的设备列表），
+跟踪进程不可用时退化为带TTL缓存的 `adb devices` 探测。注册表使用后台线程维护，
+同步工具和运行在不同事件循环中的异步工具都可以直接调用。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import atexit
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+DeviceListener = Callable[[Dict[str, str], Dict[str, str]], None]
+
+
+def parse_device_list(output: str) -> Dict[str, str]:
+    """解析设备列表（`adb devices` 输出或 track-devices 推送的内容），返回 {序列号: 状态}"""
+    devices = {}
+    for line in output.splitlines():
+        line = line.strip()
+        if not line or line.startswith('List of devices') or line.startswith('*'):
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            devices[parts[0]] = parts[1]
+    return devices
+
+
+class DeviceRegistry:
+    """ADB设备注册表"""
+
+    def __init__(
+        self,
+        adb_path: str = "adb",
+        probe_ttl: float = 2.0,
+        track: bool = True,
+        startup_timeout: float = 2.0,
+        max_backoff: float = 10.0
+    ):
+        self.adb_path = adb_path
+        self.probe_ttl = probe_ttl
+        self.track = track
+        self.startup_timeout = startup_timeout
+        self.max_backoff = max_backoff
+
+        self._devices: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._listeners: List[DeviceListener] = []
+        self._tracking = False
+        self._first_snapshot = threading.Event()
+        self._probed_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._stopped = threading.Event()
+        self.stats = {
+            'lookups': 0,
+            'probes': 0,
+            'updates': 0,
+            'tracker_starts': 0
+        }
+
+    def start(self) -> None:
+        """启动后台设备跟踪（重复调用无副作用）"""
+        if not self.track or (self._thread and self._thread.is_alive()):
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._track_loop, name="adb-track-devices", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台设备跟踪"""
+        self._stopped.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.kill()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self._tracking = False
+
+    def get_devices(self) -> Dict[str, str]:
+        """获取当前设备列表 {序列号: 状态}"""
+        self.stats['lookups'] += 1
+        if self.track:
+            self.start()
+            if not self._first_snapshot.is_set():
+                self._first_snapshot.wait(self.startup_timeout)
+        if not self._tracking:
+            self._probe_if_stale()
+        with self._lock:
+            return dict(self._devices)
+
+    def is_connected(self, serial: Optional[str] = None) -> bool:
+        """设备是否在线；未指定序列号时判断是否有任一设备在线"""
+        devices = self.get_devices()
+        if serial:
+            return devices.get(serial) == 'device'
+        return any(state == 'device' for state in devices.values())
+
+    async def ais_connected(self, serial: Optional[str] = None) -> bool:
+        """异步版 is_connected：跟踪已推送快照时直接返回；需要等待首次快照或同步探测 adb devices 时
+        在线程中执行，不阻塞调用方的事件循环"""
+        if self._tracking and self._first_snapshot.is_set():
+            return self.is_connected(serial)
+        return await asyncio.to_thread(self.is_connected, serial)
+
+    def wait_for(self, predicate: Callable[[Dict[str, str]], bool], timeout: float) -> bool:
+        """等待设备列表满足条件，用于等待设备接入或断开"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if predicate(self.get_devices()):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # 跟踪模式下等待推送，探测模式下每个TTL周期重新探测
+            wait = remaining if self._tracking else min(remaining, self.probe_ttl)
+            with self._changed:
+                self._changed.wait(wait)
+
+    def invalidate(self) -> None:
+        """使探测缓存失效；命令执行失败时调用，下次查询重新确认设备状态"""
+        self._probed_at = None
+
+    def add_listener(self, listener: DeviceListener) -> None:
+        """注册设备变化回调 listener(旧列表, 新列表)，在后台线程中调用"""
+        self._listeners.append(listener)
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取注册表统计"""
+        return {**self.stats, 'tracking': self._tracking, 'devices': len(self._devices)}
+
+    def _probe_if_stale(self) -> None:
+        probed_at = self._probed_at
+        if probed_at is not None and time.monotonic() - probed_at < self.probe_ttl:
+            return
+        self.stats['probes'] += 1
+        try:
+            result = subprocess.run([self.adb_path, 'devices'], capture_output=True, text=True, timeout=5)
+            devices = parse_device_list(result.stdout) if result.returncode == 0 else {}
+        except Exception as e:
+            logger.error(f"检查ADB连接失败: {e}")
+            devices = {}
+        self._probed_at = time.monotonic()
+        self._update(devices)
+
+    def _update(self, devices: Dict[str, str]) -> None:
+        """发布新的设备列表：先执行变化回调，再对查询可见并唤醒 wait_for 的等待方，
+        等待方返回时回调已经全部执行完毕"""
+        with self._lock:
+            previous = self._devices
+        if devices != previous:
+            self.stats['updates'] += 1
+            for serial in devices.keys() - previous.keys():
+                logger.info(f"ADB设备接入: {serial} ({devices[serial]})")
+            for serial in previous.keys() - devices.keys():
+                logger.warning(f"ADB设备断开: {serial}")
+            for listener in list(self._listeners):
+                try:
+                    listener(previous, devices)
+                except Exception as e:
+                    logger.error(f"设备变化回调执行失败: {e}")
+        with self._lock:
+            self._devices = devices
+            self._changed.notify_all()
+
+    def _track_loop(self) -> None:
+        backoff = 0.5
+        while not self._stopped.is_set():
+            try:
+                self._process = subprocess.Popen(
+                    [self.adb_path, 'track-devices'],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError as e:
+                logger.warning(f"无法启动 adb track-devices，改用定时探测: {e}")
+                self._first_snapshot.set()
+                return
+            self.stats['tracker_starts'] += 1
+            received = self._read_snapshots(self._process.stdout)
+            self._process.wait()
+            self._tracking = False
+            # 跟踪中断期间的查询改用探测
+            self.invalidate()
+            self._first_snapshot.set()
+            if received:
+                backoff = 0.5
+            if self._stopped.wait(backoff):
+                break
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _read_snapshots(self, stream) -> bool:
+        """读取 track-devices 推送：每条消息为4位十六进制长度加设备列表"""
+        received = False
+        while True:
+            header = stream.read(4)
+            if len(header) < 4:
+                return received
+            try:
+                length = int(header, 16)
+            except ValueError:
+                return received
+            payload = stream.read(length) if length else b''
+            if len(payload) < length:
+                return received
+            self._update(parse_device_list(payload.decode('utf-8', errors='replace')))
+            self._tracking = True
+            received = True
+            self._first_snapshot.set()
+
+
+_registries: Dict[str, DeviceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_device_registry(adb_path: str = "adb") -> DeviceRegistry:
+    """获取共享的设备注册表，同一 adb 路径只维护一个跟踪进程"""
+    with _registries_lock:
+        registry = _registries.get(adb_path)
+        if registry is None:
+            registry = _registries[adb_path] = DeviceRegistry(adb_path)
+        return registry
+
+
+@atexit.register
+def _stop_registries() -> None:
+    for registry in list(_registries.values()):
+        registry.stop()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Frame Buffer
+截图帧缓冲：通过 `adb exec-out screencap` 将截图直接读入内存，以帧对象在各组件间共享
+
+原有截图流程需要 screencap 写设备文件、pull 到本地、rm 清理三次 adb 调用，
+下游再用 PIL 重新打开本地文件。帧对象持有从管道读入的原始字节，
+numpy 数组和 PIL 图像都是该字节的只读视图，不再经过磁盘；落盘是可选的，并在后台线程中完成。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import io
+import os
+import struct
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import numpy as np
+from loguru import logger
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# screencap 原始格式中每像素4字节的像素格式：RGBA_8888, RGBX_8888, BGRA_8888
+RAW_PIXEL_FORMATS = {1: 'RGBA', 2: 'RGBX', 5: 'BGRA'}
+
+
+@dataclass
+class Frame:
+    """一帧截图
+
+    data 为 screencap 输出的完整字节：raw 格式为 12/16 字节头加 RGBA 像素，png 格式为 PNG 文件内容。
+    一帧有数 MB 到数十 MB，不出现在 repr 中，避免打印或 json.dumps(default=str) 时序列化整帧数据。
+    """
+    data: bytes = field(repr=False)
+    width: int
+    height: int
+    format: str  # 'raw' 或 'png'
+    pixel_offset: int = 0
+    pixel_format: int = 1
+    device_id: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    sequence: int = 0
+    path: Optional[str] = None
+    _pixels: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    _png: Optional[bytes] = field(default=None, repr=False, compare=False)
+    _screen_hash: Optional[int] = field(default=None, repr=False, compare=False)
+    _content_digest: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_screencap(cls, data: bytes, device_id: Optional[str] = None) -> 'Frame':
+        """解析 screencap 输出（自动识别 PNG 与 raw 格式）"""
+        if data.startswith(PNG_SIGNATURE):
+            width, height = struct.unpack_from('>II', data, 16)
+            return cls(data=data, width=width, height=height, format='png', device_id=device_id)
+
+        if len(data) < 12:
+            raise ValueError(f"Screencap output too short: {len(data)} bytes")
+        width, height, pixel_format = struct.unpack_from('<III', data, 0)
+        if pixel_format not in RAW_PIXEL_FORMATS:
+            raise ValueError(f"Unsupported screencap pixel format: {pixel_format}")
+        # Android 8 之后的头部多一个4字节的色彩空间字段
+        offset = len(data) - width * height * 4
+        if offset not in (12, 16):
+            raise ValueError(f"Screencap size mismatch: {len(data)} bytes for {width}x{height}")
+        return cls(data=data, width=width, height=height, format='raw',
+                   pixel_offset=offset, pixel_format=pixel_format, device_id=device_id)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    def view(self) -> memoryview:
+        """像素数据（raw）或PNG内容的只读内存视图"""
+        return memoryview(self.data)[self.pixel_offset:]
+
+    def array(self) -> np.ndarray:
+        """(height, width, 4) 的 uint8 只读数组；raw 格式不复制数据，png 格式首次访问时解码"""
+        if self._pixels is None:
+            if self.format == 'raw':
+                pixels = np.frombuffer(self.data, dtype=np.uint8, count=self.width * self.height * 4,
+                                       offset=self.pixel_offset).reshape(self.height, self.width, 4)
+                if RAW_PIXEL_FORMATS[self.pixel_format] == 'BGRA':
+                    pixels = pixels[..., [2, 1, 0, 3]]
+            else:
+                from PIL import Image
+                with Image.open(io.BytesIO(self.data)) as image:
+                    pixels = np.asarray(image.convert('RGBA'))
+            pixels.flags.writeable = False
+            self._pixels = pixels
+        return self._pixels
+
+    def image(self):
+        """PIL 图像（RGBA）；raw 格式直接引用帧数据"""
+        from PIL import Image
+        if self.format == 'raw' and RAW_PIXEL_FORMATS[self.pixel_format] != 'BGRA':
+            return Image.frombuffer('RGBA', (self.width, self.height), self.view(), 'raw', 'RGBA', 0, 1)
+        return Image.fromarray(self.array(), 'RGBA')
+
+    def png_bytes(self) -> bytes:
+        """PNG 编码内容；png 格式直接返回原始数据，raw 格式编码一次后缓存"""
+        if self.format == 'png':
+            return self.data
+        if self._png is None:
+            buffer = io.BytesIO()
+            self.image().convert('RGB').save(buffer, format='PNG', compress_level=1)
+            self._png = buffer.getvalue()
+        return self._png
+
+    def save(self, path: str) -> str:
+        """同步写入PNG文件"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.png_bytes())
+        return path
+
+
+class FrameBuffer:
+    """帧缓冲：按设备保存最近的若干帧，并负责异步落盘"""
+
+    def __init__(self, history: int = 4):
+        self.history = history
+        self._frames: Dict[str, Deque[Frame]] = {}
+        self._by_path: Dict[str, Frame] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.stats = {
+            'frames': 0,
+            'bytes_received': 0,
+            'frames_persisted': 0,
+            'bytes_persisted': 0,
+            'persist_failures': 0,
+            'path_hits': 0
+        }
+
+    def publish(self, frame: Frame) -> Frame:
+        """加入一帧，超出历史长度的旧帧被丢弃"""
+        with self._lock:
+            self._sequence += 1
+            frame.sequence = self._sequence
+            frames = self._frames.setdefault(frame.device_id or "", deque())
+            frames.append(frame)
+            while len(frames) > self.history:
+                evicted = frames.popleft()
+                if evicted.path and self._by_path.get(evicted.path) is evicted:
+                    del self._by_path[evicted.path]
+            self.stats['frames'] += 1
+            self.stats['bytes_received'] += frame.nbytes
+        return frame
+
+    def latest(self, device_id: Optional[str] = None) -> Optional[Frame]:
+        """设备最近一帧"""
+        frames = self._frames.get(device_id or "")
+        return frames[-1] if frames else None
+
+    def recent(self, device_id: Optional[str] = None) -> List[Frame]:
+        """设备最近的帧（由旧到新）"""
+        return list(self._frames.get(device_id or "", ()))
+
+    def get_by_path(self, path: str) -> Optional[Frame]:
+        """按落盘路径查找仍在缓冲中的帧，下游拿到截图路径时可以避免重新读盘"""
+        frame = self._by_path.get(os.path.abspath(path))
+        if frame is not None:
+            self.stats['path_hits'] += 1
+        return frame
+
+    def open_image(self, path: str):
+        """打开截图：缓冲中有对应帧时直接使用内存数据，否则从磁盘读取"""
+        frame = self.get_by_path(path)
+        if frame is not None:
+            return frame.image()
+        from PIL import Image
+        return Image.open(path)
+
+    def assign_path(self, frame: Frame, path: str) -> None:
+        """记录帧的落盘路径"""
+        frame.path = os.path.abspath(path)
+        with self._lock:
+            self._by_path[frame.path] = frame
+
+    def persist(self, frame: Frame, path: str) -> 'asyncio.Task[str]':
+        """在后台线程中把帧写入 path，返回可等待的任务；写入完成前同一路径的读取由缓冲提供"""
+        self.assign_path(frame, path)
+        task = asyncio.get_running_loop().create_task(self._persist(frame, path))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def _persist(self, frame: Frame, path: str) -> str:
+        try:
+            await asyncio.to_thread(frame.save, path)
+        except Exception as e:
+            self.stats['persist_failures'] += 1
+            logger.error(f"截图保存失败 {path}: {e}")
+            raise
+        self.stats['frames_persisted'] += 1
+        self.stats['bytes_persisted'] += len(frame.png_bytes())
+        return path
+
+    async def flush(self) -> None:
+        """等待所有后台落盘完成"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取帧缓冲统计"""
+        return {**self.stats, 'pending_writes': len(self._pending), 'devices': len(self._frames)}
+
+
+def screencap_command(adb_path: str = "adb", device_id: Optional[str] = None, raw: bool = True) -> List[str]:
+    """构建 exec-out screencap 命令；raw=False 时由设备编码为PNG"""
+    cmd = [adb_path]
+    if device_id:
+        cmd.extend(['-s', device_id])
+    cmd.extend(['exec-out', 'screencap'])
+    if not raw:
+        cmd.append('-p')
+    return cmd
+
+
+async def capture_frame(adb_path: str = "adb", device_id: Optional[str] = None, raw: bool = True,
+                        frame_buffer: Optional['FrameBuffer'] = None, timeout: float = 15) -> Frame:
+    """异步截图到内存，并发布到帧缓冲（默认共享缓冲）；超时后结束 adb 进程"""
+    process = await asyncio.create_subprocess_exec(
+        *screencap_command(adb_path, device_id, raw),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"exec-out screencap timed out after {timeout}s")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    if process.returncode != 0 or not stdout:
+        raise RuntimeError(f"exec-out screencap failed: {stderr.decode('utf-8', errors='replace').strip()}")
+    frame = Frame.from_screencap(stdout, device_id)
+    return (frame_buffer or get_frame_buffer()).publish(frame)
+
+
+def capture_frame_sync(adb_path: str = "adb", device_id: Optional[str] = None, raw: bool = True,
+                       frame_buffer: Optional['FrameBuffer'] = None, timeout: float = 15) -> Frame:
+    """同步截图到内存，供同步工具使用"""
+    result = subprocess.run(screencap_command(adb_path, device_id, raw), capture_output=True, timeout=timeout)
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(f"exec-out screencap failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    frame = Frame.from_screencap(result.stdout, device_id)
+    return (frame_buffer or get_frame_buffer()).publish(frame)
+
+
+_frame_buffer: Optional[FrameBuffer] = None
+
+
+def get_frame_buffer() -> FrameBuffer:
+    """获取共享帧缓冲"""
+    global _frame_buffer
+    if _frame_buffer is None:
+        _frame_buffer = FrameBuffer()
+    return _frame_buffer
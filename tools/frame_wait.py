@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Frame Wait
+帧驱动等待：以轻量帧流上的缩小灰度差异检测“屏幕变化”和“屏幕稳定”事件，驱动条件等待
+
+固定间隔轮询在条件满足后平均还要多等半个轮询周期，且每次轮询都执行一次昂贵的元素/文本检查
+（UI 树导出或 OCR）。这里改为持续抽取廉价的缩小帧（1080x2400 按步长 4 抽样为 270x600），
+与上一帧逐块比较：屏幕没有变化时条件结果也不会变化，不执行检查，抽帧间隔按退避系数逐步拉长；
+检测到变化后恢复最短间隔，等屏幕稳定下来再执行一次检查。持续变化（动画、视频）时按
+busy_check_interval 限制检查频率；屏幕上看不出的状态变化由 recheck_interval 兜底复查，
+该间隔与原有轮询间隔相当，漏检时的延迟不比轮询更差。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from .image_diff import block_difference, load_pixels, to_gray
+
+
+# 等待目标
+WAIT_CONDITION = "condition"
+WAIT_STABLE = "stable"
+WAIT_CHANGED = "changed"
+
+# 帧事件
+EVENT_CHANGED = "changed"
+EVENT_STABLE = "stable"
+
+
+@dataclass
+class FrameWaitConfig:
+    """帧驱动等待参数（时间单位为秒）"""
+    min_interval: float = 0.05        # 检测到变化后的抽帧间隔
+    max_interval: float = 0.5         # 静止时退避的上限
+    backoff: float = 1.5              # 每个未变化帧后间隔的放大倍数
+    scale: int = 4                    # 灰度抽样步长（步长 8 会跳过 20 像素文字的笔画）
+    block: int = 4                    # 比较分块（抽样后的像素数，4 x 4 = 原图 16 像素）
+    change_threshold: float = 8.0     # 分块平均灰度差超过该值视为变化（抽帧噪声约为 2~3）
+    settle_frames: int = 2            # 连续多少帧未变化视为稳定
+    busy_check_interval: float = 1.0  # 屏幕持续变化时的最短检查间隔
+    recheck_interval: float = 0.5     # 屏幕静止时的兜底复查间隔
+    poll_interval: float = 0.5        # 没有帧源时的固定轮询间隔
+
+
+@dataclass
+class WaitOutcome:
+    """一次等待的结果和开销统计"""
+    success: bool
+    elapsed: float
+    mode: str                  # 'frames' 或 'polling'
+    until: str = WAIT_CONDITION
+    event: Optional[str] = None
+    checks: int = 0
+    frames: int = 0
+    changes: int = 0
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'success': self.success,
+            'elapsed': self.elapsed,
+            'mode': self.mode,
+            'until': self.until,
+            'event': self.event,
+            'checks': self.checks,
+            'frames': self.frames,
+            'changes': self.changes
+        }
+
+
+class FrameChangeDetector:
+    """逐帧比较缩小灰度图，产生 changed/stable 事件"""
+
+    def __init__(self, config: FrameWaitConfig):
+        self.config = config
+        self._previous: Optional[np.ndarray] = None
+        self._unchanged = 0
+        # 初始状态也需要经过 settle_frames 帧才算稳定
+        self.settling = True
+        self.last_difference = 0.0
+
+    def reduce(self, source: Any) -> np.ndarray:
+        """帧源输出（Frame、numpy 数组、PIL 图像或截图路径）转为缩小灰度图"""
+        return to_gray(load_pixels(source), self.config.scale)
+
+    def feed(self, gray: np.ndarray) -> Optional[str]:
+        """加入一帧，返回该帧触发的事件"""
+        previous, self._previous = self._previous, gray
+        if previous is None:
+            return None
+        if previous.shape != gray.shape:
+            # 旋转或分辨率变化
+            self.last_difference = float('inf')
+        else:
+            self.last_difference = float(block_difference(previous, gray, self.config.block).max())
+        if self.last_difference > self.config.change_threshold:
+            self._unchanged = 0
+            self.settling = True
+            return EVENT_CHANGED
+        self._unchanged += 1
+        if self.settling and self._unchanged >= self.config.settle_frames:
+            self.settling = False
+            return EVENT_STABLE
+        return None
+
+
+class FrameWaiter:
+    """帧驱动的条件等待
+
+    frame_source 为返回一帧的可调用对象（同步或异步），check 为昂贵的条件检查协程函数。
+    clock/sleep 可替换为虚拟时钟，用于模拟设备上的确定性测试。
+    """
+
+    def __init__(
+        self,
+        config: Optional[FrameWaitConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.config = config or FrameWaitConfig()
+        self.clock = clock
+        self.sleep = sleep
+
+    async def wait(
+        self,
+        check: Optional[Callable[[], Awaitable[bool]]],
+        timeout: float,
+        frame_source: Optional[Callable[[], Any]] = None,
+        until: str = WAIT_CONDITION
+    ) -> WaitOutcome:
+        """等待条件满足（until='condition'）、屏幕稳定（'stable'）或屏幕变化（'changed'）"""
+        if until not in (WAIT_CONDITION, WAIT_STABLE, WAIT_CHANGED):
+            raise ValueError(f"Unknown wait target: {until}")
+        if until != WAIT_CONDITION and frame_source is None:
+            raise ValueError(f"Waiting for screen {until} requires a frame source")
+        start = self.clock()
+        deadline = start + timeout
+        if frame_source is None:
+            return await self._poll(check, start, deadline)
+        return await self._watch(check, frame_source, until, start, deadline)
+
+    async def _sleep_until(self, wake: float, deadline: float) -> None:
+        """睡眠到 wake，但不越过截止时间"""
+        delay = min(wake, deadline) - self.clock()
+        if delay > 0:
+            await self.sleep(delay)
+
+    async def _poll(self, check, start: float, deadline: float) -> WaitOutcome:
+        """没有帧源时按固定间隔轮询条件"""
+        outcome = WaitOutcome(success=False, elapsed=0.0, mode='polling')
+        while True:
+            outcome.checks += 1
+            if await check():
+                outcome.success = True
+                break
+            now = self.clock()
+            if now >= deadline:
+                break
+            await self._sleep_until(now + self.config.poll_interval, deadline)
+            if self.clock() >= deadline:
+                break
+        outcome.elapsed = self.clock() - start
+        return outcome
+
+    async def _capture(self, frame_source: Callable[[], Any], deadline: float) -> Any:
+        """抽取一帧；异步帧源不越过截止时间，超时抛出 asyncio.TimeoutError"""
+        frame = frame_source()
+        if inspect.isawaitable(frame):
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                if inspect.iscoroutine(frame):
+                    frame.close()
+                raise asyncio.TimeoutError
+            frame = await asyncio.wait_for(frame, remaining)
+        return frame
+
+    async def _watch(self, check, frame_source, until: str, start: float, deadline: float) -> WaitOutcome:
+        config = self.config
+        outcome = WaitOutcome(success=False, elapsed=0.0, mode='frames', until=until)
+        detector = FrameChangeDetector(config)
+
+        async def run_check() -> bool:
+            outcome.checks += 1
+            return await check()
+
+        if until == WAIT_CONDITION and await run_check():
+            outcome.success = True
+            outcome.elapsed = self.clock() - start
+            return outcome
+
+        last_check = self.clock()
+        # 上次检查之后屏幕是否变化过
+        dirty = False
+        interval = config.min_interval
+        while True:
+            frame_time = self.clock()
+            try:
+                gray = detector.reduce(await self._capture(frame_source, deadline))
+            except asyncio.TimeoutError:
+                # 抽帧卡住（adb 无响应）时按到达截止时间处理
+                if until == WAIT_CONDITION and dirty and await run_check():
+                    outcome.success = True
+                break
+            except Exception as e:
+                if until != WAIT_CONDITION:
+                    raise
+                logger.warning(f"Frame source failed, falling back to polling: {e}")
+                polled = await self._poll(check, start, deadline)
+                polled.checks += outcome.checks
+                polled.frames = outcome.frames
+                polled.changes = outcome.changes
+                polled.events = outcome.events
+                return polled
+            outcome.frames += 1
+            event = detector.feed(gray)
+            now = self.clock()
+            if event is not None:
+                outcome.events.append({'event': event, 'time': now - start,
+                                       'difference': detector.last_difference})
+            if event == EVENT_CHANGED:
+                outcome.changes += 1
+                dirty = True
+                interval = config.min_interval
+                if until == WAIT_CHANGED:
+                    outcome.success, outcome.event = True, event
+                    break
+            elif event == EVENT_STABLE and until == WAIT_STABLE:
+                outcome.success, outcome.event = True, event
+                break
+            elif not detector.settling:
+                interval = min(interval * config.backoff, config.max_interval)
+
+            if until == WAIT_CONDITION:
+                # 屏幕稳定后检查一次；持续变化或长时间静止时按各自间隔检查
+                since_check = now - last_check
+                if ((dirty and (event == EVENT_STABLE or since_check >= config.busy_check_interval))
+                        or since_check >= config.recheck_interval):
+                    dirty = False
+                    if await run_check():
+                        outcome.success, outcome.event = True, event
+                        break
+                    last_check = self.clock()
+
+            if self.clock() >= deadline:
+                # 截止前最后一次变化还没检查过
+                if until == WAIT_CONDITION and dirty and await run_check():
+                    outcome.success = True
+                break
+            await self._sleep_until(frame_time + interval, deadline)
+
+        outcome.elapsed = self.clock() - start
+        return outcome
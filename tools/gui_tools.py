@@ -37,6 +37,7 @@ from agenticx.core.event import Event
 from pydantic import BaseModel, Field
 
 # AgenticSeeker工具
+from .result_cache import CachePolicy, ResultCache, stable_digest
 from utils import get_iso_timestamp, setup_logger
 
 
@@ -265,6 +266,9 @@ class GUIToolParameters(BaseModel):
 class GUITool(BaseTool):
     """GUI工具基类 - 基于AgenticX BaseTool"""
     
+    # 结果缓存策略：默认不缓存，只读查询类工具在子类中覆盖
+    cache_policy: CachePolicy = CachePolicy.never()
+    
     def __init__(
         self,
         name: Optional[str] = None,
@@ -654,8 +658,10 @@ class GUIToolManager(Component):
         self.max_concurrent_executions = 10
         
         # 缓存
-        self.result_cache: Dict[str, Tuple[ToolResult, datetime]] = {}
         self.cache_ttl = 300  # 5分钟
+        self.result_cache = ResultCache(max_entries=1000, max_bytes=64 * 1024 * 1024, default_ttl=self.cache_ttl)
+        # 按工具名称覆盖工具类自带的缓存策略
+        self.cache_policies: Dict[str, CachePolicy] = {}
         
         # 统计信息
         self.manager_stats = {
@@ -745,6 +751,7 @@ class GUIToolManager(Component):
             
             tool = self.tools[tool_id]
             del self.tools[tool_id]
+            self.result_cache.invalidate(tag=tool_id)
             
             # 从类型映射中移除
             if tool.name in self.tool_types:
@@ -805,9 +812,9 @@ class GUIToolManager(Component):
                     "TOOL_NOT_FOUND"
                 )
             
-            # 检查缓存
-            if self.enable_caching:
-                cache_key = self._generate_cache_key(tool_id, parameters)
+            # 检查缓存（只有缓存策略允许的工具才会得到缓存键）
+            cache_key = self._generate_cache_key(tool_id, parameters, context) if self.enable_caching else None
+            if cache_key:
                 cached_result = self._get_cached_result(cache_key)
                 if cached_result:
                     return cached_result
@@ -819,9 +826,8 @@ class GUIToolManager(Component):
                 result = await tool.execute_with_retry(parameters, context)
                 
                 # 缓存结果
-                if self.enable_caching and result.success:
-                    cache_key = self._generate_cache_key(tool_id, parameters)
-                    self._cache_result(cache_key, result)
+                if cache_key and result.success:
+                    self._cache_result(cache_key, result, tool)
                 
                 return result
             
@@ -984,8 +990,9 @@ class GUIToolManager(Component):
             
             # 缓存结果
             if self.enable_caching and result.success:
-                cache_key = self._generate_cache_key(tool.tool_id, parameters)
-                self._cache_result(cache_key, result)
+                cache_key = self._generate_cache_key(tool.tool_id, parameters, context)
+                if cache_key:
+                    self._cache_result(cache_key, result, tool)
             
         except Exception as e:
             logger.error(f"Error in async tool execution {execution_id}: {e}")
@@ -1084,42 +1091,79 @@ class GUIToolManager(Component):
         except Exception as e:
             logger.error(f"Error handling tool executed event: {e}")
     
+    def set_cache_policy(self, tool_name: str, policy: CachePolicy) -> None:
+        """设置指定名称工具的缓存策略"""
+        self.cache_policies[tool_name] = policy
+        for tool in self.tools.values():
+            if tool.name == tool_name:
+                self.result_cache.invalidate(tag=tool.tool_id)
+    
+    def get_cache_policy(self, tool: GUITool) -> CachePolicy:
+        """获取工具的缓存策略"""
+        return self.cache_policies.get(tool.name, tool.cache_policy)
+    
     def _generate_cache_key(
         self,
         tool_id: str,
-        parameters: ToolParameters
-    ) -> str:
-        """生成缓存键"""
+        parameters: ToolParameters,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """生成缓存键
+        
+        键为工具ID、规范化参数和屏幕哈希的内容摘要；工具的缓存策略不允许缓存，
+        或依赖屏幕的查询无法确定屏幕内容时返回 None。
+        """
+        tool = self.tools.get(tool_id)
+        policy = self.get_cache_policy(tool) if tool else CachePolicy.never()
+        if not policy.cacheable:
+            return None
+        
+        params = parameters.to_dict()
+        screen_hash = None
+        if policy.screen_scoped:
+            # 截图路径参数以屏幕哈希代替：路径相同内容不同的截图不会命中，内容相同的不同文件可以命中
+            custom_params = dict(params.get('custom_params') or {})
+            for name in policy.screen_params:
+                if name in custom_params:
+                    image_hash = self._screen_hash(custom_params[name])
+                    if image_hash is None:
+                        return None
+                    custom_params[name] = {'screen_hash': image_hash}
+            params['custom_params'] = custom_params
+            
+            context = context or {}
+            screen_hash = context.get('screen_hash')
+            if screen_hash is None and context.get('current_screenshot'):
+                screen_hash = self._screen_hash(context['current_screenshot'])
+            if screen_hash is None and not (
+                policy.screen_params and all(name in custom_params for name in policy.screen_params)
+            ):
+                # 工具会自行截取当前屏幕，结果无法与缓存键对应
+                return None
+        
+        return stable_digest(tool_id, params, screen_hash)
+    
+    @staticmethod
+    def _screen_hash(source: Any) -> Optional[str]:
+        """截图内容的摘要（十六进制），无法读取时返回 None
+
+        使用精确的内容摘要而不是感知哈希：视觉上相近的两个屏幕（例如输入框内容不同）不能共享查询结果。
+        """
         try:
-            cache_data = {
-                'tool_id': tool_id,
-                'parameters': parameters.to_dict()
-            }
-            return str(hash(json.dumps(cache_data, sort_keys=True)))
-        except Exception:
-            return f"{tool_id}_{hash(str(parameters))}"
+            from .screen_cache import get_screen_cache
+            return get_screen_cache().content_digest(source)[0]
+        except Exception as e:
+            logger.debug(f"Failed to hash screenshot for result cache: {e}")
+            return None
     
     def _get_cached_result(self, cache_key: str) -> Optional[ToolResult]:
         """获取缓存结果"""
-        if cache_key in self.result_cache:
-            result, cached_time = self.result_cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_ttl):
-                return result
-            else:
-                del self.result_cache[cache_key]
-        return None
+        return self.result_cache.get(cache_key)
     
-    def _cache_result(self, cache_key: str, result: ToolResult) -> None:
-        """缓存结果"""
-        self.result_cache[cache_key] = (result, datetime.now())
-        
-        # 限制缓存大小
-        if len(self.result_cache) > 1000:
-            oldest_key = min(
-                self.result_cache.keys(),
-                key=lambda k: self.result_cache[k][1]
-            )
-            del self.result_cache[oldest_key]
+    def _cache_result(self, cache_key: str, result: ToolResult, tool: Optional[GUITool] = None) -> None:
+        """缓存结果，有效期取工具缓存策略中的值"""
+        ttl = self.get_cache_policy(tool).ttl if tool else None
+        self.result_cache.put(cache_key, result, ttl=ttl, tag=tool.tool_id if tool else None)
     
     async def _publish_event(self, event_type: str, data: Dict[str, Any]) -> None:
         """发布事件到AgenticX EventBus"""
@@ -1143,6 +1187,7 @@ class GUIToolManager(Component):
             'active_executions': len(self.active_executions),
             'queued_executions': len(self.execution_queue),
             'cache_size': len(self.result_cache),
+            'cache': self.result_cache.get_stats(),
             'timestamp': get_iso_timestamp()
         }
     
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Quantile Sketch
+分位数草图：固定内存、可合并的 DDSketch，用于在不保存原始样本的情况下估计尾延迟
+
+样本按对数分桶：桶 k 覆盖 (gamma^(k-1), gamma^k]，gamma = (1+a)/(1-a)，
+桶内任意值以桶的中点估计，相对误差不超过 a（默认 1%）。桶数只与数值的动态范围有关，
+与样本数无关；超过 max_buckets 时合并最小的桶，保证高分位数（p95/p99）的精度。
+两个参数相同的草图逐桶相加即完成合并，可以按线程分片写入、读取时合并。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+# 绝对值小于该值的样本计入零桶
+_MIN_INDEXABLE = 1e-9
+
+
+class DDSketch:
+    """相对误差有界的分位数草图"""
+
+    __slots__ = ('relative_accuracy', 'gamma', 'max_buckets', '_multiplier',
+                 'positive', 'negative', 'zero_count', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.max_buckets = max_buckets
+        self._multiplier = 1 / math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        """加入 count 个值为 value 的样本"""
+        if value > _MIN_INDEXABLE:
+            bins = self.positive
+            key = math.ceil(math.log(value) * self._multiplier)
+        elif value < -_MIN_INDEXABLE:
+            bins = self.negative
+            key = math.ceil(math.log(-value) * self._multiplier)
+        else:
+            bins = None
+            self.zero_count += count
+        if bins is not None:
+            bins[key] = bins.get(key, 0) + count
+            if len(bins) > self.max_buckets:
+                self._collapse(bins)
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _collapse(self, bins: Dict[int, int]) -> None:
+        """合并最小的桶，使桶数回到 max_buckets（负值一侧合并的是绝对值最小、即最接近零的桶）"""
+        keys = sorted(bins)
+        excess = len(keys) - self.max_buckets
+        folded = sum(bins.pop(key) for key in keys[:excess])
+        target = keys[excess]
+        bins[target] += folded
+
+    def merge(self, other: 'DDSketch') -> 'DDSketch':
+        """合并另一个草图（参数必须相同），返回自身"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return self
+        for source, target in ((other.positive, self.positive), (other.negative, self.negative)):
+            for key, count in _snapshot(source):
+                target[key] = target.get(key, 0) + count
+            if len(target) > self.max_buckets:
+                self._collapse(target)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> 'DDSketch':
+        return DDSketch(self.relative_accuracy, self.max_buckets).merge(self)
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def _value(self, key: int) -> float:
+        """桶 key 的代表值（与桶内任意值的相对误差不超过 relative_accuracy）"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """第 q 分位数（0 <= q <= 1），空草图返回 None"""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """一次遍历计算多个分位数"""
+        if not self.count:
+            return [None] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        ranks = [max(0.0, min(1.0, qs[i])) * (self.count - 1) for i in order]
+        results: List[Optional[float]] = [None] * len(qs)
+
+        def buckets() -> Iterable:
+            for key in sorted(self.negative, reverse=True):
+                yield self.negative[key], -self._value(key)
+            if self.zero_count:
+                yield self.zero_count, 0.0
+            for key in sorted(self.positive):
+                yield self.positive[key], self._value(key)
+
+        # 端点直接使用精确的最小值和最大值
+        position = 0
+        while position < len(ranks) and ranks[position] <= 0:
+            results[order[position]] = self.min
+            position += 1
+        seen = 0
+        for bucket_count, value in buckets():
+            seen += bucket_count
+            while position < len(ranks) and ranks[position] < seen:
+                results[order[position]] = min(max(value, self.min), self.max)
+                position += 1
+            if position == len(ranks):
+                break
+        for i in range(position, len(ranks)):
+            results[order[i]] = self.max
+        for i, q in enumerate(qs):
+            if q >= 1:
+                results[i] = self.max
+        return results
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self.positive) + len(self.negative) + (1 if self.zero_count else 0)
+
+    def to_dict(self, quantiles: Sequence[float] = (0.5, 0.9, 0.95, 0.99)) -> Dict[str, Any]:
+        """汇总统计：count/sum/min/max/avg 以及 pXX 分位数"""
+        summary = {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0,
+            'avg': self.avg
+        }
+        for q, value in zip(quantiles, self.quantiles(quantiles)):
+            summary[f"p{q * 100:g}"] = value if value is not None else 0.0
+        return summary
+
+
+def _snapshot(bins: Dict[int, int]) -> List:
+    """复制桶内容；其他线程可能在写入，复制时字典大小变化则重试"""
+    while True:
+        try:
+            return list(bins.items())
+        except RuntimeError:
+            continue
+
+
+def merge_sketches(sketches: Iterable[DDSketch], relative_accuracy: float = 0.01) -> DDSketch:
+    """合并多个草图为一个新草图"""
+    merged = None
+    for sketch in sketches:
+        if merged is None:
+            merged = DDSketch(sketch.relative_accuracy, sketch.max_buckets)
+        merged.merge(sketch)
+    return merged if merged is not None else DDSketch(relative_accuracy)
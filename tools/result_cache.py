@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Result Cache
+结果缓存：带 TTL 和容量上限的 LRU 缓存，以规范化参数的内容摘要为键
+
+工具管理器原先以 hash(json.dumps(...)) 为键缓存所有成功结果：Python 的字符串哈希会碰撞，
+参数中有无法序列化为 JSON 的值时退化为 str() 的哈希；缓存满后每次写入都要在全部条目上求最小值。
+这里的键是规范化参数的 BLAKE2b 摘要，条目按访问顺序存放在 OrderedDict 中，
+命中和淘汰都是 O(1)，并按条目数和估算字节数两个维度限制容量。
+是否缓存由工具的 CachePolicy 决定：点击、输入等有副作用的操作从不缓存，
+只读查询按屏幕哈希区分，屏幕变化后自然失效。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import dataclasses
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """工具结果的缓存策略
+
+    Attributes:
+        cacheable: 是否允许缓存结果
+        ttl: 条目有效期（秒），None 使用缓存的默认值
+        screen_scoped: 结果依赖当前屏幕内容，键中必须包含屏幕哈希；无法确定屏幕时不缓存
+        screen_params: custom_params 中表示截图路径的参数，键中以截图的屏幕哈希代替路径
+    """
+    cacheable: bool = False
+    ttl: Optional[float] = None
+    screen_scoped: bool = False
+    screen_params: Tuple[str, ...] = ()
+
+    @classmethod
+    def never(cls) -> 'CachePolicy':
+        """有副作用的操作：从不缓存"""
+        return cls()
+
+    @classmethod
+    def screen_query(cls, ttl: Optional[float] = None, screen_params: Tuple[str, ...] = ()) -> 'CachePolicy':
+        """针对屏幕内容的只读查询：同一屏幕上的相同查询复用结果"""
+        return cls(cacheable=True, ttl=ttl, screen_scoped=True, screen_params=screen_params)
+
+
+def normalize(value: Any) -> Any:
+    """将参数规范化为可确定性序列化的 JSON 结构
+
+    字典按键排序，集合排序，元组与列表等价；字节串和数组以摘要代替内容；
+    非基本类型带上类型标记，避免 "1" 与 1、枚举与其取值之间的混淆。
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        # repr 保留全部精度，并区分 nan/inf
+        return {'__float__': repr(value)}
+    if isinstance(value, Enum):
+        return {'__enum__': [type(value).__qualname__, normalize(value.value)]}
+    if isinstance(value, dict):
+        items = [(normalize(k), normalize(v)) for k, v in value.items()]
+        if all(isinstance(k, str) for k, _ in items):
+            return dict(items)
+        return {'__dict__': sorted(([k, v] for k, v in items), key=_canonical)}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted((normalize(item) for item in value), key=_canonical)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'__bytes__': hashlib.blake2b(value, digest_size=16).hexdigest()}
+    if hasattr(value, 'tobytes') and hasattr(value, 'dtype') and hasattr(value, 'shape'):
+        # numpy 数组等：形状、类型和内容摘要
+        return {'__array__': [list(value.shape), str(value.dtype),
+                              hashlib.blake2b(value.tobytes(), digest_size=16).hexdigest()]}
+    if hasattr(value, 'to_dict'):
+        return {'__object__': type(value).__qualname__, 'value': normalize(value.to_dict())}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {'__object__': type(value).__qualname__,
+                'value': normalize({f.name: getattr(value, f.name) for f in dataclasses.fields(value)})}
+    # 其余对象只能按 repr 区分：不会误命中，最多无法命中
+    return {'__repr__': type(value).__qualname__, 'value': repr(value)}
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def stable_digest(*parts: Any) -> str:
+    """参数内容的稳定摘要（跨进程一致，不受 PYTHONHASHSEED 影响）"""
+    payload = _canonical(normalize(list(parts))).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """估算对象占用的字节数（递归计算容器和对象属性，深度有限）"""
+    if _depth > 8:
+        return 0
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif isinstance(value, Enum):
+        pass
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _depth + 1)
+    return size
+
+
+@dataclass
+class ResultCacheEntry:
+    """缓存条目"""
+    value: Any
+    expires_at: float
+    size: int
+    tag: Optional[str] = None
+
+
+class ResultCache:
+    """O(1) 的 LRU/TTL 缓存
+
+    条目按访问顺序存放，命中时移到末尾，超出条目数或字节上限时从头部淘汰；
+    过期条目在被访问或淘汰时移除，purge_expired 可主动清理。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        default_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[str, ResultCacheEntry]' = OrderedDict()
+        self._bytes = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expirations': 0,
+            'evictions': 0,
+            'insertions': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self._clock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取条目，未命中或已过期时返回 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry.value
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        size: Optional[int] = None,
+        tag: Optional[str] = None
+    ) -> None:
+        """写入条目；size 为 None 时估算值的大小"""
+        if key in self._entries:
+            self._remove(key)
+        entry_size = (size if size is not None else estimate_size(value)) + sys.getsizeof(key)
+        if self.max_bytes is not None and entry_size > self.max_bytes:
+            # 单个条目超过总上限，缓存它只会清空其他条目
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = ResultCacheEntry(value, self._clock() + ttl, entry_size, tag)
+        self._bytes += entry_size
+        self.stats['insertions'] += 1
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, key: Optional[str] = None, tag: Optional[str] = None) -> int:
+        """删除指定键或带指定标签的条目，返回删除的条目数"""
+        if key is not None:
+            if key in self._entries:
+                self._remove(key)
+                return 1
+            return 0
+        keys = [k for k, entry in self._entries.items() if entry.tag == tag]
+        for k in keys:
+            self._remove(k)
+        return len(keys)
+
+    def purge_expired(self) -> int:
+        """清理所有过期条目"""
+        now = self._clock()
+        expired = [k for k, entry in self._entries.items() if entry.expires_at <= now]
+        for k in expired:
+            self._remove(k)
+        self.stats['expirations'] += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+        }
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Screen Cache
+屏幕缓存：在工具和智能体之间共享同一张截图的派生结果
+
+管理器、执行器和反思器各自截图并分析，同一张截图会被重复读取文件、编码base64、检测元素和识别文字。
+缓存以截图内容的 BLAKE2 摘要为键（帧取 screencap 输出的字节，文件取文件内容并按 mtime/大小缓存摘要），
+内容完全相同的截图（同一帧、同一文件的副本）才共享 base64 内容、元素、OCR文本和分析结果。
+
+感知哈希（dHash/pHash）对输入框中新输入的文字、开关状态、整行滚动等变化几乎不敏感，
+汉明距离为 0~2 的两张截图可能是操作前后不同的屏幕，因此只作为“是否可能是同一屏幕”的提示
+（is_same_screen），不用于决定返回哪张截图的数据。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import asyncio
+import base64
+import hashlib
+import inspect
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from .frame_buffer import Frame, get_frame_buffer
+
+
+# 用于采样的最大边长：哈希只需要低频信息，先按步长抽样可以避免处理整帧
+_SAMPLE_SIZE = 256
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _grayscale(pixels: np.ndarray, sample_size: int = _SAMPLE_SIZE) -> np.ndarray:
+    """按步长抽样并转换为灰度（float32）"""
+    step = max(1, max(pixels.shape[0], pixels.shape[1]) // sample_size)
+    sampled = pixels[::step, ::step]
+    if sampled.ndim == 2:
+        return sampled.astype(np.float32)
+    return sampled[..., :3].astype(np.float32) @ _LUMA
+
+
+def _downscale(gray: np.ndarray, height: int, width: int) -> np.ndarray:
+    """区域平均缩放到 height x width"""
+    rows = np.linspace(0, gray.shape[0], height + 1).astype(int)[:-1]
+    cols = np.linspace(0, gray.shape[1], width + 1).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, gray.shape[0])), np.diff(np.append(cols, gray.shape[1])))
+    return sums / counts
+
+
+def _pack_bits(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel().astype(np.uint8)).tobytes(), 'big')
+
+
+def dhash(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """差值哈希：缩放到 hash_size x (hash_size+1) 后比较水平相邻像素"""
+    small = _downscale(_grayscale(pixels), hash_size, hash_size + 1)
+    return _pack_bits(small[:, 1:] > small[:, :-1])
+
+
+_DCT_MATRICES: Dict[int, np.ndarray] = {}
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    if size not in _DCT_MATRICES:
+        k = np.arange(size)[:, None]
+        n = np.arange(size)[None, :]
+        matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+        matrix[0] /= np.sqrt(2.0)
+        _DCT_MATRICES[size] = matrix.astype(np.float32)
+    return _DCT_MATRICES[size]
+
+
+def phash(pixels: np.ndarray, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """DCT哈希：缩放到 32x32 做二维DCT，取左上角低频系数与中位数比较"""
+    size = hash_size * highfreq_factor
+    dct = _dct_matrix(size)
+    coefficients = dct @ _downscale(_grayscale(pixels), size, size) @ dct.T
+    low = coefficients[:hash_size, :hash_size].ravel()
+    return _pack_bits(low > np.median(low[1:]))
+
+
+HASH_FUNCTIONS: Dict[str, Callable[[np.ndarray], int]] = {'dhash': dhash, 'phash': phash}
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+ImageSource = Union[Frame, str, np.ndarray, Any]
+
+
+def _digest(*chunks: Union[bytes, memoryview]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class ScreenCacheEntry:
+    """一张截图（按内容摘要区分）及其派生结果"""
+    digest: str
+    width: int = 0
+    height: int = 0
+    paths: Set[str] = field(default_factory=set)
+    created_at: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    hits: int = 0
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    # 每个派生结果首次计算的耗时（秒），命中时计入节省的延迟
+    costs: Dict[str, float] = field(default_factory=dict)
+
+
+class ScreenCache:
+    """按内容摘要去重的屏幕缓存
+
+    lookup 将截图（帧、文件路径、numpy数组或PIL图像）映射到缓存项；get_artifact/aget_artifact
+    在缓存项上按名称保存派生结果，首次计算时记录耗时，之后的命中按该耗时累计节省的延迟。
+    max_distance/algorithm 只用于 is_same_screen 的感知哈希比较。
+    """
+
+    def __init__(self, max_entries: int = 32, max_distance: int = 3, algorithm: str = 'dhash'):
+        if algorithm not in HASH_FUNCTIONS:
+            raise ValueError(f"Unknown hash algorithm: {algorithm}")
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.algorithm = algorithm
+        self._hash_function = HASH_FUNCTIONS[algorithm]
+        self._entries: 'OrderedDict[str, ScreenCacheEntry]' = OrderedDict()
+        # 文件路径 -> (mtime_ns, size, 摘要, width, height)，同一文件不重复读取
+        self._path_digests: Dict[str, Tuple[Any, ...]] = {}
+        # 文件路径 -> (mtime_ns, size, 感知哈希, width, height)
+        self._path_hashes: Dict[str, Tuple[int, ...]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._lock = threading.RLock()
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'artifact_hits': 0,
+            'artifact_misses': 0,
+            'saved_seconds': 0.0,
+            'digest_seconds': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # 内容摘要
+
+    def content_digest(self, source: ImageSource) -> Tuple[str, int, int]:
+        """计算截图内容的摘要，返回 (digest, width, height)"""
+        start = time.perf_counter()
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                # 仍在帧缓冲中的截图直接使用内存数据
+                frame = get_frame_buffer().get_by_path(os.fspath(source))
+                if frame is None:
+                    return self._digest_path(os.fspath(source))
+                source = frame
+            if isinstance(source, Frame):
+                # png 帧的数据即落盘的文件内容，与按文件计算的摘要一致
+                if source._content_digest is None:
+                    source._content_digest = _digest(source.view() if source.format == 'png' else source.data)
+                return source._content_digest, source.width, source.height
+            if isinstance(source, np.ndarray):
+                pixels = np.ascontiguousarray(source)
+                return (_digest(str(pixels.shape).encode(), pixels.dtype.str.encode(), pixels.data),
+                        pixels.shape[1], pixels.shape[0])
+            # PIL 图像
+            return (_digest(f"{source.mode}{source.size}".encode(), source.tobytes()),
+                    source.width, source.height)
+        finally:
+            self.stats['digest_seconds'] += time.perf_counter() - start
+
+    def _digest_path(self, path: str) -> Tuple[str, int, int]:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._path_digests.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2:]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        from PIL import Image
+        # 只读取文件头获得尺寸，不解码像素
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+        digest = _digest(data)
+        self._path_digests[path] = (stat.st_mtime_ns, stat.st_size, digest, width, height)
+        return digest, width, height
+
+    # ------------------------------------------------------------------
+    # 感知哈希（仅作提示）
+
+    def compute_hash(self, source: ImageSource) -> Tuple[int, int, int]:
+        """计算截图的感知哈希，返回 (hash, width, height)"""
+        if isinstance(source, (str, os.PathLike)):
+            # 仍在帧缓冲中的截图直接使用内存数据
+            frame = get_frame_buffer().get_by_path(os.fspath(source))
+            if frame is None:
+                return self._hash_path(os.fspath(source))
+            source = frame
+        if isinstance(source, Frame):
+            if source._screen_hash is None:
+                source._screen_hash = self._hash_function(source.array())
+            return source._screen_hash, source.width, source.height
+        if isinstance(source, np.ndarray):
+            return self._hash_function(source), source.shape[1], source.shape[0]
+        # PIL 图像
+        return self._hash_function(np.asarray(source.convert('RGB'))), source.width, source.height
+
+    def _hash_path(self, path: str) -> Tuple[int, int, int]:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._path_hashes.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2:]
+
+        from PIL import Image
+        with Image.open(path) as image:
+            image.draft('RGB', (image.width // 4, image.height // 4))
+            width, height = image.size
+            screen_hash = self._hash_function(np.asarray(image.convert('RGB')))
+        self._path_hashes[path] = (stat.st_mtime_ns, stat.st_size, screen_hash, width, height)
+        return screen_hash, width, height
+
+    # ------------------------------------------------------------------
+    # 查找
+
+    def lookup(self, source: ImageSource, path: Optional[str] = None) -> ScreenCacheEntry:
+        """返回截图对应的缓存项（内容完全相同才命中），必要时新建；path 记录截图的文件位置"""
+        digest, width, height = self.content_digest(source)
+        if path is None and isinstance(source, (str, os.PathLike)):
+            path = os.fspath(source)
+        elif path is None and isinstance(source, Frame):
+            path = source.path
+
+        with self._lock:
+            self.stats['lookups'] += 1
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.stats['misses'] += 1
+                entry = ScreenCacheEntry(digest=digest, width=width, height=height)
+                self._entries[digest] = entry
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+                    logger.debug(f"屏幕缓存淘汰 {evicted}")
+            else:
+                self.stats['hits'] += 1
+                entry.hits += 1
+                entry.last_seen = time.time()
+                self._entries.move_to_end(digest)
+            if path:
+                entry.paths.add(os.path.abspath(path))
+        return entry
+
+    def is_same_screen(self, a: ImageSource, b: ImageSource) -> bool:
+        """两张截图是否视觉上相近（感知哈希距离在阈值内）
+
+        只作提示：细小但有意义的变化（输入的文字、开关状态）也可能判为相同，不能据此复用另一张截图的数据。
+        """
+        return hamming_distance(self.compute_hash(a)[0], self.compute_hash(b)[0]) <= self.max_distance
+
+    # ------------------------------------------------------------------
+    # 派生结果
+
+    def get_artifact(self, source: ImageSource, name: str, compute: Callable[[], Any]) -> Any:
+        """获取截图的派生结果，未缓存时调用 compute 计算并保存；截图无法解码时直接计算"""
+        if isinstance(source, ScreenCacheEntry):
+            entry = source
+        else:
+            try:
+                entry = self.lookup(source)
+            except Exception as e:
+                logger.debug(f"截图无法计算哈希，跳过屏幕缓存: {e}")
+                return compute()
+        with self._lock:
+            if name in entry.artifacts:
+                return self._artifact_hit(entry, name)
+        start = time.perf_counter()
+        value = compute()
+        self._store(entry, name, value, time.perf_counter() - start)
+        return value
+
+    async def aget_artifact(self, source: ImageSource, name: str, compute: Callable[[], Any]) -> Any:
+        """异步版本：compute 可以是协程函数；同一屏幕同一结果的并发请求只计算一次
+
+        截图无法读取或解码时不使用缓存，直接计算。
+        """
+        if isinstance(source, ScreenCacheEntry):
+            entry = source
+        else:
+            try:
+                entry = await asyncio.to_thread(self.lookup, source)
+            except Exception as e:
+                logger.debug(f"截图无法计算哈希，跳过屏幕缓存: {e}")
+                value = compute()
+                return await value if inspect.isawaitable(value) else value
+        key = (entry.digest, name)
+        with self._lock:
+            if name in entry.artifacts:
+                return self._artifact_hit(entry, name)
+            pending = self._inflight.get(key)
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            with self._lock:
+                self.stats['artifact_hits'] += 1
+                self.stats['saved_seconds'] += entry.costs.get(name, 0.0)
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        start = time.perf_counter()
+        try:
+            value = compute()
+            if inspect.isawaitable(value):
+                value = await value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 没有并发等待者时避免未取回异常的警告
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._store(entry, name, value, time.perf_counter() - start)
+        future.set_result(value)
+        return value
+
+    def _artifact_hit(self, entry: ScreenCacheEntry, name: str) -> Any:
+        self.stats['artifact_hits'] += 1
+        self.stats['saved_seconds'] += entry.costs.get(name, 0.0)
+        return entry.artifacts[name]
+
+    def _store(self, entry: ScreenCacheEntry, name: str, value: Any, cost: float) -> None:
+        with self._lock:
+            self.stats['artifact_misses'] += 1
+            entry.artifacts[name] = value
+            entry.costs[name] = cost
+
+    def base64(self, source: ImageSource) -> str:
+        """截图PNG内容的base64编码，供多模态消息使用"""
+        def encode() -> str:
+            if isinstance(source, Frame):
+                data = source.png_bytes()
+            else:
+                frame = get_frame_buffer().get_by_path(os.fspath(source))
+                if frame is not None:
+                    data = frame.png_bytes()
+                else:
+                    with open(source, 'rb') as f:
+                        data = f.read()
+            return base64.b64encode(data).decode('utf-8')
+
+        return self.get_artifact(source, 'base64', encode)
+
+    # ------------------------------------------------------------------
+
+    def invalidate(self, source: Optional[ImageSource] = None) -> None:
+        """清空缓存，或移除指定截图对应的缓存项"""
+        with self._lock:
+            if source is None:
+                self._entries.clear()
+                self._path_digests.clear()
+                self._path_hashes.clear()
+                return
+        digest = self.content_digest(source)[0]
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率和节省的延迟"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        artifact_requests = stats['artifact_hits'] + stats['artifact_misses']
+        stats.update({
+            'entries': entries,
+            'hit_rate': stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0,
+            'artifact_hit_rate': stats['artifact_hits'] / artifact_requests if artifact_requests else 0.0,
+            'average_digest_ms': stats['digest_seconds'] / stats['lookups'] * 1000 if stats['lookups'] else 0.0
+        })
+        return stats
+
+
+_screen_cache: Optional[ScreenCache] = None
+_screen_cache_lock = threading.Lock()
+
+
+def get_screen_cache() -> ScreenCache:
+    """获取共享屏幕缓存"""
+    global _screen_cache
+    with _screen_cache_lock:
+        if _screen_cache is None:
+            _screen_cache = ScreenCache()
+        return _screen_cache
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker Scroll Stitch
+滚动拼接：估计相邻两帧之间的滚动偏移，只分析新露出的条带，并把各帧识别出的内容拼接到同一坐标系
+
+相邻两次滚动的截图大部分重叠，每次都对整屏做 OCR 时，搜索的开销与“帧数 x 屏幕大小”成正比。
+这里先把每帧压缩为逐行投影（每行按列抽样后分成若干段求平均灰度，1080x2400 的帧得到 2400x16 的矩阵），
+固定的状态栏、标题栏和导航栏在两帧中完全相同，先排除掉，只在滚动区内用 FFT 计算各偏移下的互相关，
+平方差最小的偏移即滚动距离。新露出的条带（加上少量重叠，避免被边缘截断的文字漏识别）才交给 OCR，
+连续两次滑动成功但偏移为零说明列表已经到底。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# 滚动方向（内容移动方向与手指方向相反：向下滚动时内容上移）
+SCROLL_DIRECTIONS = ('down', 'up', 'left', 'right')
+
+
+def orient(pixels: np.ndarray, direction: str) -> np.ndarray:
+    """把帧转到统一朝向：滚动后新内容总是从底部露出"""
+    if direction == 'down':
+        return pixels
+    if direction == 'up':
+        return pixels[::-1]
+    if direction == 'right':
+        return pixels.swapaxes(0, 1)
+    if direction == 'left':
+        return pixels.swapaxes(0, 1)[::-1]
+    raise ValueError(f"Unknown scroll direction: {direction}")
+
+
+def row_profile(pixels: np.ndarray, column_step: int = 8, column_bins: int = 16) -> np.ndarray:
+    """逐行投影：每行按 column_step 抽样后分成 column_bins 段求平均灰度，形状 (行数, 段数)
+
+    只按列抽样、不按行抽样，偏移估计精确到像素。
+    """
+    sampled = pixels[:, ::column_step]
+    if sampled.ndim == 3:
+        gray = (sampled[..., 0] * np.float32(0.299) + sampled[..., 1] * np.float32(0.587)
+                + sampled[..., 2] * np.float32(0.114))
+    else:
+        gray = sampled.astype(np.float32)
+    edges = np.unique(np.linspace(0, gray.shape[1], min(column_bins, gray.shape[1]) + 1).astype(int))
+    return np.add.reduceat(gray, edges[:-1], axis=1) / np.diff(edges)
+
+
+@dataclass
+class ScrollEstimate:
+    """偏移估计：offset 为内容移动的行数，[top, bottom) 为两帧之间发生变化的滚动区"""
+    offset: int
+    top: int
+    bottom: int
+    error: float = 0.0
+
+
+def estimate_scroll_offset(
+    previous: np.ndarray,
+    current: np.ndarray,
+    expected: Optional[int] = None,
+    min_overlap: float = 0.25,
+    tolerance: float = 2.0
+) -> ScrollEstimate:
+    """估计 current 相对 previous 的滚动偏移（两者均为同一朝向的逐行投影）
+
+    当前帧第 i 行对应上一帧第 i + offset 行。平方差 SSD(d) = Σa² + Σb² - 2Σa[i+d]b[i]，
+    能量项用累加和、互相关项用 FFT 计算，全部偏移一次求出。周期性列表在多个偏移上误差几乎相同，
+    此时取最接近 expected（通常为滑动距离）的偏移。
+    """
+    if previous.shape != current.shape:
+        raise ValueError(f"Frame shape changed: {previous.shape} -> {current.shape}")
+    moving = np.flatnonzero(np.abs(previous - current).max(axis=1) > tolerance)
+    if not moving.size:
+        return ScrollEstimate(offset=0, top=0, bottom=len(current))
+    top, bottom = int(moving[0]), int(moving[-1]) + 1
+    a = previous[top:bottom].astype(np.float64)
+    b = current[top:bottom].astype(np.float64)
+    rows = bottom - top
+    max_offset = rows - max(1, math.ceil(rows * min_overlap))
+    if max_offset < 1:
+        return ScrollEstimate(offset=0, top=top, bottom=bottom, error=float(np.mean((a - b) ** 2)))
+
+    size = 1 << (2 * rows - 1).bit_length()
+    cross = np.fft.irfft(np.fft.rfft(a, size, axis=0) * np.conj(np.fft.rfft(b, size, axis=0)),
+                         size, axis=0).sum(axis=1)[:max_offset + 1]
+    row_energy_a = (a * a).sum(axis=1)
+    row_energy_b = (b * b).sum(axis=1)
+    offsets = np.arange(max_offset + 1)
+    # Σ_{i>=d} a[i]²，Σ_{i<rows-d} b[i]²
+    suffix_a = np.cumsum(row_energy_a[::-1])[::-1][offsets]
+    prefix_b = np.cumsum(row_energy_b)[rows - 1 - offsets]
+    errors = (suffix_a + prefix_b - 2 * cross) / ((rows - offsets) * a.shape[1])
+    errors = np.maximum(errors, 0.0)
+
+    best = float(errors.min())
+    candidates = np.flatnonzero(errors <= best * 1.05 + 1e-3)
+    if expected is not None and len(candidates) > 1:
+        offset = int(candidates[np.argmin(np.abs(candidates - expected))])
+    else:
+        offset = int(candidates[0])
+    return ScrollEstimate(offset=offset, top=top, bottom=bottom, error=float(errors[offset]))
+
+
+@dataclass
+class ScrollStep:
+    """一次滚动的分析范围：region 为需要识别的屏幕区域（None 表示没有新内容）"""
+    offset: int
+    position: int
+    region: Optional[Dict[str, int]]
+    at_end: bool = False
+    rows: int = 0
+
+
+@dataclass
+class ScrollSession:
+    """一次滚动搜索的拼接状态
+
+    position 为视口顶部（统一朝向下）在拼接内容中的坐标；识别出的文本按内容坐标去重，
+    重叠区域内重复识别的文本只保留一份。
+    """
+    direction: str = 'down'
+    overlap: int = 48           # 新条带向已分析区域多取的行数
+    min_offset: int = 4         # 小于该偏移视为没有滚动
+    end_after: int = 2          # 连续多少次滑动后没有滚动视为到底（一次可能只是滑动没有生效）
+    dedup_distance: int = 12    # 内容坐标相差不超过该值的同名文本视为同一条
+    column_step: int = 8
+    column_bins: int = 16
+    position: int = 0
+    frames: int = 0
+    analyzed_rows: int = 0
+    screen_rows: int = 0
+    offsets: List[int] = field(default_factory=list)
+    texts: List[Dict[str, Any]] = field(default_factory=list)
+    _profile: Optional[np.ndarray] = field(default=None, repr=False)
+    _shape: Tuple[int, int] = field(default=(0, 0), repr=False)
+    _pending: int = field(default=0, repr=False)
+    _stalls: int = field(default=0, repr=False)
+    _seen: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if self.direction not in SCROLL_DIRECTIONS:
+            raise ValueError(f"Unknown scroll direction: {self.direction}")
+
+    def advance(self, pixels: np.ndarray, expected: Optional[int] = None, swiped: bool = True) -> ScrollStep:
+        """加入滚动后的一帧，返回需要识别的新条带
+
+        expected 为本次滑动的距离；swiped 为 False 表示滑动没有执行成功，内容没有移动不计入到底判断。
+        """
+        oriented = orient(pixels, self.direction)
+        profile = row_profile(oriented, self.column_step, self.column_bins)
+        previous, self._profile = self._profile, profile
+        self._shape = oriented.shape[:2]
+        height = self._shape[0]
+        self.frames += 1
+        self.screen_rows += height
+
+        if previous is None or previous.shape != profile.shape:
+            # 首帧（或分辨率变化）整屏分析
+            step = ScrollStep(offset=0, position=self.position, region=self._region(0, height), rows=height)
+            self.analyzed_rows += height
+            return step
+
+        estimate = estimate_scroll_offset(previous, profile, expected)
+        self.offsets.append(estimate.offset)
+        self.position += estimate.offset
+        self._pending += estimate.offset
+        if estimate.offset < self.min_offset:
+            if swiped:
+                self._stalls += 1
+            return ScrollStep(offset=estimate.offset, position=self.position, region=None,
+                              at_end=self._stalls >= self.end_after)
+
+        self._stalls = 0
+        start = max(estimate.top, estimate.bottom - self._pending - self.overlap)
+        self._pending = 0
+        rows = estimate.bottom - start
+        self.analyzed_rows += rows
+        return ScrollStep(offset=estimate.offset, position=self.position,
+                          region=self._region(start, estimate.bottom), rows=rows)
+
+    def _region(self, start: int, end: int) -> Dict[str, int]:
+        """统一朝向下的行区间 [start, end) 换算为屏幕区域"""
+        height, width = self._shape
+        if self.direction in ('up', 'left'):
+            start, end = height - end, height - start
+        if self.direction in ('down', 'up'):
+            return {'left': 0, 'top': start, 'right': width, 'bottom': end}
+        return {'left': start, 'top': 0, 'right': end, 'bottom': width}
+
+    def _content_offset(self, bounds: Dict[str, Any]) -> int:
+        """文本在拼接内容中的坐标（沿滚动方向）"""
+        height = self._shape[0]
+        if self.direction == 'down':
+            row = bounds['top']
+        elif self.direction == 'up':
+            row = height - bounds['bottom']
+        elif self.direction == 'right':
+            row = bounds['left']
+        else:
+            row = height - bounds['right']
+        return self.position + int(row)
+
+    def add_texts(self, texts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """合并当前帧识别出的文本，返回此前未见过的文本（附加 content_offset）"""
+        added = []
+        for item in texts:
+            bounds = item.get('bounds')
+            if not bounds:
+                continue
+            offset = self._content_offset(bounds)
+            key = item.get('text', '').strip().lower()
+            seen = self._seen.setdefault(key, [])
+            if any(abs(offset - other) <= self.dedup_distance for other in seen):
+                continue
+            seen.append(offset)
+            entry = dict(item, content_offset=offset)
+            self.texts.append(entry)
+            added.append(entry)
+        return added
+
+    def stitched_texts(self) -> List[Dict[str, Any]]:
+        """拼接后的全部文本，按内容坐标排序"""
+        return sorted(self.texts, key=lambda item: item['content_offset'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'frames': self.frames,
+            'position': self.position,
+            'offsets': list(self.offsets),
+            'analyzed_rows': self.analyzed_rows,
+            'screen_rows': self.screen_rows,
+            'analyzed_ratio': self.analyzed_rows / self.screen_rows if self.screen_rows else 0.0,
+            'texts': len(self.texts)
+        }
@@ -14,12 +14,16 @@ import re
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from loguru import logger
+
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
     Coordinate, Rectangle, Platform, ToolType, ToolStatus
 )
 from .basic_tools import ClickTool, SwipeTool, TextInputTool
 from .advanced_tools import ScreenshotTool, ElementDetectionTool, OCRTool
+from .image_diff import load_pixels
+from .scroll_stitch import ScrollSession
 from utils import get_iso_timestamp, setup_logger
 
 
@@ -490,9 +494,22 @@ class SmartClickTool(GUITool):
 
 
 class SmartScrollTool(GUITool):
-    """智能滚动工具：基于内容智能滚动"""
+    """智能滚动工具：基于内容智能滚动
+
+    默认增量分析（custom_params['incremental']=False 时每步整屏识别）：每次滚动后估计与上一帧的偏移，
+    只对新露出的条带做 OCR，识别结果按内容坐标拼接去重；偏移为零时判定列表到底并提前结束。
+    """
     
-    def __init__(self, **kwargs):
+    # 每次滚动的滑动距离（像素），同时作为偏移估计的参考值
+    SCROLL_DISTANCE = 300
+    
+    def __init__(
+        self,
+        screenshot_tool: Optional[GUITool] = None,
+        ocr_tool: Optional[GUITool] = None,
+        swipe_tool: Optional[GUITool] = None,
+        **kwargs
+    ):
         super().__init__(
             name="SmartScrollTool",
             description="Intelligently scroll to find content",
@@ -500,9 +517,9 @@ class SmartScrollTool(GUITool):
             **kwargs
         )
         
-        self.screenshot_tool = ScreenshotTool()
-        self.ocr_tool = OCRTool()
-        self.swipe_tool = SwipeTool()
+        self.screenshot_tool = screenshot_tool or ScreenshotTool()
+        self.ocr_tool = ocr_tool or OCRTool()
+        self.swipe_tool = swipe_tool or SwipeTool()
     
     async def validate(
         self,
@@ -521,6 +538,14 @@ class SmartScrollTool(GUITool):
             logger.error(f"Validation error: {e}")
             return False
     
+    async def execute_gui_tool(
+        self,
+        parameters: ToolParameters,
+        context: Optional[Dict[str, Any]] = None
+    ) -> ToolResult:
+        """执行GUI工具操作"""
+        return await self.execute(parameters, context)
+    
     async def execute(
         self,
         parameters: ToolParameters,
@@ -531,22 +556,33 @@ class SmartScrollTool(GUITool):
         
         try:
             # 获取滚动参数
+            custom_params = parameters.custom_params or {}
             target_text = parameters.text
-            max_scrolls = parameters.custom_params.get('max_scrolls', 5) if parameters.custom_params else 5
-            scroll_direction = parameters.custom_params.get('direction', 'down') if parameters.custom_params else 'down'
+            max_scrolls = custom_params.get('max_scrolls', 5)
+            scroll_direction = custom_params.get('direction', 'down')
+            settle_time = custom_params.get('settle_time', 0.5)
+            session = ScrollSession(direction=scroll_direction) if custom_params.get('incremental', True) else None
             
             scroll_count = 0
             found_target = False
+            end_reached = False
             scroll_history = []
+            # 上一次滑动的结果，用于估计偏移和判断列表是否到底
+            scroll_result = None
             
             # 开始智能滚动循环
             while scroll_count < max_scrolls and not found_target:
-                # 获取当前屏幕内容
-                current_content = await self._analyze_current_content(context)
+                # 获取当前屏幕内容（增量模式下只有新露出的部分）
+                current_content = await self._analyze_current_content(context, session, scroll_result)
                 
                 if not current_content['success']:
                     break
                 
+                if current_content.get('at_end'):
+                    # 上一次滚动没有移动内容，列表已到底
+                    end_reached = True
+                    break
+                
                 # 检查是否找到目标内容
                 if target_text:
                     found_target = self._check_target_found(
@@ -566,6 +602,7 @@ class SmartScrollTool(GUITool):
                     'direction': scroll_direction,
                     'success': scroll_result['success'],
                     'content_found': len(current_content.get('texts', [])),
+                    'offset': current_content.get('offset'),
                     'target_found': found_target
                 })
                 
@@ -575,18 +612,32 @@ class SmartScrollTool(GUITool):
                 scroll_count += 1
                 
                 # 等待滚动完成
-                await asyncio.sleep(0.5)
+                if settle_time:
+                    await asyncio.sleep(settle_time)
             
             # 最终检查
-            if not found_target and target_text:
-                final_content = await self._analyze_current_content(context)
+            if not found_target and not end_reached and target_text:
+                final_content = await self._analyze_current_content(context, session, scroll_result)
                 if final_content['success']:
+                    end_reached = bool(final_content.get('at_end'))
                     found_target = self._check_target_found(
                         final_content['texts'], target_text
                     )
             
             end_time = get_iso_timestamp()
             
+            result_data = {
+                'target_found': found_target,
+                'scroll_count': scroll_count,
+                'scroll_history': scroll_history,
+                'target_text': target_text,
+                'max_scrolls_reached': scroll_count >= max_scrolls,
+                'end_reached': end_reached
+            }
+            if session is not None:
+                result_data['stitched_texts'] = session.stitched_texts()
+                result_data['scroll_stats'] = session.get_stats()
+            
             return ToolResult(
                 tool_id=self.tool_id,
                 tool_type=self.tool_type.value,
@@ -594,13 +645,7 @@ class SmartScrollTool(GUITool):
                 success=True,
                 start_time=start_time,
                 end_time=end_time,
-                result_data={
-                    'target_found': found_target,
-                    'scroll_count': scroll_count,
-                    'scroll_history': scroll_history,
-                    'target_text': target_text,
-                    'max_scrolls_reached': scroll_count >= max_scrolls
-                }
+                result_data=result_data
             )
             
         except Exception as e:
@@ -619,8 +664,16 @@ class SmartScrollTool(GUITool):
                 error_code=error_code
             )
     
-    async def _analyze_current_content(self, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """分析当前屏幕内容"""
+    async def _analyze_current_content(
+        self,
+        context: Optional[Dict[str, Any]],
+        session: Optional[ScrollSession] = None,
+        scroll_result: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """分析当前屏幕内容；给出滚动会话时只识别新露出的条带，返回此前未见过的文本
+
+        scroll_result 为截图前最后一次滑动的结果（_perform_scroll 的返回值）。
+        """
         try:
             # 获取截图
             screenshot_params = ToolParameters()
@@ -629,19 +682,50 @@ class SmartScrollTool(GUITool):
             if not screenshot_result.success:
                 return {'success': False, 'error': 'Failed to capture screenshot'}
             
+            screenshot_path = screenshot_result.screenshot_path
+            ocr_custom_params = {'min_confidence': 0.6, 'image_path': screenshot_path}
+            step = None
+            if session is not None:
+                try:
+                    step = session.advance(
+                        load_pixels(screenshot_path),
+                        expected=scroll_result.get('distance') if scroll_result else None,
+                        swiped=scroll_result['success'] if scroll_result else True
+                    )
+                except Exception as e:
+                    # 读不到像素或分辨率变化时退回整屏识别
+                    logger.warning(f"Incremental scroll analysis unavailable: {e}")
+                if step is not None:
+                    if step.region is None:
+                        return {
+                            'success': True,
+                            'texts': [],
+                            'screenshot_path': screenshot_path,
+                            'offset': step.offset,
+                            'at_end': step.at_end,
+                            'region': None
+                        }
+                    ocr_custom_params['region'] = step.region
+            
             # 执行OCR识别
-            ocr_params = ToolParameters(
-                custom_params={'min_confidence': 0.6}
-            )
+            ocr_params = ToolParameters(custom_params=ocr_custom_params)
             ocr_result = await self.ocr_tool.execute(ocr_params, context)
             
-            if not ocr_result.success:
+            # 新条带中没有文字时识别结果为空，不视为失败
+            if not ocr_result.success and ocr_result.error_message:
                 return {'success': False, 'error': 'Failed to perform OCR'}
             
+            texts = ((ocr_result.result_data or {}).get('ocr_results') or {}).get('texts', [])
+            if session is not None:
+                texts = session.add_texts(texts)
+            
             return {
                 'success': True,
-                'texts': ocr_result.result_data['ocr_results']['texts'],
-                'screenshot_path': screenshot_result.screenshot_path
+                'texts': texts,
+                'screenshot_path': screenshot_path,
+                'offset': step.offset if step else None,
+                'at_end': False,
+                'region': step.region if step else None
             }
             
         except Exception as e:
@@ -677,36 +761,34 @@ class SmartScrollTool(GUITool):
             start_x = screen_width // 2
             start_y = screen_height // 2
             
-            if direction == 'down':
-                end_x = start_x
-                end_y = start_y - 300  # 向上滑动实现向下滚动
-            elif direction == 'up':
-                end_x = start_x
-                end_y = start_y + 300  # 向下滑动实现向上滚动
-            elif direction == 'left':
-                end_x = start_x + 300  # 向右滑动实现向左滚动
-                end_y = start_y
-            elif direction == 'right':
-                end_x = start_x - 300  # 向左滑动实现向右滚动
-                end_y = start_y
-            else:
-                end_x = start_x
-                end_y = start_y - 300  # 默认向下滚动
+            # 手指滑动方向与滚动方向相反：向上滑动实现向下滚动
+            swipe_direction = {
+                'down': 'up',
+                'up': 'down',
+                'left': 'right',
+                'right': 'left'
+            }.get(direction, 'up')
+            
+            custom_params = parameters.custom_params or {}
+            distance = custom_params.get('scroll_distance', self.SCROLL_DISTANCE)
             
             # 执行滑动操作
             swipe_params = ToolParameters(
-                start_coordinate=Coordinate(x=start_x, y=start_y),
-                end_coordinate=Coordinate(x=end_x, y=end_y),
-                duration=parameters.custom_params.get('scroll_duration', 500) if parameters.custom_params else 500
+                target=Coordinate(x=start_x, y=start_y),
+                direction=swipe_direction,
+                distance=distance,
+                duration=custom_params.get('scroll_duration', 500) / 1000
             )
             
-            result = await self.swipe_tool.execute(swipe_params, context)
+            result = await self.swipe_tool.execute_gui_tool(swipe_params, context)
+            end_point = (result.result_data or {}).get('end_point', {})
             
             return {
                 'success': result.success,
                 'direction': direction,
+                'distance': distance,
                 'start': {'x': start_x, 'y': start_y},
-                'end': {'x': end_x, 'y': end_y},
+                'end': {'x': end_point.get('x'), 'y': end_point.get('y')},
                 'error': result.error_message if not result.success else None
             }
             
@@ -14,14 +14,22 @@ import os
 import subprocess
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
 
+from loguru import logger
+
+from .adb_session import AdbSessionPool
+from .frame_buffer import Frame, FrameBuffer, capture_frame, get_frame_buffer
+from .ui_hierarchy import UIHierarchy, UIHierarchyParser, parse_ui_dump
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
     Coordinate, Rectangle, Platform, ToolType, ToolStatus
 )
 from utils import get_iso_timestamp, setup_logger
 
+if TYPE_CHECKING:
+    from .device_pool import DevicePool
+
 
 class ToolAdapter(ABC):
     """工具适配器基类"""
@@ -105,13 +113,29 @@ class ToolAdapter(ABC):
 class AndroidAdapter(ToolAdapter):
     """Android设备适配器"""
     
-    def __init__(self, device_id: Optional[str] = None):
+    def __init__(
+        self,
+        device_id: Optional[str] = None,
+        use_shell_pool: bool = True,
+        session_pool: Optional[AdbSessionPool] = None,
+        frame_buffer: Optional[FrameBuffer] = None,
+        adb_path: str = "adb"
+    ):
         super().__init__(
             platform=Platform.ANDROID,
             adapter_name="AndroidAdapter"
         )
         self.device_id = device_id
-        self.adb_path = "adb"  # 假设adb在PATH中
+        self.adb_path = adb_path  # 默认假设adb在PATH中
+        # shell 命令复用常驻会话；传入共享的会话池时由调用方负责关闭
+        self.use_shell_pool = use_shell_pool
+        self.session_pool = session_pool
+        self._owns_session_pool = session_pool is None
+        # 截图通过 exec-out 读入内存并发布到帧缓冲；raw 格式省去设备端PNG编码
+        self.frame_buffer = frame_buffer or get_frame_buffer()
+        self.raw_screencap = True
+        # 最近一次获取的UI层次结构
+        self.ui_hierarchy: Optional[UIHierarchy] = None
         self.capabilities = {
             'screenshot', 'click', 'swipe', 'input_text',
             'press_key', 'get_elements', 'install_app',
@@ -146,6 +170,12 @@ class AndroidAdapter(ToolAdapter):
         """清理Android适配器"""
         try:
             self.is_initialized = False
+            if self.session_pool is not None:
+                if self._owns_session_pool:
+                    await self.session_pool.close()
+                    self.session_pool = None
+                else:
+                    await self.session_pool.close_device(self.device_id)
             logger.info("Android adapter cleaned up")
             return True
             
@@ -186,8 +216,48 @@ class AndroidAdapter(ToolAdapter):
             logger.error(f"Failed to get device info: {e}")
             return {'platform': 'Android', 'error': str(e)}
     
-    async def take_screenshot(self, save_path: Optional[str] = None) -> Dict[str, Any]:
-        """Android截图"""
+    async def capture_frame(self, raw: Optional[bool] = None) -> Frame:
+        """通过 exec-out screencap 截图到内存"""
+        return await capture_frame(
+            self.adb_path, self.device_id,
+            raw=self.raw_screencap if raw is None else raw,
+            frame_buffer=self.frame_buffer
+        )
+
+    async def take_screenshot(
+        self,
+        save_path: Optional[str] = None,
+        persist: bool = True,
+        wait_for_save: bool = True
+    ) -> Dict[str, Any]:
+        """Android截图
+
+        截图直接读入内存，结果中的 frame 可供下游共享。persist=False 时不落盘；
+        wait_for_save=False 时后台写盘，需要文件时等待 save_task。
+        设备不支持 exec-out 时退回设备端截图再 pull 的方式。
+        """
+        try:
+            frame = await self.capture_frame()
+        except Exception as e:
+            logger.debug(f"exec-out screencap failed, falling back to pull: {e}")
+            return await self._take_screenshot_via_file(save_path)
+
+        result = {'success': True, 'screenshot_path': None, 'frame': frame}
+        if persist:
+            if not save_path:
+                save_path = f"/tmp/screenshot_{int(time.time() * 1000)}.png"
+            save_task = self.frame_buffer.persist(frame, save_path)
+            if wait_for_save:
+                try:
+                    await save_task
+                except Exception as e:
+                    return {'success': False, 'error': f"Failed to save screenshot: {e}", 'frame': frame}
+            result['screenshot_path'] = save_path
+            result['save_task'] = save_task
+        return result
+
+    async def _take_screenshot_via_file(self, save_path: Optional[str] = None) -> Dict[str, Any]:
+        """Android截图（设备端写文件后 pull）"""
         try:
             if not save_path:
                 timestamp = int(time.time() * 1000)
@@ -345,7 +415,49 @@ class AndroidAdapter(ToolAdapter):
             }
     
     async def get_elements(self, **kwargs) -> Dict[str, Any]:
-        """获取Android UI元素"""
+        """获取Android UI元素
+
+        优先通过 exec-out 把 uiautomator dump 输出到 stdout 并边接收边解析，
+        失败时退回设备端写文件再 pull。解析结果保存在 ui_hierarchy，可直接做点选和文本查询。
+        """
+        try:
+            hierarchy = await self.dump_ui_hierarchy()
+        except Exception as e:
+            logger.debug(f"Streaming UI dump failed, falling back to pull: {e}")
+            return await self._get_elements_via_file()
+        return {
+            'success': True,
+            'elements': hierarchy.to_dicts(),
+            'hierarchy': hierarchy
+        }
+
+    async def dump_ui_hierarchy(self) -> UIHierarchy:
+        """流式获取并解析UI层次结构"""
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd.extend(['-s', self.device_id])
+        cmd.extend(['exec-out', 'uiautomator', 'dump', '/dev/tty'])
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        parser = UIHierarchyParser()
+        try:
+            while not parser.finished:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+        finally:
+            _, stderr = await process.communicate()
+        if not parser.finished:
+            raise RuntimeError(f"uiautomator dump failed: {stderr.decode('utf-8', errors='replace').strip()}")
+        self.ui_hierarchy = parser.close()
+        return self.ui_hierarchy
+
+    async def _get_elements_via_file(self) -> Dict[str, Any]:
+        """获取Android UI元素（设备端写文件后 pull）"""
         try:
             # 使用uiautomator dump获取UI层次结构
             dump_result = await self._run_adb_command([
@@ -370,7 +482,6 @@ class AndroidAdapter(ToolAdapter):
                     'error': 'Failed to pull UI dump file'
                 }
             
-            # 解析UI元素（简化实现）
             elements = await self._parse_ui_dump(local_dump_path)
             
             # 清理临时文件
@@ -379,6 +490,7 @@ class AndroidAdapter(ToolAdapter):
             return {
                 'success': True,
                 'elements': elements,
+                'hierarchy': self.ui_hierarchy,
                 'dump_path': local_dump_path
             }
             
@@ -407,7 +519,16 @@ class AndroidAdapter(ToolAdapter):
             return False
     
     async def _run_adb_command(self, args: List[str]) -> Dict[str, Any]:
-        """执行ADB命令"""
+        """执行ADB命令，shell 命令优先通过常驻会话执行（会话按行分隔命令，多行命令用独立进程）"""
+        if (self.use_shell_pool and len(args) > 1 and args[0] == 'shell'
+                and not any('\n' in arg for arg in args[1:])):
+            if self.session_pool is None:
+                self.session_pool = AdbSessionPool(self.adb_path)
+            return await self.session_pool.run(self.device_id, ' '.join(args[1:]))
+        return await self._spawn_adb_command(args)
+
+    async def _spawn_adb_command(self, args: List[str]) -> Dict[str, Any]:
+        """启动独立的 adb 进程执行命令"""
         try:
             cmd = [self.adb_path]
             
@@ -442,35 +563,8 @@ class AndroidAdapter(ToolAdapter):
     
     async def _parse_ui_dump(self, dump_path: str) -> List[Dict[str, Any]]:
         """解析UI dump文件"""
-        try:
-            # 这里应该实现XML解析逻辑
-            # 简化实现，返回模拟数据
-            elements = [
-                {
-                    'id': 'element_1',
-                    'type': 'button',
-                    'text': 'Click Me',
-                    'bounds': {'left': 100, 'top': 200, 'right': 300, 'bottom': 250},
-                    'center': {'x': 200, 'y': 225},
-                    'visible': True,
-                    'enabled': True
-                },
-                {
-                    'id': 'element_2',
-                    'type': 'input',
-                    'text': '',
-                    'bounds': {'left': 50, 'top': 300, 'right': 350, 'bottom': 350},
-                    'center': {'x': 200, 'y': 325},
-                    'visible': True,
-                    'enabled': True
-                }
-            ]
-            
-            return elements
-            
-        except Exception as e:
-            logger.error(f"Failed to parse UI dump: {e}")
-            return []
+        self.ui_hierarchy = await asyncio.to_thread(parse_ui_dump, dump_path)
+        return self.ui_hierarchy.to_dicts()
 
 
 class iOSAdapter(ToolAdapter):
@@ -857,6 +951,18 @@ class AdapterFactory:
             logger.error(f"Failed to create adapter for {platform}: {e}")
             return None
     
+    @classmethod
+    def create_device_pool(
+        cls,
+        device_ids: Optional[List[str]] = None,
+        adb_path: str = "adb",
+        **kwargs
+    ) -> 'DevicePool':
+        """创建多设备适配器池，每台设备使用独立的会话池和帧缓冲；需在事件循环中调用 start() 启动"""
+        from .device_pool import DevicePool
+        
+        return DevicePool(adb_path=adb_path, device_ids=device_ids, **kwargs)
+    
     @classmethod
     def get_supported_platforms(cls) -> List[Platform]:
         """获取支持的平台列表"""
@@ -9,6 +9,7 @@ Date: 2025
 """
 
 import asyncio
+import functools
 import json
 import time
 import uuid
@@ -16,7 +17,9 @@ from abc import ABC, abstractmethod
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from loguru import logger
 
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
@@ -61,6 +64,11 @@ class ExecutionTask:
     status: ToolStatus = ToolStatus.IDLE
     result: Optional[ToolResult] = None
     error: Optional[str] = None
+    # 进入就绪队列和被调度的时刻（time.perf_counter），用于统计排队等待时间
+    enqueued_at: Optional[float] = None
+    dispatched_at: Optional[float] = None
+    # 最终结果确定时完成的 future，批次接口直接等待它而不是轮询结果
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -80,7 +88,15 @@ class ExecutionBatch:
 
 
 class ExecutionQueue:
-    """执行队列"""
+    """执行队列
+
+    就绪任务按优先级存放在双端队列中，有依赖的任务先进入 waiting_tasks，
+    在依赖完成时由 complete_task 释放到就绪队列。入队和释放都会唤醒等待就绪任务的调度循环。
+    任务的最终结果（完成、失败、取消或依赖失败）确定时同时完成任务的 future。
+    """
+    
+    PRIORITY_ORDER = [ExecutionPriority.URGENT, ExecutionPriority.HIGH,
+                      ExecutionPriority.NORMAL, ExecutionPriority.LOW]
     
     def __init__(self, max_size: int = 1000):
         self.max_size = max_size
@@ -94,11 +110,21 @@ class ExecutionQueue:
         self.dependency_graph: Dict[str, Set[str]] = defaultdict(set)
         self.waiting_tasks: Dict[str, ExecutionTask] = {}
         self._lock = asyncio.Lock()
+        self._ready = asyncio.Condition(self._lock)
+        self._ready_count = 0
+    
+    def _push_ready(self, task: ExecutionTask) -> None:
+        """放入就绪队列并唤醒调度循环（调用方持有锁）"""
+        task.enqueued_at = time.perf_counter()
+        self.queues[task.priority].append(task)
+        self.task_map[task.task_id] = task
+        self._ready_count += 1
+        self._ready.notify()
     
     async def enqueue(self, task: ExecutionTask) -> bool:
         """入队任务"""
         async with self._lock:
-            if len(self.task_map) >= self.max_size:
+            if len(self.task_map) >= self.max_size and task.task_id not in self.task_map:
                 return False
             
             # 检查依赖关系
@@ -111,43 +137,74 @@ class ExecutionQueue:
                 ]
                 
                 if unresolved_deps:
+                    failed_dep = next((
+                        dep for dep in unresolved_deps
+                        if dep in self.task_map and self.task_map[dep].status in
+                        (ToolStatus.FAILED, ToolStatus.CANCELLED) and self.task_map[dep].completed_at
+                    ), None)
+                    if failed_dep:
+                        self._fail_dependents_of(failed_dep, [task])
+                        return True
                     self.waiting_tasks[task.task_id] = task
-                    for dep in task.dependencies:
+                    for dep in unresolved_deps:
                         self.dependency_graph[dep].add(task.task_id)
                     return True
             
             # 添加到相应优先级队列
-            self.queues[task.priority].append(task)
-            self.task_map[task.task_id] = task
+            self._push_ready(task)
             return True
     
+    def _pop_ready(self) -> Optional[ExecutionTask]:
+        """按优先级取出一个就绪任务，跳过已取消的任务（调用方持有锁）"""
+        for priority in self.PRIORITY_ORDER:
+            queue = self.queues[priority]
+            while queue:
+                task = queue.popleft()
+                self._ready_count -= 1
+                if task.status == ToolStatus.CANCELLED:
+                    continue
+                task.status = ToolStatus.RUNNING
+                task.started_at = get_iso_timestamp()
+                task.dispatched_at = time.perf_counter()
+                return task
+        return None
+    
     async def dequeue(self) -> Optional[ExecutionTask]:
         """出队任务"""
         async with self._lock:
-            # 按优先级顺序检查队列
-            for priority in [ExecutionPriority.URGENT, ExecutionPriority.HIGH,
-                           ExecutionPriority.NORMAL, ExecutionPriority.LOW]:
-                if self.queues[priority]:
-                    task = self.queues[priority].popleft()
-                    task.status = ToolStatus.RUNNING
-                    task.started_at = get_iso_timestamp()
-                    return task
-            
-            return None
+            return self._pop_ready()
+    
+    async def dequeue_ready(self, limit: int, wait: bool = True) -> List[ExecutionTask]:
+        """取出至多 limit 个就绪任务；wait 为真时在没有就绪任务时等待入队或依赖释放的通知"""
+        async with self._lock:
+            if wait:
+                await self._ready.wait_for(lambda: self._ready_count > 0)
+            tasks = []
+            while len(tasks) < limit:
+                task = self._pop_ready()
+                if task is None:
+                    break
+                tasks.append(task)
+            return tasks
     
     async def complete_task(self, task_id: str, result: ToolResult) -> None:
-        """完成任务"""
+        """完成任务，释放依赖已全部完成的等待任务"""
         async with self._lock:
             if task_id in self.task_map:
                 task = self.task_map[task_id]
                 task.status = result.status
                 task.result = result
                 task.completed_at = get_iso_timestamp()
+                self._resolve(task)
+                
+                if task.status != ToolStatus.COMPLETED:
+                    # 依赖失败或取消的任务永远无法执行，直接结束
+                    self._fail_dependents_of(task_id)
+                    return
                 
                 # 检查是否有等待此任务的依赖任务
                 if task_id in self.dependency_graph:
-                    dependent_tasks = self.dependency_graph[task_id].copy()
-                    del self.dependency_graph[task_id]
+                    dependent_tasks = self.dependency_graph.pop(task_id)
                     
                     for dependent_id in dependent_tasks:
                         if dependent_id in self.waiting_tasks:
@@ -163,8 +220,48 @@ class ExecutionQueue:
                             if all_deps_completed:
                                 # 移动到执行队列
                                 del self.waiting_tasks[dependent_id]
-                                self.queues[dependent_task.priority].append(dependent_task)
-                                self.task_map[dependent_id] = dependent_task
+                                self._push_ready(dependent_task)
+    
+    @staticmethod
+    def _resolve(task: ExecutionTask) -> None:
+        """以任务结果完成任务的 future"""
+        if task.future is not None and not task.future.done():
+            task.future.set_result(task.result)
+    
+    def _cancel_unstarted(self, task: ExecutionTask, message: str, error_code: str) -> None:
+        """结束一个尚未执行的任务并生成取消结果（调用方持有锁）"""
+        task.status = ToolStatus.CANCELLED
+        task.completed_at = get_iso_timestamp()
+        task.error = message
+        task.result = ToolResult(
+            tool_id=task.tool.tool_id,
+            tool_type=task.tool.tool_type.value,
+            status=ToolStatus.CANCELLED,
+            success=False,
+            start_time=task.completed_at,
+            end_time=task.completed_at,
+            error_message=message,
+            error_code=error_code
+        )
+        self.task_map[task.task_id] = task
+        self._resolve(task)
+    
+    def _fail_dependents_of(self, task_id: str, tasks: Optional[List[ExecutionTask]] = None) -> None:
+        """将依赖 task_id 的等待任务（及其下游）标记为取消（调用方持有锁）"""
+        pending = list(tasks) if tasks is not None else [
+            self.waiting_tasks.pop(dependent_id)
+            for dependent_id in self.dependency_graph.pop(task_id, ())
+            if dependent_id in self.waiting_tasks
+        ]
+        while pending:
+            dependent = pending.pop()
+            self.waiting_tasks.pop(dependent.task_id, None)
+            self._cancel_unstarted(dependent, f"Dependency not completed: {task_id}", "DEPENDENCY_FAILED")
+            pending.extend(
+                self.waiting_tasks.pop(grandchild_id)
+                for grandchild_id in self.dependency_graph.pop(dependent.task_id, ())
+                if grandchild_id in self.waiting_tasks
+            )
     
     async def get_task(self, task_id: str) -> Optional[ExecutionTask]:
         """获取任务"""
@@ -176,13 +273,21 @@ class ExecutionQueue:
         async with self._lock:
             if task_id in self.task_map:
                 task = self.task_map[task_id]
-                if task.status in [ToolStatus.PENDING, ToolStatus.RUNNING]:
+                # 就绪队列中的任务状态为 IDLE，出队时会跳过已取消的任务；
+                # 执行中的任务由执行器取消，取消结果在任务退出时写入
+                if task.status == ToolStatus.IDLE:
+                    self._cancel_unstarted(task, "Task cancelled before execution", "TASK_CANCELLED")
+                    self._fail_dependents_of(task_id)
+                    return True
+                if task.status == ToolStatus.RUNNING:
                     task.status = ToolStatus.CANCELLED
                     task.completed_at = get_iso_timestamp()
+                    self._fail_dependents_of(task_id)
                     return True
             
             if task_id in self.waiting_tasks:
-                del self.waiting_tasks[task_id]
+                self._cancel_unstarted(self.waiting_tasks.pop(task_id), "Task cancelled before execution", "TASK_CANCELLED")
+                self._fail_dependents_of(task_id)
                 return True
             
             return False
@@ -239,9 +344,13 @@ class ToolExecutor:
             'total_failed': 0,
             'total_cancelled': 0,
             'average_execution_time': 0.0,
-            'execution_times': deque(maxlen=1000)
+            'execution_times': deque(maxlen=1000),
+            'queue_wait_times': deque(maxlen=1000)
         }
         
+        # 任务结束时置位，调度循环在并发已满时等待该事件
+        self._slot_freed = asyncio.Event()
+        
         # 事件回调
         self.event_callbacks: Dict[str, List[Callable]] = defaultdict(list)
         
@@ -267,11 +376,12 @@ class ToolExecutor:
         self.is_running = False
         
         # 取消所有活动任务
-        for task in self.active_tasks.values():
+        for task in list(self.active_tasks.values()):
             task.cancel()
         
-        # 等待执行器任务完成
+        # 调度循环阻塞在等待通知上，直接取消
         if self.executor_task:
+            self.executor_task.cancel()
             try:
                 await self.executor_task
             except asyncio.CancelledError:
@@ -301,7 +411,8 @@ class ToolExecutor:
             priority=priority,
             timeout=timeout or self.default_timeout,
             dependencies=dependencies or [],
-            callback=callback
+            callback=callback,
+            future=asyncio.get_running_loop().create_future()
         )
         
         success = await self.queue.enqueue(task)
@@ -333,6 +444,7 @@ class ToolExecutor:
         """提交批次任务"""
         batch_id = str(uuid.uuid4())
         
+        loop = asyncio.get_running_loop()
         execution_tasks = []
         for i, (tool, parameters, context) in enumerate(tasks):
             task_id = f"{batch_id}_{i}"
@@ -349,7 +461,8 @@ class ToolExecutor:
                 context=context or {},
                 priority=priority,
                 timeout=timeout or self.default_timeout,
-                dependencies=dependencies
+                dependencies=dependencies,
+                future=loop.create_future()
             )
             
             execution_tasks.append(task)
@@ -393,6 +506,19 @@ class ToolExecutor:
         
         return None
     
+    def get_task_future(self, task_id: str) -> Optional[asyncio.Future]:
+        """获取任务的完成 future，结果为任务的最终 ToolResult"""
+        task = (self.queue.task_map.get(task_id) or self.queue.waiting_tasks.get(task_id)
+                or self.completed_tasks.get(task_id) or self.failed_tasks.get(task_id))
+        return task.future if task else None
+    
+    async def wait_for_task(self, task_id: str, timeout: Optional[float] = None) -> Optional[ToolResult]:
+        """等待任务结束并返回结果，超时抛出 asyncio.TimeoutError（任务本身不受影响）"""
+        future = self.get_task_future(task_id)
+        if future is None:
+            return await self.get_task_result(task_id)
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    
     async def get_batch_results(self, batch_id: str) -> Optional[List[ToolResult]]:
         """获取批次结果"""
         if batch_id not in self.batches:
@@ -458,7 +584,20 @@ class ToolExecutor:
             'max_concurrent_tasks': self.max_concurrent_tasks,
             'queue_status': queue_status,
             'batch_count': len(self.batches),
-            'statistics': self.stats.copy()
+            'statistics': self.stats.copy(),
+            'queue_wait': self._queue_wait_summary()
+        }
+    
+    def _queue_wait_summary(self) -> Dict[str, float]:
+        """最近任务的排队等待时间（毫秒）"""
+        waits = sorted(self.stats['queue_wait_times'])
+        if not waits:
+            return {'count': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'count': len(waits),
+            'p50_ms': waits[len(waits) // 2] * 1000,
+            'p99_ms': waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000,
+            'max_ms': waits[-1] * 1000
         }
     
     async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
@@ -538,30 +677,43 @@ class ToolExecutor:
                 pass
     
     async def _execution_loop(self) -> None:
-        """执行循环"""
+        """执行循环
+
+        不轮询：并发已满时等待任务结束的通知，否则等待就绪任务的通知；
+        每次唤醒按空闲槽位一次取出多个就绪任务。
+        """
         while self.is_running:
             try:
-                # 清理已完成的活动任务
-                await self._cleanup_completed_tasks()
-                
-                # 检查是否可以启动新任务
-                if len(self.active_tasks) < self.max_concurrent_tasks:
-                    task = await self.queue.dequeue()
-                    
-                    if task:
-                        # 启动任务执行
-                        execution_task = asyncio.create_task(
-                            self._execute_task(task)
-                        )
-                        self.active_tasks[task.task_id] = execution_task
+                free_slots = self.max_concurrent_tasks - len(self.active_tasks)
+                if free_slots <= 0:
+                    self._slot_freed.clear()
+                    await self._slot_freed.wait()
+                    continue
                 
-                # 短暂休眠避免忙等待
-                await asyncio.sleep(0.1)
+                for task in await self.queue.dequeue_ready(free_slots):
+                    self._start_task(task)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in execution loop: {e}")
                 await asyncio.sleep(1.0)
     
+    def _start_task(self, task: ExecutionTask) -> None:
+        """启动任务执行，任务结束时释放槽位"""
+        self.stats['queue_wait_times'].append(task.dispatched_at - task.enqueued_at)
+        execution_task = asyncio.create_task(self._execute_task(task))
+        self.active_tasks[task.task_id] = execution_task
+        execution_task.add_done_callback(functools.partial(self._on_task_done, task))
+    
+    def _on_task_done(self, task: ExecutionTask, execution_task: asyncio.Task) -> None:
+        if self.active_tasks.get(task.task_id) is execution_task:
+            del self.active_tasks[task.task_id]
+        if execution_task.cancelled() and task.future is not None and not task.future.done():
+            # 在第一次调度前被取消的任务不会进入 _execute_task 的取消分支，在此补上取消结果
+            self.queue._cancel_unstarted(task, "Task execution cancelled", "EXECUTION_CANCELLED")
+        self._slot_freed.set()
+    
     async def _execute_task(self, task: ExecutionTask) -> None:
         """执行单个任务"""
         start_time = time.time()
@@ -666,7 +818,7 @@ class ToolExecutor:
             # 检查是否需要重试
             if task.retry_count < task.max_retries:
                 task.retry_count += 1
-                task.status = ToolStatus.PENDING
+                task.status = ToolStatus.IDLE
                 task.started_at = None
                 
                 # 重新入队
@@ -746,7 +898,11 @@ class ToolExecutor:
 
 
 class BatchExecutor:
-    """批次执行器"""
+    """批次执行器
+
+    批次中的任务结果通过任务的完成 future 获取：每个 future 完成时把 (下标, 结果) 放入完成队列，
+    等待方只在有任务结束时被唤醒，结果随完成顺序流式产出，不再按固定间隔轮询每个任务。
+    """
     
     def __init__(self, tool_executor: ToolExecutor):
         self.tool_executor = tool_executor
@@ -755,84 +911,132 @@ class BatchExecutor:
     async def execute_sequential(
         self,
         tasks: List[Tuple[GUITool, ToolParameters, Optional[Dict[str, Any]]]],
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        fail_fast: bool = False,
+        deadline: Optional[float] = None
     ) -> List[ToolResult]:
-        """顺序执行任务"""
-        results = []
-        
-        for tool, parameters, context in tasks:
-            try:
-                task_id = await self.tool_executor.submit_task(
-                    tool, parameters, context, timeout=timeout
-                )
-                
-                # 等待任务完成
-                while True:
-                    result = await self.tool_executor.get_task_result(task_id)
-                    if result:
-                        results.append(result)
-                        break
-                    await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"Error in sequential execution: {e}")
-                # 创建错误结果
-                error_result = ToolResult(
-                    tool_id=tool.tool_id,
-                    tool_type=tool.tool_type.value,
-                    status=ToolStatus.FAILED,
-                    success=False,
-                    start_time=get_iso_timestamp(),
-                    end_time=get_iso_timestamp(),
-                    error_message=str(e),
-                    error_code="BATCH_EXECUTION_ERROR"
-                )
-                results.append(error_result)
-        
-        return results
+        """顺序执行任务：前一个任务结束后才提交下一个"""
+        return await self.execute_parallel(
+            tasks, max_concurrent=1, timeout=timeout, fail_fast=fail_fast, deadline=deadline
+        )
     
     async def execute_parallel(
         self,
         tasks: List[Tuple[GUITool, ToolParameters, Optional[Dict[str, Any]]]],
-        max_concurrent: int = 5,
-        timeout: Optional[int] = None
+        max_concurrent: Optional[int] = 5,
+        timeout: Optional[int] = None,
+        fail_fast: bool = False,
+        deadline: Optional[float] = None
     ) -> List[ToolResult]:
-        """并行执行任务"""
-        task_ids = []
+        """并行执行任务，结果按输入顺序返回"""
+        results: List[Optional[ToolResult]] = [None] * len(tasks)
+        async for index, result in self.stream_parallel(
+            tasks, max_concurrent=max_concurrent, timeout=timeout, fail_fast=fail_fast, deadline=deadline
+        ):
+            results[index] = result
+        return results
+    
+    async def stream_parallel(
+        self,
+        tasks: List[Tuple[GUITool, ToolParameters, Optional[Dict[str, Any]]]],
+        max_concurrent: Optional[int] = 5,
+        timeout: Optional[int] = None,
+        fail_fast: bool = False,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, ToolResult]]:
+        """并行执行任务，按完成顺序逐个产出 (任务下标, 结果)
+        
+        Args:
+            tasks: (工具, 参数, 上下文) 列表
+            max_concurrent: 批次内同时提交的任务数上限，None 表示不限制
+            timeout: 单个任务的超时时间（秒）
+            fail_fast: 第一个失败结果出现后取消其余任务
+            deadline: 整个批次的截止时间（秒），到期后取消其余任务
         
-        # 提交所有任务
-        for tool, parameters, context in tasks:
+        每个任务恰好产出一个结果：被 fail_fast 取消的任务为 BATCH_CANCELLED，
+        截止时间到期时未完成的任务为 BATCH_DEADLINE_EXCEEDED。提前结束迭代时未完成的任务会被取消。
+        """
+        loop = asyncio.get_running_loop()
+        finish_at = loop.time() + deadline if deadline is not None else None
+        window = max_concurrent if max_concurrent and max_concurrent > 0 else max(len(tasks), 1)
+        completed: asyncio.Queue = asyncio.Queue()
+        pending: Dict[int, str] = {}
+        next_index = 0
+        remaining = len(tasks)
+        
+        async def submit(index: int) -> None:
+            tool, parameters, context = tasks[index]
             try:
-                task_id = await self.tool_executor.submit_task(
-                    tool, parameters, context, timeout=timeout
-                )
-                task_ids.append(task_id)
+                task_id = await self.tool_executor.submit_task(tool, parameters, context, timeout=timeout)
             except Exception as e:
-                logger.error(f"Error submitting parallel task: {e}")
-                task_ids.append(None)
+                logger.error(f"Error submitting batch task: {e}")
+                completed.put_nowait((index, self._batch_result(tool, ToolStatus.FAILED, str(e), "TASK_SUBMISSION_ERROR")))
+                return
+            pending[index] = task_id
+            self.tool_executor.get_task_future(task_id).add_done_callback(
+                lambda future, index=index: completed.put_nowait((index, future.result()))
+            )
         
-        # 等待所有任务完成
-        results = []
-        for task_id in task_ids:
-            if task_id:
-                while True:
-                    result = await self.tool_executor.get_task_result(task_id)
-                    if result:
-                        results.append(result)
-                        break
-                    await asyncio.sleep(0.1)
-            else:
-                # 创建错误结果
-                error_result = ToolResult(
-                    tool_id="unknown",
-                    tool_type="unknown",
-                    status=ToolStatus.FAILED,
-                    success=False,
-                    start_time=get_iso_timestamp(),
-                    end_time=get_iso_timestamp(),
-                    error_message="Failed to submit task",
-                    error_code="TASK_SUBMISSION_ERROR"
-                )
-                results.append(error_result)
+        async def fill_window() -> None:
+            nonlocal next_index
+            while next_index < len(tasks) and len(pending) < window:
+                next_index += 1
+                await submit(next_index - 1)
         
-        return results
\ No newline at end of file
+        try:
+            await fill_window()
+            stop_status = None
+            while remaining:
+                try:
+                    if finish_at is None:
+                        index, result = await completed.get()
+                    else:
+                        index, result = await asyncio.wait_for(completed.get(), max(0.0, finish_at - loop.time()))
+                except asyncio.TimeoutError:
+                    stop_status = (ToolStatus.TIMEOUT, "Batch deadline exceeded", "BATCH_DEADLINE_EXCEEDED")
+                    break
+                
+                pending.pop(index, None)
+                remaining -= 1
+                if fail_fast and not result.success:
+                    stop_status = (ToolStatus.CANCELLED, "Batch cancelled after a task failed", "BATCH_CANCELLED")
+                else:
+                    await fill_window()
+                yield index, result
+                if stop_status:
+                    break
+            
+            if stop_status and remaining:
+                # 已结束但尚未取出的任务使用真实结果，其余已提交的任务取消后与未提交的任务一起产出批次结果
+                while not completed.empty():
+                    index, result = completed.get_nowait()
+                    pending.pop(index, None)
+                    yield index, result
+                leftovers = sorted(pending) + list(range(next_index, len(tasks)))
+                await self._cancel_pending(pending)
+                status, message, error_code = stop_status
+                for index in leftovers:
+                    yield index, self._batch_result(tasks[index][0], status, message, error_code)
+        finally:
+            await self._cancel_pending(pending)
+    
+    async def _cancel_pending(self, pending: Dict[int, str]) -> None:
+        """取消批次中已提交但尚未结束的任务"""
+        for task_id in list(pending.values()):
+            await self.tool_executor.cancel_task(task_id)
+        pending.clear()
+    
+    @staticmethod
+    def _batch_result(tool: GUITool, status: ToolStatus, message: str, error_code: str) -> ToolResult:
+        """批次层面生成的结果（提交失败、批次取消或超时）"""
+        now = get_iso_timestamp()
+        return ToolResult(
+            tool_id=tool.tool_id,
+            tool_type=tool.tool_type.value,
+            status=status,
+            success=False,
+            start_time=now,
+            end_time=now,
+            error_message=message,
+            error_code=error_code
+        )
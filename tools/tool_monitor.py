@@ -9,18 +9,24 @@ Date: 2025
 """
 
 import asyncio
+import inspect
+import itertools
 import json
+import math
 import time
 import threading
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Callable, Deque
+from typing import Any, Dict, List, Optional, Set, Callable, Deque, Sequence, Tuple
+
+from loguru import logger
 
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
     ToolType, ToolStatus
 )
+from .quantile_sketch import DDSketch
 from utils import get_iso_timestamp, setup_logger
 
 
@@ -87,18 +93,16 @@ class ExecutionTrace:
     error: Optional[str] = None
     metrics: List[PerformanceMetric] = field(default_factory=list)
     events: List[MonitorEvent] = field(default_factory=list)
+    # 单调时钟的开始和结束时刻，用于计算持续时间
+    started_at: float = field(default_factory=time.monotonic)
+    ended_at: Optional[float] = None
     
     @property
     def duration(self) -> Optional[float]:
         """执行持续时间（秒）"""
-        if self.start_time and self.end_time:
-            try:
-                # 简化的时间计算，实际应该使用proper datetime parsing
-                return float(self.end_time.split('T')[1].split(':')[2].split('Z')[0]) - \
-                       float(self.start_time.split('T')[1].split(':')[2].split('Z')[0])
-            except Exception:
-                return None
-        return None
+        if self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
 
 
 @dataclass
@@ -118,15 +122,73 @@ class Alert:
     tags: Dict[str, str] = field(default_factory=dict)
 
 
+class _MetricSeries:
+    """一个线程分片中单个指标的累计草图和按时间窗口划分的草图"""
+    
+    __slots__ = ('metric_type', 'total', 'windows', 'latest', 'latest_seq',
+                 '_window_seconds', '_relative_accuracy', '_current_end')
+    
+    def __init__(self, metric_type: MetricType, window_seconds: float, max_windows: int, relative_accuracy: float):
+        self.metric_type = metric_type
+        self.total = DDSketch(relative_accuracy)
+        # (窗口起点, 草图)，最旧的窗口在左侧
+        self.windows: Deque[Tuple[float, DDSketch]] = deque(maxlen=max_windows)
+        self.latest = 0.0
+        self.latest_seq = -1
+        self._window_seconds = window_seconds
+        self._relative_accuracy = relative_accuracy
+        self._current_end = -1.0
+    
+    def add(self, value: float, seq: int, now: float) -> None:
+        self.total.add(value)
+        if now >= self._current_end:
+            start = now - now % self._window_seconds
+            self.windows.append((start, DDSketch(self._relative_accuracy)))
+            self._current_end = start + self._window_seconds
+        self.windows[-1][1].add(value)
+        self.latest = value
+        self.latest_seq = seq
+
+
 class MetricCollector:
-    """指标收集器"""
+    """指标收集器
+    
+    每个指标的分布保存在固定内存的 DDSketch 中（相对误差 1%），同时按 window_seconds
+    划分时间窗口，保留最近 max_windows 个窗口的草图，用于查询近期的尾延迟。
+    写入只修改当前线程自己的分片，不加锁；读取时合并所有分片。
+    """
     
-    def __init__(self, max_history_size: int = 10000):
+    QUANTILES = (0.5, 0.9, 0.95, 0.99)
+    
+    def __init__(
+        self,
+        max_history_size: int = 10000,
+        window_seconds: float = 60.0,
+        max_windows: int = 15,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.monotonic
+    ):
         self.metrics: Dict[str, Deque[PerformanceMetric]] = defaultdict(lambda: deque(maxlen=max_history_size))
-        self.aggregated_metrics: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.max_history_size = max_history_size
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.relative_accuracy = relative_accuracy
+        self._clock = clock
+        # 锁只用于注册分片和读取时的合并
         self.lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[Dict[str, _MetricSeries]] = []
+        self._sequence = itertools.count()
         self.logger = logger
     
+    def _shard(self) -> Dict[str, _MetricSeries]:
+        shard = getattr(self._local, 'series', None)
+        if shard is None:
+            shard = self._local.series = {}
+            with self.lock:
+                self._shards.append(shard)
+        return shard
+    
     def record_metric(
         self,
         name: str,
@@ -137,18 +199,24 @@ class MetricCollector:
         description: Optional[str] = None
     ) -> None:
         """记录指标"""
-        metric = PerformanceMetric(
-            metric_name=name,
-            metric_type=metric_type,
-            value=value,
-            unit=unit,
-            tags=tags or {},
-            description=description
-        )
+        if self.max_history_size:
+            # deque.append 本身是线程安全的
+            self.metrics[name].append(PerformanceMetric(
+                metric_name=name,
+                metric_type=metric_type,
+                value=value,
+                unit=unit,
+                tags=tags or {},
+                description=description
+            ))
         
-        with self.lock:
-            self.metrics[name].append(metric)
-            self._update_aggregated_metrics(name, value, metric_type)
+        shard = self._shard()
+        series = shard.get(name)
+        if series is None:
+            series = shard[name] = _MetricSeries(
+                metric_type, self.window_seconds, self.max_windows, self.relative_accuracy
+            )
+        series.add(value, next(self._sequence), self._clock())
     
     def get_metric_history(
         self,
@@ -156,55 +224,161 @@ class MetricCollector:
         limit: Optional[int] = None
     ) -> List[PerformanceMetric]:
         """获取指标历史"""
-        with self.lock:
-            history = list(self.metrics.get(name, []))
-            if limit:
-                return history[-limit:]
-            return history
+        history = list(self.metrics.get(name, []))
+        if limit:
+            return history[-limit:]
+        return history
     
-    def get_aggregated_metrics(self, name: str) -> Dict[str, float]:
-        """获取聚合指标"""
+    def _series(self, name: str) -> List[_MetricSeries]:
         with self.lock:
-            return self.aggregated_metrics.get(name, {}).copy()
+            shards = list(self._shards)
+        return [shard[name] for shard in shards if name in shard]
     
-    def get_all_metrics(self) -> Dict[str, Dict[str, float]]:
-        """获取所有聚合指标"""
-        with self.lock:
-            return {name: metrics.copy() for name, metrics in self.aggregated_metrics.items()}
-    
-    def _update_aggregated_metrics(self, name: str, value: float, metric_type: MetricType) -> None:
-        """更新聚合指标"""
-        if name not in self.aggregated_metrics:
-            self.aggregated_metrics[name] = {
-                'count': 0,
-                'sum': 0.0,
-                'min': float('inf'),
-                'max': float('-inf'),
-                'avg': 0.0,
-                'latest': 0.0
-            }
-        
-        agg = self.aggregated_metrics[name]
-        
-        if metric_type == MetricType.COUNTER:
-            agg['sum'] += value
+    def get_sketch(self, name: str, window: Optional[float] = None) -> Optional[DDSketch]:
+        """合并所有分片得到指标的草图；window 为秒数时只合并覆盖最近 window 秒的时间窗口"""
+        series = self._series(name)
+        if not series:
+            return None
+        merged = DDSketch(self.relative_accuracy)
+        since = self._clock() - window if window is not None else None
+        for item in series:
+            if since is None:
+                merged.merge(item.total)
+            else:
+                for start, sketch in list(item.windows):
+                    if start + self.window_seconds > since:
+                        merged.merge(sketch)
+        return merged
+    
+    def get_quantiles(
+        self,
+        name: str,
+        quantiles: Sequence[float] = QUANTILES,
+        window: Optional[float] = None
+    ) -> Dict[str, float]:
+        """指标的分位数，如 {'p50': ..., 'p99': ...}"""
+        sketch = self.get_sketch(name, window)
+        if sketch is None:
+            return {}
+        return {f"p{q * 100:g}": value for q, value in zip(quantiles, sketch.quantiles(quantiles))}
+    
+    def get_aggregated_metrics(self, name: str, window: Optional[float] = None) -> Dict[str, float]:
+        """获取聚合指标：count/sum/min/max/avg/latest 以及 p50/p90/p95/p99"""
+        series = self._series(name)
+        if not series:
+            return {}
+        sketch = self.get_sketch(name, window)
+        agg = sketch.to_dict(self.QUANTILES)
+        latest = max(series, key=lambda item: item.latest_seq)
+        if latest.metric_type == MetricType.COUNTER:
+            # 计数器只累计总和，latest 为累计值
+            agg['count'] = 0
             agg['latest'] = agg['sum']
         else:
-            agg['count'] += 1
-            agg['sum'] += value
-            agg['min'] = min(agg['min'], value)
-            agg['max'] = max(agg['max'], value)
-            agg['avg'] = agg['sum'] / agg['count']
-            agg['latest'] = value
+            agg['latest'] = latest.latest
+        return agg
+    
+    def get_all_metrics(self, window: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """获取所有聚合指标"""
+        with self.lock:
+            names = {name for shard in self._shards for name in list(shard)}
+        return {name: self.get_aggregated_metrics(name, window) for name in names}
+    
+    @property
+    def aggregated_metrics(self) -> Dict[str, Dict[str, float]]:
+        return self.get_all_metrics()
+
+
+class SlidingWindow:
+    """滑动窗口预聚合
+    
+    把 window_seconds 划分为 buckets 个滚动桶，每个样本只更新当前桶和窗口的累计值，
+    时间推进时把过期桶的计数和总和从累计值中减去，读取快照是 O(buckets) 的，与样本数无关。
+    """
+    
+    __slots__ = ('window_seconds', 'bucket_seconds', 'count', 'sum', 'latest', 'total_count',
+                 '_counts', '_sums', '_maxes', '_epoch', '_clock')
+    
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 6, clock: Callable[[], float] = time.monotonic):
+        if window_seconds <= 0 or buckets <= 0:
+            raise ValueError("window_seconds and buckets must be positive")
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.count = 0
+        self.sum = 0.0
+        self.latest = 0.0
+        self.total_count = 0
+        self._counts = [0] * buckets
+        self._sums = [0.0] * buckets
+        self._maxes = [-math.inf] * buckets
+        self._epoch: Optional[int] = None
+        self._clock = clock
+    
+    def _advance(self, now: float) -> None:
+        """推进到 now 所在的桶，清空其间过期的桶"""
+        epoch = int(now // self.bucket_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+            return
+        steps = epoch - self._epoch
+        if steps <= 0:
+            return
+        size = len(self._counts)
+        for offset in range(1, min(steps, size) + 1):
+            slot = (self._epoch + offset) % size
+            self.count -= self._counts[slot]
+            self.sum -= self._sums[slot]
+            self._counts[slot] = 0
+            self._sums[slot] = 0.0
+            self._maxes[slot] = -math.inf
+        if not self.count:
+            # 窗口清空时归零，避免浮点误差累积
+            self.sum = 0.0
+        self._epoch = epoch
+    
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        """加入一个样本"""
+        self._advance(self._clock() if now is None else now)
+        slot = self._epoch % len(self._counts)
+        self._counts[slot] += 1
+        self._sums[slot] += value
+        if value > self._maxes[slot]:
+            self._maxes[slot] = value
+        self.count += 1
+        self.sum += value
+        self.latest = value
+        self.total_count += 1
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, float]:
+        """窗口快照：count/sum/avg/max/latest/rate，以及当前滚动桶的样本数 current_count"""
+        self._advance(self._clock() if now is None else now)
+        peak = max(self._maxes)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else 0.0,
+            'max': peak if self.count else 0.0,
+            'latest': self.latest,
+            'rate': self.count / self.window_seconds,
+            'current_count': self._counts[self._epoch % len(self._counts)] if self._epoch is not None else 0
+        }
 
 
 class AlertManager:
-    """告警管理器"""
+    """告警管理器
+    
+    规则按指标名索引。evaluate 在每个样本更新窗口后，用窗口快照评估该指标的规则：
+    条件成立时只触发一次告警，条件解除后自动标记为已解决，同一规则和范围不会重复告警。
+    """
     
     def __init__(self, max_alerts: int = 1000):
         self.alerts: Deque[Alert] = deque(maxlen=max_alerts)
         self.alert_rules: List[Dict[str, Any]] = []
-        self.alert_handlers: List[Callable[[Alert], None]] = []
+        self.alert_handlers: List[Callable[[Alert], Any]] = []
+        # (规则序号, 范围) -> 尚未解除的告警
+        self.active_alerts: Dict[Tuple[int, Optional[str]], Alert] = {}
+        self._rules_by_metric: Dict[str, List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        self._alert_ids = itertools.count(1)
         self.lock = threading.Lock()
         self.logger = logger
     
@@ -214,7 +388,9 @@ class AlertManager:
         condition: str,  # ">", "<", ">=", "<=", "==", "!="
         threshold: float,
         severity: AlertSeverity = AlertSeverity.WARNING,
-        message_template: str = "Metric {metric_name} {condition} {threshold}"
+        message_template: str = "Metric {metric_name} {condition} {threshold}",
+        statistic: str = "latest",  # 窗口快照中参与比较的统计量：latest/avg/max/count/rate/sum
+        min_count: int = 0  # 窗口内样本数达到该值才评估，避免少量样本触发比例类告警
     ) -> None:
         """添加告警规则"""
         rule = {
@@ -222,44 +398,67 @@ class AlertManager:
             'condition': condition,
             'threshold': threshold,
             'severity': severity,
-            'message_template': message_template
+            'message_template': message_template,
+            'statistic': statistic,
+            'min_count': min_count
         }
-        self.alert_rules.append(rule)
+        with self.lock:
+            self._rules_by_metric[metric_name].append((len(self.alert_rules), rule))
+            self.alert_rules.append(rule)
         logger.info(f"Added alert rule: {metric_name} {condition} {threshold}")
     
-    def add_alert_handler(self, handler: Callable[[Alert], None]) -> None:
-        """添加告警处理器"""
+    def add_alert_handler(self, handler: Callable[[Alert], Any]) -> None:
+        """添加告警处理器（可以是协程函数）"""
         self.alert_handlers.append(handler)
     
+    def has_rules(self, metric_name: str) -> bool:
+        return metric_name in self._rules_by_metric
+    
+    def evaluate(
+        self,
+        metric_name: str,
+        snapshot: Dict[str, float],
+        scope: Optional[str] = None
+    ) -> List[Alert]:
+        """用窗口快照评估指标的规则，返回新触发的告警（已记录，未分发给处理器）
+        
+        Args:
+            metric_name: 规则中的指标名
+            snapshot: SlidingWindow.snapshot() 的结果
+            scope: 窗口所属范围（如工具名），同一规则在不同范围内独立触发
+        """
+        fired = []
+        with self.lock:
+            for index, rule in self._rules_by_metric.get(metric_name, ()):
+                key = (index, scope)
+                value = snapshot.get(rule['statistic'], 0.0)
+                breached = (
+                    snapshot.get('count', 0) >= rule['min_count']
+                    and self._evaluate_condition(value, rule['condition'], rule['threshold'])
+                )
+                active = self.active_alerts.get(key)
+                if breached and active is None:
+                    alert = self._build_alert(rule, value, scope)
+                    self.active_alerts[key] = alert
+                    fired.append(alert)
+                elif not breached and active is not None:
+                    del self.active_alerts[key]
+                    active.resolved = True
+                    logger.info(f"Alert auto-resolved: {active.alert_id}")
+        for alert in fired:
+            self._record_alert(alert)
+        return fired
+    
     def check_metrics(self, metrics: Dict[str, Dict[str, float]]) -> List[Alert]:
         """检查指标并生成告警"""
         alerts = []
         
         for rule in self.alert_rules:
             metric_name = rule['metric_name']
-            condition = rule['condition']
-            threshold = rule['threshold']
-            
             if metric_name in metrics:
-                metric_data = metrics[metric_name]
-                current_value = metric_data.get('latest', 0)
-                
-                if self._evaluate_condition(current_value, condition, threshold):
-                    alert = Alert(
-                        alert_id=f"alert_{int(time.time() * 1000)}",
-                        severity=rule['severity'],
-                        title=f"Metric Alert: {metric_name}",
-                        message=rule['message_template'].format(
-                            metric_name=metric_name,
-                            condition=condition,
-                            threshold=threshold,
-                            current_value=current_value
-                        ),
-                        metric_name=metric_name,
-                        threshold_value=threshold,
-                        actual_value=current_value
-                    )
-                    alerts.append(alert)
+                current_value = metrics[metric_name].get('latest', 0)
+                if self._evaluate_condition(current_value, rule['condition'], rule['threshold']):
+                    alerts.append(self._build_alert(rule, current_value))
         
         # 记录和处理告警
         for alert in alerts:
@@ -293,6 +492,16 @@ class AlertManager:
         
         return alerts
     
+    def recent_alerts(self, limit: int = 10) -> List[Alert]:
+        """最近的告警（按记录顺序倒序），只读取队尾"""
+        with self.lock:
+            return list(itertools.islice(reversed(self.alerts), limit))
+    
+    def get_active_alerts(self) -> List[Alert]:
+        """条件仍然成立且未被手动解决的告警"""
+        with self.lock:
+            return [alert for alert in self.active_alerts.values() if not alert.resolved]
+    
     def acknowledge_alert(self, alert_id: str) -> bool:
         """确认告警"""
         with self.lock:
@@ -313,6 +522,24 @@ class AlertManager:
                     return True
         return False
     
+    def _build_alert(self, rule: Dict[str, Any], value: float, scope: Optional[str] = None) -> Alert:
+        metric_name = rule['metric_name']
+        return Alert(
+            alert_id=f"alert_{int(time.time() * 1000)}_{next(self._alert_ids)}",
+            severity=rule['severity'],
+            title=f"Metric Alert: {metric_name}" + (f" ({scope})" if scope else ""),
+            message=rule['message_template'].format(
+                metric_name=metric_name,
+                condition=rule['condition'],
+                threshold=rule['threshold'],
+                current_value=value
+            ),
+            metric_name=metric_name,
+            threshold_value=rule['threshold'],
+            actual_value=value,
+            tags={'scope': scope} if scope else {}
+        )
+    
     def _evaluate_condition(self, value: float, condition: str, threshold: float) -> bool:
         """评估条件"""
         if condition == ">":
@@ -336,10 +563,26 @@ class AlertManager:
         logger.warning(f"Alert generated: {alert.title} - {alert.message}")
     
     def _handle_alert(self, alert: Alert) -> None:
-        """处理告警"""
+        """同步处理告警；协程处理器交给当前线程运行中的事件循环，没有事件循环时丢弃"""
         for handler in self.alert_handlers:
             try:
-                handler(alert)
+                outcome = handler(alert)
+                if inspect.isawaitable(outcome):
+                    try:
+                        asyncio.get_running_loop().create_task(outcome)
+                    except RuntimeError:
+                        outcome.close()
+                        logger.warning(f"No running event loop for async alert handler: {alert.alert_id}")
+            except Exception as e:
+                logger.error(f"Error in alert handler: {e}")
+    
+    async def dispatch(self, alert: Alert) -> None:
+        """在事件循环中处理告警，依次等待协程处理器"""
+        for handler in self.alert_handlers:
+            try:
+                outcome = handler(alert)
+                if inspect.isawaitable(outcome):
+                    await outcome
             except Exception as e:
                 logger.error(f"Error in alert handler: {e}")
 
@@ -351,11 +594,12 @@ class ExecutionTracker:
         self.traces: Dict[str, ExecutionTrace] = {}
         self.completed_traces: Deque[ExecutionTrace] = deque(maxlen=max_traces)
         self.lock = threading.Lock()
+        self._trace_ids = itertools.count(1)
         self.logger = logger
     
     def start_trace(self, tool: GUITool, parameters: Optional[ToolParameters] = None) -> str:
         """开始跟踪"""
-        trace_id = f"trace_{tool.tool_id}_{int(time.time() * 1000)}"
+        trace_id = f"trace_{tool.tool_id}_{int(time.time() * 1000)}_{next(self._trace_ids)}"
         
         trace = ExecutionTrace(
             trace_id=trace_id,
@@ -363,7 +607,7 @@ class ExecutionTracker:
             tool_name=tool.name,
             start_time=get_iso_timestamp(),
             status=ToolStatus.RUNNING,
-            parameters=parameters.data if parameters else None
+            parameters=parameters.to_dict() if parameters else None
         )
         
         with self.lock:
@@ -377,29 +621,31 @@ class ExecutionTracker:
         trace_id: str,
         result: Optional[ToolResult] = None,
         error: Optional[str] = None
-    ) -> None:
-        """结束跟踪"""
+    ) -> Optional[ExecutionTrace]:
+        """结束跟踪，返回已结束的跟踪（不存在时返回 None）"""
         with self.lock:
-            if trace_id in self.traces:
-                trace = self.traces[trace_id]
-                trace.end_time = get_iso_timestamp()
-                
-                if result:
-                    trace.status = result.status
-                    trace.result = result.data
-                    if result.error_message:
-                        trace.error = result.error_message
-                elif error:
-                    trace.status = ToolStatus.FAILED
-                    trace.error = error
-                else:
-                    trace.status = ToolStatus.COMPLETED
-                
-                # 移动到已完成跟踪
-                self.completed_traces.append(trace)
-                del self.traces[trace_id]
-                
-                logger.debug(f"Ended trace: {trace_id}, status: {trace.status.value}")
+            trace = self.traces.pop(trace_id, None)
+            if trace is None:
+                return None
+            trace.end_time = get_iso_timestamp()
+            trace.ended_at = time.monotonic()
+            
+            if result:
+                trace.status = result.status
+                trace.result = result.result_data
+                if result.error_message:
+                    trace.error = result.error_message
+            elif error:
+                trace.status = ToolStatus.FAILED
+                trace.error = error
+            else:
+                trace.status = ToolStatus.COMPLETED
+            
+            # 移动到已完成跟踪
+            self.completed_traces.append(trace)
+        
+        logger.debug(f"Ended trace: {trace_id}, status: {trace.status.value}")
+        return trace
     
     def add_trace_event(self, trace_id: str, event: MonitorEvent) -> None:
         """添加跟踪事件"""
@@ -453,10 +699,30 @@ class ExecutionTracker:
         return None
 
 
+# 通知监控循环退出的哨兵
+_STOP = object()
+
+
 class ToolMonitor:
-    """工具监控器"""
+    """工具监控器
+    
+    每次工具执行结束时，执行耗时和成败（失败计 1、成功计 0，窗口平均值即失败率）写入该工具的
+    滑动窗口，随后只评估这两个指标的告警规则；告警经 asyncio 队列交给监控循环分发，
+    仪表板直接读取各窗口的快照。监控循环在事件循环中运行（构造时已有运行中的事件循环则自动启动，
+    否则调用 await start()），未启动时告警在调用线程中同步分发。
+    """
+    
+    WINDOW_METRICS = ('execution_time', 'failure_rate')
     
-    def __init__(self, level: MonitorLevel = MonitorLevel.DETAILED):
+    def __init__(
+        self,
+        level: MonitorLevel = MonitorLevel.DETAILED,
+        window_seconds: float = 60.0,
+        window_buckets: int = 6,
+        cleanup_interval: float = 10.0,
+        trace_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
         self.level = level
         self.logger = logger
         
@@ -468,11 +734,19 @@ class ToolMonitor:
         # 事件处理
         self.event_handlers: List[Callable[[MonitorEvent], None]] = []
         self.events: Deque[MonitorEvent] = deque(maxlen=10000)
+        self._event_ids = itertools.count(1)
         
         # 监控状态
         self.monitoring_enabled = True
         self.monitoring_start_time = get_iso_timestamp()
         
+        # 滑动窗口：(范围, 指标名) -> 窗口，范围为工具名，自定义指标的范围为 None
+        self.window_seconds = window_seconds
+        self.window_buckets = window_buckets
+        self.windows: Dict[Tuple[Optional[str], str], SlidingWindow] = {}
+        self._window_lock = threading.Lock()
+        self._clock = clock
+        
         # 统计信息
         self.stats = {
             'total_executions': 0,
@@ -482,6 +756,14 @@ class ToolMonitor:
             'average_execution_time': 0.0
         }
         
+        # 监控循环
+        self.cleanup_interval = cleanup_interval
+        self.trace_ttl = trace_ttl
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._alert_queue: Optional[asyncio.Queue] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._next_cleanup = time.monotonic() + cleanup_interval
+        
         # 设置默认告警规则
         self._setup_default_alert_rules()
         
@@ -498,13 +780,13 @@ class ToolMonitor:
         
         # 记录开始事件
         event = MonitorEvent(
-            event_id=f"event_{int(time.time() * 1000)}",
+            event_id=f"event_{next(self._event_ids)}",
             event_type="execution_start",
             tool_id=tool.tool_id,
             tool_name=tool.name,
             data={
                 'trace_id': trace_id,
-                'parameters': parameters.data if parameters else None
+                'parameters': parameters.to_dict() if parameters else None
             },
             message=f"Started execution of tool {tool.name}"
         )
@@ -534,7 +816,8 @@ class ToolMonitor:
             return
         
         # 结束跟踪
-        self.execution_tracker.end_trace(trace_id, result, error)
+        trace = self.execution_tracker.end_trace(trace_id, result, error)
+        success = bool(result and result.success and not error)
         
         # 记录结束事件
         event_type = "execution_end"
@@ -551,7 +834,7 @@ class ToolMonitor:
             message = f"Unsuccessful execution of tool {tool.name}"
         
         event = MonitorEvent(
-            event_id=f"event_{int(time.time() * 1000)}",
+            event_id=f"event_{next(self._event_ids)}",
             event_type=event_type,
             tool_id=tool.tool_id,
             tool_name=tool.name,
@@ -566,31 +849,35 @@ class ToolMonitor:
         
         self._record_event(event)
         
-        # 记录性能指标
-        if result and hasattr(result, 'execution_time'):
-            execution_time = getattr(result, 'execution_time', 0)
-            
-            self.metric_collector.record_metric(
-                f"tool.{tool.name}.execution_time",
-                execution_time,
-                MetricType.TIMER,
-                "seconds",
-                {'tool_id': tool.tool_id}
-            )
-            
-            # 更新统计信息
-            self._update_stats(result.success, execution_time)
-        
-        # 记录成功/失败指标
-        if result:
-            metric_name = f"tool.{tool.name}.success" if result.success else f"tool.{tool.name}.failure"
-            self.metric_collector.record_metric(
-                metric_name,
-                1,
-                MetricType.COUNTER,
-                "count",
-                {'tool_id': tool.tool_id}
-            )
+        # 执行耗时优先取结果中的 duration，否则取跟踪的持续时间
+        execution_time = result.duration if result and result.duration is not None else None
+        if execution_time is None and trace is not None:
+            execution_time = trace.duration
+        execution_time = execution_time or 0.0
+        
+        self.metric_collector.record_metric(
+            f"tool.{tool.name}.execution_time",
+            execution_time,
+            MetricType.TIMER,
+            "seconds",
+            {'tool_id': tool.tool_id}
+        )
+        self.metric_collector.record_metric(
+            f"tool.{tool.name}.success" if success else f"tool.{tool.name}.failure",
+            1,
+            MetricType.COUNTER,
+            "count",
+            {'tool_id': tool.tool_id}
+        )
+        
+        # 更新统计信息和窗口，并按窗口评估告警
+        with self._window_lock:
+            self._update_stats(success, execution_time)
+        self._observe('execution_time', execution_time, tool.name)
+        self._observe('failure_rate', 0.0 if success else 1.0, tool.name)
+        
+        if self._monitor_task is None:
+            self._maybe_cleanup()
     
     def record_custom_metric(
         self,
@@ -603,33 +890,36 @@ class ToolMonitor:
         """记录自定义指标"""
         if self.monitoring_enabled:
             self.metric_collector.record_metric(name, value, metric_type, unit, tags)
+            self._observe(name, value)
     
     def add_event_handler(self, handler: Callable[[MonitorEvent], None]) -> None:
         """添加事件处理器"""
         self.event_handlers.append(handler)
     
-    def add_alert_handler(self, handler: Callable[[Alert], None]) -> None:
-        """添加告警处理器"""
+    def add_alert_handler(self, handler: Callable[[Alert], Any]) -> None:
+        """添加告警处理器（可以是协程函数）"""
         self.alert_manager.add_alert_handler(handler)
     
+    def get_window_snapshot(self, metric_name: str, tool_name: Optional[str] = None) -> Dict[str, float]:
+        """读取指标窗口的快照；tool_name 为 None 时读取自定义指标的窗口"""
+        with self._window_lock:
+            window = self.windows.get((tool_name, metric_name))
+            return window.snapshot() if window is not None else {}
+    
     def get_monitoring_dashboard(self) -> Dict[str, Any]:
-        """获取监控仪表板数据"""
-        # 获取基础统计
-        stats = self.stats.copy()
+        """获取监控仪表板数据：读取统计和窗口快照，开销只与指标数有关"""
+        with self._window_lock:
+            stats = self.stats.copy()
+            key_metrics = {
+                self._window_name(scope, metric_name): window.snapshot()
+                for (scope, metric_name), window in self.windows.items()
+            }
         
         # 获取活跃跟踪
         active_traces = self.execution_tracker.get_active_traces()
         
         # 获取最近的告警
-        recent_alerts = self.alert_manager.get_alerts(limit=10)
-        
-        # 获取关键指标
-        key_metrics = {}
-        all_metrics = self.metric_collector.get_all_metrics()
-        
-        for metric_name, metric_data in all_metrics.items():
-            if any(keyword in metric_name for keyword in ['execution_time', 'success', 'failure', 'executions']):
-                key_metrics[metric_name] = metric_data
+        recent_alerts = self.alert_manager.recent_alerts(10)
         
         # 计算健康状态
         health_status = self._calculate_health_status()
@@ -639,7 +929,9 @@ class ToolMonitor:
                 'enabled': self.monitoring_enabled,
                 'start_time': self.monitoring_start_time,
                 'level': self.level.value,
-                'health': health_status
+                'health': health_status,
+                'loop_running': self._monitor_task is not None,
+                'window_seconds': self.window_seconds
             },
             'statistics': stats,
             'active_executions': len(active_traces),
@@ -707,6 +999,10 @@ class ToolMonitor:
             },
             'error_analysis': error_types,
             'metrics': tool_metrics,
+            'recent_window': {
+                metric_name: self.get_window_snapshot(metric_name, tool_name)
+                for metric_name in self.WINDOW_METRICS
+            },
             'recent_traces': traces[:10]  # 最近10次执行
         }
     
@@ -720,9 +1016,26 @@ class ToolMonitor:
         self.monitoring_enabled = False
         logger.info("Tool monitoring disabled")
     
+    async def start(self) -> None:
+        """在当前事件循环中启动监控循环"""
+        self._start_in(asyncio.get_running_loop())
+    
+    async def stop(self) -> None:
+        """停止监控循环；队列中已有的告警会先分发完"""
+        task = self._monitor_task
+        if task is None:
+            return
+        self._alert_queue.put_nowait(_STOP)
+        try:
+            await task
+        finally:
+            self._monitor_task = None
+            self._alert_queue = None
+            self._loop = None
+    
     def _setup_default_alert_rules(self) -> None:
         """设置默认告警规则"""
-        # 执行时间告警
+        # 执行时间告警：单次执行超过阈值
         self.alert_manager.add_alert_rule(
             "execution_time",
             ">",
@@ -739,13 +1052,15 @@ class ToolMonitor:
             "Tool execution time exceeded 1 minute: {current_value}s"
         )
         
-        # 失败率告警
+        # 失败率告警：窗口内至少 10 次执行时按平均失败率评估
         self.alert_manager.add_alert_rule(
             "failure_rate",
             ">",
             0.1,  # 10%
             AlertSeverity.WARNING,
-            "Tool failure rate exceeded 10%: {current_value}"
+            "Tool failure rate exceeded 10%: {current_value}",
+            statistic="avg",
+            min_count=10
         )
         
         self.alert_manager.add_alert_rule(
@@ -753,30 +1068,85 @@ class ToolMonitor:
             ">",
             0.2,  # 20%
             AlertSeverity.ERROR,
-            "Tool failure rate exceeded 20%: {current_value}"
+            "Tool failure rate exceeded 20%: {current_value}",
+            statistic="avg",
+            min_count=10
         )
     
     def _start_monitoring_loop(self) -> None:
-        """启动监控循环"""
-        def monitoring_loop():
-            while True:
-                try:
+        """启动监控循环：已有运行中的事件循环时在其中启动，否则等待调用 start()"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._start_in(loop)
+    
+    def _start_in(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._monitor_task is not None and not self._monitor_task.done():
+            return
+        self._loop = loop
+        self._alert_queue = asyncio.Queue()
+        self._monitor_task = loop.create_task(self._monitoring_loop())
+    
+    async def _monitoring_loop(self) -> None:
+        """监控循环：分发告警，并每隔 cleanup_interval 秒清理过期的跟踪"""
+        queue = self._alert_queue
+        next_cleanup = time.monotonic() + self.cleanup_interval
+        while True:
+            try:
+                alert = await asyncio.wait_for(queue.get(), max(0.0, next_cleanup - time.monotonic()))
+            except asyncio.TimeoutError:
+                alert = None
+            if alert is _STOP:
+                break
+            try:
+                if alert is not None:
+                    await self.alert_manager.dispatch(alert)
+                if time.monotonic() >= next_cleanup:
                     if self.monitoring_enabled:
-                        # 检查指标并生成告警
-                        metrics = self.metric_collector.get_all_metrics()
-                        self.alert_manager.check_metrics(metrics)
-                        
-                        # 清理过期的跟踪
                         self._cleanup_expired_traces()
-                    
-                    time.sleep(10)  # 每10秒检查一次
-                except Exception as e:
-                    logger.error(f"Error in monitoring loop: {e}")
-                    time.sleep(30)  # 出错时等待30秒
-        
-        # 在后台线程中运行监控循环
-        monitoring_thread = threading.Thread(target=monitoring_loop, daemon=True)
-        monitoring_thread.start()
+                    next_cleanup = time.monotonic() + self.cleanup_interval
+            except Exception as e:
+                logger.error(f"Error in monitoring loop: {e}")
+    
+    def _observe(self, metric_name: str, value: float, scope: Optional[str] = None) -> None:
+        """更新窗口，并用窗口快照评估该指标的告警规则"""
+        key = (scope, metric_name)
+        fired = ()
+        with self._window_lock:
+            window = self.windows.get(key)
+            if window is None:
+                window = self.windows[key] = SlidingWindow(self.window_seconds, self.window_buckets, self._clock)
+            now = self._clock()
+            window.add(value, now)
+            if self.alert_manager.has_rules(metric_name):
+                fired = self.alert_manager.evaluate(metric_name, window.snapshot(now), scope)
+        for alert in fired:
+            self._dispatch_alert(alert)
+    
+    def _dispatch_alert(self, alert: Alert) -> None:
+        """把告警交给监控循环；监控循环未运行时同步处理"""
+        loop, queue = self._loop, self._alert_queue
+        if self._monitor_task is not None and loop is not None and queue is not None:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            try:
+                if running is loop:
+                    queue.put_nowait(alert)
+                else:
+                    # 其他线程中结束的执行
+                    loop.call_soon_threadsafe(queue.put_nowait, alert)
+                return
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        self.alert_manager._handle_alert(alert)
+    
+    @staticmethod
+    def _window_name(scope: Optional[str], metric_name: str) -> str:
+        return f"tool.{scope}.{metric_name}" if scope is not None else metric_name
     
     def _record_event(self, event: MonitorEvent) -> None:
         """记录事件"""
@@ -812,40 +1182,37 @@ class ToolMonitor:
         )
     
     def _calculate_health_status(self) -> str:
-        """计算健康状态"""
+        """计算健康状态：根据条件仍然成立的告警"""
         if not self.monitoring_enabled:
             return "disabled"
         
-        # 检查最近的告警
-        recent_alerts = self.alert_manager.get_alerts(limit=10)
-        critical_alerts = [a for a in recent_alerts if a.severity == AlertSeverity.CRITICAL and not a.resolved]
-        error_alerts = [a for a in recent_alerts if a.severity == AlertSeverity.ERROR and not a.resolved]
+        active = self.alert_manager.get_active_alerts()
+        severities = [a.severity for a in active]
         
-        if critical_alerts:
+        if AlertSeverity.CRITICAL in severities:
             return "critical"
-        elif error_alerts:
+        elif AlertSeverity.ERROR in severities:
             return "unhealthy"
-        elif len([a for a in recent_alerts if a.severity == AlertSeverity.WARNING and not a.resolved]) > 5:
+        elif AlertSeverity.WARNING in severities:
             return "warning"
         else:
             return "healthy"
     
+    def _maybe_cleanup(self) -> None:
+        """监控循环未运行时，在执行结束时按间隔清理过期的跟踪"""
+        now = time.monotonic()
+        if now >= self._next_cleanup:
+            self._next_cleanup = now + self.cleanup_interval
+            self._cleanup_expired_traces()
+    
     def _cleanup_expired_traces(self) -> None:
-        """清理过期的跟踪"""
-        current_time = time.time()
-        expired_trace_ids = []
+        """清理超过 trace_ttl 秒仍未结束的跟踪"""
+        now = time.monotonic()
+        expired_trace_ids = [
+            trace.trace_id for trace in self.execution_tracker.get_active_traces()
+            if now - trace.started_at > self.trace_ttl
+        ]
         
-        for trace_id, trace in self.execution_tracker.traces.items():
-            # 如果跟踪超过1小时仍未完成，认为是过期的
-            try:
-                start_timestamp = time.mktime(time.strptime(trace.start_time, "%Y-%m-%dT%H:%M:%SZ"))
-                if current_time - start_timestamp > 3600:  # 1小时
-                    expired_trace_ids.append(trace_id)
-            except Exception:
-                # 如果时间解析失败，也认为是过期的
-                expired_trace_ids.append(trace_id)
-        
-        # 清理过期跟踪
         for trace_id in expired_trace_ids:
             self.execution_tracker.end_trace(trace_id, error="Trace expired")
-            logger.warning(f"Cleaned up expired trace: {trace_id}")
\ No newline at end of file
+            logger.warning(f"Cleaned up expired trace: {trace_id}")
@@ -4,18 +4,27 @@
 AgenticSeeker Tool Validator
 工具验证器：负责工具执行前后的验证、质量检查和结果评估
 
+每个验证器把工具适用的规则编译为一个同步检查函数（CompiledValidationPlan），
+按工具类、版本和验证级别缓存；参数检查的结果再按参数内容记忆，相同参数的重复调用直接复用。
+验证历史有界，通过的报告按比例采样，警告和失败的报告全部保留。
+
 Author: AgenticX Team
 Date: 2025
 """
 
 import asyncio
+import itertools
 import json
 import re
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from loguru import logger
 
 from .gui_tools import (
     GUITool, ToolParameters, ToolResult, ToolError,
@@ -87,6 +96,101 @@ class ValidationReport:
         return sum(1 for issue in self.issues if issue.severity == "warning")
 
 
+# 工具类名与规则类别的对应关系，子类沿用父类的类别；工具也可以通过 validation_kind 属性指定
+TOOL_RULE_KINDS = {
+    'ClickTool': 'click',
+    'SwipeTool': 'swipe',
+    'TextInputTool': 'text_input',
+    'KeyPressTool': 'key_press',
+    'ScreenshotTool': 'screenshot',
+    'ElementDetectionTool': 'element_detection',
+    'OCRTool': 'ocr',
+    'ImageComparisonTool': 'image_comparison'
+}
+
+
+def resolve_rule_kind(tool: GUITool) -> Optional[str]:
+    """工具适用的规则类别，没有对应规则时返回 None"""
+    kind = getattr(tool, 'validation_kind', None)
+    if kind:
+        return kind
+    for cls in type(tool).__mro__:
+        if cls.__name__ in TOOL_RULE_KINDS:
+            return TOOL_RULE_KINDS[cls.__name__]
+    return None
+
+
+def parameter_view(parameters: ToolParameters, kind: Optional[str] = None) -> Dict[str, Any]:
+    """把 ToolParameters 展开为规则使用的扁平字典
+
+    custom_params 中的键与参数字段同级（同名时字段优先），坐标和矩形转为字典；
+    点击和滑动的 target 同时作为 coordinate/start_coordinate，按键工具的 text 作为 key。
+    """
+    data = dict(parameters.custom_params)
+    for name, value in parameters.__dict__.items():
+        if value is not None and name != 'custom_params':
+            data[name] = value.to_dict() if hasattr(value, 'to_dict') else value
+
+    target = parameters.target
+    if kind == 'click' and isinstance(target, Coordinate):
+        data.setdefault('coordinate', data['target'])
+    elif kind == 'swipe' and isinstance(target, (Coordinate, Rectangle)):
+        start = target if isinstance(target, Coordinate) else target.center
+        data.setdefault('start_coordinate', start.to_dict())
+    elif kind == 'key_press' and parameters.text is not None:
+        data.setdefault('key', parameters.text)
+    return data
+
+
+_SCALAR_TYPES = frozenset((str, int, float, bool))
+
+
+def _freeze(value: Any) -> Any:
+    """把参数值转为可哈希的键；标量带上类型（规则区分 1、1.0 和 True），不可哈希时抛出 TypeError"""
+    if value is None or value.__class__ in _SCALAR_TYPES:
+        return (value.__class__, value)
+    if isinstance(value, dict):
+        return ('__dict__',) + tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ('__list__',) + tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ('__set__', frozenset(value))
+    if isinstance(value, (Coordinate, Rectangle)):
+        return (value.__class__,) + tuple(value.__dict__.values())
+    hash(value)
+    return (value.__class__, value)
+
+
+def parameters_key(parameters: ToolParameters) -> Tuple[Any, ...]:
+    """ToolParameters 内容的可哈希键，按字段顺序逐个转换，不需要先展开为字典"""
+    return tuple([_freeze(value) for value in parameters.__dict__.values()])
+
+
+def _overall_result(issues: List[ValidationIssue]) -> ValidationResult:
+    """根据问题的严重程度确定验证结果"""
+    if any(issue.severity == "error" for issue in issues):
+        return ValidationResult.FAILED
+    if any(issue.severity == "warning" for issue in issues):
+        return ValidationResult.WARNING
+    return ValidationResult.PASSED
+
+
+@dataclass(frozen=True)
+class CompiledValidationPlan:
+    """编译后的验证计划
+
+    Attributes:
+        key: 缓存键（工具类、版本、规则类别、验证级别等）
+        kind: 规则类别
+        rules: 计划包含的规则名称，按执行顺序
+        check: 同步检查函数，参数验证为 check(data)，结果验证为 check(result, data)
+    """
+    key: Tuple[Any, ...]
+    kind: Optional[str]
+    rules: Tuple[str, ...]
+    check: Callable[..., List[ValidationIssue]]
+
+
 class BaseValidator(ABC):
     """验证器基类"""
     
@@ -95,6 +199,36 @@ class BaseValidator(ABC):
         self.level = level
         self.logger = logger
         self.enabled = True
+        # 编译后的验证计划
+        self._plans: Dict[Tuple[Any, ...], CompiledValidationPlan] = {}
+        self._validation_ids = itertools.count(1)
+    
+    def compile(self, tool: GUITool) -> CompiledValidationPlan:
+        """获取工具的验证计划；同一工具类、版本和验证级别只编译一次"""
+        key = (
+            type(tool),
+            getattr(tool, 'version', None),
+            getattr(tool, 'validation_kind', None),
+            self.level,
+            tuple(getattr(tool, 'required_parameters', None) or ())
+        )
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile(tool, resolve_rule_kind(tool), key)
+            logger.debug(f"{self.name} compiled plan for {type(tool).__name__}: {', '.join(plan.rules)}")
+        return plan
+    
+    @abstractmethod
+    def _compile(self, tool: GUITool, kind: Optional[str], key: Tuple[Any, ...]) -> CompiledValidationPlan:
+        """把工具适用的规则编译为验证计划"""
+        pass
+    
+    def invalidate_plans(self) -> None:
+        """清除已编译的计划（规则或验证级别变化后调用）"""
+        self._plans.clear()
+    
+    def next_validation_id(self, prefix: str) -> str:
+        return f"{prefix}_{int(time.time() * 1000)}_{next(self._validation_ids)}"
     
     @abstractmethod
     async def validate(
@@ -153,20 +287,28 @@ class BaseValidator(ABC):
 class ParameterValidator(BaseValidator):
     """参数验证器"""
     
-    def __init__(self, level: ValidationLevel = ValidationLevel.STANDARD):
+    # ToolParameters 中应为数值的字段
+    NUMERIC_FIELDS = ('duration', 'force', 'distance', 'speed', 'timeout', 'wait_before', 'wait_after')
+    
+    def __init__(self, level: ValidationLevel = ValidationLevel.STANDARD, memo_size: int = 4096):
         super().__init__("ParameterValidator", level)
         
-        # 参数验证规则
+        # 参数验证规则（按规则类别）
         self.validation_rules = {
-            ToolType.CLICK: self._validate_click_parameters,
-            ToolType.SWIPE: self._validate_swipe_parameters,
-            ToolType.TEXT_INPUT: self._validate_text_input_parameters,
-            ToolType.KEY_PRESS: self._validate_key_press_parameters,
-            ToolType.SCREENSHOT: self._validate_screenshot_parameters,
-            ToolType.ELEMENT_DETECTION: self._validate_element_detection_parameters,
-            ToolType.OCR: self._validate_ocr_parameters,
-            ToolType.IMAGE_COMPARISON: self._validate_image_comparison_parameters
+            'click': self._validate_click_parameters,
+            'swipe': self._validate_swipe_parameters,
+            'text_input': self._validate_text_input_parameters,
+            'key_press': self._validate_key_press_parameters,
+            'screenshot': self._validate_screenshot_parameters,
+            'element_detection': self._validate_element_detection_parameters,
+            'ocr': self._validate_ocr_parameters,
+            'image_comparison': self._validate_image_comparison_parameters
         }
+        
+        # (计划键, 参数内容) -> 问题列表，LRU
+        self.memo_size = memo_size
+        self._memo: 'OrderedDict[Tuple[Any, ...], Tuple[ValidationIssue, ...]]' = OrderedDict()
+        self.memo_stats = {'hits': 0, 'misses': 0, 'uncacheable': 0}
     
     async def validate(
         self,
@@ -176,88 +318,134 @@ class ParameterValidator(BaseValidator):
         context: Optional[Dict[str, Any]] = None
     ) -> ValidationReport:
         """验证参数"""
-        start_time = time.time()
-        validation_id = f"param_val_{int(time.time() * 1000)}"
-        issues = []
+        return self.check(tool, parameters)
+    
+    def check(self, tool: GUITool, parameters: Optional[ToolParameters]) -> ValidationReport:
+        """同步验证参数：执行工具编译后的检查函数"""
+        start_time = time.perf_counter()
+        validation_id = self.next_validation_id("param_val")
         
         if not parameters:
-            issues.append(self.create_issue(
+            issues = [self.create_issue(
                 "MISSING_PARAMETERS",
                 "error",
                 "parameter",
                 "Tool parameters are required but not provided"
-            ))
+            )]
             
             return self.create_report(
                 validation_id, tool, "pre_execution",
                 ValidationResult.FAILED, issues,
-                execution_time=time.time() - start_time
+                execution_time=time.perf_counter() - start_time
             )
         
-        # 基础参数验证
-        issues.extend(await self._validate_basic_parameters(parameters))
+        plan = self.compile(tool)
+        issues = self._check_memoized(plan, parameters)
+        
+        return self.create_report(
+            validation_id, tool, "pre_execution", _overall_result(issues), issues,
+            execution_time=time.perf_counter() - start_time
+        )
+    
+    def _compile(self, tool: GUITool, kind: Optional[str], key: Tuple[Any, ...]) -> CompiledValidationPlan:
+        """按规则类别和验证级别选出规则，组合为一个检查函数"""
+        rules: List[Tuple[str, Callable[[Dict[str, Any]], List[ValidationIssue]]]] = [
+            ('basic', self._validate_basic_parameters)
+        ]
         
         # 工具特定参数验证
-        if tool.tool_type in self.validation_rules:
-            tool_issues = await self.validation_rules[tool.tool_type](parameters)
-            issues.extend(tool_issues)
+        if kind in self.validation_rules:
+            rules.append((kind, self.validation_rules[kind]))
         
         # 根据验证级别进行额外检查
         if self.level in [ValidationLevel.STRICT, ValidationLevel.COMPREHENSIVE]:
-            issues.extend(await self._validate_advanced_parameters(tool, parameters))
-        
-        # 确定验证结果
-        if any(issue.severity == "error" for issue in issues):
-            result = ValidationResult.FAILED
-        elif any(issue.severity == "warning" for issue in issues):
-            result = ValidationResult.WARNING
-        else:
-            result = ValidationResult.PASSED
+            required = key[-1]
+            if required:
+                rules.append(('required', partial(self._validate_required_parameters, required)))
+            rules.append(('combinations', self._validate_parameter_combinations))
+            rules.append(('performance', self._validate_performance_parameters))
+        
+        checks = tuple(rule for _, rule in rules)
+        
+        def check(data: Dict[str, Any]) -> List[ValidationIssue]:
+            issues = []
+            for rule in checks:
+                issues.extend(rule(data))
+            return issues
         
-        return self.create_report(
-            validation_id, tool, "pre_execution", result, issues,
-            execution_time=time.time() - start_time
+        return CompiledValidationPlan(key=key, kind=kind, rules=tuple(name for name, _ in rules), check=check)
+    
+    def _check_memoized(self, plan: CompiledValidationPlan, parameters: ToolParameters) -> List[ValidationIssue]:
+        """相同工具计划下，相同参数内容的检查结果直接复用
+
+        记忆中保存的是问题的副本，命中时重新生成问题对象（时间戳为本次验证的时间），
+        不同报告之间不共享可变的问题对象。
+        """
+        try:
+            memo_key = (plan.key, parameters_key(parameters))
+        except TypeError:
+            # 参数中有不可哈希的值（如数组），不记忆
+            self.memo_stats['uncacheable'] += 1
+            return plan.check(parameter_view(parameters, plan.kind))
+        
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            self._memo.move_to_end(memo_key)
+            self.memo_stats['hits'] += 1
+            if not cached:
+                return []
+            timestamp = get_iso_timestamp()
+            return [self._copy_issue(issue, timestamp) for issue in cached]
+        
+        self.memo_stats['misses'] += 1
+        issues = plan.check(parameter_view(parameters, plan.kind))
+        self._memo[memo_key] = tuple(self._copy_issue(issue) for issue in issues)
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return issues
+    
+    @staticmethod
+    def _copy_issue(issue: ValidationIssue, timestamp: Optional[str] = None) -> ValidationIssue:
+        return replace(
+            issue,
+            details=dict(issue.details) if issue.details is not None else None,
+            timestamp=timestamp or issue.timestamp
         )
     
-    async def _validate_basic_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def invalidate_plans(self) -> None:
+        super().invalidate_plans()
+        self._memo.clear()
+    
+    def _validate_basic_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """基础参数验证"""
         issues = []
         
-        # 检查必需的基础字段
-        if not hasattr(parameters, 'data') or not parameters.data:
-            issues.append(self.create_issue(
-                "EMPTY_PARAMETERS",
-                "error",
-                "parameter",
-                "Parameter data is empty"
-            ))
-            return issues
-        
-        # 检查参数类型
-        if not isinstance(parameters.data, dict):
-            issues.append(self.create_issue(
-                "INVALID_PARAMETER_TYPE",
-                "error",
-                "parameter",
-                f"Parameter data must be dict, got {type(parameters.data)}"
-            ))
+        # 检查数值字段的类型
+        for name in self.NUMERIC_FIELDS:
+            value = data.get(name)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                issues.append(self.create_issue(
+                    "INVALID_PARAMETER_TYPE",
+                    "error",
+                    "parameter",
+                    f"Parameter {name} must be a number, got {type(value).__name__}"
+                ))
         
         return issues
     
-    async def _validate_click_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_click_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证点击参数"""
         issues = []
-        data = parameters.data
         
-        # 检查坐标
-        if 'coordinate' not in data:
+        # 检查坐标（target 为矩形或元素描述时没有坐标）
+        if 'coordinate' not in data and 'target' not in data:
             issues.append(self.create_issue(
                 "MISSING_COORDINATE",
                 "error",
                 "parameter",
-                "Click operation requires coordinate parameter"
+                "Click operation requires coordinate or target parameter"
             ))
-        else:
+        elif 'coordinate' in data:
             coord = data['coordinate']
             if isinstance(coord, dict):
                 if 'x' not in coord or 'y' not in coord:
@@ -310,13 +498,12 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_swipe_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_swipe_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证滑动参数"""
         issues = []
-        data = parameters.data
         
-        # 检查起始和结束坐标
-        required_coords = ['start_coordinate', 'end_coordinate']
+        # 检查起始和结束坐标（给出方向时由工具计算结束坐标）
+        required_coords = ['start_coordinate'] if 'direction' in data else ['start_coordinate', 'end_coordinate']
         for coord_name in required_coords:
             if coord_name not in data:
                 issues.append(self.create_issue(
@@ -393,10 +580,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_text_input_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_text_input_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证文本输入参数"""
         issues = []
-        data = parameters.data
         
         # 检查文本内容
         if 'text' not in data:
@@ -447,10 +633,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_key_press_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_key_press_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证按键参数"""
         issues = []
-        data = parameters.data
         
         # 检查按键
         if 'key' not in data:
@@ -501,10 +686,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_screenshot_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_screenshot_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证截图参数"""
         issues = []
-        data = parameters.data
         
         # 检查区域参数
         if 'region' in data:
@@ -554,10 +738,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_element_detection_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_element_detection_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证元素检测参数"""
         issues = []
-        data = parameters.data
         
         # 检查检测类型
         if 'detection_type' in data:
@@ -572,13 +755,13 @@ class ParameterValidator(BaseValidator):
                     details={'valid_types': valid_types}
                 ))
         
-        # 检查目标参数
-        if 'target' not in data:
+        # 检查目标参数（也可以用 text 描述目标）
+        if 'target' not in data and 'text' not in data:
             issues.append(self.create_issue(
                 "MISSING_TARGET",
                 "error",
                 "parameter",
-                "Element detection requires target parameter"
+                "Element detection requires target or text parameter"
             ))
         
         # 检查置信度阈值
@@ -601,10 +784,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_ocr_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_ocr_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证OCR参数"""
         issues = []
-        data = parameters.data
         
         # 检查语言参数
         if 'language' in data:
@@ -639,10 +821,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_image_comparison_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_image_comparison_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证图像比较参数"""
         issues = []
-        data = parameters.data
         
         # 检查比较图像
         required_images = ['reference_image']
@@ -688,34 +869,24 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_advanced_parameters(self, tool: GUITool, parameters: ToolParameters) -> List[ValidationIssue]:
-        """高级参数验证"""
+    def _validate_required_parameters(self, required_params: Tuple[str, ...], data: Dict[str, Any]) -> List[ValidationIssue]:
+        """检查工具声明的必需参数"""
         issues = []
         
-        # 检查参数完整性
-        if hasattr(tool, 'required_parameters'):
-            required_params = getattr(tool, 'required_parameters', [])
-            for param in required_params:
-                if param not in parameters.data:
-                    issues.append(self.create_issue(
-                        f"MISSING_REQUIRED_PARAM_{param.upper()}",
-                        "error",
-                        "parameter",
-                        f"Required parameter '{param}' is missing"
-                    ))
-        
-        # 检查参数组合的有效性
-        issues.extend(await self._validate_parameter_combinations(tool, parameters))
-        
-        # 检查性能相关参数
-        issues.extend(await self._validate_performance_parameters(parameters))
+        for param in required_params:
+            if param not in data:
+                issues.append(self.create_issue(
+                    f"MISSING_REQUIRED_PARAM_{param.upper()}",
+                    "error",
+                    "parameter",
+                    f"Required parameter '{param}' is missing"
+                ))
         
         return issues
     
-    async def _validate_parameter_combinations(self, tool: GUITool, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_parameter_combinations(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证参数组合"""
         issues = []
-        data = parameters.data
         
         # 检查互斥参数
         mutually_exclusive_groups = [
@@ -755,10 +926,9 @@ class ParameterValidator(BaseValidator):
         
         return issues
     
-    async def _validate_performance_parameters(self, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_performance_parameters(self, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证性能相关参数"""
         issues = []
-        data = parameters.data
         
         # 检查超时设置
         if 'timeout' in data:
@@ -808,6 +978,14 @@ class ResultValidator(BaseValidator):
     
     def __init__(self, level: ValidationLevel = ValidationLevel.STANDARD):
         super().__init__("ResultValidator", level)
+        
+        # 工具特定结果验证规则（按规则类别）
+        self.validation_rules = {
+            'screenshot': self._validate_screenshot_result,
+            'element_detection': self._validate_detection_result,
+            'ocr': self._validate_ocr_result,
+            'image_comparison': self._validate_comparison_result
+        }
     
     async def validate(
         self,
@@ -817,55 +995,75 @@ class ResultValidator(BaseValidator):
         context: Optional[Dict[str, Any]] = None
     ) -> ValidationReport:
         """验证执行结果"""
-        start_time = time.time()
-        validation_id = f"result_val_{int(time.time() * 1000)}"
-        issues = []
+        return self.check(tool, result, parameters)
+    
+    def check(
+        self,
+        tool: GUITool,
+        result: Optional[ToolResult],
+        parameters: Optional[ToolParameters] = None
+    ) -> ValidationReport:
+        """同步验证执行结果：执行工具编译后的检查函数"""
+        start_time = time.perf_counter()
+        validation_id = self.next_validation_id("result_val")
         
         if not result:
-            issues.append(self.create_issue(
+            issues = [self.create_issue(
                 "MISSING_RESULT",
                 "error",
                 "postcondition",
                 "Tool execution result is required but not provided"
-            ))
+            )]
             
             return self.create_report(
                 validation_id, tool, "post_execution",
                 ValidationResult.FAILED, issues,
-                execution_time=time.time() - start_time
+                execution_time=time.perf_counter() - start_time
             )
         
-        # 基础结果验证
-        issues.extend(await self._validate_basic_result(result))
+        plan = self.compile(tool)
+        # 只有质量验证需要参数内容
+        data = parameter_view(parameters, plan.kind) if parameters and 'quality' in plan.rules else None
+        issues = plan.check(result, data)
+        
+        # 计算质量指标
+        metrics = self._calculate_quality_metrics(plan.kind, result)
+        
+        return self.create_report(
+            validation_id, tool, "post_execution", _overall_result(issues), issues,
+            metrics=metrics, execution_time=time.perf_counter() - start_time
+        )
+    
+    def _compile(self, tool: GUITool, kind: Optional[str], key: Tuple[Any, ...]) -> CompiledValidationPlan:
+        """按规则类别和验证级别选出结果规则，组合为一个检查函数"""
+        rules: List[Tuple[str, Callable[[ToolResult], List[ValidationIssue]]]] = [
+            ('basic', self._validate_basic_result)
+        ]
         
         # 工具特定结果验证
-        issues.extend(await self._validate_tool_specific_result(tool, result))
+        if kind in self.validation_rules:
+            rules.append((kind, self.validation_rules[kind]))
         
         # 性能验证
         if self.level in [ValidationLevel.STRICT, ValidationLevel.COMPREHENSIVE]:
-            issues.extend(await self._validate_performance_result(result))
-        
-        # 质量验证
-        if self.level == ValidationLevel.COMPREHENSIVE:
-            issues.extend(await self._validate_quality_result(tool, result, parameters))
-        
-        # 确定验证结果
-        if any(issue.severity == "error" for issue in issues):
-            validation_result = ValidationResult.FAILED
-        elif any(issue.severity == "warning" for issue in issues):
-            validation_result = ValidationResult.WARNING
-        else:
-            validation_result = ValidationResult.PASSED
-        
-        # 计算质量指标
-        metrics = await self._calculate_quality_metrics(tool, result, parameters)
+            rules.append(('performance', self._validate_performance_result))
+        
+        checks = tuple(rule for _, rule in rules)
+        quality = self.level == ValidationLevel.COMPREHENSIVE
+        
+        def check(result: ToolResult, data: Optional[Dict[str, Any]]) -> List[ValidationIssue]:
+            issues = []
+            for rule in checks:
+                issues.extend(rule(result))
+            # 质量验证
+            if quality:
+                issues.extend(self._validate_quality_result(result, data))
+            return issues
         
-        return self.create_report(
-            validation_id, tool, "post_execution", validation_result, issues,
-            metrics=metrics, execution_time=time.time() - start_time
-        )
+        names = tuple(name for name, _ in rules) + (('quality',) if quality else ())
+        return CompiledValidationPlan(key=key, kind=kind, rules=names, check=check)
     
-    async def _validate_basic_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_basic_result(self, result: ToolResult) -> List[ValidationIssue]:
         """基础结果验证"""
         issues = []
         
@@ -919,29 +1117,13 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_tool_specific_result(self, tool: GUITool, result: ToolResult) -> List[ValidationIssue]:
-        """工具特定结果验证"""
-        issues = []
-        
-        # 根据工具类型验证特定结果
-        if tool.tool_type == ToolType.SCREENSHOT:
-            issues.extend(await self._validate_screenshot_result(result))
-        elif tool.tool_type == ToolType.ELEMENT_DETECTION:
-            issues.extend(await self._validate_detection_result(result))
-        elif tool.tool_type == ToolType.OCR:
-            issues.extend(await self._validate_ocr_result(result))
-        elif tool.tool_type == ToolType.IMAGE_COMPARISON:
-            issues.extend(await self._validate_comparison_result(result))
-        
-        return issues
-    
-    async def _validate_screenshot_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_screenshot_result(self, result: ToolResult) -> List[ValidationIssue]:
         """验证截图结果"""
         issues = []
         
-        if result.success and result.data:
+        if result.success and result.result_data:
             # 检查图像数据
-            if 'image_data' not in result.data:
+            if 'image_data' not in result.result_data:
                 issues.append(self.create_issue(
                     "MISSING_IMAGE_DATA",
                     "error",
@@ -950,8 +1132,8 @@ class ResultValidator(BaseValidator):
                 ))
             
             # 检查图像尺寸
-            if 'image_size' in result.data:
-                size = result.data['image_size']
+            if 'image_size' in result.result_data:
+                size = result.result_data['image_size']
                 if isinstance(size, dict) and 'width' in size and 'height' in size:
                     if size['width'] <= 0 or size['height'] <= 0:
                         issues.append(self.create_issue(
@@ -963,14 +1145,14 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_detection_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_detection_result(self, result: ToolResult) -> List[ValidationIssue]:
         """验证检测结果"""
         issues = []
         
-        if result.success and result.data:
+        if result.success and result.result_data:
             # 检查检测到的元素
-            if 'elements' in result.data:
-                elements = result.data['elements']
+            if 'elements' in result.result_data:
+                elements = result.result_data['elements']
                 if not isinstance(elements, list):
                     issues.append(self.create_issue(
                         "INVALID_ELEMENTS_TYPE",
@@ -999,14 +1181,14 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_ocr_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_ocr_result(self, result: ToolResult) -> List[ValidationIssue]:
         """验证OCR结果"""
         issues = []
         
-        if result.success and result.data:
+        if result.success and result.result_data:
             # 检查识别的文本
-            if 'text' in result.data:
-                text = result.data['text']
+            if 'text' in result.result_data:
+                text = result.result_data['text']
                 if not isinstance(text, str):
                     issues.append(self.create_issue(
                         "INVALID_OCR_TEXT_TYPE",
@@ -1016,8 +1198,8 @@ class ResultValidator(BaseValidator):
                     ))
             
             # 检查置信度
-            if 'confidence' in result.data:
-                confidence = result.data['confidence']
+            if 'confidence' in result.result_data:
+                confidence = result.result_data['confidence']
                 if not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
                     issues.append(self.create_issue(
                         "INVALID_OCR_CONFIDENCE",
@@ -1036,14 +1218,14 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_comparison_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_comparison_result(self, result: ToolResult) -> List[ValidationIssue]:
         """验证比较结果"""
         issues = []
         
-        if result.success and result.data:
+        if result.success and result.result_data:
             # 检查相似度
-            if 'similarity' in result.data:
-                similarity = result.data['similarity']
+            if 'similarity' in result.result_data:
+                similarity = result.result_data['similarity']
                 if not isinstance(similarity, (int, float)) or not 0 <= similarity <= 1:
                     issues.append(self.create_issue(
                         "INVALID_SIMILARITY_VALUE",
@@ -1053,8 +1235,8 @@ class ResultValidator(BaseValidator):
                     ))
             
             # 检查匹配结果
-            if 'is_match' in result.data:
-                is_match = result.data['is_match']
+            if 'is_match' in result.result_data:
+                is_match = result.result_data['is_match']
                 if not isinstance(is_match, bool):
                     issues.append(self.create_issue(
                         "INVALID_MATCH_TYPE",
@@ -1065,34 +1247,33 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_performance_result(self, result: ToolResult) -> List[ValidationIssue]:
+    def _validate_performance_result(self, result: ToolResult) -> List[ValidationIssue]:
         """验证性能结果"""
         issues = []
         
         # 检查执行时间
-        if hasattr(result, 'execution_time'):
-            exec_time = getattr(result, 'execution_time', None)
-            if exec_time is not None:
-                if exec_time < 0:
-                    issues.append(self.create_issue(
-                        "NEGATIVE_EXECUTION_TIME",
-                        "error",
-                        "performance",
-                        "Execution time cannot be negative"
-                    ))
-                elif exec_time > 60:  # 1分钟
-                    issues.append(self.create_issue(
-                        "LONG_EXECUTION_TIME",
-                        "warning",
-                        "performance",
-                        "Execution time is very long",
-                        details={'execution_time': exec_time},
-                        suggestion="Consider optimizing tool performance"
-                    ))
+        exec_time = result.duration
+        if exec_time is not None:
+            if exec_time < 0:
+                issues.append(self.create_issue(
+                    "NEGATIVE_EXECUTION_TIME",
+                    "error",
+                    "performance",
+                    "Execution time cannot be negative"
+                ))
+            elif exec_time > 60:  # 1分钟
+                issues.append(self.create_issue(
+                    "LONG_EXECUTION_TIME",
+                    "warning",
+                    "performance",
+                    "Execution time is very long",
+                    details={'execution_time': exec_time},
+                    suggestion="Consider optimizing tool performance"
+                ))
         
         # 检查内存使用
-        if result.data and 'memory_usage' in result.data:
-            memory_usage = result.data['memory_usage']
+        if result.result_data and 'memory_usage' in result.result_data:
+            memory_usage = result.result_data['memory_usage']
             if isinstance(memory_usage, (int, float)):
                 if memory_usage > 1000:  # 1GB
                     issues.append(self.create_issue(
@@ -1106,12 +1287,12 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _validate_quality_result(self, tool: GUITool, result: ToolResult, parameters: Optional[ToolParameters]) -> List[ValidationIssue]:
+    def _validate_quality_result(self, result: ToolResult, data: Optional[Dict[str, Any]]) -> List[ValidationIssue]:
         """验证结果质量"""
         issues = []
         
         # 检查结果完整性
-        if result.success and not result.data:
+        if result.success and not result.result_data:
             issues.append(self.create_issue(
                 "EMPTY_SUCCESS_RESULT",
                 "warning",
@@ -1138,19 +1319,19 @@ class ResultValidator(BaseValidator):
                 ))
         
         # 检查数据一致性
-        if result.data and parameters:
-            issues.extend(await self._validate_data_consistency(result, parameters))
+        if result.result_data and data:
+            issues.extend(self._validate_data_consistency(result, data))
         
         return issues
     
-    async def _validate_data_consistency(self, result: ToolResult, parameters: ToolParameters) -> List[ValidationIssue]:
+    def _validate_data_consistency(self, result: ToolResult, data: Dict[str, Any]) -> List[ValidationIssue]:
         """验证数据一致性"""
         issues = []
         
         # 检查输入输出一致性
-        if 'region' in parameters.data and 'image_size' in result.data:
-            param_region = parameters.data['region']
-            result_size = result.data['image_size']
+        if 'region' in data and 'image_size' in result.result_data:
+            param_region = data['region']
+            result_size = result.result_data['image_size']
             
             if (isinstance(param_region, dict) and isinstance(result_size, dict) and
                 'width' in param_region and 'height' in param_region and
@@ -1171,7 +1352,7 @@ class ResultValidator(BaseValidator):
         
         return issues
     
-    async def _calculate_quality_metrics(self, tool: GUITool, result: ToolResult, parameters: Optional[ToolParameters]) -> Dict[str, Any]:
+    def _calculate_quality_metrics(self, kind: Optional[str], result: ToolResult) -> Dict[str, Any]:
         """计算质量指标"""
         metrics = {}
         
@@ -1179,27 +1360,27 @@ class ResultValidator(BaseValidator):
         metrics['success_rate'] = 1.0 if result.success else 0.0
         
         # 执行时间指标
-        if hasattr(result, 'execution_time'):
-            exec_time = getattr(result, 'execution_time', 0)
+        if result.duration is not None:
+            exec_time = result.duration
             metrics['execution_time'] = exec_time
             metrics['performance_score'] = max(0, 1 - exec_time / 30)  # 30秒为基准
         
         # 数据质量指标
-        if result.data:
-            metrics['data_completeness'] = len(result.data) / 10  # 假设10个字段为完整
+        if result.result_data:
+            metrics['data_completeness'] = len(result.result_data) / 10  # 假设10个字段为完整
             
             # 置信度指标
-            if 'confidence' in result.data:
-                metrics['confidence'] = result.data['confidence']
+            if 'confidence' in result.result_data:
+                metrics['confidence'] = result.result_data['confidence']
             
             # 准确性指标（基于工具类型）
-            if tool.tool_type == ToolType.OCR and 'text' in result.data:
-                text_length = len(result.data['text'])
+            if kind == 'ocr' and 'text' in result.result_data:
+                text_length = len(result.result_data['text'])
                 metrics['text_length'] = text_length
                 metrics['text_quality_score'] = min(1.0, text_length / 100)
             
-            elif tool.tool_type == ToolType.ELEMENT_DETECTION and 'elements' in result.data:
-                element_count = len(result.data['elements'])
+            elif kind == 'element_detection' and 'elements' in result.result_data:
+                element_count = len(result.result_data['elements'])
                 metrics['element_count'] = element_count
                 metrics['detection_score'] = min(1.0, element_count / 5)
         
@@ -1219,7 +1400,12 @@ class ResultValidator(BaseValidator):
 class ToolValidator:
     """工具验证器管理器"""
     
-    def __init__(self, level: ValidationLevel = ValidationLevel.STANDARD):
+    def __init__(
+        self,
+        level: ValidationLevel = ValidationLevel.STANDARD,
+        max_history_size: int = 1000,
+        history_sample_rate: float = 0.1
+    ):
         self.level = level
         self.logger = logger
         
@@ -1227,9 +1413,12 @@ class ToolValidator:
         self.parameter_validator = ParameterValidator(level)
         self.result_validator = ResultValidator(level)
         
-        # 验证历史
-        self.validation_history: List[ValidationReport] = []
-        self.max_history_size = 1000
+        # 验证历史：有界，通过的报告按 history_sample_rate 采样，警告和失败的报告全部保留
+        self.max_history_size = max_history_size
+        self.validation_history: Deque[ValidationReport] = deque(maxlen=max_history_size)
+        self.history_sample_rate = history_sample_rate
+        self._sample_every = max(1, round(1 / history_sample_rate)) if history_sample_rate > 0 else 0
+        self._passed_seen = 0
         
         # 统计信息
         self.stats = {
@@ -1237,9 +1426,27 @@ class ToolValidator:
             'passed_validations': 0,
             'warning_validations': 0,
             'failed_validations': 0,
-            'average_validation_time': 0.0
+            'average_validation_time': 0.0,
+            'sampled_out': 0
         }
     
+    def check_parameters(self, tool: GUITool, parameters: ToolParameters) -> ValidationReport:
+        """同步执行前验证，供热点工具在调用路径上直接使用"""
+        report = self.parameter_validator.check(tool, parameters)
+        self._record_validation(report)
+        return report
+    
+    def check_result(
+        self,
+        tool: GUITool,
+        result: ToolResult,
+        parameters: Optional[ToolParameters] = None
+    ) -> ValidationReport:
+        """同步执行后验证"""
+        report = self.result_validator.check(tool, result, parameters)
+        self._record_validation(report)
+        return report
+    
     async def validate_pre_execution(
         self,
         tool: GUITool,
@@ -1247,12 +1454,7 @@ class ToolValidator:
         context: Optional[Dict[str, Any]] = None
     ) -> ValidationReport:
         """执行前验证"""
-        report = await self.parameter_validator.validate(
-            tool, parameters, None, context
-        )
-        
-        await self._record_validation(report)
-        return report
+        return self.check_parameters(tool, parameters)
     
     async def validate_post_execution(
         self,
@@ -1262,12 +1464,12 @@ class ToolValidator:
         context: Optional[Dict[str, Any]] = None
     ) -> ValidationReport:
         """执行后验证"""
-        report = await self.result_validator.validate(
-            tool, parameters, result, context
-        )
-        
-        await self._record_validation(report)
-        return report
+        return self.check_result(tool, result, parameters)
+    
+    def invalidate_plans(self) -> None:
+        """清除已编译的验证计划和参数检查的记忆（修改规则后调用）"""
+        self.parameter_validator.invalidate_plans()
+        self.result_validator.invalidate_plans()
     
     async def validate_full_execution(
         self,
@@ -1289,7 +1491,7 @@ class ToolValidator:
         limit: int = 100
     ) -> List[ValidationReport]:
         """获取验证历史"""
-        history = self.validation_history.copy()
+        history = list(self.validation_history)
         
         # 过滤条件
         if tool_id:
@@ -1305,7 +1507,12 @@ class ToolValidator:
     
     async def get_validation_stats(self) -> Dict[str, Any]:
         """获取验证统计"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['compiled_plans'] = len(self.parameter_validator._plans) + len(self.result_validator._plans)
+        stats['parameter_memo'] = dict(self.parameter_validator.memo_stats,
+                                       entries=len(self.parameter_validator._memo))
+        stats['history_size'] = len(self.validation_history)
+        return stats
     
     async def get_tool_quality_report(self, tool_id: str) -> Dict[str, Any]:
         """获取工具质量报告"""
@@ -1352,14 +1559,17 @@ class ToolValidator:
             'recent_reports': tool_reports[-10:]  # 最近10次验证
         }
     
-    async def _record_validation(self, report: ValidationReport) -> None:
+    def _record_validation(self, report: ValidationReport) -> None:
         """记录验证结果"""
-        # 添加到历史记录
-        self.validation_history.append(report)
-        
-        # 限制历史记录大小
-        if len(self.validation_history) > self.max_history_size:
-            self.validation_history = self.validation_history[-self.max_history_size:]
+        # 添加到历史记录（deque 自动丢弃最旧的报告）
+        keep = True
+        if report.result == ValidationResult.PASSED:
+            keep = bool(self._sample_every) and self._passed_seen % self._sample_every == 0
+            self._passed_seen += 1
+        if keep:
+            self.validation_history.append(report)
+        else:
+            self.stats['sampled_out'] += 1
         
         # 更新统计信息
         self.stats['total_validations'] += 1
@@ -1375,5 +1585,3 @@ class ToolValidator:
         total_time = (self.stats['average_validation_time'] * 
                      (self.stats['total_validations'] - 1) + report.execution_time)
         self.stats['average_validation_time'] = total_time / self.stats['total_validations']
-        
-        logger.debug(f"Validation recorded: {report.validation_id}, result: {report.result.value}")
\ No newline at end of file
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgenticSeeker UI Hierarchy
+UI层次结构解析：增量解析 uiautomator dump 输出的XML，并为元素建立空间索引和文本索引
+
+解析基于 iterparse/XMLPullParser 逐个节点处理，处理完的XML节点立即释放，
+可以边接收 `uiautomator dump` 输出边解析。空间索引采用均匀网格，
+点选、最近元素、按文本和 resource-id 查找在数千节点的界面上均为亚毫秒级。
+
+Author: AgenticX Team
+Date: 2025
+"""
+
+import math
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+BOOLEAN_ATTRIBUTES = (
+    'checkable', 'checked', 'clickable', 'enabled', 'focusable', 'focused',
+    'scrollable', 'long-clickable', 'password', 'selected'
+)
+
+
+def parse_bounds(value: str) -> Tuple[int, int, int, int]:
+    """解析 uiautomator 的 bounds 属性 "[left,top][right,bottom]" """
+    match = BOUNDS_PATTERN.match(value or '')
+    if not match:
+        return 0, 0, 0, 0
+    return tuple(int(v) for v in match.groups())
+
+
+@dataclass
+class UIElement:
+    """UI元素"""
+    index: int
+    class_name: str
+    bounds: Tuple[int, int, int, int]
+    text: str = ''
+    resource_id: str = ''
+    content_desc: str = ''
+    package: str = ''
+    depth: int = 0
+    parent: Optional[int] = None
+    children: List[int] = field(default_factory=list)
+    attributes: Dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def left(self) -> int:
+        return self.bounds[0]
+
+    @property
+    def top(self) -> int:
+        return self.bounds[1]
+
+    @property
+    def right(self) -> int:
+        return self.bounds[2]
+
+    @property
+    def bottom(self) -> int:
+        return self.bounds[3]
+
+    @property
+    def area(self) -> int:
+        return max(self.right - self.left, 0) * max(self.bottom - self.top, 0)
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (self.left + self.right) // 2, (self.top + self.bottom) // 2
+
+    @property
+    def clickable(self) -> bool:
+        return self.attributes.get('clickable', False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.attributes.get('enabled', True)
+
+    @property
+    def scrollable(self) -> bool:
+        return self.attributes.get('scrollable', False)
+
+    def contains(self, x: float, y: float) -> bool:
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+    def distance_to(self, x: float, y: float) -> float:
+        """点到元素边框的距离，点在元素内时为0"""
+        dx = max(self.left - x, 0, x - self.right)
+        dy = max(self.top - y, 0, y - self.bottom)
+        return math.hypot(dx, dy)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为工具层使用的元素字典"""
+        center_x, center_y = self.center
+        return {
+            'id': self.resource_id or f"node_{self.index}",
+            'type': self.class_name.rsplit('.', 1)[-1],
+            'class': self.class_name,
+            'text': self.text,
+            'resource_id': self.resource_id,
+            'content_desc': self.content_desc,
+            'bounds': {'left': self.left, 'top': self.top, 'right': self.right, 'bottom': self.bottom},
+            'center': {'x': center_x, 'y': center_y},
+            'visible': self.area > 0,
+            'enabled': self.enabled,
+            'clickable': self.clickable,
+            'scrollable': self.scrollable
+        }
+
+
+class UIHierarchy:
+    """解析后的UI层次结构及其索引"""
+
+    def __init__(self, cell_size: int = 128):
+        self.cell_size = cell_size
+        self.elements: List[UIElement] = []
+        self.rotation = 0
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        # 网格覆盖的单元格范围 (min_cx, min_cy, max_cx, max_cy)
+        self._grid_bounds: Optional[Tuple[int, int, int, int]] = None
+        self._by_text: Dict[str, List[int]] = {}
+        self._by_description: Dict[str, List[int]] = {}
+        self._by_resource_id: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    @classmethod
+    def parse(cls, source: Union[str, IO[bytes]], cell_size: int = 128) -> 'UIHierarchy':
+        """从文件路径或二进制文件对象解析"""
+        parser = UIHierarchyParser(cell_size=cell_size)
+        for event, node in ET.iterparse(source, events=('start', 'end')):
+            parser.handle(event, node)
+        return parser.hierarchy
+
+    @classmethod
+    def from_string(cls, xml: Union[str, bytes], cell_size: int = 128) -> 'UIHierarchy':
+        """从XML文本解析"""
+        parser = UIHierarchyParser(cell_size=cell_size)
+        parser.feed(xml)
+        return parser.close()
+
+    def add(self, element: UIElement) -> None:
+        """加入元素并更新索引"""
+        element.index = len(self.elements)
+        self.elements.append(element)
+        if element.text:
+            self._by_text.setdefault(element.text, []).append(element.index)
+        if element.content_desc:
+            self._by_description.setdefault(element.content_desc, []).append(element.index)
+        if element.resource_id:
+            self._by_resource_id.setdefault(element.resource_id, []).append(element.index)
+        if element.area <= 0:
+            return
+
+        size = self.cell_size
+        min_cx, min_cy = element.left // size, element.top // size
+        max_cx, max_cy = (element.right - 1) // size, (element.bottom - 1) // size
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                self._grid.setdefault((cx, cy), []).append(element.index)
+        g = self._grid_bounds
+        if g is None:
+            self._grid_bounds = (min_cx, min_cy, max_cx, max_cy)
+        else:
+            self._grid_bounds = (min(g[0], min_cx), min(g[1], min_cy), max(g[2], max_cx), max(g[3], max_cy))
+
+    def get(self, index: int) -> UIElement:
+        return self.elements[index]
+
+    def root(self) -> Optional[UIElement]:
+        return self.elements[0] if self.elements else None
+
+    def parent_of(self, element: UIElement) -> Optional[UIElement]:
+        return self.elements[element.parent] if element.parent is not None else None
+
+    def children_of(self, element: UIElement) -> List[UIElement]:
+        return [self.elements[i] for i in element.children]
+
+    def elements_at(self, x: float, y: float) -> List[UIElement]:
+        """包含该点的全部元素，最上层（层级最深、面积最小）的在前"""
+        cell = self._grid.get((int(x) // self.cell_size, int(y) // self.cell_size), ())
+        hits = [self.elements[i] for i in cell if self.elements[i].contains(x, y)]
+        hits.sort(key=lambda e: (-e.depth, e.area, -e.index))
+        return hits
+
+    def element_at(self, x: float, y: float,
+                   predicate: Optional[Callable[[UIElement], bool]] = None) -> Optional[UIElement]:
+        """该点处最上层的元素，可按条件过滤（如只要可点击的元素）"""
+        for element in self.elements_at(x, y):
+            if predicate is None or predicate(element):
+                return element
+        return None
+
+    def nearest(self, x: float, y: float,
+                predicate: Optional[Callable[[UIElement], bool]] = None,
+                max_distance: Optional[float] = None) -> Optional[UIElement]:
+        """离该点最近的元素（按点到边框的距离，相同时取层级更深、面积更小的）
+
+        从该点所在单元格开始逐圈向外搜索，当前圈以外的单元格不可能更近时停止。
+        """
+        if self._grid_bounds is None:
+            return None
+        size = self.cell_size
+        cx, cy = int(x) // size, int(y) // size
+        min_cx, min_cy, max_cx, max_cy = self._grid_bounds
+        max_ring = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy, 0)
+
+        best: Optional[UIElement] = None
+        best_key: Optional[Tuple[float, int, int]] = None
+        seen = set()
+        for ring in range(max_ring + 1):
+            # 第 ring 圈单元格内的点与 (x, y) 的距离至少为 (ring - 1) * size
+            ring_distance = max(ring - 1, 0) * size
+            if best_key is not None and ring_distance > best_key[0]:
+                break
+            if max_distance is not None and ring_distance > max_distance:
+                break
+            for cell in self._ring_cells(cx, cy, ring):
+                for index in self._grid.get(cell, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    element = self.elements[index]
+                    if predicate is not None and not predicate(element):
+                        continue
+                    key = (element.distance_to(x, y), -element.depth, element.area)
+                    if best_key is None or key < best_key:
+                        best, best_key = element, key
+        if best is not None and max_distance is not None and best_key[0] > max_distance:
+            return None
+        return best
+
+    @staticmethod
+    def _ring_cells(cx: int, cy: int, ring: int) -> Iterable[Tuple[int, int]]:
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def find_by_text(self, text: str, exact: bool = True, include_description: bool = True) -> List[UIElement]:
+        """按文本查找；exact=False 时按不区分大小写的包含关系匹配"""
+        indexes = [self._by_text]
+        if include_description:
+            indexes.append(self._by_description)
+        found: List[int] = []
+        for index in indexes:
+            if exact:
+                found.extend(index.get(text, ()))
+            else:
+                needle = text.lower()
+                for key, ids in index.items():
+                    if needle in key.lower():
+                        found.extend(ids)
+        return [self.elements[i] for i in sorted(set(found))]
+
+    def find_by_resource_id(self, resource_id: str) -> List[UIElement]:
+        """按 resource-id 查找，可省略包名前缀（如 "title" 匹配 "com.android.settings:id/title"）"""
+        ids = self._by_resource_id.get(resource_id)
+        if ids is None and ':id/' not in resource_id:
+            suffix = f":id/{resource_id}"
+            ids = [i for key, values in self._by_resource_id.items() if key.endswith(suffix) for i in values]
+        return [self.elements[i] for i in ids or ()]
+
+    def to_dicts(self, predicate: Optional[Callable[[UIElement], bool]] = None) -> List[Dict[str, Any]]:
+        return [e.to_dict() for e in self.elements if predicate is None or predicate(e)]
+
+
+ROOT_END_TAG = b'</hierarchy>'
+
+
+class UIHierarchyParser:
+    """增量解析器：可逐块 feed 数据，也可处理 iterparse 产生的事件"""
+
+    def __init__(self, cell_size: int = 128):
+        self.hierarchy = UIHierarchy(cell_size=cell_size)
+        self._pull = ET.XMLPullParser(events=('start', 'end'))
+        self._stack: List[int] = []
+        self._finished = False
+        # 上一块末尾可能是被切开的 </hierarchy>，留到下一块一起查找
+        self._tail = b''
+        self._root_closed = False
+
+    @property
+    def finished(self) -> bool:
+        """根节点 hierarchy 是否已解析完毕"""
+        return self._finished
+
+    def feed(self, data: Union[str, bytes]) -> None:
+        """输入一块XML数据，解析其中已完整的节点；根节点结束后的内容（如 dump 的提示信息）被忽略"""
+        if self._finished or self._root_closed:
+            return
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        data = self._tail + data
+        end = data.find(ROOT_END_TAG)
+        if end >= 0:
+            data, self._tail = data[:end + len(ROOT_END_TAG)], b''
+            self._root_closed = True
+        else:
+            keep = len(ROOT_END_TAG) - 1
+            data, self._tail = data[:-keep], data[-keep:]
+        self._pull.feed(data)
+        for event, node in self._pull.read_events():
+            self.handle(event, node)
+
+    def close(self) -> UIHierarchy:
+        if not self._finished:
+            self._pull.feed(self._tail)
+            self._tail = b''
+            self._pull.close()
+            for event, node in self._pull.read_events():
+                self.handle(event, node)
+        return self.hierarchy
+
+    def handle(self, event: str, node: ET.Element) -> None:
+        if node.tag == 'hierarchy':
+            if event == 'start':
+                self.hierarchy.rotation = int(node.get('rotation', 0) or 0)
+            else:
+                self._finished = True
+                node.clear()
+            return
+        if node.tag != 'node':
+            return
+        if event == 'start':
+            attrib = node.attrib
+            parent = self._stack[-1] if self._stack else None
+            element = UIElement(
+                index=0,
+                class_name=attrib.get('class', ''),
+                bounds=parse_bounds(attrib.get('bounds', '')),
+                text=attrib.get('text', ''),
+                resource_id=attrib.get('resource-id', ''),
+                content_desc=attrib.get('content-desc', ''),
+                package=attrib.get('package', ''),
+                depth=len(self._stack),
+                parent=parent,
+                attributes={name: attrib[name] == 'true' for name in BOOLEAN_ATTRIBUTES if name in attrib}
+            )
+            self.hierarchy.add(element)
+            if parent is not None:
+                self.hierarchy.elements[parent].children.append(element.index)
+            self._stack.append(element.index)
+        else:
+            self._stack.pop()
+            # 子节点都已处理，释放XML节点保持内存平稳
+            node.clear()
+
+
+def parse_ui_dump(source: Union[str, IO[bytes]], cell_size: int = 128) -> UIHierarchy:
+    """解析 uiautomator dump 文件，失败时返回空的层次结构"""
+    try:
+        return UIHierarchy.parse(source, cell_size=cell_size)
+    except (ET.ParseError, OSError) as e:
+        logger.error(f"Failed to parse UI dump: {e}")
+        return UIHierarchy(cell_size=cell_size)
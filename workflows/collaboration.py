@@ -12,7 +12,7 @@ import json
 from rich import print
 from rich.json import JSON
 from loguru import logger
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -42,20 +42,34 @@ class AgentCoordinator(Component):
     实现Manager、Executor、ActionReflector、Notetaker的协作流程。
     """
     
-    def __init__(self, agents: Dict[str, Any], info_pool: InfoPool):
+    def __init__(self, agents: Dict[str, Any], info_pool: InfoPool,
+                 max_concurrent_tasks: int = 2, verbose: bool = True):
         """
         初始化协调器
         
         Args:
             agents: 智能体字典 {agent_name: agent_instance}
             info_pool: 信息池实例
+            max_concurrent_tasks: 流水线模式下同时在途的最大任务数
+            verbose: 是否在规划阶段打印共享状态和规划结果
         """
         super().__init__()
         self.agents = agents
         self.info_pool = info_pool
+        self.max_concurrent_tasks = max(1, max_concurrent_tasks)
+        self.verbose = verbose
         self.current_tasks: Dict[str, Dict[str, Any]] = {}
         self._task_counter = 0
         
+        # 设备阶段（截图、规划、执行）独占设备，反思和记录阶段只调用LLM，可与之重叠
+        self._device_lock = asyncio.Lock()
+        self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
+        
+        # 屏幕状态：每次执行操作后版本号加一，同一版本的截图在各阶段之间共享
+        self._screen_version = 0
+        self._screenshot: Optional[Tuple[int, str]] = None
+        self._pipeline_stats = {"screenshots_taken": 0, "screenshots_reused": 0}
+        
     async def execute_task(self, task_description: str, **kwargs) -> Dict[str, Any]:
         """
         执行移动GUI任务
@@ -67,6 +81,37 @@ class AgentCoordinator(Component):
         Returns:
             任务执行结果
         """
+        self._invalidate_screenshot()
+        return await self._run_task(task_description, pipelined=False, **kwargs)
+    
+    async def execute_tasks(self, task_descriptions: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """
+        以流水线模式执行多个独立任务
+        
+        任务N的反思和记录阶段与任务N+1的规划和执行阶段重叠；
+        同时在途的任务数不超过 max_concurrent_tasks。
+        
+        Args:
+            task_descriptions: 任务描述列表
+            **kwargs: 额外参数
+            
+        Returns:
+            与输入顺序一致的任务执行结果列表
+        """
+        self._invalidate_screenshot()
+        
+        async def run(description: str) -> Dict[str, Any]:
+            async with self._task_slots:
+                return await self._run_task(description, pipelined=True, **kwargs)
+        
+        return list(await asyncio.gather(*(run(description) for description in task_descriptions)))
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """获取截图复用等流水线统计"""
+        return {**self._pipeline_stats, "screen_version": self._screen_version}
+    
+    async def _run_task(self, task_description: str, pipelined: bool, **kwargs) -> Dict[str, Any]:
+        """执行单个任务并维护任务状态"""
         # 生成任务ID
         self._task_counter += 1
         task_id = f"task_{self._task_counter}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -91,7 +136,7 @@ class AgentCoordinator(Component):
             await self.info_pool.update_task(task_description, source_agent="coordinator")
             
             # 执行四阶段协作流程
-            result = await self._execute_collaboration_workflow(task_id, task_description, **kwargs)
+            result = await self._execute_collaboration_workflow(task_id, task_description, pipelined=pipelined, **kwargs)
             
             # 更新任务状态
             task_info["status"] = TaskStatus.COMPLETED
@@ -120,13 +165,15 @@ class AgentCoordinator(Component):
                 "execution_time": (task_info["end_time"] - task_info["start_time"]).total_seconds()
             }
     
-    async def _execute_collaboration_workflow(self, task_id: str, task_description: str, **kwargs) -> Dict[str, Any]:
+    async def _execute_collaboration_workflow(self, task_id: str, task_description: str,
+                                              pipelined: bool = False, **kwargs) -> Dict[str, Any]:
         """
         执行四智能体协作工作流
         
         Args:
             task_id: 任务ID
             task_description: 任务描述
+            pipelined: 是否只在规划和执行阶段占用设备，使反思和记录与后续任务重叠
             **kwargs: 额外参数
             
         Returns:
@@ -134,15 +181,11 @@ class AgentCoordinator(Component):
         """
         task_info = self.current_tasks[task_id]
         
-        # 阶段1: Manager - 任务规划
-        task_info["status"] = TaskStatus.PLANNING
-        planning_result = await self._manager_planning_phase(task_id, task_description, **kwargs)
-        task_info["steps"].append({"phase": "planning", "result": planning_result})
-        
-        # 阶段2: Executor - 操作执行
-        task_info["status"] = TaskStatus.EXECUTING
-        execution_result = await self._executor_execution_phase(task_id, planning_result, **kwargs)
-        task_info["steps"].append({"phase": "execution", "result": execution_result})
+        if pipelined:
+            async with self._device_lock:
+                planning_result, execution_result = await self._device_phases(task_id, task_description, **kwargs)
+        else:
+            planning_result, execution_result = await self._device_phases(task_id, task_description, **kwargs)
         
         # 阶段3: ActionReflector - 结果反思
         task_info["status"] = TaskStatus.REFLECTING
@@ -172,6 +215,49 @@ class AgentCoordinator(Component):
         
         return final_result
     
+    async def _device_phases(self, task_id: str, task_description: str,
+                             **kwargs) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """依赖设备屏幕的规划和执行阶段"""
+        task_info = self.current_tasks[task_id]
+        
+        # 阶段1: Manager - 任务规划
+        task_info["status"] = TaskStatus.PLANNING
+        planning_result = await self._manager_planning_phase(task_id, task_description, **kwargs)
+        task_info["steps"].append({"phase": "planning", "result": planning_result})
+        
+        # 阶段2: Executor - 操作执行
+        task_info["status"] = TaskStatus.EXECUTING
+        execution_result = await self._executor_execution_phase(task_id, planning_result, **kwargs)
+        task_info["steps"].append({"phase": "execution", "result": execution_result})
+        
+        return planning_result, execution_result
+    
+    async def _current_screenshot(self, manager: Any, task_id: str) -> Optional[str]:
+        """获取当前屏幕截图，屏幕自上次截图后未变化时直接复用"""
+        if self._screenshot is not None and self._screenshot[0] == self._screen_version:
+            self._pipeline_stats["screenshots_reused"] += 1
+            logger.info(f"Manager agent reuses screenshot of unchanged screen (TASK {task_id})")
+            return self._screenshot[1]
+        
+        logger.info(f"Manager agent starts taking screenshot (TASK {task_id})")
+        screenshot_path = await manager.take_screenshot()
+        self._pipeline_stats["screenshots_taken"] += 1
+        if screenshot_path:
+            self._screenshot = (self._screen_version, screenshot_path)
+        logger.info(f"Manager agent finished taking screenshot (TASK {task_id}), path: {screenshot_path}")
+        return screenshot_path
+    
+    def _invalidate_screenshot(self) -> None:
+        """两次调用之间屏幕可能在没有执行操作的情况下变化（应用加载、通知），不再复用之前的截图"""
+        self._screen_version += 1
+        self._screenshot = None
+    
+    def _record_screen_change(self, execution_output: Any) -> None:
+        """执行阶段操作了设备：屏幕版本加一，执行器的操作后截图即为新屏幕的截图"""
+        self._screen_version += 1
+        after_screenshot = execution_output.get("after_screenshot") if isinstance(execution_output, dict) else None
+        self._screenshot = (self._screen_version, after_screenshot) if after_screenshot else None
+    
     async def _manager_planning_phase(self, task_id: str, task_description: str, **kwargs) -> Dict[str, Any]:
         """
         Manager智能体规划阶段
@@ -190,14 +276,13 @@ class AgentCoordinator(Component):
 
         try:
             # 1. Manager Agent takes a screenshot
-            logger.info(f"Manager agent starts taking screenshot (TASK {task_id})")
-            screenshot_path = await manager.take_screenshot()
-            logger.info(f"Manager agent finished taking screenshot (TASK {task_id}), path: {screenshot_path}")
+            screenshot_path = await self._current_screenshot(manager, task_id)
             
             # 获取当前共享状态
-            shared_state = await self.info_pool.get_shared_state()
-            logger.info(f"Manager agent fetched shared state (TASK {task_id}): "); 
-            print(JSON(json.dumps(shared_state, ensure_ascii=False)))
+            if self.verbose:
+                shared_state = await self.info_pool.get_shared_state()
+                logger.info(f"Manager agent fetched shared state (TASK {task_id}): "); 
+                print(JSON(json.dumps(shared_state, ensure_ascii=False, default=str)))
 
             # 调用Manager智能体
             logger.info(f"Manager agent invokes for planning (TASK {task_id})")
@@ -216,7 +301,8 @@ class AgentCoordinator(Component):
                 planning_result = agent_result
             
             logger.info(f"Manager agent returned planning result (TASK {task_id}): ")
-            print(planning_result)
+            if self.verbose:
+                print(planning_result)
             
             # 构建结构化结果
             structured_result = {
@@ -266,6 +352,7 @@ class AgentCoordinator(Component):
         if not executor:
             raise ValueError("Executor智能体未找到")
         
+        execution_result = None
         try:
             # 从规划结果中提取截图路径
             screenshot_path = planning_result.get("screenshot_path")
@@ -330,6 +417,10 @@ class AgentCoordinator(Component):
             
             await self.info_pool.add_error(f"Executor执行失败: {str(e)}", source_agent="executor")
             return error_result
+        finally:
+            # 执行器可能在抛出异常前已经操作了设备，无论成败都视为屏幕已变化；
+            # 失败时没有操作后截图，下一次规划重新截图
+            self._record_screen_change(execution_result)
     
     async def _reflector_reflection_phase(self, task_id: str, execution_result: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """